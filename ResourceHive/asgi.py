@@ -3,6 +3,10 @@ ASGI config for ResourceHive project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Served by the "events" service (docker-compose.yml) for the long-lived
+/events/ server-sent event streams (app/live_updates.py), next to the
+Gunicorn WSGI workers that handle every other request.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
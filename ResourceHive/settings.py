@@ -65,6 +65,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Enable for production
+    'app.middleware.RequestLogContextMiddleware',  # Request id and user on log records
+    'app.middleware.SQLInstrumentationMiddleware',  # Opt-in, see SQL_INSTRUMENTATION_ENABLED
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -72,9 +74,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'app.middleware.DisableClientSideCachingMiddleware',
-    'app.middleware.PreventBackToLoginMiddleware',  # Prevent back button to login
-    'app.middleware.SingleSessionPerUserMiddleware',  # Enforce 1 active session per user
-    'userpanel.middleware.ForcePasswordChangeMiddleware',  # Force password change for new users
+    'app.middleware.AuthStateMiddleware',  # Back-to-login, 1 active session per user, forced password change
 
 ]
 
@@ -102,14 +102,34 @@ WSGI_APPLICATION = 'ResourceHive.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Connections are kept open for DB_CONN_MAX_AGE seconds (0 closes them after every request)
+# and checked before reuse, for either configuration below. Under ASGI (the events service)
+# set DB_CONN_MAX_AGE=0.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+# DB_POOL=True uses psycopg 3's connection pool instead of persistent connections
+# (PostgreSQL only, requires psycopg[pool]); the timeout is how long a request waits for a
+# free connection before failing
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+# DB_PGBOUNCER=True when connecting through pgbouncer in transaction pooling mode (the
+# pgbouncer service in docker-compose.yml), which cannot keep server-side cursors open
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'False') == 'True'
+# The reports, tallies, dashboard aggregates and exports read from a streaming replica of the
+# database when one is configured, either as REPORTING_DATABASE_URL or as DB_REPORTING_HOST
+# (plus DB_REPORTING_PORT / DB_REPORTING_NAME where they differ from the primary's), and from
+# the primary otherwise or while the replica lags more than REPORTING_MAX_LAG_SECONDS behind
+# (see app/db_routing.py)
+REPORTING_DATABASE_URL = os.getenv('REPORTING_DATABASE_URL')
+DB_REPORTING_HOST = os.getenv('DB_REPORTING_HOST')
+REPORTING_MAX_LAG_SECONDS = float(os.getenv('REPORTING_MAX_LAG_SECONDS', '30'))
+
 # Use DATABASE_URL if available (Railway), otherwise use individual variables
 if os.getenv('DATABASE_URL') and HAS_DJ_DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.config(
-            default=os.getenv('DATABASE_URL'),
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
+        'default': dj_database_url.config(default=os.getenv('DATABASE_URL'))
     }
 else:
     DATABASES = {
@@ -123,6 +143,99 @@ else:
         }
     }
 
+if REPORTING_DATABASE_URL and HAS_DJ_DATABASE_URL:
+    DATABASES['reporting'] = dj_database_url.parse(REPORTING_DATABASE_URL)
+elif DB_REPORTING_HOST:
+    DATABASES['reporting'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPORTING_HOST,
+        'PORT': os.getenv('DB_REPORTING_PORT', DATABASES['default']['PORT']),
+        'NAME': os.getenv('DB_REPORTING_NAME', DATABASES['default']['NAME']),
+    }
+if 'reporting' in DATABASES:
+    # A replica is read-only: tests read the primary's test database through it
+    DATABASES['reporting']['TEST'] = {'MIRROR': 'default'}
+
+for database in DATABASES.values():
+    if DB_POOL and database['ENGINE'] == 'django.db.backends.postgresql':
+        # The pool owns the connections' lifetime and health checks
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        }
+    else:
+        database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    database['CONN_HEALTH_CHECKS'] = DB_CONN_HEALTH_CHECKS
+    database['DISABLE_SERVER_SIDE_CURSORS'] = DB_PGBOUNCER
+
+DATABASE_ROUTERS = ['app.db_routing.ReportingRouter']
+
+# Cache
+# Uses Redis when REDIS_URL is set so cached state is shared between Gunicorn workers,
+# otherwise falls back to a per-process local memory cache. Caches whose entries are
+# invalidated by the process that changed them check CACHE_IS_SHARED before trusting them.
+CACHE_IS_SHARED = bool(os.getenv('REDIS_URL'))
+if CACHE_IS_SHARED:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'resourcehive',
+        }
+    }
+
+# How long (seconds) a user's session/role/password-change state is cached by AuthStateMiddleware
+AUTH_STATE_CACHE_TIMEOUT = int(os.getenv('AUTH_STATE_CACHE_TIMEOUT', '300'))
+# ...and for how long without a shared cache, where a login or password reset handled by
+# another worker leaves this worker accepting the superseded session until this expires
+AUTH_STATE_LOCAL_CACHE_TIMEOUT = int(os.getenv('AUTH_STATE_LOCAL_CACHE_TIMEOUT', '5'))
+
+# How long (seconds) a user's resolved admin permission codenames are cached
+ADMIN_PERMISSION_CACHE_TIMEOUT = int(os.getenv('ADMIN_PERMISSION_CACHE_TIMEOUT', '300'))
+# ...and for how long without a shared cache, where a revoked permission only reaches the
+# worker that handled the change and stays in force on the others until this expires
+ADMIN_PERMISSION_LOCAL_CACHE_TIMEOUT = int(os.getenv('ADMIN_PERMISSION_LOCAL_CACHE_TIMEOUT', '5'))
+
+# How long (seconds) the activity log user/model dropdown options are cached
+ACTIVITY_FILTER_CACHE_TIMEOUT = int(os.getenv('ACTIVITY_FILTER_CACHE_TIMEOUT', '3600'))
+
+# How long (seconds) a user's dashboard request counters are cached
+REQUEST_COUNTERS_CACHE_TIMEOUT = int(os.getenv('REQUEST_COUNTERS_CACHE_TIMEOUT', '30'))
+
+# How long (seconds) the supply/property catalog snapshot for the pickers is cached
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '600'))
+# ...and for how long without a shared cache, where an edit only drops the snapshot of the
+# worker that handled it and the others keep serving theirs until this expires
+CATALOG_LOCAL_CACHE_TIMEOUT = int(os.getenv('CATALOG_LOCAL_CACHE_TIMEOUT', '10'))
+
+# Server-sent event stream of notification and dashboard counters (/events/, ASGI only).
+# Comment heartbeat interval, delay that coalesces bursts of writes into one update,
+# full recount interval as a safety net, and lifetime after which the client reconnects
+LIVE_EVENTS_HEARTBEAT_SECONDS = int(os.getenv('LIVE_EVENTS_HEARTBEAT_SECONDS', '25'))
+LIVE_EVENTS_DEBOUNCE_SECONDS = float(os.getenv('LIVE_EVENTS_DEBOUNCE_SECONDS', '1'))
+LIVE_EVENTS_RESYNC_SECONDS = int(os.getenv('LIVE_EVENTS_RESYNC_SECONDS', '300'))
+LIVE_EVENTS_MAX_SECONDS = int(os.getenv('LIVE_EVENTS_MAX_SECONDS', '3600'))
+
+# Per-request SQL instrumentation (query counts, DB time, N+1 detection, Server-Timing header).
+# Results are kept in a per-process ring buffer shown at /ops/slow-requests/
+SQL_INSTRUMENTATION_ENABLED = os.getenv('SQL_INSTRUMENTATION_ENABLED', 'False') == 'True'
+SQL_INSTRUMENTATION_BUFFER_SIZE = int(os.getenv('SQL_INSTRUMENTATION_BUFFER_SIZE', '500'))
+# A statement repeated this many times in one request is reported as a possible N+1
+SQL_DUPLICATE_QUERY_THRESHOLD = int(os.getenv('SQL_DUPLICATE_QUERY_THRESHOLD', '5'))
+
+# Calendar months of activity log, supply/property history and notifications kept in the
+# database (including the current one); older months are moved to compressed files in
+# media storage by the archive_logs command
+LOG_RETENTION_HOT_MONTHS = int(os.getenv('LOG_RETENTION_HOT_MONTHS', '12'))
+
 # Old SQLite configuration (backup)
 # DATABASES = {
 #     'default': {
@@ -206,49 +319,47 @@ BORROW_SHORT_TERM_DAYS = 2  # Borrows <= 2 days are considered "short-term"
 BORROW_SHORT_TERM_NOTICE_HOURS = 10  # Send reminder 10 hours before return date for short-term borrows
 
 # Logging Configuration
+# Log records are handed to a background thread that writes JSON lines to
+# LOG_FILE and the console (see app/log_pipeline.py), so requests never wait on
+# log I/O. All workers append to LOG_FILE; rotate it with logrotate, or set it
+# empty to log to the console only
+LOG_FILE = os.getenv('LOG_FILE', 'debug.log')
+# Records beyond this many waiting to be written are dropped instead of blocking
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+APP_LOG_LEVEL = os.getenv('APP_LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO')
+# How often each process re-reads runtime log level overrides (log_level command)
+LOG_LEVEL_REFRESH_SECONDS = int(os.getenv('LOG_LEVEL_REFRESH_SECONDS', '30'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
-        },
-        'simple': {
-            'format': '{levelname} {message}',
-            'style': '{',
-        },
-    },
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple',
-        },
-        'file': {
-            'class': 'logging.FileHandler',
-            'filename': 'debug.log',
-            'formatter': 'verbose',
+        'queue': {
+            '()': 'app.log_pipeline.QueuedLogHandler',
+            'filename': LOG_FILE,
+            'queue_size': LOG_QUEUE_SIZE,
+            'console': True,
         },
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': True,
         },
         'django.request': {
-            'handlers': ['file'],
+            'handlers': ['queue'],
             'level': 'ERROR',
             'propagate': False,
         },
         'django.server': {
-            'handlers': ['file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'app': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'handlers': ['queue'],
+            'level': APP_LOG_LEVEL,
             'propagate': True,
         },
     },
@@ -0,0 +1,76 @@
+"""
+Cached filter dropdown options for the activity log page.
+
+The user and model dropdowns list every distinct user and model name that
+appears in ActivityLog. Computing them means a DISTINCT over the whole audit
+table on every page view, so the result is cached and only rebuilt when a
+log entry introduces a new user or model name, or a listed user is renamed
+(see the receivers in app/signals.py).
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+CACHE_KEY = 'activity_filter_options'
+
+
+def load_activity_filter_options():
+    """
+    Build the dropdown options with two queries.
+
+    Returns a dict with keys: users (list of {'id', 'username'} dicts ordered
+    by username, including inactive users so past activity stays filterable)
+    and models (sorted list of model names).
+    """
+    from .models import ActivityLog
+
+    users = list(
+        User.objects.filter(
+            id__in=ActivityLog.objects.filter(user__isnull=False).values('user_id')
+        ).order_by('username').values('id', 'username')
+    )
+    models = list(
+        ActivityLog.objects.values_list('model_name', flat=True).distinct().order_by('model_name')
+    )
+    return {'users': users, 'models': models}
+
+
+def get_activity_filter_options():
+    """Return the cached dropdown options, loading them on a cache miss."""
+    options = cache.get(CACHE_KEY)
+    if options is None:
+        options = load_activity_filter_options()
+        cache.set(CACHE_KEY, options, getattr(settings, 'ACTIVITY_FILTER_CACHE_TIMEOUT', 3600))
+    return options
+
+
+def invalidate_activity_filter_options(user_id=None, model_name=None):
+    """
+    Drop the cached options if they no longer describe the log.
+
+    With no arguments the cache is always cleared. Otherwise it is only
+    cleared when user_id or model_name is missing from the cached options.
+    """
+    if user_id is None and model_name is None:
+        cache.delete(CACHE_KEY)
+        return
+
+    options = cache.get(CACHE_KEY)
+    if options is None:
+        return
+    known_user = user_id is None or any(u['id'] == user_id for u in options['users'])
+    known_model = model_name is None or model_name in options['models']
+    if not (known_user and known_model):
+        cache.delete(CACHE_KEY)
+
+
+def invalidate_activity_filter_user(user):
+    """Drop the cached options if a listed user's username changed."""
+    options = cache.get(CACHE_KEY)
+    if options is None:
+        return
+    for entry in options['users']:
+        if entry['id'] == user.pk:
+            if entry['username'] != user.username:
+                cache.delete(CACHE_KEY)
+            return
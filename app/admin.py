@@ -8,7 +8,7 @@ from .models import (
     SupplyQuantity, SupplyHistory, PropertyHistory,
     Department, PropertyCategory, SupplyCategory, SupplySubcategory, 
     SupplyRequestBatch, SupplyRequestItem, BorrowRequestBatch, BorrowRequestItem, BadStockReport,
-    UserSession, PPMP, PPMPItem
+    UserSession, PPMP, PPMPItem, LogArchive
 )
 
 @admin.register(Property)
@@ -356,3 +356,10 @@ class PPMPItemAdmin(admin.ModelAdmin):
             'fields': ('unit_price', 'quantity', 'released', 'total_amount')
         }),
     )
+
+
+@admin.register(LogArchive)
+class LogArchiveAdmin(admin.ModelAdmin):
+    list_display = ['table', 'month', 'row_count', 'file', 'created_at']
+    list_filter = ['table']
+    readonly_fields = ['table', 'month', 'file', 'row_count', 'first_id', 'last_id', 'created_at']
@@ -0,0 +1,88 @@
+"""
+Cached per-user authentication state used by AuthStateMiddleware.
+
+Loads the active session key, role, must_change_password flag and group
+membership for a user in a single query and keeps the result in the cache
+until one of those fields changes (see the invalidation receivers in
+app/signals.py).
+
+The receivers only clear the cache of the process that made the change, so
+without a shared cache (REDIS_URL) another Gunicorn worker can hold a stale
+state. There the state is kept for AUTH_STATE_LOCAL_CACHE_TIMEOUT only, so a
+session superseded by a login on another worker, or a password change
+required there, takes effect within seconds. Before AuthStateMiddleware
+logs a user out or forces a password change, it still re-reads the
+deciding column with active_session_key() or password_change_required(),
+uncached, so a stale state never acts on its own.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+
+def _cache_key(user_id):
+    return f"auth_state:{user_id}"
+
+
+def load_auth_state(user_id):
+    """
+    Build the auth state for a user with one query.
+
+    Returns a dict with keys: session_key, role, must_change_password, groups.
+    """
+    rows = User.objects.filter(pk=user_id).values_list(
+        'active_session__session_key',
+        'userprofile__role',
+        'userprofile__must_change_password',
+        'groups__name',
+    )
+
+    state = {
+        'session_key': None,
+        'role': None,
+        'must_change_password': False,
+        'groups': [],
+    }
+    for session_key, role, must_change_password, group_name in rows:
+        state['session_key'] = session_key
+        state['role'] = role
+        state['must_change_password'] = bool(must_change_password)
+        if group_name and group_name not in state['groups']:
+            state['groups'].append(group_name)
+    return state
+
+
+def get_auth_state(user):
+    """Return the cached auth state for a user, loading it on a cache miss."""
+    key = _cache_key(user.pk)
+    state = cache.get(key)
+    if state is None:
+        state = load_auth_state(user.pk)
+        cache.set(key, state, _auth_state_cache_timeout())
+    return state
+
+
+def _auth_state_cache_timeout():
+    if getattr(settings, 'CACHE_IS_SHARED', False):
+        return getattr(settings, 'AUTH_STATE_CACHE_TIMEOUT', 300)
+    return getattr(settings, 'AUTH_STATE_LOCAL_CACHE_TIMEOUT', 5)
+
+
+def active_session_key(user_id):
+    """The user's active session key, read from the database (None without a UserSession)."""
+    from .models import UserSession
+
+    return UserSession.objects.filter(user_id=user_id).values_list('session_key', flat=True).first()
+
+
+def password_change_required(user_id):
+    """The user's must_change_password flag, read from the database."""
+    from .models import UserProfile
+
+    return bool(UserProfile.objects.filter(user_id=user_id).values_list('must_change_password', flat=True).first())
+
+
+def invalidate_auth_state(user_id):
+    """Drop the cached auth state for a user so the next request reloads it."""
+    if user_id:
+        cache.delete(_cache_key(user_id))
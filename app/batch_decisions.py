@@ -0,0 +1,335 @@
+"""
+Bulk approve/reject of batch request items.
+
+Admins decide batch items one POST at a time (approve_batch_item,
+reject_batch_item, approve_borrow_item, approve_reservation_item, ...);
+each POST re-checks stock, re-computes and saves the batch, notifies the
+user and, once the last item is decided, sends the completion email.
+Reviewing a 40-item requisition took 40 round trips.
+
+apply_decisions() takes the decisions for any number of items of one
+request type, across one or more batches, and applies them together:
+
+- the batches, and the SupplyQuantity or Property rows of their items, are
+  locked (select_for_update) and every decision is validated against them
+  before anything is written, counting the stock taken by earlier
+  approvals in the same call; any invalid decision rejects the whole call;
+- all item decisions, reserved-quantity updates and batch statuses are
+  written in one transaction;
+- each batch owner gets one notification, one activity log entry is
+  written per batch, and one completion email is sent per batch that
+  became fully decided, after commit, from a background thread.
+
+The rules for each decision are those of the single-item views.
+"""
+from threading import Thread
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .live_updates import publish, user_target
+
+APPROVE = 'approve'
+REJECT = 'reject'
+
+# Batches still under review, and items that can be (re-)decided in them
+DECIDABLE_BATCH_STATUSES = ('pending', 'partially_approved')
+DECIDABLE_STATUSES = ('pending', 'approved', 'rejected')
+
+# Request type -> (batch model, item model, item field, admin permission, label)
+REQUEST_TYPES = {
+    'supply': ('SupplyRequestBatch', 'SupplyRequestItem', 'supply', 'approve_supply_request', 'batch request'),
+    'borrow': ('BorrowRequestBatch', 'BorrowRequestItem', 'property', 'approve_borrow_request', 'batch borrow request'),
+    'reservation': ('ReservationBatch', 'ReservationItem', 'property', 'approve_reservation', 'reservation batch'),
+}
+
+
+def _item_name(item):
+    return item.supply.supply_name if hasattr(item, 'supply_id') else item.property.property_name
+
+
+def _parse_decisions(decisions):
+    """Normalize the raw decisions to {item_id: decision dict}; raises ValidationError."""
+    parsed = {}
+    for raw in decisions:
+        try:
+            item_id = int(raw['item'])
+            approved_quantity = raw.get('approved_quantity')
+            approved_quantity = int(approved_quantity) if approved_quantity not in (None, '') else None
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(f'Invalid decision: {raw!r}')
+        if raw.get('decision') not in (APPROVE, REJECT):
+            raise ValidationError(f"Item #{item_id}: decision must be '{APPROVE}' or '{REJECT}'.")
+        if item_id in parsed:
+            raise ValidationError(f'Item #{item_id} has more than one decision.')
+        allocations = raw.get('ppmp_allocations') or None
+        if allocations is not None and not (
+            isinstance(allocations, list) and all(isinstance(allocation, dict) for allocation in allocations)
+        ):
+            raise ValidationError(f'Item #{item_id}: invalid PPMP allocations.')
+        for allocation in allocations or ():
+            if allocation.get('ppmp_item_id'):
+                try:
+                    allocation['ppmp_item_id'] = int(allocation['ppmp_item_id'])
+                except (TypeError, ValueError):
+                    raise ValidationError(f"Item #{item_id}: invalid PPMP item {allocation['ppmp_item_id']!r}.")
+        parsed[item_id] = {
+            'decision': raw['decision'],
+            'approved_quantity': approved_quantity,
+            'ppmp_allocations': allocations,
+            'remarks': raw.get('remarks') or '',
+        }
+    if not parsed:
+        raise ValidationError('No decisions were given.')
+    return parsed
+
+
+def apply_decisions(request_type, decisions, user):
+    """
+    Approve or reject batch items of one request type ('supply', 'borrow' or
+    'reservation'). decisions is a list of {'item': item id, 'decision':
+    'approve' or 'reject', 'approved_quantity': optional, 'ppmp_allocations':
+    optional (supply items, as posted to approve_batch_item), 'remarks':
+    optional}.
+
+    Raises ValidationError with every problem found, leaving everything
+    unchanged; otherwise returns {batch id: new batch status}.
+    """
+    from django.apps import apps
+    from .models import ActivityLog, Notification, PPMPItem, Property, SupplyQuantity
+
+    batch_name, item_name, field, _, label = REQUEST_TYPES[request_type]
+    batch_model = apps.get_model('app', batch_name)
+    item_model = apps.get_model('app', item_name)
+    decisions = _parse_decisions(decisions)
+
+    with transaction.atomic():
+        # Lock the batches, then the stock rows, always in primary key order
+        batch_ids = sorted(set(
+            item_model.objects.filter(pk__in=list(decisions)).values_list('batch_request_id', flat=True)
+        ))
+        batches = {
+            batch.pk: batch
+            for batch in batch_model.objects.select_for_update().filter(pk__in=batch_ids).order_by('pk')
+        }
+        items = {}
+        batch_items = {batch_id: [] for batch_id in batch_ids}
+        for item in item_model.objects.filter(batch_request_id__in=batch_ids).select_related(field).order_by('pk'):
+            batch_items[item.batch_request_id].append(item)
+            if item.pk in decisions:
+                items[item.pk] = item
+        missing = sorted(set(decisions) - set(items))
+        if missing:
+            raise ValidationError([f'Item #{item_id} was not found.' for item_id in missing])
+
+        stock_ids = sorted({getattr(item, f'{field}_id') for item in items.values()})
+        if request_type == 'supply':
+            stock = {q.supply_id: q for q in SupplyQuantity.objects.select_for_update().filter(supply_id__in=stock_ids).order_by('pk')}
+        else:
+            stock = Property.objects.select_for_update().order_by('pk').in_bulk(stock_ids)
+            # Share the locked rows so reserved quantities updated by item.save() add up
+            for item in items.values():
+                item.property = stock[item.property_id]
+
+        ppmp_item_ids = [
+            allocation['ppmp_item_id']
+            for decision in decisions.values() for allocation in decision['ppmp_allocations'] or ()
+            if allocation.get('ppmp_item_id')
+        ]
+        ppmp_items = PPMPItem.objects.in_bulk(ppmp_item_ids) if ppmp_item_ids else {}
+
+        # Validate everything before writing anything
+        errors = [
+            f'{label.capitalize()} #{batch_id} is {batches[batch_id].get_status_display().lower()}.'
+            for batch_id in batch_ids if batches[batch_id].status not in DECIDABLE_BATCH_STATUSES
+        ]
+        taken = {}  # Stock id -> quantity approved so far in this call
+        for item_id, decision in decisions.items():
+            item = items[item_id]
+            name = _item_name(item)
+            if item.status not in DECIDABLE_STATUSES:
+                errors.append(f'{name} (item #{item_id}) is already {item.get_status_display().lower()}.')
+                continue
+            if decision['decision'] == REJECT:
+                continue
+
+            quantity = decision['approved_quantity']
+            if quantity is None:
+                quantity = item.quantity
+            if not 1 <= quantity <= item.quantity:
+                errors.append(f'{name}: approved quantity must be between 1 and {item.quantity}.')
+                continue
+            decision['approved_quantity'] = quantity
+
+            stock_id = getattr(item, f'{field}_id')
+            if request_type == 'supply' and stock_id not in stock:
+                errors.append(f'{name} has no quantity information.')
+                continue
+            available = stock[stock_id].available_quantity - taken.get(stock_id, 0)
+            if item.status == 'approved':
+                # Re-approving replaces the quantity the item already holds
+                available += item.quantity if request_type == 'reservation' else (item.approved_quantity or 0)
+            if quantity > available:
+                errors.append(f'Cannot approve {quantity} units of {name}. Only {available} units available.')
+                continue
+            taken[stock_id] = taken.get(stock_id, 0) + quantity
+
+            for allocation in decision['ppmp_allocations'] or ():
+                if allocation.get('ppmp_item_id') and allocation['ppmp_item_id'] not in ppmp_items:
+                    errors.append(f"{name}: PPMP item #{allocation['ppmp_item_id']} was not found.")
+        if errors:
+            raise ValidationError(errors)
+
+        # Apply the decisions
+        changed_stock = set()
+        for item_id, decision in decisions.items():
+            item = items[item_id]
+            changed_stock.add(getattr(item, f'{field}_id'))
+            if request_type == 'supply':
+                _decide_supply_item(item, decision, stock.get(item.supply_id), ppmp_items)
+            elif request_type == 'borrow':
+                _decide_borrow_item(item, decision)
+            else:
+                _decide_reservation_item(item, decision)
+        if request_type == 'supply':
+            for supply_id in sorted(changed_stock):
+                if supply_id in stock:
+                    stock[supply_id].save(user=user)
+
+        # Update the batches, notify their owners and log once per batch
+        statuses = {}
+        completed = []
+        notifications = []
+        decided = {batch_id: [] for batch_id in batch_ids}
+        for item_id in decisions:
+            decided[items[item_id].batch_request_id].append(items[item_id])
+        for batch_id in batch_ids:
+            batch = batches[batch_id]
+            if _update_batch_status(request_type, batch, batch_items[batch_id], user):
+                completed.append(batch)
+            statuses[batch_id] = batch.status
+
+            approved = [item for item in decided[batch_id] if item.status == 'approved']
+            rejected = [item for item in decided[batch_id] if item.status == 'rejected']
+            summary = ', '.join(
+                [f'{_item_name(item)} approved' for item in approved] + [f'{_item_name(item)} rejected' for item in rejected]
+            )
+            notifications.append(Notification(
+                user_id=batch.user_id,
+                message=f"{len(approved)} item(s) approved and {len(rejected)} rejected in your {label} #{batch_id}.",
+                remarks=summary,
+            ))
+            ActivityLog.log_activity(
+                user=user,
+                action='approve' if approved else 'reject',
+                model_name=item_name,
+                object_repr=f"Batch #{batch_id}",
+                description=f"Reviewed {len(decided[batch_id])} item(s) in {label} #{batch_id}: {summary}"
+            )
+        # bulk_create skips the Notification receiver, so publish to the owners here
+        Notification.objects.bulk_create(notifications)
+        publish(*(user_target(batch.user_id) for batch in batches.values()))
+
+        if completed:
+            # Off the request path, as the single-item views send theirs
+            transaction.on_commit(lambda: Thread(
+                target=_send_completion_emails, args=(request_type, completed), daemon=True,
+            ).start())
+    return statuses
+
+
+def _decide_supply_item(item, decision, quantity_info, ppmp_items):
+    """Mirror of approve_batch_item / reject_batch_item; the reserved quantity is saved by the caller."""
+    if decision['remarks']:
+        item.remarks = decision['remarks']
+    if decision['decision'] == REJECT:
+        if item.status == 'approved' and item.approved_quantity and quantity_info is not None:
+            quantity_info.reserved_quantity = max(0, quantity_info.reserved_quantity - item.approved_quantity)
+        item.status = 'rejected'
+        item.save()
+        return
+
+    if item.status == 'approved' and item.approved_quantity:
+        quantity_info.reserved_quantity = max(0, quantity_info.reserved_quantity - item.approved_quantity)
+    item.status = 'approved'
+    item.approved_quantity = decision['approved_quantity']
+    allocations = decision['ppmp_allocations']
+    if allocations:
+        # PPMP released quantities are updated when the item is claimed
+        item.ppmp_allocations = allocations
+        item.ppmp_year = allocations[0].get('year')
+        if allocations[0].get('ppmp_item_id'):
+            item.ppmp_item = ppmp_items[allocations[0]['ppmp_item_id']]
+    item.save()
+    quantity_info.reserved_quantity += item.approved_quantity
+
+
+def _decide_borrow_item(item, decision):
+    """Mirror of approve_borrow_item / reject_borrow_item; item.save() updates the reserved quantity."""
+    if decision['remarks']:
+        item.remarks = decision['remarks']
+    if decision['decision'] == APPROVE:
+        item.status = 'approved'
+        item.approved_quantity = decision['approved_quantity']
+    else:
+        item.status = 'rejected'
+    item.save()
+
+
+def _decide_reservation_item(item, decision):
+    """Mirror of approve_reservation_item / reject_reservation_item; item.save() updates the reserved quantity."""
+    remarks = decision['remarks']
+    if decision['decision'] == REJECT:
+        item.status = 'rejected'
+        item.remarks = remarks
+    else:
+        approved_quantity = decision['approved_quantity']
+        if approved_quantity < item.quantity:
+            adjustment_note = f"Approved quantity: {approved_quantity} (Originally requested: {item.quantity})"
+            item.remarks = f"{adjustment_note}\n{remarks}" if remarks else adjustment_note
+        else:
+            item.remarks = remarks
+        item.quantity = approved_quantity
+        item.status = 'approved'
+    item.save()
+
+
+def _update_batch_status(request_type, batch, items, user):
+    """
+    Recompute and save the batch status from its items, as the single-item
+    views do. Returns True if the batch became fully decided.
+    """
+    approved = sum(1 for item in items if item.status == 'approved')
+    rejected = sum(1 for item in items if item.status == 'rejected')
+    all_decided = approved + rejected == len(items)
+
+    if request_type == 'reservation':
+        if approved and not batch.approved_date:
+            batch.approved_date = timezone.now()
+        if all_decided:
+            batch.status = 'partially_approved' if approved and rejected else ('approved' if approved else 'rejected')
+    else:
+        if all_decided:
+            batch.status = 'for_claiming' if approved else 'rejected'
+        elif approved:
+            batch.status = 'partially_approved'
+        if approved:
+            batch.approved_date = batch.approved_date or timezone.now()
+            batch.approved_by = batch.approved_by or user
+    batch.save()
+    return all_decided
+
+
+def _send_completion_emails(request_type, batches):
+    """One completion email per fully decided batch; reservations have none, as in the single-item views."""
+    from .utils import send_batch_request_completion_email, send_borrow_batch_request_completion_email
+
+    send = {
+        'supply': send_batch_request_completion_email,
+        'borrow': send_borrow_batch_request_completion_email,
+    }.get(request_type)
+    if send is None:
+        return
+    for batch in batches:
+        send(batch, batch.items.filter(status='approved'), batch.items.filter(status='rejected'))
@@ -0,0 +1,153 @@
+"""
+Benchmark scenarios and baseline comparison for the run_benchmarks command.
+
+A scenario is a dict naming either a URL to fetch with the test client, as
+the 'admin' or the 'user' account of a generated load dataset (see the
+generate_load_dataset command), or a 'call' that runs server-side work
+directly, such as the scheduler sweeps. URL kwargs that depend on the
+dataset (a barcode to look up) are given as callables of the benchmark
+context built by benchmark_context().
+
+The sweeps are marked 'mutates': they update every overdue, expired or
+expiring row in the database, not just the generated ones, consume the
+expiry watermark and notify users. run_benchmarks only runs them against a
+database that holds nothing but the generated dataset (see
+is_load_dataset()) or with --allow-mutations, and always with outgoing
+email kept in memory and SMS patched out.
+
+Each scenario is measured as a list of wall-clock timings plus the number of
+queries of its last run. summarize() reduces those to p50/p95/max and
+compare() checks a run against a saved baseline: a scenario regresses when
+its p95 grows by more than the threshold (ignoring changes below
+NOISE_FLOOR_MS) or when it runs more queries than before.
+"""
+import math
+
+# Latency changes smaller than this are treated as noise, whatever the ratio
+NOISE_FLOOR_MS = 5.0
+
+
+def _sweep_borrow_batches():
+    from .models import BorrowRequestBatch
+    BorrowRequestBatch.check_near_overdue_items()
+    BorrowRequestBatch.check_overdue_batches()
+    BorrowRequestBatch.check_expired_batches()
+
+
+def _sweep_reservations():
+    from .models import ReservationBatch
+    ReservationBatch.check_and_update_batches()
+
+
+def _sweep_expiring_supplies():
+    from .models import Supply
+    Supply.check_expiring_supplies()
+
+
+SCENARIOS = [
+    {'name': 'admin_dashboard', 'role': 'admin', 'url': 'dashboard'},
+    {'name': 'supply_list', 'role': 'admin', 'url': 'supply_list'},
+    {'name': 'supply_list_search', 'role': 'admin', 'url': 'supply_list', 'query': {'q': 'Paper'}},
+    {'name': 'property_list', 'role': 'admin', 'url': 'property_list'},
+    {'name': 'activity_log', 'role': 'admin', 'url': 'activity'},
+    {'name': 'resource_allocation', 'role': 'admin', 'url': 'resource_allocation_dashboard'},
+    {'name': 'supply_approved_tally', 'role': 'admin', 'url': 'supply_approved_tally'},
+    {'name': 'supply_barcode_lookup', 'role': 'admin', 'url': 'get_supply_by_barcode',
+     'kwargs': lambda context: {'barcode': context['supply_barcode']}},
+    {'name': 'property_barcode_lookup', 'role': 'admin', 'url': 'get_property_by_barcode',
+     'kwargs': lambda context: {'barcode': context['property_barcode']}},
+    {'name': 'export_supplies', 'role': 'admin', 'url': 'export_supply'},
+    {'name': 'user_dashboard', 'role': 'user', 'url': 'user_dashboard'},
+    {'name': 'user_all_requests', 'role': 'user', 'url': 'user_all_requests'},
+    {'name': 'request_counters', 'role': 'user', 'url': 'request_counters'},
+    {'name': 'export_claimed_tally', 'role': 'user', 'url': 'export_claimed_supplies_tally_excel'},
+    {'name': 'sweep_borrow_batches', 'call': _sweep_borrow_batches, 'mutates': True},
+    {'name': 'sweep_reservations', 'call': _sweep_reservations, 'mutates': True},
+    {'name': 'sweep_expiring_supplies', 'call': _sweep_expiring_supplies, 'mutates': True},
+]
+
+
+def is_load_dataset(prefix):
+    """
+    Whether the database holds only the dataset generated with prefix.
+
+    Superusers are allowed alongside it (the deployment's own admin account);
+    any other user or supply not tagged with prefix means real data.
+    """
+    from django.contrib.auth.models import User
+
+    from .models import Supply
+
+    return not (
+        User.objects.filter(is_superuser=False).exclude(username__startswith=f'{prefix}_').exists()
+        or Supply.objects.exclude(supply_name__startswith=f'[{prefix}]').exists()
+    )
+
+
+def benchmark_context(prefix):
+    """
+    Accounts and sample objects of the dataset generated with prefix.
+
+    The benchmark user is the generated user with the most supply requests,
+    so the user-side pages have something to show.
+    """
+    from django.contrib.auth.models import User
+    from django.core.management.base import CommandError
+    from django.db.models import Count
+
+    from .models import Property, Supply
+
+    admin = User.objects.filter(username=f'{prefix}_admin').first()
+    user = User.objects.filter(
+        username__startswith=f'{prefix}_user_',
+    ).annotate(batches=Count('supplyrequestbatch')).order_by('-batches', 'id').first()
+    supply = Supply.objects.filter(supply_name__startswith=f'[{prefix}]').order_by('id').first()
+    prop = Property.objects.filter(property_name__startswith=f'[{prefix}]').order_by('id').first()
+    if not (admin and user and supply and prop):
+        raise CommandError(
+            f"No load dataset tagged '{prefix}' found. Run generate_load_dataset --prefix {prefix} first."
+        )
+    return {
+        'admin': admin,
+        'user': user,
+        'supply_barcode': supply.barcode,
+        'property_barcode': prop.barcode,
+    }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list of numbers."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(timings_ms, queries):
+    """Reduce one scenario's timings to the figures stored in a baseline."""
+    return {
+        'p50_ms': round(percentile(timings_ms, 50), 2),
+        'p95_ms': round(percentile(timings_ms, 95), 2),
+        'max_ms': round(max(timings_ms), 2),
+        'queries': queries,
+        'runs': len(timings_ms),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare scenario results against a baseline.
+
+    Returns a list of (scenario, reason) for every regression. Scenarios
+    missing from either side are skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        p95, old_p95 = result['p95_ms'], previous['p95_ms']
+        if p95 > old_p95 * (1 + threshold) and p95 - old_p95 > NOISE_FLOOR_MS:
+            regressions.append((name, f'p95 {old_p95}ms -> {p95}ms'))
+        if result['queries'] > previous['queries']:
+            regressions.append((name, f"queries {previous['queries']} -> {result['queries']}"))
+    return regressions
@@ -0,0 +1,107 @@
+"""
+Import-time profile of a Gunicorn worker boot, for the profile_worker_boot
+command.
+
+Workers are started without --preload, so each one imports the WSGI
+application and, on its first request, the URLconf with every view module.
+profile_worker_boot() replays exactly that in a fresh interpreter under
+`python -X importtime` and parses the report. Report, export and barcode
+libraries (LAZY_MODULES) are imported inside the code paths that use them,
+so finding one of them in a boot profile is a regression: it costs every
+worker its import time and memory, whether or not the worker ever serves
+an export.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Imported on first use only; must not appear in a worker boot
+LAZY_MODULES = ('reportlab', 'openpyxl', 'PIL', 'barcode', 'requests')
+
+WORKER_BOOT_CODE = (
+    'import ResourceHive.wsgi\n'
+    'from django.urls import get_resolver\n'
+    'get_resolver().url_patterns\n'
+)
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def parse_importtime(output):
+    """
+    Parse `python -X importtime` output into a list of
+    (module, self_us, cumulative_us, depth) in the order reported, where a
+    module is listed after everything it imported.
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def importer_chain(entries, index):
+    """Module names from the top-level import down to entries[index]."""
+    chain = [entries[index][0]]
+    depth = entries[index][3]
+    for module, _, _, module_depth in entries[index + 1:]:
+        if module_depth < depth:
+            chain.append(module)
+            depth = module_depth
+            if depth == 0:
+                break
+    return list(reversed(chain))
+
+
+def lazy_module_imports(entries, lazy_modules=LAZY_MODULES):
+    """{lazy top-level package: importer chain} for every lazy package that was imported."""
+    outermost = {}
+    for index, (module, _, _, depth) in enumerate(entries):
+        package = module.split('.')[0]
+        if package in lazy_modules and (package not in outermost or depth < entries[outermost[package]][3]):
+            outermost[package] = index
+    return {package: importer_chain(entries, index) for package, index in outermost.items()}
+
+
+def profile_worker_boot(code=WORKER_BOOT_CODE, python=sys.executable):
+    """
+    Run code in a fresh interpreter under -X importtime with this process'
+    settings module and return {'entries', 'modules', 'import_ms', 'wall_ms',
+    'rss_mb', 'lazy_imports'}. import_ms is the sum of every module's own
+    import time; wall_ms also counts interpreter start-up; rss_mb is the
+    peak resident memory of the booted interpreter.
+    """
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'ResourceHive.settings')
+    boot = (
+        'import django\ndjango.setup()\n' + code +
+        # ru_maxrss is in KiB on Linux
+        'import resource\nprint(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n'
+    )
+    start = time.perf_counter()
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', boot],
+        capture_output=True, text=True, env=env, cwd=_project_root(),
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode:
+        raise RuntimeError(f'Worker boot failed:\n{result.stderr[-2000:]}')
+
+    entries = parse_importtime(result.stderr)
+    return {
+        'entries': entries,
+        'modules': len(entries),
+        'import_ms': round(sum(self_us for _, self_us, _, _ in entries) / 1000, 1),
+        'wall_ms': round(wall_ms, 1),
+        'rss_mb': round(int(result.stdout.split()[-1]) / 1024, 1),
+        'lazy_imports': lazy_module_imports(entries),
+    }
+
+
+def _project_root():
+    from django.conf import settings
+    return str(settings.BASE_DIR)
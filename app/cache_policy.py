@@ -0,0 +1,85 @@
+"""
+HTTP caching policies for views.
+
+By default DisableClientSideCachingMiddleware marks every response as
+no-store so the back button never shows authenticated pages after logout.
+Views that serve data which can safely be reused (images, generated slips,
+history JSON) declare a policy with @cache_policy instead, and get ETag /
+Last-Modified validation with 304 responses via Django's condition().
+
+Usage:
+    @login_required
+    @cache_policy(REVALIDATE, etag_func=lambda request, pk: ...)
+    def my_view(request, pk):
+        ...
+"""
+from functools import wraps
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+# Never stored by the browser (default for HTML pages)
+NO_STORE = 'no-store'
+# Stored privately but revalidated on every use (ETag / Last-Modified -> 304)
+REVALIDATE = 'revalidate'
+# Stored privately and reused without revalidation until max_age expires
+IMMUTABLE = 'immutable'
+# Stored privately for a few seconds, then revalidated (frequently polled JSON)
+SHORT_LIVED = 'short-lived'
+
+DEFAULT_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+DEFAULT_SHORT_LIVED_MAX_AGE = 30
+
+
+def apply_cache_policy(response, policy, max_age=None):
+    """Set Cache-Control headers for a policy and mark the response as handled."""
+    if policy == REVALIDATE:
+        patch_cache_control(response, private=True, no_cache=True, max_age=0)
+    elif policy == IMMUTABLE:
+        patch_cache_control(
+            response,
+            private=True,
+            immutable=True,
+            max_age=max_age or DEFAULT_IMMUTABLE_MAX_AGE,
+        )
+    elif policy == SHORT_LIVED:
+        patch_cache_control(
+            response,
+            private=True,
+            must_revalidate=True,
+            max_age=max_age or DEFAULT_SHORT_LIVED_MAX_AGE,
+        )
+    else:
+        response['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0, private'
+    patch_vary_headers(response, ['Cookie'])
+    response.cache_policy = policy
+    return response
+
+
+def cache_policy(policy, etag_func=None, last_modified_func=None, max_age=None):
+    """
+    Decorator declaring the caching policy of a view.
+
+    etag_func / last_modified_func receive the same arguments as the view and
+    are evaluated before it; when the client's validators still match, a 304
+    is returned without running the view. Returning None from them skips
+    validation for that request (e.g. when the user may not see the object).
+    policy may also be a callable receiving the view's arguments, for views
+    whose policy depends on the request (e.g. on a version in the URL).
+    Error responses always keep the default no-store behaviour.
+    """
+    def decorator(view_func):
+        conditional_view = view_func
+        if etag_func or last_modified_func:
+            conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                request_policy = policy(request, *args, **kwargs) if callable(policy) else policy
+                apply_cache_policy(response, request_policy, max_age)
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,195 @@
+"""
+Server-side request carts (Cart / CartLine).
+
+The supply, borrow and reservation lists used to be kept as lists in
+request.session, so every add, update or remove re-serialized the whole list
+into the session row, and every page view and submission fetched each line's
+item with its own query. Each line is now a CartLine row: adding an item
+updates or inserts that one row, the pages load a cart's lines together with
+their items in one query, and submitting checks those lines (validate_cart())
+and turns them into a batch with a single bulk_create() in one transaction
+(submit_cart()), in a constant number of queries however long the cart is.
+
+Item ids come straight from the POST data; a value that is not a number
+raises ValueError, which the views report as invalid input.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .live_updates import publish, user_target
+from .request_counters import invalidate_request_counters
+from .request_index import sync_request_index
+
+SUPPLY = 'supply'
+BORROW = 'borrow'
+RESERVATION = 'reservation'
+
+# Cart kind -> (batch model, item model, request index kind)
+BATCH_MODELS = {
+    SUPPLY: ('SupplyRequestBatch', 'SupplyRequestItem', 'batch_supply'),
+    BORROW: ('BorrowRequestBatch', 'BorrowRequestItem', 'batch_borrow'),
+    RESERVATION: ('ReservationBatch', 'ReservationItem', 'reservation'),
+}
+
+
+def get_cart(user, kind, create=True):
+    """The user's cart of the given kind; None if it does not exist and create is False."""
+    from .models import Cart
+
+    if create:
+        cart = Cart.objects.get_or_create(user=user, kind=kind)[0]
+    else:
+        cart = Cart.objects.filter(user=user, kind=kind).first()
+    if cart is not None:
+        cart.user = user  # submit_cart() creates the batch for it
+    return cart
+
+
+def _lookup(cart, item_id):
+    return {f'{cart.item_field}_id': int(item_id)}
+
+
+def get_line(cart, item_id):
+    """The cart's line for an item, or None."""
+    return cart.lines.filter(**_lookup(cart, item_id)).first()
+
+
+def add_to_cart(cart, item_id, quantity, **fields):
+    """
+    Add quantity of an item to the cart, merging it into the item's line if
+    there is one. Any other fields (dates, purpose) overwrite the line's.
+    """
+    lookup = _lookup(cart, item_id)
+    if cart.lines.filter(**lookup).update(quantity=F('quantity') + quantity, **fields):
+        return
+    try:
+        with transaction.atomic():
+            cart.lines.create(quantity=quantity, **lookup, **fields)
+    except IntegrityError:
+        # Added by a concurrent request (e.g. a double click); merge into that line
+        cart.lines.filter(**lookup).update(quantity=F('quantity') + quantity, **fields)
+
+
+def update_line(cart, item_id, **fields):
+    """Set fields (quantity, dates, purpose) of an item's line; False if the item is not in the cart."""
+    return bool(cart.lines.filter(**_lookup(cart, item_id)).update(**fields))
+
+
+def remove_from_cart(cart, item_id):
+    cart.lines.filter(**_lookup(cart, item_id)).delete()
+
+
+def clear_cart(cart):
+    """Remove every line and the batch-level dates and purpose."""
+    cart.lines.all().delete()
+    cart.needed_date = cart.return_date = None
+    cart.purpose = ''
+    cart.save(update_fields=['needed_date', 'return_date', 'purpose'])
+
+
+def fill_cart(cart, lines, **cart_fields):
+    """
+    Replace the cart's content (used by "request again"): lines are dicts of
+    CartLine fields with the item under 'item_id'; cart_fields set the
+    batch-level dates and purpose.
+    """
+    from .models import CartLine
+
+    with transaction.atomic():
+        clear_cart(cart)
+        for name, value in cart_fields.items():
+            setattr(cart, name, value)
+        if cart_fields:
+            cart.save(update_fields=list(cart_fields))
+        CartLine.objects.bulk_create([
+            CartLine(cart=cart, **_lookup(cart, line.pop('item_id')), **line)
+            for line in (dict(line) for line in lines)
+        ])
+
+
+def line_count(cart):
+    return cart.lines.count() if cart is not None else 0
+
+
+def cart_lines(cart):
+    """
+    The cart's lines in the order they were added, each with its supply (and
+    its quantity_info) or property loaded by the same query.
+    """
+    if cart is None:
+        return []
+    related = 'supply__quantity_info' if cart.kind == SUPPLY else 'property'
+    return list(cart.lines.select_related(related))
+
+
+def cart_item(line):
+    """The supply or property of a line from cart_lines()."""
+    return line.supply if line.supply_id is not None else line.property
+
+
+def validate_cart(cart, lines):
+    """
+    Check the lines from cart_lines() before submitting them; returns a list
+    of error messages, empty if the cart can be submitted. Supplies must have
+    the requested quantity available (after reserved items); properties must
+    be available for request and not archived.
+    """
+    from .models import SupplyQuantity
+
+    errors = []
+    for line in lines:
+        if cart.kind == SUPPLY:
+            try:
+                available_qty = line.supply.quantity_info.available_quantity
+            except SupplyQuantity.DoesNotExist:
+                errors.append(f"{line.supply.supply_name} has no quantity information.")
+                continue
+            if line.quantity > available_qty:
+                errors.append(
+                    f"{line.supply.supply_name}: Only {available_qty} unit(s) available "
+                    f"(accounting for reserved items). Please reduce your request to {available_qty} or less."
+                )
+        elif line.property.availability != 'available':
+            errors.append(f'{line.property.property_name} is not available for request')
+        elif line.property.is_archived:
+            errors.append(f'{line.property.property_name} is archived and cannot be requested')
+    return errors
+
+
+def submit_cart(cart, lines, purpose, **item_fields):
+    """
+    Submit the cart as a pending batch request of its kind and empty it.
+
+    lines are the cart's lines from cart_lines(), already checked with
+    validate_cart(); item_fields (e.g. the batch return date) are set on
+    every item. The batch, its items and the emptied cart are written in one
+    transaction, the items with a single bulk_create(), so a failure leaves
+    neither a partial batch nor an emptied cart. The admins are notified
+    once the transaction commits (see notify_admins_of_new_batch()).
+    bulk_create() skips the item post_save receivers, so the batch's request
+    index row is re-projected here once all of its items exist. Returns the
+    batch.
+    """
+    from django.apps import apps
+
+    batch_name, item_name, index_kind = BATCH_MODELS[cart.kind]
+    batch_model = apps.get_model('app', batch_name)
+    item_model = apps.get_model('app', item_name)
+    field = cart.item_field
+
+    with transaction.atomic():
+        batch = batch_model.objects.create(user=cart.user, purpose=purpose, status='pending')
+        items = []
+        for line in lines:
+            item = item_model(batch_request=batch, quantity=line.quantity, status='pending', **item_fields)
+            setattr(item, field, cart_item(line))
+            if cart.kind == RESERVATION:
+                item.remarks = line.purpose
+            items.append(item)
+        item_model.objects.bulk_create(items)
+        clear_cart(cart)
+
+        sync_request_index(index_kind, batch.pk)
+        invalidate_request_counters(cart.user_id)
+        publish(user_target(cart.user_id))
+    return batch
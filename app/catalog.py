@@ -0,0 +1,120 @@
+"""
+Cached catalog snapshot for the supply and property pickers.
+
+The supply and property pages and the reservation form offer every item in
+a dropdown or picker modal. Rendering those options into each page meant
+loading the whole catalog on every page view, so the pages now render only
+their own (paginated) rows and fetch a compact JSON snapshot of the catalog
+from catalog_snapshot (see static/scripts/catalog.js).
+
+The snapshot is built once and cached together with its version (an MD5 of
+the JSON). Pages request it as catalog/?v=<version>, which the browser may
+keep as immutable, and the ETag turns any other request into a 304 when
+nothing changed. Catalog edits drop the cached snapshot (see the receivers
+in app/signals.py); the rebuilt snapshot gets a new version, and the pages
+a new URL, whenever its content changed. Bulk .update() calls bypass those
+receivers, so CATALOG_CACHE_TIMEOUT bounds how stale the snapshot can get.
+
+The receivers only drop the snapshot and version of the process that made
+the edit. With a shared cache (REDIS_URL) that is every process; without
+one, each Gunicorn worker keeps its own copy for CATALOG_LOCAL_CACHE_TIMEOUT
+only, so an edit reaches the other workers' pages within seconds. Both
+timeouts apply to the snapshot and its version together.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+CACHE_KEY = 'catalog_snapshot'
+VERSION_CACHE_KEY = 'catalog_snapshot_version'
+
+
+def build_catalog():
+    """
+    Build the catalog with two queries.
+
+    Returns a dict with keys: supplies (non-archived supplies as {'id',
+    'name', 'category', 'subcategory', 'unit', 'barcode', 'description',
+    'quantity', 'available_quantity', 'available'}) and properties
+    (non-archived properties as {'id', 'name', 'number', 'category_id',
+    'category', 'unit', 'quantity', 'available_quantity', 'availability',
+    'condition'}), both ordered by name.
+    """
+    from .models import Property, Supply
+
+    supplies = [
+        {
+            'id': row['id'],
+            'name': row['supply_name'],
+            'category': row['category__name'],
+            'subcategory': row['subcategory__name'],
+            'unit': row['unit'],
+            'barcode': row['barcode'],
+            'description': row['description'] or '',
+            'quantity': row['quantity_info__current_quantity'] or 0,
+            'available_quantity': row['quantity_info__available_stock'] or 0,
+            'available': row['available_for_request'],
+        }
+        for row in Supply.objects.filter(is_archived=False).order_by('supply_name', 'id').values(
+            'id', 'supply_name', 'category__name', 'subcategory__name', 'unit', 'barcode', 'description',
+            'quantity_info__current_quantity', 'quantity_info__available_stock', 'available_for_request',
+        )
+    ]
+    properties = [
+        {
+            'id': row['id'],
+            'name': row['property_name'],
+            'number': row['property_number'],
+            'category_id': row['category_id'],
+            'category': row['category__name'],
+            'unit': row['unit_of_measure'],
+            'quantity': row['quantity'],
+            'available_quantity': max(0, row['quantity'] - row['reserved_quantity']),
+            'availability': row['availability'],
+            'condition': row['condition'],
+        }
+        for row in Property.objects.filter(is_archived=False).order_by('property_name', 'id').values(
+            'id', 'property_name', 'property_number', 'category_id', 'category__name', 'unit_of_measure',
+            'quantity', 'reserved_quantity', 'availability', 'condition',
+        )
+    ]
+    return {'supplies': supplies, 'properties': properties}
+
+
+def get_catalog_snapshot():
+    """Return the cached {'version', 'body'} snapshot (body is UTF-8 JSON), building it on a cache miss."""
+    snapshot = cache.get(CACHE_KEY)
+    if snapshot is None:
+        body = json.dumps(build_catalog(), separators=(',', ':')).encode()
+        snapshot = {'version': hashlib.md5(body).hexdigest(), 'body': body}
+        timeout = _catalog_cache_timeout()
+        cache.set(CACHE_KEY, snapshot, timeout)
+        cache.set(VERSION_CACHE_KEY, snapshot['version'], timeout)
+    return snapshot
+
+
+def _catalog_cache_timeout():
+    if getattr(settings, 'CACHE_IS_SHARED', False):
+        return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 600)
+    return getattr(settings, 'CATALOG_LOCAL_CACHE_TIMEOUT', 10)
+
+
+def get_catalog_version():
+    """Version of the current snapshot, without fetching its body from the cache."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = get_catalog_snapshot()['version']
+    return version
+
+
+def catalog_url():
+    """Versioned URL of the current snapshot, for the pages that fetch it."""
+    return f"{reverse('catalog_snapshot')}?v={get_catalog_version()}"
+
+
+def invalidate_catalog():
+    """Drop the cached snapshot; the next request rebuilds it under a new version."""
+    cache.delete_many([CACHE_KEY, VERSION_CACHE_KEY])
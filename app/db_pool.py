@@ -0,0 +1,148 @@
+"""
+Database connection reuse and its metrics.
+
+Opening a PostgreSQL connection (TCP, TLS, authentication, backend fork)
+costs more than most of the queries of a short API request, so connections
+are reused (see the DB_* settings in ResourceHive/settings.py) in one of
+three ways:
+
+- persistent: each worker thread keeps its connection for CONN_MAX_AGE
+  seconds, checking it before reuse (CONN_HEALTH_CHECKS);
+- pool: psycopg 3's ConnectionPool, shared by the threads of a process
+  (DB_POOL);
+- either of those through pgbouncer in transaction mode (DB_PGBOUNCER),
+  which multiplexes the connections of every process onto a few server
+  connections.
+
+The scheduler thread (app/scheduler.py) closes its connection around each
+job the way Django does around each request, so it is reused between jobs
+but never kept past CONN_MAX_AGE or after an error.
+
+pool_stats() reports how the connections are being used: the process's
+connection count (opened by connection_created, see app/signals.py), the
+pool's size, idle connections and wait time when pooling, pgbouncer's
+SHOW POOLS when behind pgbouncer, and the server's view of the database's
+client connections from pg_stat_activity. /ops/db-pool/ serves it as JSON.
+"""
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_opened = {}
+
+
+def record_connection_opened(alias):
+    with _lock:
+        _opened[alias] = _opened.get(alias, 0) + 1
+
+
+def reuse_mode(alias=DEFAULT_DB_ALIAS):
+    """'pool', 'persistent' or 'per_request'."""
+    settings_dict = connections[alias].settings_dict
+    if settings_dict.get('OPTIONS', {}).get('pool'):
+        return 'pool'
+    if settings_dict.get('CONN_MAX_AGE'):
+        return 'persistent'
+    return 'per_request'
+
+
+def _pool_stats(connection):
+    # psycopg_pool counters: pool_size connections exist, pool_available of
+    # them are idle, requests_waiting threads are queued for one
+    stats = connection.pool.get_stats()
+    return {
+        'min_size': stats.get('pool_min'),
+        'max_size': stats.get('pool_max'),
+        'size': stats.get('pool_size', 0),
+        'idle': stats.get('pool_available', 0),
+        'active': stats.get('pool_size', 0) - stats.get('pool_available', 0),
+        'waiting': stats.get('requests_waiting', 0),
+        'requests': stats.get('requests_num', 0),
+        'requests_queued': stats.get('requests_queued', 0),
+        'wait_ms_total': stats.get('requests_wait_ms', 0),
+        'timeouts': stats.get('requests_errors', 0),
+        'connect_ms_total': stats.get('connections_ms', 0),
+    }
+
+
+def _pgbouncer_pools(connection):
+    """SHOW POOLS for this database, from pgbouncer's admin console (needs STATS_USERS)."""
+    params = connection.get_connection_params()
+    database = params.get('dbname') or params.get('database')
+    params['dbname'] = 'pgbouncer'
+    params.pop('database', None)
+    raw = connection.Database.connect(**params)
+    try:
+        raw.autocommit = True
+        with raw.cursor() as cursor:
+            cursor.execute('SHOW POOLS')
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        raw.close()
+    return [
+        {
+            'user': row.get('user'),
+            'client_active': row.get('cl_active'),
+            'client_waiting': row.get('cl_waiting'),
+            'server_active': row.get('sv_active'),
+            'server_idle': row.get('sv_idle'),
+            'max_wait_ms': (row.get('maxwait') or 0) * 1000 + (row.get('maxwait_us') or 0) // 1000,
+        }
+        for row in rows if row.get('database') == database
+    ]
+
+
+def _server_connections(connection):
+    """The database's client connections per state, across every process, from pg_stat_activity."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(state, 'unknown'), count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND backend_type = 'client backend' GROUP BY 1"
+        )
+        states = dict(cursor.fetchall())
+    return {
+        'active': states.get('active', 0),
+        'idle': states.get('idle', 0),
+        'idle_in_transaction': states.get('idle in transaction', 0),
+        'total': sum(states.values()),
+    }
+
+
+def pool_stats(alias=DEFAULT_DB_ALIAS):
+    """Connection reuse settings and usage for a database alias (see the module docstring)."""
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    mode = reuse_mode(alias)
+    stats = {
+        'alias': alias,
+        'vendor': connection.vendor,
+        'mode': mode,
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+        'health_checks': settings_dict.get('CONN_HEALTH_CHECKS'),
+        'pgbouncer': getattr(settings, 'DB_PGBOUNCER', False),
+        'process': {'pid': os.getpid(), 'connections_opened': _opened.get(alias, 0)},
+        'pool': None,
+        'pgbouncer_pools': None,
+        'server': None,
+    }
+    if mode == 'pool':
+        stats['pool'] = _pool_stats(connection)
+    if connection.vendor != 'postgresql':
+        return stats
+    if stats['pgbouncer']:
+        try:
+            stats['pgbouncer_pools'] = _pgbouncer_pools(connection)
+        except connection.Database.Error:
+            logger.warning('Could not read pgbouncer pool stats', exc_info=True)
+    try:
+        stats['server'] = _server_connections(connection)
+    except DatabaseError:
+        logger.warning('Could not read pg_stat_activity', exc_info=True)
+    return stats
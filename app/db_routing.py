@@ -0,0 +1,151 @@
+"""
+Routing of the reporting and analytics reads to a read replica.
+
+The dashboard aggregates, the approved supply tally, the request summaries
+and the PDF/Excel exports only read, but month-end reporting scans enough
+of the request and inventory tables to compete with the approval desk for
+the primary's I/O. When a streaming replica of the database is configured
+as the 'reporting' alias (DB_REPORTING_HOST or REPORTING_DATABASE_URL, see
+ResourceHive/settings.py), those views run inside using_reporting() (a
+context manager and decorator; ReportingViewMixin for class-based views)
+and ReportingRouter sends their reads to the replica. Everything else, and
+every write, stays on the primary.
+
+The replica is chosen once per using_reporting() block, so a report never
+mixes rows from both databases. It is only chosen while it is less than
+REPORTING_MAX_LAG_SECONDS behind the primary, judged from
+pg_last_xact_replay_timestamp() on the replica. A replica that has
+replayed all the WAL it received is current however old its last replayed
+transaction is, but only while its WAL receiver is streaming: a receiver
+that lost the primary stops receiving, so "all received WAL replayed" says
+nothing about the primary. The reporting database user therefore needs
+pg_read_all_stats (or pg_monitor) to see the receiver's status. A lagging,
+disconnected or unreachable replica makes the reports read from the primary
+instead. The lag is checked at most every
+LAG_CHECK_INTERVAL seconds per process.
+
+Reads inside a transaction on the primary stay on the primary, so a view
+never misses its own writes (and TestCase tests, which run in a
+transaction, read their fixtures). Without a 'reporting' alias
+using_reporting() does nothing.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.template.response import SimpleTemplateResponse
+
+logger = logging.getLogger(__name__)
+
+REPORTING_DB_ALIAS = 'reporting'
+LAG_CHECK_INTERVAL = 5
+
+# Seconds behind the primary; 0 when the alias is not a standby or has replayed all the WAL
+# its receiver is streaming, NULL when the WAL receiver is not streaming (the replica cannot
+# know how far behind it is) or it has never replayed a transaction
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float
+    END
+"""
+
+_reporting_alias = ContextVar('reporting_alias', default=None)
+_lock = threading.Lock()
+_last_check = {}
+
+
+def replica_configured():
+    return REPORTING_DB_ALIAS in settings.DATABASES
+
+
+def replica_lag(alias=REPORTING_DB_ALIAS):
+    """Seconds the alias's database is behind the primary, or None if unknown or unreachable."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            return cursor.fetchone()[0]
+    except DatabaseError:
+        logger.warning('Could not read the replication lag of %s', alias, exc_info=True)
+        return None
+
+
+def replica_is_current():
+    """Whether the reporting replica is within REPORTING_MAX_LAG_SECONDS of the primary."""
+    now = time.monotonic()
+    with _lock:
+        checked_at, lag = _last_check.get(REPORTING_DB_ALIAS, (None, None))
+    if checked_at is None or now - checked_at >= LAG_CHECK_INTERVAL:
+        lag = replica_lag()
+        with _lock:
+            _last_check[REPORTING_DB_ALIAS] = (now, lag)
+        if lag is not None and lag > settings.REPORTING_MAX_LAG_SECONDS:
+            logger.warning('Reporting replica is %.1fs behind, reading reports from the primary', lag)
+    return lag is not None and lag <= settings.REPORTING_MAX_LAG_SECONDS
+
+
+def reporting_alias():
+    """
+    The alias reports read from now: the replica if configured and current,
+    else the primary. Inside a transaction on the primary, reads stay there
+    (see ReportingRouter), so the replica's lag is not checked.
+    """
+    if (replica_configured() and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+            and replica_is_current()):
+        return REPORTING_DB_ALIAS
+    return DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def using_reporting():
+    """Send the reads made inside the block (or decorated function) to the reporting alias."""
+    token = _reporting_alias.set(reporting_alias())
+    try:
+        yield
+    finally:
+        _reporting_alias.reset(token)
+
+
+class ReportingViewMixin:
+    """Run a class-based view, including rendering its template, inside using_reporting()."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with using_reporting():
+            response = super().dispatch(request, *args, **kwargs)
+            # A TemplateResponse is rendered after the view returns; its lazy querysets belong to the report
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+        return response
+
+
+class ReportingRouter:
+    """Reads inside using_reporting() go to the alias it chose; writes always go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        alias = _reporting_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Also for instances read from the replica, which would otherwise be saved back to it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the primary's rows, so objects read from either may be related
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPORTING_DB_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica receives the schema through replication
+        return False if db == REPORTING_DB_ALIAS else None
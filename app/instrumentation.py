@@ -0,0 +1,152 @@
+"""
+Per-request SQL instrumentation.
+
+SQLInstrumentationMiddleware (app/middleware.py) wraps every database
+connection with a QueryRecorder for the duration of a request, using
+connection.execute_wrapper(). The recorder counts queries, sums their
+duration and groups them by fingerprint (the SQL text with literals and IN
+lists collapsed) so the same statement run over and over with different
+parameters -- the usual N+1 pattern -- shows up as one repeated fingerprint.
+
+Each request's profile is appended to an in-process ring buffer that the
+/ops/slow-requests/ page reads. The buffer is per worker process and is
+lost on restart; it is meant for spotting and tracking slow views, not as a
+metrics store.
+
+Instrumentation is off unless SQL_INSTRUMENTATION_ENABLED is set.
+"""
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+\b')
+_WHITESPACE = re.compile(r'\s+')
+
+_buffer_lock = threading.Lock()
+_buffer = None
+
+
+def fingerprint(sql):
+    """Normalise a SQL statement so that runs differing only in parameters compare equal."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """
+    execute_wrapper callable that records the number, duration and
+    fingerprints of the queries run through it.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.fingerprint_durations = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            key = fingerprint(sql)
+            self.count += 1
+            self.duration += elapsed
+            self.fingerprints[key] += 1
+            self.fingerprint_durations[key] += elapsed
+
+    def duplicates(self, threshold=None):
+        """[(fingerprint, count, total_ms)] for statements run at least threshold times, most repeated first."""
+        if threshold is None:
+            threshold = getattr(settings, 'SQL_DUPLICATE_QUERY_THRESHOLD', 5)
+        return [
+            (key, count, round(self.fingerprint_durations[key] * 1000, 2))
+            for key, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+def _get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = deque(maxlen=getattr(settings, 'SQL_INSTRUMENTATION_BUFFER_SIZE', 500))
+    return _buffer
+
+
+def record_request(profile):
+    """Append a request profile dict to the ring buffer."""
+    buffer = _get_buffer()
+    with _buffer_lock:
+        buffer.append(profile)
+
+
+def recorded_requests():
+    """Snapshot of the ring buffer, oldest first."""
+    buffer = _get_buffer()
+    with _buffer_lock:
+        return list(buffer)
+
+
+def clear_recorded_requests():
+    buffer = _get_buffer()
+    with _buffer_lock:
+        buffer.clear()
+
+
+def summarize_by_view(profiles):
+    """
+    Aggregate request profiles per view, slowest average first.
+
+    Returns a list of dicts with view, requests, avg_ms, max_ms,
+    avg_queries, max_queries, avg_db_ms and n_plus_one (requests that had
+    repeated query fingerprints).
+    """
+    views = {}
+    for profile in profiles:
+        row = views.setdefault(profile['view'], {
+            'view': profile['view'], 'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'queries': 0, 'max_queries': 0, 'db_ms': 0.0, 'n_plus_one': 0,
+        })
+        row['requests'] += 1
+        row['total_ms'] += profile['total_ms']
+        row['max_ms'] = max(row['max_ms'], profile['total_ms'])
+        row['queries'] += profile['queries']
+        row['max_queries'] = max(row['max_queries'], profile['queries'])
+        row['db_ms'] += profile['db_ms']
+        if profile['duplicates']:
+            row['n_plus_one'] += 1
+
+    summary = []
+    for row in views.values():
+        requests = row['requests']
+        summary.append({
+            'view': row['view'],
+            'requests': requests,
+            'avg_ms': round(row['total_ms'] / requests, 2),
+            'max_ms': round(row['max_ms'], 2),
+            'avg_queries': round(row['queries'] / requests, 1),
+            'max_queries': row['max_queries'],
+            'avg_db_ms': round(row['db_ms'] / requests, 2),
+            'n_plus_one': row['n_plus_one'],
+        })
+    summary.sort(key=lambda row: row['avg_ms'], reverse=True)
+    return summary
+
+
+def server_timing(profile):
+    """Server-Timing header value for a request profile."""
+    return (
+        f'db;dur={profile["db_ms"]};desc="{profile["queries"]} queries", '
+        f'app;dur={profile["python_ms"]}, '
+        f'total;dur={profile["total_ms"]}'
+    )
@@ -0,0 +1,310 @@
+"""
+Server-sent events for the notification badge and dashboard counters.
+
+Instead of polling the counter endpoints, a page opens one EventSource on
+/events/ (static/scripts/liveUpdates.js). The stream sends the user's
+counters when it connects and afterwards only the counters that changed.
+
+Writes that can change a counter call publish() (see the receivers in
+app/signals.py). Once the transaction commits, the target -- "user:<id>" or
+"admins" -- is sent with Postgres NOTIFY on EVENTS_CHANNEL. One listener
+thread per process LISTENs on its own connection and wakes the streams of
+the affected users, which then recompute their counters. On other database
+backends events only reach streams in the publishing process.
+
+A stream is a long-lived async response, so it is only served under ASGI
+(ResourceHive/asgi.py, the "events" service in docker-compose.yml). Under
+WSGI the view answers 204, which tells EventSource not to reconnect, and the
+pages keep fetching counters on demand as before.
+
+The events service runs in its own process, and the caches behind the
+counter endpoints and AuthStateMiddleware are only cleared in the process
+that made a change unless the cache is shared. Streams therefore compute
+their counters, group membership and active session from the database and
+never read those caches.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from datetime import timedelta
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, close_old_connections, connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .auth_state import active_session_key
+from .request_counters import compute_request_counters
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = 'resourcehive_events'
+ADMINS = 'admins'
+# Sent by the listener after (re)connecting: events may have been missed
+EVERYONE = '*'
+
+# Day windows offered by the admin dashboard's near-expiry card
+NEAR_EXPIRY_WINDOWS = (7, 14, 30, 60, 90)
+
+
+def user_target(user_id):
+    return f'user:{user_id}'
+
+
+# ── Counters ──
+
+def pending_requests_counts():
+    """Pending supply and borrow requests (legacy and batches): {'supply': n, 'borrow': n, 'all': n}."""
+    from .models import BorrowRequest, BorrowRequestBatch, SupplyRequest, SupplyRequestBatch
+
+    counts = {
+        'supply': sum(model.objects.filter(status__iexact='pending').count()
+                      for model in (SupplyRequest, SupplyRequestBatch)),
+        'borrow': sum(model.objects.filter(status__iexact='pending').count()
+                      for model in (BorrowRequest, BorrowRequestBatch)),
+    }
+    counts['all'] = counts['supply'] + counts['borrow']
+    return counts
+
+
+def near_expiry_counts(windows=NEAR_EXPIRY_WINDOWS, today=None):
+    """In-stock supplies expiring within each window of days, in one query: {'7': n, ...}."""
+    from .models import Supply
+    from .stock_monitor import IN_STOCK
+
+    today = today or timezone.now().date()
+    return Supply.objects.filter(
+        expiration_date__range=(today, today + timedelta(days=max(windows))),
+        quantity_info__stock_status__in=IN_STOCK,
+    ).aggregate(**{
+        str(days): Count('pk', filter=Q(expiration_date__lte=today + timedelta(days=days)))
+        for days in windows
+    })
+
+
+def live_counters(user, is_admin=None):
+    """
+    Everything a user's pages keep live: the unread notification count, plus
+    the request counters for USER accounts or the pending-request and
+    near-expiry counts for admins. All read from the database, uncached.
+    """
+    from .models import Notification
+
+    if is_admin is None:
+        is_admin = not is_user_account(user)
+    counters = {'notifications': Notification.objects.filter(user=user, is_read=False).count()}
+    if not is_admin:
+        counters['requests'] = compute_request_counters(user)
+    else:
+        counters['pending_requests'] = pending_requests_counts()
+        counters['near_expiry'] = near_expiry_counts()
+    return counters
+
+
+def is_user_account(user):
+    return user.groups.filter(name='USER').exists()
+
+
+def counter_delta(previous, current):
+    """The top-level counters of current that differ from previous."""
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+def format_event(event, data, retry_ms=None):
+    """One server-sent event frame."""
+    lines = []
+    if retry_ms is not None:
+        lines.append(f'retry: {retry_ms}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+# ── Publishing ──
+
+def publish(*targets, using=DEFAULT_DB_ALIAS):
+    """Wake the streams of the given targets once the current transaction commits."""
+    transaction.on_commit(partial(_send, frozenset(targets), using), using=using)
+
+
+def _send(targets, using):
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        for target in targets:
+            hub.dispatch(target)
+        return
+    try:
+        with connection.cursor() as cursor:
+            for target in targets:
+                cursor.execute('SELECT pg_notify(%s, %s)', [EVENTS_CHANNEL, target])
+    except DatabaseError:
+        # Counters catch up on the next resync; never fail the write over this
+        logger.warning('Could not publish live update for %s', ', '.join(targets), exc_info=True)
+
+
+# ── Fan-out ──
+
+class Subscription:
+    """A stream's interest in its user's (and, for admins, the shared) counters."""
+
+    def __init__(self, user_id, is_admin, loop):
+        self.targets = {user_target(user_id), EVERYONE}
+        if is_admin:
+            self.targets.add(ADMINS)
+        self.loop = loop
+        self.changed = asyncio.Event()
+
+    def wake(self):
+        """Thread-safe; repeated wakes before the stream runs coalesce into one."""
+        try:
+            self.loop.call_soon_threadsafe(self.changed.set)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    async def wait(self, timeout):
+        """True when woken within timeout seconds."""
+        try:
+            await asyncio.wait_for(self.changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class EventHub:
+    """Routes published targets to the subscriptions of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._listener = None
+
+    def subscribe(self, user_id, is_admin):
+        subscription = Subscription(user_id, is_admin, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        self.start_listener()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, target):
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if target in s.targets]
+        for subscription in subscriptions:
+            subscription.wake()
+
+    def start_listener(self, using=DEFAULT_DB_ALIAS):
+        """Start the NOTIFY listener thread the first time a stream subscribes (Postgres only)."""
+        if self._listener is not None or connections[using].vendor != 'postgresql':
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = PostgresListener(self, using)
+                self._listener.start()
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+
+class PostgresListener(threading.Thread):
+    """LISTENs on EVENTS_CHANNEL over a dedicated connection and dispatches each payload."""
+
+    def __init__(self, hub, using=DEFAULT_DB_ALIAS):
+        super().__init__(name='live-updates-listener', daemon=True)
+        self.hub = hub
+        self.using = using
+
+    def run(self):
+        delay = 1
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.warning('Live update listener disconnected; retrying in %ss', delay, exc_info=True)
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+            else:
+                delay = 1
+
+    def listen(self):
+        wrapper = connections[self.using]
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN {EVENTS_CHANNEL}')
+            # Anything published while disconnected was missed
+            self.hub.dispatch(EVERYONE)
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self.hub.dispatch(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+
+hub = EventHub()
+
+
+# ── Stream ──
+
+def _current_counters(user, session_key, is_admin):
+    """Counters for an open stream, or None once the session is no longer the user's active one."""
+    try:
+        if session_key and active_session_key(user.pk) not in (None, session_key):
+            return None
+        return live_counters(user, is_admin)
+    finally:
+        close_old_connections()
+
+
+async def event_stream(user, session_key, is_admin):
+    """
+    Yield a user's counters, then the changed counters after every relevant
+    publish, with heartbeat comments in between. Ends after
+    LIVE_EVENTS_MAX_SECONDS (EventSource reconnects, re-running the auth
+    middleware) or as soon as the session is replaced by a newer login.
+    """
+    heartbeat = getattr(settings, 'LIVE_EVENTS_HEARTBEAT_SECONDS', 25)
+    debounce = getattr(settings, 'LIVE_EVENTS_DEBOUNCE_SECONDS', 1)
+    resync = getattr(settings, 'LIVE_EVENTS_RESYNC_SECONDS', 300)
+    max_seconds = getattr(settings, 'LIVE_EVENTS_MAX_SECONDS', 3600)
+    # Not thread-sensitive: a stream must not pin a worker thread (and its DB connection)
+    compute = sync_to_async(_current_counters, thread_sensitive=False)
+
+    loop = asyncio.get_running_loop()
+    subscription = hub.subscribe(user.pk, is_admin)
+    try:
+        counters = await compute(user, session_key, is_admin)
+        if counters is None:
+            return
+        yield format_event('counters', counters, retry_ms=int(heartbeat * 1000))
+        started = synced = loop.time()
+
+        while loop.time() - started < max_seconds:
+            woken = await subscription.wait(heartbeat)
+            if not woken and loop.time() - synced < resync:
+                yield ': ping\n\n'
+                continue
+            # Let a burst of writes (e.g. approving a whole batch) settle into one update
+            await asyncio.sleep(debounce)
+            subscription.changed.clear()
+
+            current = await compute(user, session_key, is_admin)
+            if current is None:
+                return
+            synced = loop.time()
+            delta = counter_delta(counters, current)
+            counters = current
+            yield format_event('counters', delta) if delta else ': ping\n\n'
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,220 @@
+"""
+Concurrency load harness for the request -> approve -> claim -> return
+workflow, driven by the run_load_test command.
+
+Simulated users submit supply and borrow carts while simulated admins
+approve, claim and return items, all against the same small set of "hot"
+supplies and properties so that requests genuinely contend for stock. Each
+worker is a thread with its own test client and database connection, so
+every operation goes through the full middleware and view stack.
+
+LoadStats collects per-operation latencies and outcomes. Failures are
+classified by classify_failure(); deadlocks and lock timeouts are counted
+separately because they mark the concurrency ceiling, and requests the
+application turned down (not enough stock, nothing left to claim) are
+counted as rejected rather than as errors.
+
+After the run, check_invariants() compares a stock_snapshot() taken before
+the run with one taken after it:
+
+- negative_available: reserved stock exceeds stock on hand;
+- reserved_drift: reserved_quantity moved differently from the approved,
+  unclaimed items that should be holding it;
+- ledger_mismatch: stock on hand moved differently from the items claimed
+  and returned, or from the quantity history written by the claim and
+  return views.
+
+Drift is measured relative to the starting snapshot, so inconsistencies
+already present in the database are not reported as violations.
+"""
+import threading
+from collections import defaultdict
+
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+from .benchmarks import percentile
+
+# Failure classes, in the order they are reported
+FAILURE_KINDS = ('deadlock', 'lock_timeout', 'error', 'rejected')
+
+_DEADLOCK_MARKERS = ('deadlock detected', 'deadlock found')
+_LOCK_TIMEOUT_MARKERS = ('database is locked', 'lock timeout', 'could not obtain lock',
+                         'canceling statement due to lock timeout', 'could not serialize access')
+
+_APPROVED_QUANTITY = Coalesce('approved_quantity', 'quantity')
+
+
+def classify_failure(failure):
+    """
+    Failure class of an operation: 'deadlock' or 'lock_timeout' when the
+    message says so, otherwise 'error' for exceptions and 'rejected' for
+    error messages the application returned.
+    """
+    message = str(failure).lower()
+    if any(marker in message for marker in _DEADLOCK_MARKERS):
+        return 'deadlock'
+    if any(marker in message for marker in _LOCK_TIMEOUT_MARKERS):
+        return 'lock_timeout'
+    return 'error' if isinstance(failure, BaseException) else 'rejected'
+
+
+class LoadStats:
+    """Thread-safe per-operation latency and outcome counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.failures = defaultdict(lambda: dict.fromkeys(FAILURE_KINDS, 0))
+        self.failure_samples = []
+
+    def record(self, operation, elapsed_ms, failure=None):
+        """Record one operation; failure is the exception or application error message when it failed."""
+        with self._lock:
+            self.timings[operation].append(elapsed_ms)
+            if failure is not None:
+                kind = classify_failure(failure)
+                self.failures[operation][kind] += 1
+                if kind != 'rejected' and len(self.failure_samples) < 20:
+                    self.failure_samples.append((operation, kind, str(failure)[:300]))
+
+    def summary(self, wall_seconds):
+        """Throughput and per-operation figures for the report."""
+        operations = {}
+        for operation, timings in sorted(self.timings.items()):
+            failures = self.failures[operation]
+            operations[operation] = {
+                'count': len(timings),
+                'failed': sum(failures.values()) - failures['rejected'],
+                **failures,
+                'p50_ms': round(percentile(timings, 50), 2),
+                'p95_ms': round(percentile(timings, 95), 2),
+                'p99_ms': round(percentile(timings, 99), 2),
+                'max_ms': round(max(timings), 2),
+            }
+        total = sum(row['count'] for row in operations.values())
+        return {
+            'operations': operations,
+            'total_operations': total,
+            'throughput_per_s': round(total / wall_seconds, 2) if wall_seconds else 0,
+            **{kind: sum(row[kind] for row in operations.values()) for kind in FAILURE_KINDS},
+            'failure_samples': self.failure_samples,
+        }
+
+
+def stock_snapshot(supply_ids, property_ids):
+    """
+    Stock figures of the given supplies and properties.
+
+    Supplies: current, reserved, claimed (approved quantity of completed
+    items) and drift (reserved minus the approved quantity of approved,
+    unclaimed items). Properties: quantity, reserved, out (approved quantity
+    of active or overdue borrow items) and drift (reserved minus approved
+    borrow and reservation items).
+    """
+    from .models import BorrowRequestItem, Property, ReservationItem, SupplyQuantity, SupplyRequestItem
+
+    def totals(queryset, field, quantity=_APPROVED_QUANTITY):
+        return dict(queryset.values_list(field).annotate(total=Sum(quantity)).order_by())
+
+    held = totals(SupplyRequestItem.objects.filter(
+        supply_id__in=supply_ids, status='approved', claimed_date__isnull=True), 'supply_id')
+    claimed = totals(SupplyRequestItem.objects.filter(
+        supply_id__in=supply_ids, status='completed'), 'supply_id')
+    supplies = {}
+    for supply_id, current, reserved in SupplyQuantity.objects.filter(
+        supply_id__in=supply_ids,
+    ).values_list('supply_id', 'current_quantity', 'reserved_quantity'):
+        supplies[supply_id] = {
+            'current': current,
+            'reserved': reserved,
+            'claimed': claimed.get(supply_id, 0),
+            'drift': reserved - held.get(supply_id, 0),
+        }
+
+    borrow_held = totals(BorrowRequestItem.objects.filter(
+        property_id__in=property_ids, status='approved'), 'property_id')
+    reservation_held = totals(ReservationItem.objects.filter(
+        property_id__in=property_ids, status='approved'), 'property_id', 'quantity')
+    out = totals(BorrowRequestItem.objects.filter(
+        property_id__in=property_ids, status__in=['active', 'overdue']), 'property_id')
+    properties = {}
+    for property_id, quantity, reserved in Property.objects.filter(
+        id__in=property_ids,
+    ).values_list('id', 'quantity', 'reserved_quantity'):
+        properties[property_id] = {
+            'quantity': quantity,
+            'reserved': reserved,
+            'out': out.get(property_id, 0),
+            'drift': reserved - borrow_held.get(property_id, 0) - reservation_held.get(property_id, 0),
+        }
+    return {'supplies': supplies, 'properties': properties}
+
+
+def _history_deltas(model, owner_field, owner_ids, field_name, since):
+    """Net quantity change recorded by the claim/return views' history rows since a moment."""
+    deltas = defaultdict(int)
+    for owner_id, old, new in model.objects.filter(
+        action='quantity_update', field_name=field_name, timestamp__gte=since,
+        **{f'{owner_field}__in': owner_ids},
+    ).values_list(owner_field, 'old_value', 'new_value'):
+        try:
+            deltas[owner_id] += int(new) - int(old)
+        except (TypeError, ValueError):
+            continue
+    return deltas
+
+
+def check_invariants(before, after, since):
+    """
+    Compare two stock snapshots taken around a load run that started at since.
+
+    Returns a list of {'kind', 'object', 'detail'} dicts, one per violation.
+    """
+    from .models import PropertyHistory, SupplyHistory
+
+    violations = []
+
+    def violation(kind, obj, detail):
+        violations.append({'kind': kind, 'object': obj, 'detail': detail})
+
+    supply_history = _history_deltas(SupplyHistory, 'supply_id', list(after['supplies']), 'current_quantity', since)
+    for supply_id, now in after['supplies'].items():
+        start = before['supplies'].get(supply_id)
+        if start is None:
+            continue
+        obj = f'Supply #{supply_id}'
+        if now['reserved'] > now['current']:
+            violation('negative_available', obj,
+                      f"reserved {now['reserved']} exceeds current quantity {now['current']}")
+        if now['drift'] != start['drift']:
+            violation('reserved_drift', obj,
+                      f"reserved_quantity off by {now['drift'] - start['drift']:+d} from approved items")
+        moved = now['current'] - start['current']
+        claimed = now['claimed'] - start['claimed']
+        if moved != -claimed:
+            violation('ledger_mismatch', obj, f'stock moved {moved:+d} but {claimed} unit(s) were claimed')
+        if moved != supply_history[supply_id]:
+            violation('ledger_mismatch', obj,
+                      f'stock moved {moved:+d} but history records {supply_history[supply_id]:+d}')
+
+    property_history = _history_deltas(PropertyHistory, 'property_id', list(after['properties']), 'quantity', since)
+    for property_id, now in after['properties'].items():
+        start = before['properties'].get(property_id)
+        if start is None:
+            continue
+        obj = f'Property #{property_id}'
+        if now['reserved'] > now['quantity']:
+            violation('negative_available', obj,
+                      f"reserved {now['reserved']} exceeds quantity on hand {now['quantity']}")
+        if now['drift'] != start['drift']:
+            violation('reserved_drift', obj,
+                      f"reserved_quantity off by {now['drift'] - start['drift']:+d} from approved items")
+        moved = now['quantity'] - start['quantity']
+        lent = now['out'] - start['out']
+        if moved != -lent:
+            violation('ledger_mismatch', obj, f'stock moved {moved:+d} but {lent:+d} unit(s) went out on loan')
+        if moved != property_history[property_id]:
+            violation('ledger_mismatch', obj,
+                      f'stock moved {moved:+d} but history records {property_history[property_id]:+d}')
+    return violations
@@ -0,0 +1,245 @@
+"""
+Non-blocking, structured logging.
+
+Request threads never write log records themselves: QueuedLogHandler puts
+each record on an in-memory queue and a QueueListener thread writes it to a
+JSON-lines file and/or the console. When the queue is full, records are
+dropped and counted instead of making the request wait.
+
+Every Gunicorn worker appends to the same file, so the handler never rotates
+it itself: a size-based rollover in one worker would rename the file out
+from under the others. The file is opened with WatchedFileHandler, which
+reopens it once an external tool (logrotate, without copytruncate) has moved
+it away. Under Docker, leave LOG_FILE empty and let the container runtime
+collect the console output instead.
+
+RequestLogContextMiddleware (app/middleware.py) binds a request id -- taken
+from the X-Request-ID header when a proxy supplies one -- to the current
+context, and RequestContextFilter copies it and the username onto every
+record at the moment it is logged, so both survive the hand-off to the
+listener thread.
+
+Logger levels can be changed at runtime with the log_level management
+command. Overrides are stored in the cache and every worker process applies
+them within LOG_LEVEL_REFRESH_SECONDS (see apply_level_overrides()); they
+reach other processes only when the cache is shared (Redis).
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+
+from django.utils.functional import empty
+
+LEVEL_OVERRIDES_CACHE_KEY = 'log_level_overrides'
+
+_request_context = ContextVar('log_request_context', default=None)
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Open QueuedLogHandlers, for listener_threads()
+_handlers = weakref.WeakSet()
+
+_levels_lock = threading.Lock()
+_configured_levels = {}
+_applied_overrides = {}
+_next_refresh = 0.0
+
+
+def clean_request_id(value):
+    """An incoming X-Request-ID if it is safe to log and echo back, else None."""
+    if value and _REQUEST_ID.match(value):
+        return value
+    return None
+
+
+def bind_request(request, request_id):
+    """Attach a request and its id to the current context; returns a token for unbind_request()."""
+    return _request_context.set((request_id, request))
+
+
+def unbind_request(token):
+    _request_context.reset(token)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Add request_id and user attributes to records, '-' outside a request.
+
+    The user is only reported once authentication has resolved it, so
+    logging never triggers a session or user lookup by itself.
+    """
+
+    def filter(self, record):
+        context = _request_context.get()
+        request_id, user = '-', '-'
+        if context is not None:
+            request_id, request = context
+            lazy_user = getattr(request, 'user', None)
+            resolved = getattr(lazy_user, '_wrapped', lazy_user)
+            if resolved is not None and resolved is not empty and resolved.is_authenticated:
+                user = resolved.get_username()
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id
+        if not hasattr(record, 'user'):
+            record.user = user
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, dt_timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName,
+            'request_id': getattr(record, 'request_id', '-'),
+            'user': getattr(record, 'user', '-'),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class QueuedLogHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to a background listener that writes them to a JSON-lines
+    file, unless filename is empty, and, if console is set, to stderr.
+
+    Used from settings.LOGGING through a '()' factory, so it does not rely on
+    dictConfig's own QueueHandler support (Python 3.12+).
+    """
+
+    def __init__(self, filename='debug.log', console=False, queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        self.addFilter(RequestContextFilter())
+
+        sinks = []
+        if filename:
+            file_handler = logging.handlers.WatchedFileHandler(filename, encoding='utf-8', delay=True)
+            file_handler.setFormatter(JSONFormatter())
+            sinks.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter('{levelname} {message}', style='{'))
+            sinks.append(console_handler)
+        self.sinks = sinks
+        self.listener = logging.handlers.QueueListener(self.queue, *sinks, respect_handler_level=True)
+        self.listener.start()
+        _handlers.add(self)
+        atexit.register(self.close)
+
+    def prepare(self, record):
+        """
+        Copy of record with the message merged and the traceback rendered, so
+        the listener thread never touches request-thread objects. Unlike the
+        base class, the message is not pre-formatted, leaving that to the sinks.
+        """
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        listener, self.listener = self.listener, None
+        _handlers.discard(self)
+        if listener is not None:
+            # Drains the queue before returning
+            listener.stop()
+            for sink in self.sinks:
+                sink.close()
+        super().close()
+
+
+def listener_threads():
+    """
+    The listener threads of the open QueuedLogHandlers. They run until the
+    process exits, so code waiting for its own background threads to finish
+    must leave them out.
+    """
+    return {handler.listener._thread for handler in list(_handlers)
+            if handler.listener is not None and handler.listener._thread is not None}
+
+
+# ── Runtime levels ──
+
+def get_level_overrides():
+    """{logger name: level name} overrides currently stored in the cache."""
+    from django.core.cache import cache
+    return cache.get(LEVEL_OVERRIDES_CACHE_KEY) or {}
+
+
+def set_level_override(name, level):
+    """
+    Override a logger's level in every process, or drop the override when
+    level is None. Returns the stored overrides.
+    """
+    from django.core.cache import cache
+
+    overrides = get_level_overrides()
+    if level is None:
+        overrides.pop(name, None)
+    else:
+        level = level.upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f'Unknown log level: {level}')
+        overrides[name] = level
+    cache.set(LEVEL_OVERRIDES_CACHE_KEY, overrides, None)
+    apply_level_overrides(force=True)
+    return overrides
+
+
+def apply_level_overrides(force=False):
+    """
+    Apply the cached overrides to this process' loggers, restoring the
+    configured level of loggers whose override was removed. Reads the cache
+    at most once per LOG_LEVEL_REFRESH_SECONDS unless force is set.
+    """
+    global _next_refresh
+    from django.conf import settings
+
+    now = time.monotonic()
+    if not force and now < _next_refresh:
+        return
+    _next_refresh = now + getattr(settings, 'LOG_LEVEL_REFRESH_SECONDS', 30)
+
+    try:
+        overrides = get_level_overrides()
+    except Exception:
+        # An unreachable cache keeps the current levels rather than failing the request
+        return
+    with _levels_lock:
+        for name in set(_applied_overrides) - set(overrides):
+            logging.getLogger(name).setLevel(_configured_levels.pop(name))
+            del _applied_overrides[name]
+        for name, level in overrides.items():
+            if _applied_overrides.get(name) == level:
+                continue
+            logger = logging.getLogger(name)
+            _configured_levels.setdefault(name, logger.level)
+            logger.setLevel(level)
+            _applied_overrides[name] = level
@@ -0,0 +1,146 @@
+"""
+Retention of the append-only audit tables (ActivityLog, SupplyHistory,
+PropertyHistory and Notification).
+
+Rows are kept in their table for LOG_RETENTION_HOT_MONTHS calendar months
+(the hot window). archive_cold_months() (the archive_logs command, run e.g.
+monthly) moves every older month out, one (table, month) at a time: the
+month's rows are written in id order to a gzip-compressed JSON Lines file
+in media storage, the file is recorded as a LogArchive row, and the rows are
+deleted in the same transaction that records it. A month is found with a
+range scan of the table's timestamp index, so the tables, their indexes and
+the work autovacuum does on them stay proportional to the hot window
+however many years of audit data accumulate, and the activity log, history
+and notification views keep reading the live tables, which hold exactly the
+hot window.
+
+Rows written into an already archived month after it was archived (e.g. a
+clock skewed server) are archived as a further file for that month on the
+next run. read_archive() streams an archive file back as dicts of column
+values, e.g. for an audit request or to reload a month.
+"""
+import gzip
+import json
+import tempfile
+from datetime import datetime
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+# Archive label -> model; the label names the archive files
+RETAINED_MODELS = {
+    'activity_log': 'ActivityLog',
+    'supply_history': 'SupplyHistory',
+    'property_history': 'PropertyHistory',
+    'notification': 'Notification',
+}
+
+BATCH_SIZE = 2000
+# Archives up to this size are built in memory before being saved
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+
+def _month_start(value):
+    """The local midnight starting value's month."""
+    value = timezone.localtime(value) if timezone.is_aware(value) else value
+    return timezone.make_aware(datetime(value.year, value.month, 1))
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return timezone.make_aware(datetime(index // 12, index % 12 + 1, 1))
+
+
+def hot_window_start(now=None, hot_months=None):
+    """Rows older than this are archived: the start of the oldest month in the hot window."""
+    if hot_months is None:
+        hot_months = settings.LOG_RETENTION_HOT_MONTHS
+    return _add_months(_month_start(now or timezone.now()), 1 - hot_months)
+
+
+def _delete_rows(model, pks):
+    # Raw DELETE: ActivityLog's post_delete receiver would make the ORM fetch
+    # and signal row by row; the caches it clears are invalidated once instead
+    table = connection.ops.quote_name(model._meta.db_table)
+    for start in range(0, len(pks), BATCH_SIZE):
+        chunk = pks[start:start + BATCH_SIZE]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+
+def archive_month(label, month):
+    """
+    Archive the rows of one table (a RETAINED_MODELS label) whose timestamp
+    falls in the month starting at month. Returns the LogArchive, or None if
+    the month has no rows.
+    """
+    from .live_updates import publish, user_target
+    from .models import LogArchive
+
+    model = apps.get_model('app', RETAINED_MODELS[label])
+    rows = model.objects.filter(timestamp__gte=month, timestamp__lt=_add_months(month, 1)).order_by('pk')
+
+    pks = []
+    user_ids = set()
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+        with gzip.GzipFile(fileobj=spool, mode='wb') as archive_file:
+            for row in rows.values().iterator(chunk_size=BATCH_SIZE):
+                archive_file.write(json.dumps(row, cls=DjangoJSONEncoder).encode() + b'\n')
+                pks.append(row['id'])
+                if label == 'notification':
+                    user_ids.add(row['user_id'])
+        if not pks:
+            return None
+        spool.seek(0)
+        archive = LogArchive(table=label, month=month.date(), row_count=len(pks), first_id=pks[0], last_id=pks[-1])
+        archive.file.save(f'{label}-{month:%Y-%m}.jsonl.gz', File(spool), save=False)
+
+    try:
+        with transaction.atomic():
+            archive.save()
+            _delete_rows(model, pks)
+            if user_ids:
+                # The raw DELETE skips publish_notification; refresh the owners' badges
+                publish(*(user_target(user_id) for user_id in user_ids))
+    except Exception:
+        archive.file.delete(save=False)
+        raise
+    return archive
+
+
+def archive_cold_months(now=None, hot_months=None, labels=None):
+    """
+    Archive every month before the hot window of each table (all of
+    RETAINED_MODELS unless labels is given), oldest first. Returns the
+    LogArchive rows created.
+    """
+    from .activity_filters import invalidate_activity_filter_options
+
+    cutoff = hot_window_start(now, hot_months)
+    archives = []
+    for label in labels or RETAINED_MODELS:
+        model = apps.get_model('app', RETAINED_MODELS[label])
+        oldest = model.objects.filter(timestamp__lt=cutoff).aggregate(oldest=Min('timestamp'))['oldest']
+        if oldest is None:
+            continue
+        month = _month_start(oldest)
+        while month < cutoff:
+            archive = archive_month(label, month)
+            if archive is not None:
+                archives.append(archive)
+            month = _add_months(month, 1)
+        if label == 'activity_log':
+            invalidate_activity_filter_options()
+    return archives
+
+
+def read_archive(archive):
+    """Stream the rows of a LogArchive back as dicts of column values."""
+    with archive.file.open('rb') as stored, gzip.GzipFile(fileobj=stored) as archive_file:
+        for line in archive_file:
+            yield json.loads(line)
@@ -0,0 +1,47 @@
+"""
+Management command to move the activity log, supply/property history and
+notifications older than the hot window (LOG_RETENTION_HOT_MONTHS) into
+compressed monthly archive files in media storage.
+
+Run it regularly (e.g. monthly from cron) so the tables only ever hold the
+hot window; see app/log_retention.py.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from app.log_retention import RETAINED_MODELS, archive_cold_months, hot_window_start
+
+
+class Command(BaseCommand):
+    help = 'Archive activity log, history and notification rows older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            action='append',
+            dest='labels',
+            help=f"Only archive this table (repeatable). One of: {', '.join(RETAINED_MODELS)}",
+        )
+        parser.add_argument(
+            '--hot-months',
+            type=int,
+            default=None,
+            help='Calendar months kept in the database (default: LOG_RETENTION_HOT_MONTHS)',
+        )
+
+    def handle(self, *args, **options):
+        labels = options['labels']
+        unknown = set(labels or []) - set(RETAINED_MODELS)
+        if unknown:
+            raise CommandError(f"Unknown table(s): {', '.join(sorted(unknown))}")
+        if options['hot_months'] is not None and options['hot_months'] < 1:
+            raise CommandError('--hot-months must be at least 1')
+
+        cutoff = hot_window_start(hot_months=options['hot_months'])
+        self.stdout.write(self.style.SUCCESS(f'Archiving rows older than {cutoff:%Y-%m-%d}...'))
+        archives = archive_cold_months(hot_months=options['hot_months'], labels=labels)
+
+        for archive in archives:
+            self.stdout.write(f'  ✓ {archive.table} {archive.month:%Y-%m}: {archive.row_count} rows -> {archive.file.name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'\nArchived {sum(archive.row_count for archive in archives)} rows into {len(archives)} files.'
+        ))
@@ -5,5 +5,5 @@ class Command(BaseCommand):
     help = 'Check for supplies that are expiring soon or have expired and create notifications'
 
     def handle(self, *args, **kwargs):
-        Supply.check_expiring_supplies()
-        self.stdout.write(self.style.SUCCESS('Successfully checked for expiring supplies')) 
\ No newline at end of file
+        alerted = Supply.check_expiring_supplies()
+        self.stdout.write(self.style.SUCCESS(f'Successfully checked for expiring supplies ({alerted} alerted)'))
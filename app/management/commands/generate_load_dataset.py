@@ -0,0 +1,472 @@
+"""
+Management command to bulk-create a realistic, scalable dataset for
+benchmarks and load tests.
+
+--scale N multiplies the base volumes below. Rows are written with
+bulk_create, so model save() side effects (history rows, barcode images,
+admin notifications, reserved quantity bookkeeping) and post_save signals do
+not run; the command restores what the benchmarks depend on afterwards:
+request dates are spread over the past year, property and supply reserved
+quantities are recomputed from the generated items, and the RequestIndex
+read model is rebuilt.
+
+Every generated row is tagged with --prefix so a later run with --flush can
+remove it again without touching real data.
+"""
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, Permission, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from app.activity_filters import invalidate_activity_filter_options
+from app.models import (
+    PPMP, ActivityLog, BorrowRequestBatch, BorrowRequestItem, Department, Notification,
+    PPMPItem, Property, PropertyCategory, PropertyHistory, ReservationBatch, ReservationItem,
+    Supply, SupplyCategory, SupplyHistory, SupplyQuantity, SupplyRequestBatch, SupplyRequestItem,
+    UserProfile,
+)
+from app.request_index import rebuild_request_index
+
+# Rows created per unit of --scale
+BASE_VOLUMES = {
+    'departments': 8,
+    'users': 60,
+    'supplies': 120,
+    'properties': 80,
+    'ppmp_items': 40,  # per department
+    'supply_batches': 300,
+    'borrow_batches': 150,
+    'reservation_batches': 80,
+    'notifications': 600,
+    'history': 400,  # per history table
+    'activity': 500,
+}
+
+# batch status -> item status, with relative weights
+SUPPLY_STATES = [
+    ('pending', 'pending', 20), ('approved', 'approved', 10), ('for_claiming', 'approved', 10),
+    ('partially_approved', 'approved', 5), ('completed', 'completed', 40), ('rejected', 'rejected', 8),
+    ('cancelled', 'pending', 4), ('voided', 'voided', 3),
+]
+BORROW_STATES = [
+    ('pending', 'pending', 15), ('approved', 'approved', 8), ('for_claiming', 'approved', 7),
+    ('active', 'active', 20), ('overdue', 'overdue', 8), ('returned', 'returned', 30),
+    ('rejected', 'rejected', 7), ('voided', 'voided', 5),
+]
+RESERVATION_STATES = [
+    ('pending', 'pending', 20), ('approved', 'approved', 20), ('active', 'active', 15),
+    ('completed', 'completed', 25), ('rejected', 'rejected', 8), ('expired', 'expired', 8),
+    ('voided', 'voided', 4),
+]
+
+SUPPLY_NAMES = [
+    'A4 Paper Ream', 'Ballpoint Pens', 'Pencils', 'Notepads', 'Sticky Notes', 'Printer Ink',
+    'Toner Cartridge', 'File Folder', 'Envelopes', 'Correction Tape', 'Hand Soap', 'Face Mask',
+    'Disinfectant Spray', 'Batteries (AA)', 'USB Cable', 'Whiteboard Marker', 'Stapler Wire',
+]
+PROPERTY_NAMES = [
+    'Projector', 'Laptop', 'Extension Cord', 'Speaker System', 'Microphone', 'Document Camera',
+    'Portable Whiteboard', 'Digital Camera', 'Tripod', 'Tablet', 'Folding Table', 'Monoblock Chair',
+]
+PURPOSES = [
+    'Classroom use', 'Department seminar', 'Office operations', 'Laboratory activity',
+    'Faculty meeting', 'Student orientation', 'Research project', 'Campus event',
+]
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create a scalable synthetic dataset for benchmarks and load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1,
+                            help='Multiplier for the base row volumes (default: 1)')
+        parser.add_argument('--prefix', default='load',
+                            help='Tag for generated rows, used by --flush (default: load)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument('--password', default='loadtest123',
+                            help='Password for every generated account (default: loadtest123)')
+        parser.add_argument('--flush', action='store_true',
+                            help='Delete rows generated by an earlier run with the same prefix first')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per bulk_create statement (default: 1000)')
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        if scale < 1:
+            raise CommandError('--scale must be at least 1')
+        self.prefix = options['prefix']
+        self.tag = f'[{self.prefix}]'
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.today = timezone.localdate()
+
+        if options['flush']:
+            self.flush()
+        elif User.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise CommandError(
+                f"Rows tagged '{self.prefix}' already exist. Re-run with --flush or use another --prefix."
+            )
+
+        volumes = {name: count * scale for name, count in BASE_VOLUMES.items()}
+        self.stdout.write(self.style.SUCCESS(f'=== GENERATING LOAD DATASET (scale {scale}) ===\n'))
+
+        with transaction.atomic():
+            departments = self.create_departments(volumes['departments'])
+            admin, users = self.create_users(volumes['users'], departments, options['password'])
+            supplies = self.create_supplies(volumes['supplies'])
+            properties = self.create_properties(volumes['properties'])
+            self.create_ppmps(departments, volumes['ppmp_items'], admin)
+            self.create_supply_batches(volumes['supply_batches'], users, supplies, admin)
+            self.create_borrow_batches(volumes['borrow_batches'], users, properties, admin)
+            self.create_reservation_batches(volumes['reservation_batches'], users, properties)
+            self.sync_reserved_quantities(supplies, properties)
+            self.create_notifications(volumes['notifications'], [admin] + users)
+            self.create_history(volumes['history'], supplies, properties, admin)
+            self.create_activity(volumes['activity'], [admin] + users)
+
+        self.stdout.write('Rebuilding request index...')
+        counts = rebuild_request_index(chunk_size=self.batch_size)
+        invalidate_activity_filter_options()
+        self.stdout.write(f'  ✓ {sum(counts.values())} request index rows')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone. Admin login: {self.prefix}_admin, users: {self.prefix}_user_0 .. "
+            f"{self.prefix}_user_{len(users) - 1} (password: {options['password']})"
+        ))
+
+    # ── Helpers ──
+
+    def bulk_create(self, model, rows):
+        created = model.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.stdout.write(f'  ✓ {len(created)} {model.__name__} rows')
+        return created
+
+    def random_moment(self, max_days_ago=365):
+        """A timestamp in the past max_days_ago days, during office hours."""
+        day = self.today - timedelta(days=self.rng.randint(0, max_days_ago))
+        moment = datetime.combine(day, time(self.rng.randint(7, 17), self.rng.randint(0, 59)))
+        return min(timezone.make_aware(moment), self.now)
+
+    def backdate(self, model, objs, field):
+        """Spread auto_now_add timestamps, which bulk_create always sets to now."""
+        for obj in objs:
+            setattr(obj, field, self.random_moment())
+        model.objects.bulk_update(objs, [field], batch_size=self.batch_size)
+
+    def pick_state(self, states):
+        return self.rng.choices(states, weights=[weight for _, _, weight in states])[0][:2]
+
+    def flush(self):
+        self.stdout.write(self.style.WARNING(f"Deleting rows tagged '{self.prefix}'..."))
+        with transaction.atomic():
+            # Users cascade to their batches, items, notifications and profiles
+            User.objects.filter(username__startswith=f'{self.prefix}_').delete()
+            ActivityLog.objects.filter(object_repr__startswith=self.tag).delete()
+            Supply.objects.filter(supply_name__startswith=self.tag).delete()
+            Property.objects.filter(property_name__startswith=self.tag).delete()
+            # Departments cascade to their PPMPs
+            Department.objects.filter(name__startswith=self.tag).delete()
+            SupplyCategory.objects.filter(name__startswith=self.tag).delete()
+            PropertyCategory.objects.filter(name__startswith=self.tag).delete()
+
+    # ── Reference data ──
+
+    def create_departments(self, count):
+        self.stdout.write('Creating departments...')
+        return self.bulk_create(Department, [
+            Department(name=f'{self.tag} Department {i:03d}') for i in range(count)
+        ])
+
+    def create_users(self, count, departments, password):
+        self.stdout.write('Creating users...')
+        password_hash = make_password(password)
+        admin = User(
+            username=f'{self.prefix}_admin', first_name='Load', last_name='Admin',
+            email=f'{self.prefix}_admin@example.com', password=password_hash,
+            is_staff=True, is_superuser=True,
+        )
+        users = [
+            User(
+                username=f'{self.prefix}_user_{i}', first_name=f'User{i}', last_name=self.prefix.title(),
+                email=f'{self.prefix}_user_{i}@example.com', password=password_hash,
+            )
+            for i in range(count)
+        ]
+        created = self.bulk_create(User, [admin] + users)
+        admin, users = created[0], created[1:]
+
+        UserProfile.objects.bulk_create([
+            UserProfile(user=admin, role='ADMIN'),
+            *[UserProfile(user=user, role='USER', department=self.rng.choice(departments)) for user in users],
+        ], batch_size=self.batch_size)
+
+        # Regular users need the user module permissions the USER group grants
+        user_group, _ = Group.objects.get_or_create(name='USER')
+        user_group.permissions.add(*Permission.objects.filter(
+            content_type__app_label='app', codename__in=['view_user_module', 'view_user_dashboard'],
+        ))
+        User.groups.through.objects.bulk_create([
+            User.groups.through(user_id=user.id, group_id=user_group.id) for user in users
+        ], batch_size=self.batch_size)
+        return admin, users
+
+    def create_supplies(self, count):
+        self.stdout.write('Creating supplies...')
+        categories = [SupplyCategory.objects.get_or_create(name=f'{self.tag} {name}')[0]
+                      for name in ('Office Supplies', 'Janitorial', 'IT Consumables', 'Medical')]
+        supplies = self.bulk_create(Supply, [
+            Supply(
+                supply_name=f'{self.tag} {SUPPLY_NAMES[i % len(SUPPLY_NAMES)]} {i}',
+                category=self.rng.choice(categories + [None]),
+                unit=self.rng.choice(['pcs', 'box', 'ream', 'bottle']),
+                date_received=self.today - timedelta(days=self.rng.randint(30, 365)),
+                expiration_date=(self.today + timedelta(days=self.rng.randint(-10, 365))
+                                 if self.rng.random() < 0.3 else None),
+                available_for_request=self.rng.random() < 0.9,
+            )
+            for i in range(count)
+        ])
+        # Same barcode text Supply.save() assigns, so scanner lookups resolve; images are skipped
+        for supply in supplies:
+            supply.barcode = f'SUP-{supply.pk}'
+        Supply.objects.bulk_update(supplies, ['barcode'], batch_size=self.batch_size)
+        quantities = [
+            SupplyQuantity(
+                supply=supply,
+                current_quantity=self.rng.choice([0, 3]) if self.rng.random() < 0.1 else self.rng.randint(50, 1000),
+                minimum_threshold=self.rng.randint(5, 40),
+            )
+            for supply in supplies
+        ]
+        # bulk_create skips SupplyQuantity.save(), which stores the stock status
+        for info in quantities:
+            info.refresh_stock_fields()
+        self.bulk_create(SupplyQuantity, quantities)
+        return supplies
+
+    def create_properties(self, count):
+        self.stdout.write('Creating properties...')
+        categories = [PropertyCategory.objects.get_or_create(name=f'{self.tag} {name}')[0]
+                      for name in ('ICT Equipment', 'Furniture', 'Audio Visual')]
+        rows = []
+        for i in range(count):
+            overall = self.rng.randint(20, 200)
+            rows.append(Property(
+                property_number=f'{self.prefix.upper()}-PROP-{i:06d}',
+                property_name=f'{self.tag} {PROPERTY_NAMES[i % len(PROPERTY_NAMES)]} {i}',
+                category=self.rng.choice(categories),
+                barcode=f'{self.prefix.upper()}-PROP-{i}',
+                unit_of_measure='Unit',
+                overall_quantity=overall,
+                quantity=overall,
+                location=self.rng.choice(['Storage Room', 'AVR', 'Faculty Room', 'Laboratory']),
+                condition='In good condition' if self.rng.random() < 0.9 else 'Needing repair',
+            ))
+        return self.bulk_create(Property, rows)
+
+    def create_ppmps(self, departments, items_per_department, admin):
+        self.stdout.write('Creating PPMPs...')
+        ppmps = self.bulk_create(PPMP, [
+            PPMP(department=department, year=self.today.year, uploaded_by=admin,
+                 file=f'ppmp_files/{self.prefix}_{department.pk}.xlsx')
+            for department in departments
+        ])
+        rows = []
+        for ppmp in ppmps:
+            for row_number in range(1, items_per_department + 1):
+                quantity = self.rng.randint(10, 500)
+                price = self.rng.randint(10, 2000)
+                rows.append(PPMPItem(
+                    ppmp=ppmp, row_number=row_number, mode='MOOE',
+                    description=f'{SUPPLY_NAMES[row_number % len(SUPPLY_NAMES)]} ({row_number})',
+                    unit_measure=self.rng.choice(['PC', 'BOX', 'REAM']),
+                    unit_price=price, quantity=quantity, total_amount=price * quantity,
+                    released=self.rng.randint(0, quantity),
+                ))
+        self.bulk_create(PPMPItem, rows)
+
+    # ── Requests ──
+
+    def create_supply_batches(self, count, users, supplies, admin):
+        self.stdout.write('Creating supply requests...')
+        states = [self.pick_state(SUPPLY_STATES) for _ in range(count)]
+        batches = self.bulk_create(SupplyRequestBatch, [
+            SupplyRequestBatch(
+                user=self.rng.choice(users), purpose=self.rng.choice(PURPOSES), status=batch_status,
+                approved_by=admin if item_status in ('approved', 'completed') else None,
+            )
+            for batch_status, item_status in states
+        ])
+        self.backdate(SupplyRequestBatch, batches, 'request_date')
+
+        items = []
+        for batch, (batch_status, item_status) in zip(batches, states):
+            for index, supply in enumerate(self.rng.sample(supplies, self.rng.randint(1, 5))):
+                status = item_status
+                if batch_status == 'partially_approved' and index % 2:
+                    status = 'rejected'
+                quantity = self.rng.randint(1, 10)
+                items.append(SupplyRequestItem(
+                    batch_request=batch, supply=supply, quantity=quantity, status=status,
+                    approved=status == 'approved',
+                    approved_quantity=quantity if status in ('approved', 'completed') else None,
+                    claimed_date=batch.request_date + timedelta(days=2) if status == 'completed' else None,
+                ))
+        self.bulk_create(SupplyRequestItem, items)
+
+    def create_borrow_batches(self, count, users, properties, admin):
+        self.stdout.write('Creating borrow requests...')
+        states = [self.pick_state(BORROW_STATES) for _ in range(count)]
+        batches = self.bulk_create(BorrowRequestBatch, [
+            BorrowRequestBatch(
+                user=self.rng.choice(users), purpose=self.rng.choice(PURPOSES), status=batch_status,
+                approved_by=admin if item_status in ('approved', 'active', 'overdue', 'returned') else None,
+            )
+            for batch_status, item_status in states
+        ])
+        self.backdate(BorrowRequestBatch, batches, 'request_date')
+
+        items = []
+        for batch, (_, item_status) in zip(batches, states):
+            for prop in self.rng.sample(properties, self.rng.randint(1, 3)):
+                if item_status == 'overdue':
+                    return_date = self.today - timedelta(days=self.rng.randint(1, 20))
+                elif item_status in ('returned', 'rejected', 'voided'):
+                    return_date = timezone.localdate(batch.request_date) + timedelta(days=self.rng.randint(1, 14))
+                else:
+                    return_date = self.today + timedelta(days=self.rng.randint(1, 30))
+                quantity = self.rng.randint(1, 3)
+                out = item_status in ('active', 'overdue', 'returned')
+                items.append(BorrowRequestItem(
+                    batch_request=batch, property=prop, quantity=quantity, status=item_status,
+                    approved=item_status == 'approved',
+                    approved_quantity=quantity if item_status in ('approved', 'active', 'overdue', 'returned') else None,
+                    return_date=return_date,
+                    actual_return_date=return_date if item_status == 'returned' else None,
+                    claimed_date=batch.request_date + timedelta(days=1) if out else None,
+                    # Keep the scheduler sweeps from emailing or texting generated users
+                    near_overdue_notified=True,
+                    overdue_notified=True,
+                ))
+        self.bulk_create(BorrowRequestItem, items)
+
+    def create_reservation_batches(self, count, users, properties):
+        self.stdout.write('Creating reservations...')
+        states = [self.pick_state(RESERVATION_STATES) for _ in range(count)]
+        batches = self.bulk_create(ReservationBatch, [
+            ReservationBatch(user=self.rng.choice(users), purpose=self.rng.choice(PURPOSES), status=batch_status)
+            for batch_status, _ in states
+        ])
+        self.backdate(ReservationBatch, batches, 'request_date')
+
+        items = []
+        for batch, (_, item_status) in zip(batches, states):
+            for prop in self.rng.sample(properties, self.rng.randint(1, 3)):
+                if item_status in ('pending', 'approved'):
+                    needed_date = self.today + timedelta(days=self.rng.randint(2, 45))
+                else:
+                    needed_date = timezone.localdate(batch.request_date) + timedelta(days=self.rng.randint(1, 10))
+                items.append(ReservationItem(
+                    batch_request=batch, property=prop, quantity=self.rng.randint(1, 3), status=item_status,
+                    approved=item_status == 'approved',
+                    needed_date=needed_date,
+                    return_date=needed_date + timedelta(days=self.rng.randint(1, 7)),
+                ))
+        self.bulk_create(ReservationItem, items)
+
+    def sync_reserved_quantities(self, supplies, properties):
+        """Recompute reserved and on-hand quantities from the generated items."""
+        self.stdout.write('Syncing reserved quantities...')
+
+        def totals(queryset, field, quantity_field):
+            return dict(queryset.values_list(field).annotate(total=Sum(quantity_field)))
+
+        supply_reserved = totals(SupplyRequestItem.objects.filter(
+            supply__in=supplies, status='approved'), 'supply_id', 'approved_quantity')
+        quantities = list(SupplyQuantity.objects.filter(supply__in=supplies))
+        for info in quantities:
+            info.reserved_quantity = supply_reserved.get(info.supply_id, 0)
+            info.current_quantity = max(info.current_quantity, info.reserved_quantity)
+            info.refresh_stock_fields()
+        SupplyQuantity.objects.bulk_update(quantities, ['reserved_quantity', 'current_quantity', 'stock_status',
+                                                        'available_stock'],
+                                           batch_size=self.batch_size)
+
+        borrow_reserved = totals(BorrowRequestItem.objects.filter(
+            property__in=properties, status='approved'), 'property_id', 'approved_quantity')
+        reservation_reserved = totals(ReservationItem.objects.filter(
+            property__in=properties, status='approved'), 'property_id', 'quantity')
+        borrowed_out = totals(BorrowRequestItem.objects.filter(
+            property__in=properties, status__in=['active', 'overdue']), 'property_id', 'approved_quantity')
+        for prop in properties:
+            reserved = borrow_reserved.get(prop.pk, 0) + reservation_reserved.get(prop.pk, 0)
+            out = borrowed_out.get(prop.pk, 0)
+            prop.overall_quantity = max(prop.overall_quantity, reserved + out)
+            prop.quantity = prop.overall_quantity - out
+            prop.reserved_quantity = reserved
+        Property.objects.bulk_update(properties, ['overall_quantity', 'quantity', 'reserved_quantity'],
+                                     batch_size=self.batch_size)
+
+    # ── Feeds ──
+
+    def create_notifications(self, count, users):
+        self.stdout.write('Creating notifications...')
+        notifications = self.bulk_create(Notification, [
+            Notification(
+                user=self.rng.choice(users),
+                message=self.rng.choice([
+                    'Your supply request has been approved', 'Your borrow request is ready for claiming',
+                    'Reminder: borrowed item due soon', 'New batch supply request submitted',
+                ]),
+                is_read=self.rng.random() < 0.6,
+            )
+            for _ in range(count)
+        ])
+        self.backdate(Notification, notifications, 'timestamp')
+
+    def create_history(self, count, supplies, properties, admin):
+        self.stdout.write('Creating history rows...')
+        supply_history = self.bulk_create(SupplyHistory, [
+            SupplyHistory(
+                supply=self.rng.choice(supplies), user=admin, action='update', field_name='quantity',
+                old_value=str(old), new_value=str(old + change),
+                remarks=f"Quantity {'increased' if change > 0 else 'decreased'} by {abs(change)}",
+            )
+            for old, change in ((self.rng.randint(10, 500), self.rng.choice([-5, -2, 10, 25])) for _ in range(count))
+        ])
+        self.backdate(SupplyHistory, supply_history, 'timestamp')
+
+        property_history = self.bulk_create(PropertyHistory, [
+            PropertyHistory(
+                property=self.rng.choice(properties), user=admin, action='update',
+                field_name=field, old_value=old, new_value=new,
+            )
+            for field, old, new in (self.rng.choice([
+                ('location', 'Storage Room', 'AVR'),
+                ('condition', 'In good condition', 'Needing repair'),
+                ('accountable_person', 'Juan Dela Cruz', 'Maria Santos'),
+            ]) for _ in range(count))
+        ])
+        self.backdate(PropertyHistory, property_history, 'timestamp')
+
+    def create_activity(self, count, users):
+        self.stdout.write('Creating activity log entries...')
+        entries = self.bulk_create(ActivityLog, [
+            ActivityLog(
+                user=self.rng.choice(users), action=action, model_name=model_name,
+                object_repr=f'{self.tag} {model_name} #{self.rng.randint(1, 1000)}',
+                description=f'{action.title()} {model_name.lower()} (generated)',
+            )
+            for action, model_name in (self.rng.choice([
+                ('request', 'SupplyRequestBatch'), ('approve', 'SupplyRequestBatch'),
+                ('borrow', 'BorrowRequestBatch'), ('return', 'BorrowRequestBatch'),
+                ('update', 'Supply'), ('update', 'Property'), ('login', 'User'),
+            ]) for _ in range(count))
+        ])
+        self.backdate(ActivityLog, entries, 'timestamp')
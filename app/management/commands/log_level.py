@@ -0,0 +1,58 @@
+"""
+Management command to change logger levels at runtime.
+
+Overrides are stored in the cache and applied by every running worker within
+LOG_LEVEL_REFRESH_SECONDS (see app/log_pipeline.py), without a restart:
+
+    python manage.py log_level                      # list overrides
+    python manage.py log_level app.views WARNING    # quieten a module
+    python manage.py log_level app.views --reset    # back to settings.LOGGING
+    python manage.py log_level --reset-all
+"""
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.log_pipeline import get_level_overrides, set_level_override
+
+
+class Command(BaseCommand):
+    help = 'Show or change logger levels of running processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('logger', nargs='?', help='Logger name, e.g. app.views')
+        parser.add_argument('level', nargs='?', help='DEBUG, INFO, WARNING, ERROR or CRITICAL')
+        parser.add_argument('--reset', action='store_true', help='Remove the override for the logger')
+        parser.add_argument('--reset-all', action='store_true', help='Remove every override')
+
+    def handle(self, *args, **options):
+        name, level = options['logger'], options['level']
+
+        if options['reset_all']:
+            for overridden in list(get_level_overrides()):
+                set_level_override(overridden, None)
+            self.stdout.write(self.style.SUCCESS('  ✓ All log level overrides removed'))
+            return
+
+        if name and options['reset']:
+            set_level_override(name, None)
+            self.stdout.write(self.style.SUCCESS(f'  ✓ Override for {name} removed'))
+            return
+
+        if name and level:
+            try:
+                set_level_override(name, level)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'  ✓ {name} set to {level.upper()}'))
+            return
+
+        if name:
+            raise CommandError('Give a level, or --reset to remove the override.')
+
+        overrides = get_level_overrides()
+        if not overrides:
+            self.stdout.write('No log level overrides.')
+        for overridden, overridden_level in sorted(overrides.items()):
+            configured = logging.getLevelName(logging.getLogger(overridden).getEffectiveLevel())
+            self.stdout.write(f'{overridden:<40} {overridden_level:<10} (effective here: {configured})')
@@ -0,0 +1,65 @@
+"""
+Management command to profile what a Gunicorn worker imports while booting
+(see app/boot_profile.py).
+
+Prints the import time and module count of a worker boot and the slowest
+imports, and fails if a report/export/barcode library was imported at boot
+or the import time exceeds --budget-ms:
+
+    python manage.py profile_worker_boot
+    python manage.py profile_worker_boot --runs 5 --budget-ms 400
+"""
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.boot_profile import profile_worker_boot
+
+
+class Command(BaseCommand):
+    help = 'Profile the imports of a worker boot and guard against eager heavy imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3,
+                            help='Boots to profile; the fastest is reported (default: 3)')
+        parser.add_argument('--top', type=int, default=15,
+                            help='Slowest imports to list by cumulative time (default: 15)')
+        parser.add_argument('--budget-ms', type=float,
+                            help='Fail if the total import time exceeds this many milliseconds')
+        parser.add_argument('--json', help='Also write the summary to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+
+        try:
+            profiles = [profile_worker_boot() for _ in range(options['runs'])]
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        profile = min(profiles, key=lambda p: p['import_ms'])
+
+        self.stdout.write(
+            f"Worker boot: {profile['import_ms']} ms importing {profile['modules']} modules "
+            f"({profile['wall_ms']} ms wall, {profile['rss_mb']} MB RSS, best of {options['runs']})"
+        )
+        self.stdout.write(f"\n{'Module':<60}{'cumulative ms':>15}{'self ms':>10}")
+        slowest = sorted(profile['entries'], key=lambda e: e[2], reverse=True)[:options['top']]
+        for module, self_us, cumulative_us, _ in slowest:
+            self.stdout.write(f'{module:<60}{cumulative_us / 1000:>15.1f}{self_us / 1000:>10.1f}')
+
+        if options['json']:
+            summary = {key: profile[key] for key in ('modules', 'import_ms', 'wall_ms', 'rss_mb', 'lazy_imports')}
+            Path(options['json']).write_text(json.dumps(summary, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"  ✓ Summary saved to {options['json']}"))
+
+        failures = []
+        for package, chain in profile['lazy_imports'].items():
+            failures.append(f"{package} imported at boot via {' -> '.join(chain)}")
+        if options['budget_ms'] is not None and profile['import_ms'] > options['budget_ms']:
+            failures.append(f"import time {profile['import_ms']} ms exceeds the {options['budget_ms']} ms budget")
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(f'  ✗ {failure}'))
+            raise CommandError(f'{len(failures)} worker boot check(s) failed')
+        self.stdout.write(self.style.SUCCESS('\n  ✓ No heavy libraries imported at boot'))
@@ -0,0 +1,158 @@
+"""
+Management command to time the key pages, APIs and scheduler sweeps against
+a generated load dataset (see generate_load_dataset).
+
+Each scenario in app/benchmarks.py is run once to warm caches and then
+--iterations times, recording wall-clock latency and the number of queries.
+Results are printed as a table and can be saved as a JSON baseline; when a
+baseline is given, the command fails if any scenario's p95 latency grew by
+more than --threshold or it now runs more queries.
+
+The sweep scenarios update rows across the whole database, so they are
+refused unless the database holds only the generated dataset; pass
+--allow-mutations to run them anyway (e.g. on a disposable copy). Mail is
+kept in memory and SMS is patched out for every run.
+
+    python manage.py generate_load_dataset --scale 5
+    python manage.py run_benchmarks --save-baseline benchmarks.json
+    python manage.py run_benchmarks --baseline benchmarks.json
+"""
+import json
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app.benchmarks import SCENARIOS, benchmark_context, compare, is_load_dataset, summarize
+from app.models import UserSession
+
+
+class Command(BaseCommand):
+    help = 'Benchmark key views, APIs and sweeps and compare against a saved baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='load',
+                            help='Prefix of the generated load dataset (default: load)')
+        parser.add_argument('--iterations', type=int, default=10,
+                            help='Timed runs per scenario after one warm-up run (default: 10)')
+        parser.add_argument('--only', nargs='+', metavar='SCENARIO',
+                            help='Run only the named scenarios')
+        parser.add_argument('--baseline', help='JSON baseline to compare against')
+        parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as a JSON baseline')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed p95 growth over the baseline, as a fraction (default: 0.25)')
+        parser.add_argument('--allow-mutations', action='store_true',
+                            help='Run the sweep scenarios even if the database holds more than the load dataset')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        scenarios = SCENARIOS
+        if options['only']:
+            known = {scenario['name'] for scenario in SCENARIOS}
+            unknown = set(options['only']) - known
+            if unknown:
+                raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in SCENARIOS if scenario['name'] in options['only']]
+
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())['scenarios']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Could not read baseline {options['baseline']}: {e}")
+
+        context = benchmark_context(options['prefix'])
+        mutating = [scenario['name'] for scenario in scenarios if scenario.get('mutates')]
+        if mutating and not options['allow_mutations'] and not is_load_dataset(options['prefix']):
+            raise CommandError(
+                f"The database holds rows outside the '{options['prefix']}' load dataset, and "
+                f"{', '.join(mutating)} would update them. Run against a database with only the "
+                f"generated dataset, leave them out with --only, or pass --allow-mutations."
+            )
+        # Only one session per user is allowed; drop the previous run's, as the login view does
+        accounts = [context['admin'], context['user']]
+        UserSession.objects.filter(user__in=accounts).delete()
+        # The test client's host must be allowed, and mail sent by views or sweeps stays in memory
+        benchmark_settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        )
+        # The sweeps text borrowers through the SMS gateway; callers import it from app.utils at call time
+        no_sms = mock.patch('app.utils.send_sms_alert', return_value=(False, 'SMS disabled during benchmarks'))
+        try:
+            with benchmark_settings, no_sms:
+                clients = {}
+                for role in ('admin', 'user'):
+                    clients[role] = Client()
+                    clients[role].force_login(context[role])
+
+                results = {}
+                for scenario in scenarios:
+                    results[scenario['name']] = self.measure(scenario, clients, context, options['iterations'])
+        finally:
+            UserSession.objects.filter(user__in=accounts).delete()
+
+        self.report(results, baseline)
+
+        if options['save_baseline']:
+            Path(options['save_baseline']).write_text(json.dumps({
+                'dataset_prefix': options['prefix'],
+                'iterations': options['iterations'],
+                'scenarios': results,
+            }, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f"  ✓ Baseline saved to {options['save_baseline']}"))
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options['threshold'])
+            if regressions:
+                for name, reason in regressions:
+                    self.stderr.write(self.style.ERROR(f'  ✗ {name}: {reason}'))
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('  ✓ No regressions against the baseline'))
+
+    def measure(self, scenario, clients, context, iterations):
+        if 'call' in scenario:
+            run = scenario['call']
+        else:
+            kwargs = scenario.get('kwargs')
+            url = reverse(scenario['url'], kwargs=kwargs(context) if kwargs else None)
+            client = clients[scenario['role']]
+
+            def run():
+                response = client.get(url, scenario.get('query'))
+                if response.status_code != 200:
+                    raise CommandError(f"{scenario['name']}: GET {url} returned {response.status_code}")
+                # Drain streaming responses so their queries are part of the measurement
+                if response.streaming:
+                    b''.join(response.streaming_content)
+
+        run()
+        timings = []
+        for _ in range(iterations):
+            # Reports read from the reporting alias, so count the queries of every database
+            with ExitStack() as stack:
+                captured = [stack.enter_context(CaptureQueriesContext(conn)) for conn in connections.all()]
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+        return summarize(timings, sum(len(queries) for queries in captured))
+
+    def report(self, results, baseline):
+        self.stdout.write(f"{'Scenario':<28}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'queries':>9}"
+                          + (f"{'base p95':>10}" if baseline else ''))
+        for name, result in results.items():
+            line = (f"{name:<28}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                    f"{result['max_ms']:>10.2f}{result['queries']:>9}")
+            if baseline:
+                previous = baseline.get(name)
+                line += f"{previous['p95_ms']:>10.2f}" if previous else f"{'-':>10}"
+            self.stdout.write(line)
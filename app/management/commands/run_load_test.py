@@ -0,0 +1,304 @@
+"""
+Management command to load-test the request -> approve -> claim -> return
+workflow with concurrent simulated users and admins (see
+app/load_harness.py).
+
+Run it against a generated load dataset on PostgreSQL; SQLite serialises
+writers, so most of what it reports there is lock contention:
+
+    python manage.py generate_load_dataset --scale 2
+    python manage.py run_load_test --users 40 --admins 6 --duration 60
+
+User workers repeatedly fill and submit supply and borrow carts for the hot
+supplies and properties. Admin workers approve pending items, claim approved
+supply batches and borrow items, and return borrowed items, picking among
+the oldest open harness requests so that admins regularly collide on the
+same request. The report lists throughput, latency percentiles per
+operation, deadlocks, lock timeouts, errors and rejections, and the stock invariants
+that broke during the run. The command fails when an invariant is violated.
+
+The workers are Django test clients running in this process: requests go
+through the middleware, views and database, but not through Gunicorn, the
+proxy or the network. The figures measure the application and database
+under concurrency, not a deployed server's capacity.
+"""
+import json
+import random
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app.load_harness import LoadStats, check_invariants, stock_snapshot
+from app.log_pipeline import listener_threads
+from app.models import (
+    BorrowRequestItem, Property, Supply, SupplyRequestBatch, SupplyRequestItem, UserProfile, UserSession,
+)
+
+# Open requests an admin picks from; small enough that admins collide on the same request
+ADMIN_PICK_WINDOW = 5
+
+
+class Command(BaseCommand):
+    help = 'Concurrent load test of the request, approve, claim and return workflow'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='load',
+                            help='Prefix of the generated load dataset (default: load)')
+        parser.add_argument('--users', type=int, default=20, help='Concurrent user workers (default: 20)')
+        parser.add_argument('--admins', type=int, default=4, help='Concurrent admin workers (default: 4)')
+        parser.add_argument('--duration', type=float, default=30,
+                            help='Seconds to keep the workers running (default: 30)')
+        parser.add_argument('--hot-supplies', type=int, default=3,
+                            help='Supplies every cart draws from (default: 3)')
+        parser.add_argument('--hot-properties', type=int, default=3,
+                            help='Properties every borrow cart draws from (default: 3)')
+        parser.add_argument('--think-ms', type=int, default=0,
+                            help='Pause between a worker\'s operations, in milliseconds (default: 0)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed')
+        parser.add_argument('--json', metavar='PATH', help='Also write the report as JSON')
+
+    def handle(self, *args, **options):
+        for option in ('users', 'admins', 'hot_supplies', 'hot_properties'):
+            if options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be at least 1")
+        prefix = options['prefix']
+
+        users = list(User.objects.filter(username__startswith=f'{prefix}_user_').order_by('id')[:options['users']])
+        if len(users) < options['users']:
+            raise CommandError(
+                f"The '{prefix}' dataset has {len(users)} users; generate a larger --scale "
+                f"or lower --users."
+            )
+        # The best-stocked items, so contention rather than empty shelves decides the outcome
+        supplies = list(Supply.objects.filter(
+            supply_name__startswith=f'[{prefix}]', quantity_info__isnull=False, available_for_request=True,
+        ).order_by('-quantity_info__current_quantity', 'id').values_list('id', flat=True)[:options['hot_supplies']])
+        properties = list(Property.objects.filter(
+            property_name__startswith=f'[{prefix}]', availability='available', is_archived=False,
+        ).order_by('-quantity', 'id').values_list('id', flat=True)[:options['hot_properties']])
+        if not supplies or not properties:
+            raise CommandError(f"No load dataset tagged '{prefix}' found. Run generate_load_dataset first.")
+        admins = self.admin_accounts(prefix, options['admins'])
+
+        self.harness_users = [user.id for user in users]
+        self.supplies = supplies
+        self.properties = properties
+        self.think = options['think_ms'] / 1000
+        self.stats = LoadStats()
+        seed = options['seed'] if options['seed'] is not None else random.randrange(1 << 30)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"=== LOAD TEST: {len(users)} users, {len(admins)} admins, {options['duration']}s, "
+            f"hot supplies {supplies}, hot properties {properties} (seed {seed}) ==="
+        ))
+        self.stdout.write('In-process test clients: measures views, middleware and the database, '
+                          'not a live server (no Gunicorn, proxy or network).')
+
+        accounts = users + admins
+        UserSession.objects.filter(user__in=accounts).delete()
+        started = timezone.now()
+        before = stock_snapshot(supplies, properties)
+        deadline = time.monotonic() + options['duration']
+        workers = [
+            threading.Thread(target=self.worker, args=(self.user_step, user, deadline, random.Random(seed + i)))
+            for i, user in enumerate(users)
+        ] + [
+            threading.Thread(target=self.worker, args=(self.admin_step, admin, deadline, random.Random(-seed - i)))
+            for i, admin in enumerate(admins)
+        ]
+        # The test client's host must be allowed, and approval emails stay in memory
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        ):
+            wall_start = time.monotonic()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            wall_seconds = time.monotonic() - wall_start
+            # Let background threads started by the views (completion emails) finish while mail stays in
+            # memory; the log listeners run until exit and would hold up the join for the whole grace period
+            grace = time.monotonic() + 10
+            waiting = set(threading.enumerate()) - listener_threads() - {threading.current_thread()}
+            for thread in waiting:
+                thread.join(timeout=max(grace - time.monotonic(), 0))
+        UserSession.objects.filter(user__in=accounts).delete()
+
+        summary = self.stats.summary(wall_seconds)
+        violations = check_invariants(before, stock_snapshot(supplies, properties), started)
+        self.report(summary, violations, wall_seconds)
+
+        if options['json']:
+            Path(options['json']).write_text(json.dumps({
+                'client': 'in-process', 'seed': seed, 'users': len(users), 'admins': len(admins), 'duration_s': round(wall_seconds, 2),
+                'hot_supplies': supplies, 'hot_properties': properties,
+                **summary, 'violations': violations,
+            }, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"  ✓ Report written to {options['json']}"))
+
+        if violations:
+            raise CommandError(f'{len(violations)} invariant violation(s)')
+
+    def admin_accounts(self, prefix, count):
+        """One superuser per admin worker, since each account may only hold one session."""
+        admins = []
+        for i in range(count):
+            admin, created = User.objects.get_or_create(
+                username=f'{prefix}_admin_{i}',
+                defaults={'first_name': 'Load', 'last_name': f'Admin {i}', 'is_staff': True, 'is_superuser': True},
+            )
+            if created:
+                admin.set_unusable_password()
+                admin.save(update_fields=['password'])
+                UserProfile.objects.create(user=admin, role='ADMIN')
+            admins.append(admin)
+        return admins
+
+    # ── Workers ──
+
+    def worker(self, step, account, deadline, rng):
+        client = Client()
+        client.force_login(account)
+        try:
+            while time.monotonic() < deadline:
+                if not step(client, rng):
+                    time.sleep(0.05)  # Nothing to do yet
+                elif self.think:
+                    time.sleep(self.think)
+        finally:
+            connections.close_all()
+
+    def timed(self, operation, func):
+        """Run one operation, recording its latency and whether it failed."""
+        failure = None
+        start = time.perf_counter()
+        try:
+            failure = func()
+        except Exception as e:
+            failure = e
+        self.stats.record(operation, (time.perf_counter() - start) * 1000, failure)
+
+    def post(self, client, url_name, data=None, **kwargs):
+        """POST to a view; returns the application's error message, or None when it succeeded."""
+        response = client.post(reverse(url_name, kwargs=kwargs or None), data or {})
+        if response.status_code >= 400:
+            raise RuntimeError(f'HTTP {response.status_code} from {url_name}')
+        if response.get('Content-Type', '').startswith('application/json'):
+            payload = response.json()
+            if payload.get('success') is False or payload.get('status') == 'error':
+                return payload.get('message') or payload.get('error') or f'{url_name} failed'
+        return None
+
+    def user_step(self, client, rng):
+        if rng.random() < 0.5:
+            for supply_id in rng.sample(self.supplies, rng.randint(1, len(self.supplies))):
+                self.timed('cart.add_supply', lambda: self.post(
+                    client, 'add_to_list', {'supply_id': supply_id, 'quantity': rng.randint(1, 5)}))
+            self.timed('supply.submit', lambda: self.post(
+                client, 'submit_list_request', {'purpose': 'Load test'}))
+        else:
+            return_date = (timezone.localdate() + timedelta(days=7)).isoformat()
+            for property_id in rng.sample(self.properties, rng.randint(1, len(self.properties))):
+                self.timed('cart.add_property', lambda: self.post(client, 'add_to_borrow_list', {
+                    'property_id': property_id, 'quantity': rng.randint(1, 2), 'return_date': return_date,
+                }))
+            self.timed('borrow.submit', lambda: self.post(client, 'submit_borrow_list_request', {
+                'batch_return_date': return_date, 'general_purpose': 'Load test',
+            }))
+        return True
+
+    def admin_step(self, client, rng):
+        actions = [self.approve_supply, self.claim_supply, self.approve_borrow, self.claim_borrow, self.return_borrow]
+        rng.shuffle(actions)
+        return any(action(client, rng) for action in actions)
+
+    def pick(self, queryset, rng):
+        candidates = list(queryset.order_by('id')[:ADMIN_PICK_WINDOW])
+        return rng.choice(candidates) if candidates else None
+
+    def approve_supply(self, client, rng):
+        item = self.pick(SupplyRequestItem.objects.filter(
+            batch_request__user_id__in=self.harness_users, supply_id__in=self.supplies, status='pending',
+        ).values('id', 'batch_request_id', 'quantity'), rng)
+        if item is None:
+            return False
+        self.timed('supply.approve', lambda: self.post(
+            client, 'approve_batch_item', {'approved_quantity': item['quantity']},
+            batch_id=item['batch_request_id'], item_id=item['id']))
+        return True
+
+    def claim_supply(self, client, rng):
+        batch_id = self.pick(SupplyRequestBatch.objects.filter(
+            user_id__in=self.harness_users, status='for_claiming',
+        ).values_list('id', flat=True), rng)
+        if batch_id is None:
+            return False
+        self.timed('supply.claim', lambda: self.post(client, 'claim_batch_items', batch_id=batch_id))
+        return True
+
+    def borrow_item(self, rng, **filters):
+        return self.pick(BorrowRequestItem.objects.filter(
+            batch_request__user_id__in=self.harness_users, property_id__in=self.properties, **filters,
+        ).values('id', 'batch_request_id', 'quantity'), rng)
+
+    def approve_borrow(self, client, rng):
+        item = self.borrow_item(rng, status='pending')
+        if item is None:
+            return False
+        self.timed('borrow.approve', lambda: self.post(
+            client, 'approve_borrow_item', {'approved_quantity': item['quantity']},
+            batch_id=item['batch_request_id'], item_id=item['id']))
+        return True
+
+    def claim_borrow(self, client, rng):
+        item = self.borrow_item(rng, status='approved', claimed_date__isnull=True)
+        if item is None:
+            return False
+        self.timed('borrow.claim', lambda: self.post(
+            client, 'claim_individual_borrow_item', batch_id=item['batch_request_id'], item_id=item['id']))
+        return True
+
+    def return_borrow(self, client, rng):
+        item = self.borrow_item(rng, status='active')
+        if item is None:
+            return False
+        self.timed('borrow.return', lambda: self.post(
+            client, 'return_individual_borrow_item', batch_id=item['batch_request_id'], item_id=item['id']))
+        return True
+
+    # ── Report ──
+
+    def report(self, summary, violations, wall_seconds):
+        self.stdout.write(
+            f"\n{summary['total_operations']} operations in {wall_seconds:.1f}s "
+            f"({summary['throughput_per_s']}/s), "
+            f"{summary['deadlock']} deadlock(s), {summary['lock_timeout']} lock timeout(s), "
+            f"{summary['error']} error(s), {summary['rejected']} rejected"
+        )
+        self.stdout.write(f"{'Operation':<20}{'count':>8}{'failed':>8}{'rejected':>9}{'p50 ms':>10}"
+                          f"{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for operation, row in summary['operations'].items():
+            self.stdout.write(f"{operation:<20}{row['count']:>8}{row['failed']:>8}{row['rejected']:>9}"
+                              f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+                              f"{row['max_ms']:>10.2f}")
+
+        for operation, kind, message in summary['failure_samples']:
+            self.stdout.write(self.style.WARNING(f'  ! {operation} [{kind}]: {message}'))
+
+        if violations:
+            self.stderr.write(self.style.ERROR(f'\n{len(violations)} invariant violation(s):'))
+            for violation in violations:
+                self.stderr.write(self.style.ERROR(
+                    f"  ✗ {violation['kind']}: {violation['object']}: {violation['detail']}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('\n  ✓ Stock invariants held'))
@@ -1,18 +1,34 @@
+import logging
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
 from django.utils.cache import add_never_cache_headers
-from django.contrib.auth.models import AnonymousUser
+from django.contrib import messages
 from django.contrib.auth import logout
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.http import HttpResponseRedirect
+from .auth_state import active_session_key, get_auth_state, invalidate_auth_state, password_change_required
+from .instrumentation import QueryRecorder, record_request, server_timing
+from .log_pipeline import apply_level_overrides, bind_request, clean_request_id, unbind_request
 from .models import UserSession
 
 class DisableClientSideCachingMiddleware(MiddlewareMixin):
     """
-    Prevent caching of authenticated pages to ensure back button doesn't work
+    Prevent caching of authenticated pages to ensure back button doesn't work.
+    Responses from views that declared a policy with @cache_policy
+    (see app/cache_policy.py) keep their own caching headers.
     """
     def process_response(self, request, response):
-        # Add no-cache headers for all responses
+        if getattr(response, 'cache_policy', None):
+            return response
+
+        # Add no-cache headers for all other responses
         add_never_cache_headers(response)
         
         # For authenticated users, add additional headers to prevent back button from working
@@ -24,72 +40,107 @@ class DisableClientSideCachingMiddleware(MiddlewareMixin):
         return response
 
 
-class PreventBackToLoginMiddleware(MiddlewareMixin):
+class AuthStateMiddleware:
     """
-    Redirect authenticated users away from login page if they try to access it via back button
+    Single auth-state check for authenticated requests.
+
+    Replaces the separate back-to-login, single-session and forced password
+    change middlewares. The user's session key, role, must_change_password
+    flag and groups are loaded with one query and cached per user (see
+    app/auth_state.py), so most requests do not touch the database here.
     """
-    def process_request(self, request):
-        # Check if user is authenticated and trying to access login page
+    # Login-related URLs to protect from the back button
+    LOGIN_PATHS = ('/accounts/login/', '/login/', '/auth/login/')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        # URLs that stay accessible while a password change is required
+        self.password_change_allowed_urls = {
+            'USER': tuple([
+                '/auth/password_change/',
+                '/user/password_change/',
+                '/accounts/password_change/',
+                reverse('user_password_change'),
+                reverse('user_password_change_done'),
+                reverse('logout'),
+                '/static/',
+                '/media/',
+            ]),
+            'ADMIN': tuple([
+                '/password_change/',
+                '/auth/password_change/',
+                reverse('password_change'),
+                reverse('password_change_done'),
+                reverse('logout'),
+                '/static/',
+                '/media/',
+            ]),
+        }
+        self.password_change_redirects = {
+            'USER': 'user_password_change',
+            'ADMIN': 'password_change',
+        }
+
+    def __call__(self, request):
         if request.user.is_authenticated:
-            # List of login-related URLs to protect
-            protected_paths = ['/accounts/login/', '/login/', '/auth/login/']
-            current_path = request.path.lower()
-            
-            if any(path in current_path for path in protected_paths):
-                # Redirect authenticated users away from login
-                if request.user.groups.filter(name='ADMIN').exists():
-                    return HttpResponseRedirect(reverse('dashboard'))
-                elif request.user.groups.filter(name='USER').exists():
-                    return HttpResponseRedirect(reverse('user_dashboard'))
-                else:
-                    return HttpResponseRedirect(reverse('dashboard'))
-        
-        return None
+            response = self.check_auth_state(request)
+            if response is not None:
+                return response
 
+        return self.get_response(request)
+
+    def check_auth_state(self, request):
+        state = get_auth_state(request.user)
+
+        # Redirect authenticated users away from the login page
+        current_path = request.path.lower()
+        if any(path in current_path for path in self.LOGIN_PATHS):
+            if 'ADMIN' in state['groups']:
+                return HttpResponseRedirect(reverse('dashboard'))
+            elif 'USER' in state['groups']:
+                return HttpResponseRedirect(reverse('user_dashboard'))
+            else:
+                return HttpResponseRedirect(reverse('dashboard'))
+
+        # Enforce 1 active session per user
+        session_key = request.session.session_key
+        if session_key:
+            if state['session_key'] != session_key:
+                # The cached key may predate a login handled by another worker
+                active_key = active_session_key(request.user.pk)
+                if active_key != state['session_key']:
+                    invalidate_auth_state(request.user.pk)
+                state = {**state, 'session_key': active_key}
+            if state['session_key'] is None:
+                # No active session record - create one
+                try:
+                    UserSession.objects.update_or_create(
+                        user=request.user,
+                        defaults={
+                            'session_key': session_key,
+                            'ip_address': self.get_client_ip(request),
+                            'user_agent': request.META.get('HTTP_USER_AGENT', '')[:500]
+                        }
+                    )
+                except Exception:
+                    # Silently fail if we can't create session record
+                    pass
+            elif session_key != state['session_key']:
+                # Session key mismatch - invalidate current session
+                logout(request)
+                return redirect(reverse('login'))
+
+        # Force password change for new USER and ADMIN accounts
+        role = state['role']
+        if role in self.password_change_allowed_urls and state['must_change_password']:
+            allowed_urls = self.password_change_allowed_urls[role]
+            if not request.path.startswith(allowed_urls) and password_change_required(request.user.pk):
+                messages.warning(request, 'You must change your password before accessing other pages.')
+                return redirect(self.password_change_redirects[role])
 
-class SingleSessionPerUserMiddleware(MiddlewareMixin):
-    """
-    Middleware to enforce 1 active session per user.
-    If a user logs in from a different device/browser, the previous session will be invalidated.
-    """
-    
-    def process_request(self, request):
-        """Check if the current session is still valid for this user"""
-        if not isinstance(request.user, AnonymousUser) and request.user.is_authenticated:
-            try:
-                # Only validate if we have a session key
-                if not request.session.session_key:
-                    return None
-                    
-                user_session = UserSession.objects.get(user=request.user)
-                
-                # Check if the current session key matches the stored session key
-                if request.session.session_key != user_session.session_key:
-                    # Session key mismatch - invalidate current session
-                    logout(request)
-                    return redirect(reverse('login'))
-                    
-            except UserSession.DoesNotExist:
-                # No active session record - create one if we have a session key
-                if request.session.session_key:
-                    try:
-                        UserSession.objects.update_or_create(
-                            user=request.user,
-                            defaults={
-                                'session_key': request.session.session_key,
-                                'ip_address': self.get_client_ip(request),
-                                'user_agent': request.META.get('HTTP_USER_AGENT', '')[:500]
-                            }
-                        )
-                    except Exception:
-                        # Silently fail if we can't create session record
-                        pass
-            except Exception:
-                # Silently fail for any other exception
-                pass
-        
         return None
-    
+
     @staticmethod
     def get_client_ip(request):
         """Get the client's IP address"""
@@ -99,3 +150,83 @@ class SingleSessionPerUserMiddleware(MiddlewareMixin):
         else:
             ip = request.META.get('REMOTE_ADDR')
         return ip
+
+
+class RequestLogContextMiddleware:
+    """
+    Tag every log record written while handling a request with its request
+    id and user (see app/log_pipeline.py), echo the id in an X-Request-ID
+    header, and pick up runtime log level changes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        apply_level_overrides()
+        request_id = clean_request_id(request.headers.get('X-Request-ID')) or uuid.uuid4().hex
+        request.request_id = request_id
+        token = bind_request(request, request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            unbind_request(token)
+        response['X-Request-ID'] = request_id
+        return response
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Opt-in per-request SQL profiling (see app/instrumentation.py).
+
+    Records the query count, database time, Python time and repeated query
+    fingerprints of every request into the /ops/slow-requests/ ring buffer,
+    adds a Server-Timing header and logs a warning when a view repeats the
+    same statement SQL_DUPLICATE_QUERY_THRESHOLD times or more. Enabled with
+    SQL_INSTRUMENTATION_ENABLED; otherwise removed from the stack at startup.
+    """
+    IGNORED_PREFIXES = ('/static/', '/media/')
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.logger = logging.getLogger('app.instrumentation')
+
+    def __call__(self, request):
+        if request.path.startswith(self.IGNORED_PREFIXES):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        match = getattr(request, 'resolver_match', None)
+        db_ms = round(recorder.duration * 1000, 2)
+        profile = {
+            'timestamp': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else request.path,
+            'status': response.status_code,
+            'user': request.user.username if getattr(request, 'user', None) and request.user.is_authenticated else '',
+            'total_ms': total_ms,
+            'db_ms': db_ms,
+            'python_ms': round(max(total_ms - db_ms, 0), 2),
+            'queries': recorder.count,
+            'duplicates': recorder.duplicates(),
+        }
+        record_request(profile)
+
+        if profile['duplicates']:
+            statement, count, _ = profile['duplicates'][0]
+            self.logger.warning(
+                'Possible N+1 in %s: %d repeated statement(s), worst ran %d times: %s',
+                profile['view'], len(profile['duplicates']), count, statement[:300],
+            )
+        response['Server-Timing'] = server_timing(profile)
+        return response
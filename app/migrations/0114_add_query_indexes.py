@@ -0,0 +1,95 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0113_borrowrequestbatch_approved_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['-timestamp', '-id'], name='activitylog_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['model_name', '-timestamp'], name='activitylog_model_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', '-timestamp'], name='activitylog_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequestbatch',
+            index=models.Index(fields=['user', 'status', '-request_date'], name='borrowbatch_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequestbatch',
+            index=models.Index(fields=['status', '-request_date'], name='borrowbatch_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequestitem',
+            index=models.Index(fields=['status', 'return_date'], name='borrowitem_status_return_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequestitem',
+            index=models.Index(condition=models.Q(('actual_return_date__isnull', True)), fields=['status', 'return_date'], name='borrowitem_open_return_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-timestamp'], name='notification_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-timestamp'], name='notification_user_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['property_name'], name='property_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyhistory',
+            index=models.Index(fields=['property', '-timestamp', '-id'], name='prophistory_property_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationbatch',
+            index=models.Index(fields=['user', 'status', '-request_date'], name='resbatch_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationbatch',
+            index=models.Index(fields=['status', '-request_date'], name='resbatch_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationitem',
+            index=models.Index(fields=['status', 'needed_date'], name='resitem_status_needed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationitem',
+            index=models.Index(fields=['status', 'return_date'], name='resitem_status_return_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supply',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['supply_name'], name='supply_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplyhistory',
+            index=models.Index(fields=['supply', '-timestamp', '-id'], name='supplyhistory_supply_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplyrequestbatch',
+            index=models.Index(fields=['user', 'status', '-request_date'], name='supplybatch_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplyrequestbatch',
+            index=models.Index(fields=['status', '-request_date'], name='supplybatch_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplyrequestitem',
+            index=models.Index(fields=['status', 'supply'], name='supplyitem_status_supply_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0114_add_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('supply', 'Supply Request'), ('batch_supply', 'Supply Request'), ('borrow', 'Borrow Request'), ('batch_borrow', 'Borrow Request'), ('legacy_reservation', 'Reservation'), ('reservation', 'Reservation')], max_length=20)),
+                ('source_id', models.PositiveIntegerField()),
+                ('status', models.CharField(max_length=20)),
+                ('status_display', models.CharField(max_length=50)),
+                ('request_date', models.DateTimeField()),
+                ('needed_date', models.DateField(blank=True, null=True)),
+                ('return_date', models.DateField(blank=True, null=True)),
+                ('item_summary', models.CharField(blank=True, max_length=255)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('total_quantity', models.PositiveIntegerField(default=0)),
+                ('purpose', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='app.department')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='request_index', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-request_date', '-id'], name='requestindex_user_date_idx'), models.Index(fields=['user', 'status', '-request_date'], name='requestindex_user_status_idx'), models.Index(fields=['kind', 'status', '-request_date'], name='requestindex_kind_status_idx'), models.Index(fields=['department', '-request_date'], name='requestindex_dept_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'source_id'), name='requestindex_kind_source_uniq')],
+            },
+        ),
+    ]
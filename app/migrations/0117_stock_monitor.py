@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:30
+
+from datetime import date, timedelta
+
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+
+
+def backfill_alert_state(apps, schema_editor):
+    """
+    Store the current stock status, and mark supplies that are already past
+    (or inside) the expiry window as alerted, so the first run of the new
+    monitor does not re-announce them. Supplies expiring exactly today or at
+    the edge of the window are left for that run, as the old daily check
+    would have announced them today.
+    """
+    Supply = apps.get_model('app', 'Supply')
+    SupplyQuantity = apps.get_model('app', 'SupplyQuantity')
+
+    SupplyQuantity.objects.update(stock_status=Case(
+        When(current_quantity=0, then=Value('out_of_stock')),
+        When(current_quantity__lte=F('minimum_threshold'), then=Value('low_stock')),
+        default=Value('available'),
+    ))
+    today = date.today()
+    Supply.objects.filter(expiration_date__lt=today).update(expiry_alert='expired')
+    Supply.objects.filter(
+        expiration_date__gt=today, expiration_date__lt=today + timedelta(days=30),
+    ).update(expiry_alert='expiring')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0116_carts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supply',
+            name='expiry_alert',
+            field=models.CharField(blank=True, choices=[('', 'None'), ('expiring', 'Expiring Soon'), ('expired', 'Expired')], default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='supplyquantity',
+            name='stock_status',
+            field=models.CharField(choices=[('low_stock', 'Low Stock'), ('out_of_stock', 'Out of Stock'), ('available', 'Available')], db_index=True, default='out_of_stock', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='supply',
+            index=models.Index(condition=models.Q(('expiration_date__isnull', False)), fields=['expiry_alert', 'expiration_date'], name='supply_expiry_alert_idx'),
+        ),
+        migrations.RunPython(backfill_alert_state, migrations.RunPython.noop),
+    ]
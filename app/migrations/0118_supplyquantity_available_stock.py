@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:33
+
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+
+
+def backfill_available_stock(apps, schema_editor):
+    SupplyQuantity = apps.get_model('app', 'SupplyQuantity')
+    SupplyQuantity.objects.update(available_stock=Case(
+        When(current_quantity__gt=F('reserved_quantity'), then=F('current_quantity') - F('reserved_quantity')),
+        default=Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0117_stock_monitor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supplyquantity',
+            name='available_stock',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_available_stock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0118_supplyquantity_available_stock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(choices=[('activity_log', 'Activity Log'), ('supply_history', 'Supply History'), ('property_history', 'Property History'), ('notification', 'Notifications')], max_length=30)),
+                ('month', models.DateField()),
+                ('file', models.FileField(upload_to='log_archives/')),
+                ('row_count', models.PositiveIntegerField()),
+                ('first_id', models.PositiveBigIntegerField()),
+                ('last_id', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['table', 'month', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['timestamp'], name='notification_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyhistory',
+            index=models.Index(fields=['timestamp'], name='prophistory_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplyhistory',
+            index=models.Index(fields=['timestamp'], name='supplyhistory_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logarchive',
+            index=models.Index(fields=['table', 'month'], name='logarchive_table_month_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 18:05
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_image_digest(apps, schema_editor):
+    DamageReport = apps.get_model('app', 'DamageReport')
+    reports = DamageReport.objects.filter(image_data__isnull=False).only('pk', 'image_data')
+    for report in reports.iterator(chunk_size=100):
+        digest = hashlib.md5(bytes(report.image_data)).hexdigest()
+        DamageReport.objects.filter(pk=report.pk).update(image_digest=digest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0119_log_archives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='damagereport',
+            name='image_digest',
+            field=models.CharField(blank=True, default='', help_text='MD5 of image_data, used as its ETag', max_length=32),
+        ),
+        migrations.RunPython(backfill_image_digest, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-19 18:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0120_damagereport_image_digest'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='borrowrequestitem',
+            name='borrowitem_open_return_idx',
+        ),
+    ]
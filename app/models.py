@@ -1,9 +1,12 @@
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import Count, Max, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
+from functools import partial
 from django.utils import timezone
+import hashlib
 import logging
 
 
@@ -37,6 +40,11 @@ class ActivityLog(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='activitylog_ts_idx'),
+            models.Index(fields=['model_name', '-timestamp'], name='activitylog_model_ts_idx'),
+            models.Index(fields=['user', '-timestamp'], name='activitylog_user_ts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} {self.get_action_display()} {self.model_name} - {self.object_repr}"
@@ -201,6 +209,14 @@ class SupplyQuantity(models.Model):
     current_quantity = models.PositiveIntegerField(default=0)
     reserved_quantity = models.PositiveIntegerField(default=0)  # Track reserved stock for approved requests
     minimum_threshold = models.PositiveIntegerField(default=10)
+    # Maintained by save(), see app/stock_monitor.py
+    stock_status = models.CharField(max_length=20, default='out_of_stock', db_index=True, choices=[
+        ('low_stock', 'Low Stock'),
+        ('out_of_stock', 'Out of Stock'),
+        ('available', 'Available'),
+    ])
+    # available_quantity as of the last save(), for filtering and sorting in SQL
+    available_stock = models.PositiveIntegerField(default=0, db_index=True)
     last_updated = models.DateTimeField(auto_now=True)
 
     @property
@@ -208,6 +224,12 @@ class SupplyQuantity(models.Model):
         """Calculate available quantity (current - reserved)"""
         return max(0, self.current_quantity - self.reserved_quantity)
 
+    def refresh_stock_fields(self):
+        """Set the stored stock_status and available_stock from the quantities (save() calls this)."""
+        from .stock_monitor import stock_status
+        self.stock_status = stock_status(self.current_quantity, self.minimum_threshold)
+        self.available_stock = self.available_quantity
+
     def __str__(self):
         return f"Quantity for {self.supply.supply_name}: {self.current_quantity}"
 
@@ -219,6 +241,11 @@ class SupplyQuantity(models.Model):
         # Check if this is a new quantity record
         is_new = self.pk is None
 
+        from .stock_monitor import check_stock_level
+        self.refresh_stock_fields()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'stock_status', 'available_stock'}
+
         if is_new:
             super().save(*args, **kwargs)  # Save first to get the ID
             
@@ -251,6 +278,8 @@ class SupplyQuantity(models.Model):
                         remarks=remarks
                     )
 
+            # Alert the admins if this change crossed into low or out of stock
+            check_stock_level(self)
             super().save(*args, **kwargs)
 
 class SupplyCategory(models.Model):
@@ -288,6 +317,12 @@ class Supply(models.Model):
     available_for_request = models.BooleanField(default=True)
     date_received = models.DateField()
     expiration_date = models.DateField(null=True, blank=True)
+    # Last expiry alert sent for the current expiration date, see app/stock_monitor.py
+    expiry_alert = models.CharField(max_length=20, blank=True, default='', choices=[
+        ('', 'None'),
+        ('expiring', 'Expiring Soon'),
+        ('expired', 'Expired'),
+    ])
     last_updated = models.DateTimeField(auto_now=True)
     is_archived = models.BooleanField(default=False)
 
@@ -299,13 +334,7 @@ class Supply(models.Model):
     @property
     def status(self):
         try:
-            quantity_info = self.quantity_info
-            if quantity_info.current_quantity == 0:
-                return 'out_of_stock'
-            elif quantity_info.current_quantity <= quantity_info.minimum_threshold:
-                return 'low_stock'
-            else:
-                return 'available'
+            return self.quantity_info.stock_status
         except SupplyQuantity.DoesNotExist:
             return 'out_of_stock'
 
@@ -348,6 +377,9 @@ class Supply(models.Model):
                         new_value=new_str if new_str else None
                     )
 
+            # Keep the alerts already sent; a new expiration date gets its own
+            self.expiry_alert = old_obj.expiry_alert if old_obj.expiration_date == self.expiration_date else ''
+
         super().save(*args, **kwargs)
         
         # Generate barcode if not set (after initial save to have an ID)
@@ -377,43 +409,18 @@ class Supply(models.Model):
         """
         Check and create notifications for supplies that are expiring soon or have expired.
         This should be run periodically (e.g., daily) using a scheduled task.
+        See app/stock_monitor.py; returns the number of supplies alerted.
         """
-        today = date.today()
-        
-        # Find supplies that will expire in 30 days
-        expiring_soon = cls.objects.filter(
-            expiration_date__isnull=False,
-            expiration_date=today + timedelta(days=30)
-        )
-        
-        # Find supplies that just expired today
-        expired_today = cls.objects.filter(
-            expiration_date__isnull=False,
-            expiration_date=today
-        )
-        
-        # Get all admin users
-        admin_users = User.objects.filter(userprofile__role='ADMIN')
-        
-        # Create notifications for supplies expiring soon
-        for supply in expiring_soon:
-            for admin_user in admin_users:
-                Notification.objects.create(
-                    user=admin_user,
-                    message=f"Supply '{supply.supply_name}' will expire in 30 days",
-                    remarks=f"Expiration date: {supply.expiration_date}"
-                )
-        
-        # Create notifications for supplies that expired today
-        for supply in expired_today:
-            for admin_user in admin_users:
-                Notification.objects.create(
-                    user=admin_user,
-                    message=f"Supply '{supply.supply_name}' has expired today",
-                    remarks=f"Please remove from inventory or take appropriate action."
-                )
+        from .stock_monitor import check_expiring_supplies
+        return check_expiring_supplies()
 
     class Meta:
+        indexes = [
+            models.Index(fields=['supply_name'], name='supply_active_name_idx', condition=Q(is_archived=False)),
+            # check_expiring_supplies() range scans
+            models.Index(fields=['expiry_alert', 'expiration_date'], name='supply_expiry_alert_idx',
+                         condition=Q(expiration_date__isnull=False)),
+        ]
         permissions = [
             ("view_admin_dashboard", "Can view  admin dashboard"),
             ("view_checkout_page", "Can view checkout page"),
@@ -472,6 +479,11 @@ class Property(models.Model):
     ppmp_references = models.JSONField(null=True, blank=True, help_text="JSON field storing PPMP item references")
     remarks = models.TextField(blank=True, null=True, help_text="Additional notes or comments about the property")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['property_name'], name='property_active_name_idx', condition=Q(is_archived=False)),
+        ]
+
     def __str__(self):
         # Only show property name and property number (if available), not barcode
         if self.property_number:
@@ -688,22 +700,112 @@ class SupplyRequest(models.Model):
                     quantity_info.save()
                     
                     # Save the supply to update available_for_request
+                    # (low stock alerts are raised by quantity_info.save())
                     self.supply.save()
-                    
-                    # Create notification for low stock if needed
-                    if quantity_info.current_quantity <= quantity_info.minimum_threshold:
-                        # Get all admin users to notify about low stock
-                        admin_users = User.objects.filter(userprofile__role='ADMIN')
-                        
-                        for admin_user in admin_users:
-                            Notification.objects.create(
-                                user=admin_user,
-                                message=f"Supply '{self.supply.supply_name}' is running low on stock (Current: {quantity_info.current_quantity}, Minimum: {quantity_info.minimum_threshold})",
-                                remarks="Please restock soon."
-                            )
             except SupplyQuantity.DoesNotExist:
                 pass
 
+class annotated_property:
+    """
+    Read-only property that returns the queryset annotation of the same name
+    when the instance has one (see BatchQuerySet.with_aggregates()), and
+    otherwise computes the value with the decorated method.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.name = method.__name__
+        self.__doc__ = method.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # Annotations are set as instance attributes, which shadow this
+        # (non-data) descriptor
+        return self.method(instance)
+
+
+def notify_admins_of_new_batch(batch, label, item_name):
+    """
+    Notify every admin of a newly submitted batch, listing its first items.
+
+    The batch models' save() schedules this with transaction.on_commit(), so
+    a batch submitted together with its items (app/carts.py submit_cart())
+    is announced once, after the items exist, and a batch whose transaction
+    rolls back is never announced. The batch has already committed by then,
+    so a failure here is logged rather than raised: raising would make the
+    submission look failed and invite a duplicate. label is e.g. 'supply';
+    item_name is the lookup of an item's name, e.g. 'supply__supply_name'.
+    """
+    from .live_updates import publish, user_target
+
+    try:
+        items = [f"{name} (x{quantity})" for name, quantity in batch.items.values_list(item_name, 'quantity')]
+        item_list = ", ".join(items[:3])
+        if len(items) > 3:
+            item_list += f" and {len(items) - 3} more items"
+
+        admin_ids = list(User.objects.filter(userprofile__role='ADMIN').values_list('id', flat=True))
+        # bulk_create skips the Notification receiver, so publish to all admins at once
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=admin_id,
+                message=f"New batch {label} request #{batch.id} submitted by {batch.user.username}",
+                remarks=f"Items: {item_list}. Purpose: {batch.purpose[:100]}"
+            )
+            for admin_id in admin_ids
+        ])
+    except Exception:
+        logging.getLogger(__name__).error(
+            "Could not notify the admins of %s batch #%s", label, batch.id, exc_info=True
+        )
+        return
+    publish(*(user_target(admin_id) for admin_id in admin_ids))
+
+
+class BatchQuerySet(models.QuerySet):
+    """
+    Batch requests whose item aggregates can be computed in SQL.
+    item_aggregates maps each annotation to (aggregate over the items, value
+    for a batch without items); the names match the model's
+    annotated_property properties, which then skip their per-batch queries.
+    """
+    item_aggregates = {
+        'total_items': (Count('pk'), 0),
+        'total_quantity': (Sum('quantity'), 0),
+    }
+
+    def with_aggregates(self):
+        """
+        Annotate every item aggregate as a correlated subquery rather than a
+        join, so that filters on the items added later (searches by item
+        name, for example) cannot multiply or narrow the aggregates.
+        """
+        item_model = self.model._meta.get_field('items').related_model
+        annotations = {}
+        for name, (aggregate, empty) in self.item_aggregates.items():
+            items = item_model.objects.filter(batch_request=OuterRef('pk')).order_by().values('batch_request')
+            value = Subquery(items.annotate(value=aggregate).values('value'))
+            annotations[name] = value if empty is None else Coalesce(value, Value(empty))
+        return self.annotate(**annotations)
+
+
+class ReservationBatchQuerySet(BatchQuerySet):
+    item_aggregates = {
+        **BatchQuerySet.item_aggregates,
+        'earliest_needed_date': (Min('needed_date'), None),
+        'latest_return_date': (Max('return_date'), None),
+    }
+
+
+class BorrowRequestBatchQuerySet(BatchQuerySet):
+    item_aggregates = {
+        **BatchQuerySet.item_aggregates,
+        'earliest_return_date': (Min('return_date'), None),
+        'latest_return_date': (Max('return_date'), None),
+    }
+
+
 class SupplyRequestBatch(models.Model):
     """
     A batch supply request that can contain multiple supply items.
@@ -733,52 +835,40 @@ class SupplyRequestBatch(models.Model):
     voided_date = models.DateTimeField(null=True, blank=True)
     remarks = models.TextField(blank=True, null=True)
 
+    objects = BatchQuerySet.as_manager()
+
     class Meta:
         ordering = ['-request_date']
+        indexes = [
+            models.Index(fields=['user', 'status', '-request_date'], name='supplybatch_user_status_idx'),
+            models.Index(fields=['status', '-request_date'], name='supplybatch_status_date_idx'),
+        ]
 
     def __str__(self):
         return f"Batch Request #{self.id} by {self.user.username} ({self.request_date.date()})"
 
-    @property
+    @annotated_property
     def total_items(self):
         return self.items.count()
 
-    @property
+    @annotated_property
     def total_quantity(self):
         return sum(item.quantity for item in self.items.all())
 
     def save(self, *args, **kwargs):
         # Check if this is a new batch request
         is_new = self.pk is None
-        
-        # Get the old instance if it exists
-        try:
-            old_instance = SupplyRequestBatch.objects.get(pk=self.pk)
-            old_status = old_instance.status
-        except SupplyRequestBatch.DoesNotExist:
-            old_status = None
 
         # Save the batch request
         super().save(*args, **kwargs)
 
-        # If this is a new batch request, notify admin users
+        # If this is a new batch request, notify admin users once its items are committed
         if is_new:
-            admin_users = User.objects.filter(userprofile__role='ADMIN')
-            item_list = ", ".join([f"{item.supply.supply_name} (x{item.quantity})" 
-                                 for item in self.items.all()[:3]])
-            if self.items.count() > 3:
-                item_list += f" and {self.items.count() - 3} more items"
-            
-            for admin_user in admin_users:
-                Notification.objects.create(
-                    user=admin_user,
-                    message=f"New batch supply request #{self.id} submitted by {self.user.username}",
-                    remarks=f"Items: {item_list}. Purpose: {self.purpose[:100]}"
-                )
+            transaction.on_commit(partial(notify_admins_of_new_batch, self, 'supply', 'supply__supply_name'))
 
         # NOTE: Quantity deduction is handled during the CLAIMING process, not during approval.
-        # During approval, quantities are reserved (handled in views.py approve_batch_item).
-        # During claiming, quantities are actually deducted from current_quantity (handled in views.py claim_batch_items).
+        # During approval, quantities are reserved (handled in views/requests.py approve_batch_item).
+        # During claiming, quantities are actually deducted from current_quantity (handled in views/requests.py claim_batch_items).
 
 class SupplyRequestItem(models.Model):
     """
@@ -808,6 +898,9 @@ class SupplyRequestItem(models.Model):
 
     class Meta:
         unique_together = ['batch_request', 'supply']  # Prevent duplicate items in same batch
+        indexes = [
+            models.Index(fields=['status', 'supply'], name='supplyitem_status_supply_idx'),
+        ]
 
     def __str__(self):
         return f"{self.supply.supply_name} (x{self.quantity}) in Batch #{self.batch_request.id}"
@@ -861,27 +954,33 @@ class ReservationBatch(models.Model):
     # Link to the auto-generated borrow request batch
     generated_borrow_batch = models.ForeignKey('BorrowRequestBatch', on_delete=models.SET_NULL, null=True, blank=True, related_name='source_reservation_batch')
 
+    objects = ReservationBatchQuerySet.as_manager()
+
     class Meta:
         ordering = ['-request_date']
+        indexes = [
+            models.Index(fields=['user', 'status', '-request_date'], name='resbatch_user_status_idx'),
+            models.Index(fields=['status', '-request_date'], name='resbatch_status_date_idx'),
+        ]
 
     def __str__(self):
         return f"Reservation Batch #{self.id} by {self.user.username} ({self.request_date.date()})"
 
-    @property
+    @annotated_property
     def total_items(self):
         return self.items.count()
 
-    @property
+    @annotated_property
     def total_quantity(self):
         return sum(item.quantity for item in self.items.all())
 
-    @property
+    @annotated_property
     def earliest_needed_date(self):
         """Get the earliest needed date among all items"""
         needed_dates = [item.needed_date for item in self.items.all() if item.needed_date]
         return min(needed_dates) if needed_dates else None
 
-    @property
+    @annotated_property
     def latest_return_date(self):
         """Get the latest return date among all items"""
         return_dates = [item.return_date for item in self.items.all() if item.return_date]
@@ -892,29 +991,16 @@ class ReservationBatch(models.Model):
         is_new = self.pk is None
         
         # Get the old instance if it exists
-        try:
-            old_instance = ReservationBatch.objects.get(pk=self.pk)
-            old_status = old_instance.status
-        except ReservationBatch.DoesNotExist:
-            old_status = None
+        old_status = None
+        if not is_new:
+            old_status = ReservationBatch.objects.filter(pk=self.pk).values_list('status', flat=True).first()
 
         # Save the batch request
         super().save(*args, **kwargs)
 
-        # If this is a new batch request, notify admin users
+        # If this is a new batch request, notify admin users once its items are committed
         if is_new:
-            admin_users = User.objects.filter(userprofile__role='ADMIN')
-            item_list = ", ".join([f"{item.property.property_name} (x{item.quantity})" 
-                                 for item in self.items.all()[:3]])
-            if self.items.count() > 3:
-                item_list += f" and {self.items.count() - 3} more items"
-            
-            for admin_user in admin_users:
-                Notification.objects.create(
-                    user=admin_user,
-                    message=f"New batch reservation request #{self.id} submitted by {self.user.username}",
-                    remarks=f"Items: {item_list}. Purpose: {self.purpose[:100]}"
-                )
+            transaction.on_commit(partial(notify_admins_of_new_batch, self, 'reservation', 'property__property_name'))
 
         # Handle status changes
         if old_status != self.status:
@@ -958,141 +1044,140 @@ class ReservationBatch(models.Model):
         
         # 0b. Update pending/approved batches to expired when ALL their items are expired
         # This ensures batch status matches item status
-        pending_batches = cls.objects.filter(status='pending')
+        # The item aggregates are annotated so the filters below run in SQL
+        # instead of loading every batch's items
+        batches = cls.objects.with_aggregates().select_related('user')
+        all_items_expired = batches.annotate(
+            unexpired_items=Count('items', filter=~Q(items__status='expired'))
+        ).filter(total_items__gt=0, unexpired_items=0)
+
+        pending_batches = all_items_expired.filter(status='pending')
         for batch in pending_batches:
-            all_items = batch.items.all()
-            if all_items and all(item.status == 'expired' for item in all_items):
-                batch.status = 'expired'
-                batch.save()
-                # Notify the user about the expired reservation
+            batch.status = 'expired'
+            batch.save()
+            # Notify the user about the expired reservation
+            Notification.objects.create(
+                user=batch.user,
+                message=f"Your reservation batch #{batch.id} has expired.",
+                remarks=f"All items in the batch have expired before approval."
+            )
+            # Send email notification
+            from .utils import send_reservation_expired_email
+            send_reservation_expired_email(batch)
+
+        # 1. Update pending batches to expired when latest return_date has passed
+        for batch in batches.filter(status='pending', latest_return_date__lt=today):
+            batch.status = 'expired'
+            batch.save()
+
+            # Notify the user about the expired reservation (only if not already notified)
+            existing_notification = Notification.objects.filter(
+                user=batch.user,
+                message__contains=f"batch #{batch.id} has expired"
+            ).exists()
+            if not existing_notification:
                 Notification.objects.create(
                     user=batch.user,
                     message=f"Your reservation batch #{batch.id} has expired.",
-                    remarks=f"All items in the batch have expired before approval."
+                    remarks=f"The reservation period ended on {batch.latest_return_date} before approval."
                 )
                 # Send email notification
                 from .utils import send_reservation_expired_email
                 send_reservation_expired_email(batch)
-        
-        # 1. Update pending batches to expired when latest return_date has passed
-        for batch in cls.objects.filter(status='pending'):
-            if batch.latest_return_date and batch.latest_return_date < today:
-                batch.status = 'expired'
-                batch.save()
-                
-                # Notify the user about the expired reservation (only if not already notified)
-                existing_notification = Notification.objects.filter(
-                    user=batch.user,
-                    message__contains=f"batch #{batch.id} has expired"
-                ).exists()
-                if not existing_notification:
-                    Notification.objects.create(
-                        user=batch.user,
-                        message=f"Your reservation batch #{batch.id} has expired.",
-                        remarks=f"The reservation period ended on {batch.latest_return_date} before approval."
-                    )
-                    # Send email notification
-                    from .utils import send_reservation_expired_email
-                    send_reservation_expired_email(batch)
-        
+
         # 2a. Update approved batches to expired when ALL their items are expired
-        approved_batches = cls.objects.filter(status='approved')
+        approved_batches = all_items_expired.filter(status='approved')
         for batch in approved_batches:
-            all_items = batch.items.all()
-            if all_items and all(item.status == 'expired' for item in all_items):
-                batch.status = 'expired'
-                batch.save()
-                # Notify the user about the expired reservation
-                existing_notification = Notification.objects.filter(
+            batch.status = 'expired'
+            batch.save()
+            # Notify the user about the expired reservation
+            existing_notification = Notification.objects.filter(
+                user=batch.user,
+                message__contains=f"batch #{batch.id} has expired"
+            ).exists()
+            if not existing_notification:
+                Notification.objects.create(
                     user=batch.user,
-                    message__contains=f"batch #{batch.id} has expired"
-                ).exists()
-                if not existing_notification:
-                    Notification.objects.create(
-                        user=batch.user,
-                        message=f"Your reservation batch #{batch.id} has expired.",
-                        remarks=f"All items in the batch have expired."
-                    )
-                    # Send email notification
-                    from .utils import send_reservation_expired_email
-                    send_reservation_expired_email(batch)
-        
+                    message=f"Your reservation batch #{batch.id} has expired.",
+                    remarks=f"All items in the batch have expired."
+                )
+                # Send email notification
+                from .utils import send_reservation_expired_email
+                send_reservation_expired_email(batch)
+
         # 2b. Update approved batches to expired when latest return_date has passed without becoming active
-        for batch in cls.objects.filter(status='approved'):
-            if batch.latest_return_date and batch.latest_return_date < today and not batch.generated_borrow_batch:
-                batch.status = 'expired'
-                batch.save()
-                
-                # Notify the user about the expired reservation (only if not already notified)
-                existing_notification = Notification.objects.filter(
+        for batch in batches.filter(status='approved', latest_return_date__lt=today, generated_borrow_batch__isnull=True):
+            batch.status = 'expired'
+            batch.save()
+
+            # Notify the user about the expired reservation (only if not already notified)
+            existing_notification = Notification.objects.filter(
+                user=batch.user,
+                message__contains=f"batch #{batch.id} has expired"
+            ).exists()
+            if not existing_notification:
+                Notification.objects.create(
                     user=batch.user,
-                    message__contains=f"batch #{batch.id} has expired"
-                ).exists()
-                if not existing_notification:
-                    Notification.objects.create(
-                        user=batch.user,
-                        message=f"Your reservation batch #{batch.id} has expired.",
-                        remarks=f"The reservation period ended on {batch.latest_return_date} without activation."
-                    )
-                    # Send email notification
-                    from .utils import send_reservation_expired_email
-                    send_reservation_expired_email(batch)
-        
+                    message=f"Your reservation batch #{batch.id} has expired.",
+                    remarks=f"The reservation period ended on {batch.latest_return_date} without activation."
+                )
+                # Send email notification
+                from .utils import send_reservation_expired_email
+                send_reservation_expired_email(batch)
+
         # 3. AUTO-GENERATE BORROW REQUESTS: Update approved batches to active when earliest needed_date is reached
-        approved_batches = cls.objects.filter(
+        # and the latest return_date hasn't passed
+        approved_batches = batches.filter(
             status='approved',
-            generated_borrow_batch__isnull=True  # Only if borrow request hasn't been created yet
+            generated_borrow_batch__isnull=True,  # Only if borrow request hasn't been created yet
+            earliest_needed_date__lte=today,
+            latest_return_date__gte=today,
         )
-        
+
         for batch in approved_batches:
-            earliest_date = batch.earliest_needed_date
-            latest_date = batch.latest_return_date
-            
-            # Check if it's time to activate (needed_date reached and return_date hasn't passed)
-            if earliest_date and earliest_date <= today and latest_date and latest_date >= today:
-                with transaction.atomic():
-                    # Create a single BorrowRequestBatch for the entire reservation batch
-                    borrow_batch = BorrowRequestBatch.objects.create(
-                        user=batch.user,
-                        purpose=f"Auto-generated from Reservation Batch #{batch.id}: {batch.purpose}",
-                        status='for_claiming',
-                        approved_date=timezone.now(),
-                        remarks=f"Automatically created from approved reservation batch #{batch.id}"
+            with transaction.atomic():
+                # Create a single BorrowRequestBatch for the entire reservation batch
+                borrow_batch = BorrowRequestBatch.objects.create(
+                    user=batch.user,
+                    purpose=f"Auto-generated from Reservation Batch #{batch.id}: {batch.purpose}",
+                    status='for_claiming',
+                    approved_date=timezone.now(),
+                    remarks=f"Automatically created from approved reservation batch #{batch.id}"
+                )
+                
+                # Create BorrowRequestItem for each approved item in the batch
+                approved_items = batch.items.filter(status='approved')
+                for item in approved_items:
+                    BorrowRequestItem.objects.create(
+                        batch_request=borrow_batch,
+                        property=item.property,
+                        quantity=item.quantity,
+                        approved_quantity=item.quantity,
+                        return_date=item.return_date,
+                        status='approved',
+                        approved=True,
+                        from_reservation=True,  # Mark as coming from a reservation
+                        remarks=f"Auto-generated from reservation batch #{batch.id}"
                     )
                     
-                    # Create BorrowRequestItem for each approved item in the batch
-                    approved_items = batch.items.filter(status='approved')
-                    for item in approved_items:
-                        BorrowRequestItem.objects.create(
-                            batch_request=borrow_batch,
-                            property=item.property,
-                            quantity=item.quantity,
-                            approved_quantity=item.quantity,
-                            return_date=item.return_date,
-                            status='approved',
-                            approved=True,
-                            from_reservation=True,  # Mark as coming from a reservation
-                            remarks=f"Auto-generated from reservation batch #{batch.id}"
-                        )
-                        
-                        # Mark item as active
-                        item.status = 'active'
-                        item.save()
-                    
-                    # Link the borrow batch to the reservation batch and mark as active
-                    batch.generated_borrow_batch = borrow_batch
-                    batch.status = 'active'
-                    batch.save()
-                    
-                    # Notify admins about the auto-generated borrow request
-                    admin_users = User.objects.filter(userprofile__role='ADMIN')
-                    item_count = approved_items.count()
-                    for admin_user in admin_users:
-                        Notification.objects.create(
-                            user=admin_user,
-                            message=f"Borrow request #{borrow_batch.id} auto-generated from reservation batch #{batch.id}",
-                            remarks=f"User: {batch.user.username}, {item_count} items, Status: For Claiming"
-                        )
+                    # Mark item as active
+                    item.status = 'active'
+                    item.save()
+                
+                # Link the borrow batch to the reservation batch and mark as active
+                batch.generated_borrow_batch = borrow_batch
+                batch.status = 'active'
+                batch.save()
+                
+                # Notify admins about the auto-generated borrow request
+                admin_users = User.objects.filter(userprofile__role='ADMIN')
+                item_count = approved_items.count()
+                for admin_user in admin_users:
+                    Notification.objects.create(
+                        user=admin_user,
+                        message=f"Borrow request #{borrow_batch.id} auto-generated from reservation batch #{batch.id}",
+                        remarks=f"User: {batch.user.username}, {item_count} items, Status: For Claiming"
+                    )
         
         # 4. Check active reservations to see if their linked borrow requests have been completed
         active_batches = cls.objects.filter(status='active', generated_borrow_batch__isnull=False)
@@ -1132,6 +1217,10 @@ class ReservationItem(models.Model):
 
     class Meta:
         unique_together = ['batch_request', 'property']  # Prevent duplicate items in same batch
+        indexes = [
+            models.Index(fields=['status', 'needed_date'], name='resitem_status_needed_idx'),
+            models.Index(fields=['status', 'return_date'], name='resitem_status_return_idx'),
+        ]
 
     def __str__(self):
         return f"{self.property.property_name} (x{self.quantity}) in Reservation Batch #{self.batch_request.id}"
@@ -1537,6 +1626,7 @@ class DamageReport(models.Model):
     image_name = models.CharField(max_length=255, blank=True, null=True, help_text="Original filename")
     image_type = models.CharField(max_length=50, default='image/jpeg', help_text="MIME type (e.g., image/jpeg)")
     image_size = models.PositiveIntegerField(null=True, blank=True, help_text="Image size in bytes")
+    image_digest = models.CharField(max_length=32, blank=True, default='', help_text="MD5 of image_data, used as its ETag")
     
     deleted_at = models.DateTimeField(null=True, blank=True, help_text="When the image was deleted")
     deleted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='deleted_damage_reports', help_text="Admin who deleted the image")
@@ -1566,6 +1656,7 @@ class DamageReport(models.Model):
                     self.image_name = image_file.name
                     self.image_type = 'image/jpeg'  # Always JPEG after compression
                     self.image_size = size
+                    self.image_digest = hashlib.md5(binary_data).hexdigest()
                     return True
             except Exception as e:
                 import logging
@@ -1821,27 +1912,33 @@ class BorrowRequestBatch(models.Model):
     voided_date = models.DateTimeField(null=True, blank=True)
     remarks = models.TextField(blank=True, null=True)
 
+    objects = BorrowRequestBatchQuerySet.as_manager()
+
     class Meta:
         ordering = ['-request_date']
+        indexes = [
+            models.Index(fields=['user', 'status', '-request_date'], name='borrowbatch_user_status_idx'),
+            models.Index(fields=['status', '-request_date'], name='borrowbatch_status_date_idx'),
+        ]
 
     def __str__(self):
         return f"Borrow Batch #{self.id} by {self.user.username} ({self.request_date.date()})"
 
-    @property
+    @annotated_property
     def total_items(self):
         return self.items.count()
 
-    @property
+    @annotated_property
     def total_quantity(self):
         return sum(item.quantity for item in self.items.all())
 
-    @property
+    @annotated_property
     def earliest_return_date(self):
         """Get the earliest return date among all items"""
         return_dates = [item.return_date for item in self.items.all() if item.return_date]
         return min(return_dates) if return_dates else None
 
-    @property
+    @annotated_property
     def latest_return_date(self):
         """Get the latest return date among all items"""
         return_dates = [item.return_date for item in self.items.all() if item.return_date]
@@ -1852,29 +1949,16 @@ class BorrowRequestBatch(models.Model):
         is_new = self.pk is None
         
         # Get the old instance if it exists
-        try:
-            old_instance = BorrowRequestBatch.objects.get(pk=self.pk)
-            old_status = old_instance.status
-        except BorrowRequestBatch.DoesNotExist:
-            old_status = None
+        old_status = None
+        if not is_new:
+            old_status = BorrowRequestBatch.objects.filter(pk=self.pk).values_list('status', flat=True).first()
 
         # Save the batch request
         super().save(*args, **kwargs)
 
-        # If this is a new batch request, notify admin users
+        # If this is a new batch request, notify admin users once its items are committed
         if is_new:
-            admin_users = User.objects.filter(userprofile__role='ADMIN')
-            item_list = ", ".join([f"{item.property.property_name} (x{item.quantity})" 
-                                 for item in self.items.all()[:3]])
-            if self.items.count() > 3:
-                item_list += f" and {self.items.count() - 3} more items"
-            
-            for admin_user in admin_users:
-                Notification.objects.create(
-                    user=admin_user,
-                    message=f"New batch borrow request #{self.id} submitted by {self.user.username}",
-                    remarks=f"Items: {item_list}. Purpose: {self.purpose[:100]}"
-                )
+            transaction.on_commit(partial(notify_admins_of_new_batch, self, 'borrow', 'property__property_name'))
 
         # Handle status changes
         if old_status != self.status:
@@ -2019,7 +2103,7 @@ class BorrowRequestBatch(models.Model):
                     )
 
                     # Log the SMS for debugging
-                    logger.info(f"\n{'='*60}\nSMS TO {phone_number} (User: {user.username}):\n{'='*60}\n{message}\n{'='*60}")
+                    logger.debug(f"\n{'='*60}\nSMS TO {phone_number} (User: {user.username}):\n{'='*60}\n{message}\n{'='*60}")
 
                     # Send SMS
                     success, response = send_sms_alert(phone_number, message)
@@ -2176,52 +2260,52 @@ class BorrowRequestBatch(models.Model):
             logger.info(f"Marked {count} borrow item(s) as expired and unreserved quantities")
         
         # 2. Mark pending, partially_approved batches as expired when latest return_date has passed
-        pending_or_partial_batches = cls.objects.filter(status__in=['pending', 'partially_approved'])
+        # (latest_return_date is annotated, so the date check runs in SQL)
+        expired_batches = cls.objects.with_aggregates().select_related('user').filter(latest_return_date__lt=today)
+        pending_or_partial_batches = expired_batches.filter(status__in=['pending', 'partially_approved'])
         
         for batch in pending_or_partial_batches:
-            if batch.latest_return_date and batch.latest_return_date < today:
-                # Unreserve all quantities for items in this batch before marking as expired
-                for item in batch.items.filter(status__in=['pending', 'approved']):
-                    if item.property:
-                        item.property.reserved_quantity = max(0, item.property.reserved_quantity - item.quantity)
-                        item.property.save(update_fields=['reserved_quantity'])
-                        item.property.update_availability()
-                        logger.info(f"Unreserved {item.quantity} units of {item.property.property_name} from expired batch #{batch.id}")
-                
-                batch.status = 'expired'
-                batch.save()
-                logger.info(f"Marked batch #{batch.id} as expired and unreserved all quantities")
-                
-                # Send email notification
-                from .utils import send_borrow_request_expired_email
-                send_borrow_request_expired_email(batch)
+            # Unreserve all quantities for items in this batch before marking as expired
+            for item in batch.items.filter(status__in=['pending', 'approved']):
+                if item.property:
+                    item.property.reserved_quantity = max(0, item.property.reserved_quantity - item.quantity)
+                    item.property.save(update_fields=['reserved_quantity'])
+                    item.property.update_availability()
+                    logger.info(f"Unreserved {item.quantity} units of {item.property.property_name} from expired batch #{batch.id}")
+            
+            batch.status = 'expired'
+            batch.save()
+            logger.info(f"Marked batch #{batch.id} as expired and unreserved all quantities")
+            
+            # Send email notification
+            from .utils import send_borrow_request_expired_email
+            send_borrow_request_expired_email(batch)
         
         # 3. Mark for_claiming/active batches as expired when latest return_date has passed
         # and mark their items as expired accordingly
-        active_batches = cls.objects.filter(status__in=['for_claiming', 'active'])
+        active_batches = expired_batches.filter(status__in=['for_claiming', 'active'])
         
         for batch in active_batches:
-            if batch.latest_return_date and batch.latest_return_date < today:
-                # Unreserve quantities only for items that haven't been returned yet
-                for item in batch.items.filter(status__in=['pending', 'approved', 'active']):
-                    if item.property:
-                        item.property.reserved_quantity = max(0, item.property.reserved_quantity - item.quantity)
-                        item.property.save(update_fields=['reserved_quantity'])
-                        item.property.update_availability()
-                        logger.info(f"Unreserved {item.quantity} units of {item.property.property_name} from expired batch #{batch.id}")
-                    
-                    # Mark item as expired if not already returned
-                    if item.status != 'returned':
-                        item.status = 'expired'
-                        item.save()
-                
-                batch.status = 'expired'
-                batch.save()
-                logger.info(f"Marked active/for_claiming batch #{batch.id} as expired and unreserved all quantities")
+            # Unreserve quantities only for items that haven't been returned yet
+            for item in batch.items.filter(status__in=['pending', 'approved', 'active']):
+                if item.property:
+                    item.property.reserved_quantity = max(0, item.property.reserved_quantity - item.quantity)
+                    item.property.save(update_fields=['reserved_quantity'])
+                    item.property.update_availability()
+                    logger.info(f"Unreserved {item.quantity} units of {item.property.property_name} from expired batch #{batch.id}")
                 
-                # Send email notification
-                from .utils import send_borrow_request_expired_email
-                send_borrow_request_expired_email(batch)
+                # Mark item as expired if not already returned
+                if item.status != 'returned':
+                    item.status = 'expired'
+                    item.save()
+            
+            batch.status = 'expired'
+            batch.save()
+            logger.info(f"Marked active/for_claiming batch #{batch.id} as expired and unreserved all quantities")
+            
+            # Send email notification
+            from .utils import send_borrow_request_expired_email
+            send_borrow_request_expired_email(batch)
 
 class BorrowRequestItem(models.Model):
     """
@@ -2255,6 +2339,11 @@ class BorrowRequestItem(models.Model):
 
     class Meta:
         unique_together = ['batch_request', 'property']  # Prevent duplicate items in same batch
+        indexes = [
+            # Expiry sweep (status in (approved, active) and return_date < today) and the
+            # overdue / near-overdue sweeps over the items still out
+            models.Index(fields=['status', 'return_date'], name='borrowitem_status_return_idx'),
+        ]
 
     def __str__(self):
         return f"{self.property.property_name} (x{self.quantity}) in Borrow Batch #{self.batch_request.id}"
@@ -2362,6 +2451,14 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-timestamp'], name='notification_user_ts_idx'),
+            models.Index(fields=['user', 'is_read', '-timestamp'], name='notification_user_read_idx'),
+            # archive_cold_months() month scans
+            models.Index(fields=['timestamp'], name='notification_ts_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.message[:50]}"
 
@@ -2377,6 +2474,11 @@ class SupplyHistory(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['supply', '-timestamp', '-id'], name='supplyhistory_supply_ts_idx'),
+            # archive_cold_months() month scans
+            models.Index(fields=['timestamp'], name='supplyhistory_ts_idx'),
+        ]
 
     def __str__(self):
         user_display = self.user.username if self.user else "Unknown User"  
@@ -2394,12 +2496,47 @@ class PropertyHistory(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['property', '-timestamp', '-id'], name='prophistory_property_ts_idx'),
+            # archive_cold_months() month scans
+            models.Index(fields=['timestamp'], name='prophistory_ts_idx'),
+        ]
 
     def __str__(self):
         user_display = self.user.username if self.user else "Unknown User"  
         return f"{self.property.property_name} - {self.action} by {user_display} at {self.timestamp}"
 
 
+class LogArchive(models.Model):
+    """
+    One month of an audit table moved out of the database into a compressed
+    JSON Lines file (see app/log_retention.py).
+    """
+    TABLE_CHOICES = [
+        ('activity_log', 'Activity Log'),
+        ('supply_history', 'Supply History'),
+        ('property_history', 'Property History'),
+        ('notification', 'Notifications'),
+    ]
+
+    table = models.CharField(max_length=30, choices=TABLE_CHOICES)
+    month = models.DateField()  # First day of the archived month
+    file = models.FileField(upload_to='log_archives/')
+    row_count = models.PositiveIntegerField()
+    first_id = models.PositiveBigIntegerField()
+    last_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['table', 'month', 'id']
+        indexes = [
+            models.Index(fields=['table', 'month'], name='logarchive_table_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_table_display()} {self.month:%Y-%m} ({self.row_count} rows)"
+
+
 class BadStockReport(models.Model):
     supply = models.ForeignKey(Supply, on_delete=models.CASCADE, related_name='bad_stock_reports')
     quantity_removed = models.PositiveIntegerField(validators=[MinValueValidator(1)])
@@ -2557,3 +2694,106 @@ class PropertyPPMPAllocation(models.Model):
     
     def __str__(self):
         return f"{self.property.property_name} - {self.ppmp_item.ppmp.department.name} {self.ppmp_item.ppmp.year} - {self.quantity_allocated} allocated"
+
+
+class RequestIndex(models.Model):
+    """
+    Denormalized read model with one row per request or request batch.
+
+    Legacy single-item requests (SupplyRequest, BorrowRequest, Reservation)
+    and batches (SupplyRequestBatch, BorrowRequestBatch, ReservationBatch)
+    are projected into the same shape so request lists can filter, sort and
+    paginate in the database. Rows are kept in sync by the receivers in
+    app/signals.py; run `manage.py rebuild_request_index` to rebuild them.
+    """
+    KIND_CHOICES = [
+        ('supply', 'Supply Request'),
+        ('batch_supply', 'Supply Request'),
+        ('borrow', 'Borrow Request'),
+        ('batch_borrow', 'Borrow Request'),
+        ('legacy_reservation', 'Reservation'),
+        ('reservation', 'Reservation'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    source_id = models.PositiveIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='request_index')
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=20)
+    status_display = models.CharField(max_length=50)
+    request_date = models.DateTimeField()
+    needed_date = models.DateField(null=True, blank=True)
+    return_date = models.DateField(null=True, blank=True)
+    item_summary = models.CharField(max_length=255, blank=True)
+    item_count = models.PositiveIntegerField(default=0)
+    total_quantity = models.PositiveIntegerField(default=0)
+    purpose = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'source_id'], name='requestindex_kind_source_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-request_date', '-id'], name='requestindex_user_date_idx'),
+            models.Index(fields=['user', 'status', '-request_date'], name='requestindex_user_status_idx'),
+            models.Index(fields=['kind', 'status', '-request_date'], name='requestindex_kind_status_idx'),
+            models.Index(fields=['department', '-request_date'], name='requestindex_dept_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.source_id} ({self.status})"
+
+
+class Cart(models.Model):
+    """
+    A user's supply, borrow or reservation list before it is submitted as a
+    batch request (see app/carts.py). One cart per user and kind; the dates
+    and purpose are the batch-level values carried over by "request again".
+    """
+    KIND_CHOICES = [
+        ('supply', 'Supply'),
+        ('borrow', 'Borrow'),
+        ('reservation', 'Reservation'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='carts')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    needed_date = models.DateField(null=True, blank=True)
+    return_date = models.DateField(null=True, blank=True)
+    purpose = models.TextField(blank=True, default='')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'kind'], name='cart_user_kind_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} cart of {self.user}"
+
+    @property
+    def item_field(self):
+        """Name of the CartLine field holding this cart's items."""
+        return 'supply' if self.kind == 'supply' else 'property'
+
+
+class CartLine(models.Model):
+    """One item of a Cart: a supply for supply carts, a property otherwise."""
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='lines')
+    supply = models.ForeignKey(Supply, on_delete=models.CASCADE, null=True, blank=True)
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, null=True, blank=True)
+    quantity = models.PositiveIntegerField()
+    needed_date = models.DateField(null=True, blank=True)
+    return_date = models.DateField(null=True, blank=True)
+    purpose = models.TextField(blank=True, default='')
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['added_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'supply'], name='cartline_cart_supply_uniq'),
+            models.UniqueConstraint(fields=['cart', 'property'], name='cartline_cart_property_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.supply_id or self.property_id} (x{self.quantity}) in {self.cart}"
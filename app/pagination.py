@@ -0,0 +1,119 @@
+"""
+Keyset (cursor) pagination for append-only logs ordered newest first.
+
+OFFSET pagination makes the database walk and discard every row before the
+requested page, so deep pages of the activity log or of a long supply
+history get slower as the tables grow. Keyset pagination instead remembers
+the (timestamp, id) of the last row shown and asks for the rows strictly
+after it, which the (-timestamp, -id) indexes answer directly.
+
+Cursors are opaque URL-safe strings; a cursor for the next page walks
+towards older rows, a cursor for the previous page walks back towards newer
+ones. Each cursor also carries the 1-based position of the first row of the
+page it points to so templates can keep numbering rows without a COUNT(*).
+
+Usage:
+    page = keyset_paginate(ActivityLog.objects.all(), request.GET.get('cursor'), page_size=20)
+    page.object_list, page.next_cursor, page.previous_cursor
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor string cannot be decoded."""
+
+
+def encode_cursor(direction, timestamp, pk, position):
+    payload = json.dumps([direction, timestamp.isoformat(), pk, position], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (direction, timestamp, pk, position) for a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, timestamp, pk, position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in (NEXT, PREVIOUS):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(timestamp), int(pk), max(int(position), 1)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+class KeysetPage:
+    """One page of rows plus the cursors needed to move to its neighbours."""
+
+    def __init__(self, object_list, start_index, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.start_index = start_index
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def end_index(self):
+        return self.start_index + len(self.object_list) - 1
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_paginate(queryset, cursor=None, page_size=20, field='timestamp'):
+    """
+    Return a KeysetPage of queryset ordered by (-field, -id).
+
+    An invalid or missing cursor returns the first (newest) page, so stale or
+    hand-edited URLs degrade to the start of the list instead of an error.
+    """
+    direction, value, pk, position = NEXT, None, None, 1
+    if cursor:
+        try:
+            direction, value, pk, position = decode_cursor(cursor)
+        except InvalidCursor:
+            direction, value, pk, position = NEXT, None, None, 1
+
+    if value is None:
+        rows = list(queryset.order_by(f'-{field}', '-id')[:page_size + 1])
+        has_older, has_newer = len(rows) > page_size, False
+        rows = rows[:page_size]
+    elif direction == NEXT:
+        older = Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk})
+        rows = list(queryset.filter(older).order_by(f'-{field}', '-id')[:page_size + 1])
+        has_older, has_newer = len(rows) > page_size, True
+        rows = rows[:page_size]
+    else:
+        newer = Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk})
+        rows = list(queryset.filter(newer).order_by(field, 'id')[:page_size + 1])
+        has_older, has_newer = True, len(rows) > page_size
+        rows = rows[:page_size]
+        rows.reverse()
+        if not has_newer:
+            position = 1
+
+    next_cursor = previous_cursor = None
+    if rows and has_older:
+        last = rows[-1]
+        next_cursor = encode_cursor(NEXT, getattr(last, field), last.pk, position + len(rows))
+    if rows and has_newer:
+        first = rows[0]
+        previous_cursor = encode_cursor(PREVIOUS, getattr(first, field), first.pk, max(position - page_size, 1))
+
+    return KeysetPage(rows, position, next_cursor, previous_cursor)
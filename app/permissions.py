@@ -2,13 +2,79 @@
 Custom permission utilities for admin access control
 """
 from functools import wraps
+from django.conf import settings
 from django.contrib.auth.decorators import user_passes_test
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.http import JsonResponse
 
 
+def _permission_cache_key(user_id):
+    return f"admin_permissions:{user_id}"
+
+
+def resolve_admin_permissions(user):
+    """
+    Resolve a user's admin permissions once.
+
+    Returns a tuple (full_access, codenames): full_access is True for
+    superusers and admins without limited access, otherwise codenames is
+    the frozenset of permission codenames assigned to the user.
+
+    The result is memoized on the user object (which lives for the request)
+    and in the cache until invalidate_admin_permissions() is called. The
+    invalidation only reaches other processes through a shared cache, so
+    without one (CACHE_IS_SHARED) the result is cached for
+    ADMIN_PERMISSION_LOCAL_CACHE_TIMEOUT seconds only, which bounds how long
+    a revoked permission stays in force on the other Gunicorn workers.
+    """
+    resolved = getattr(user, '_admin_permissions_cache', None)
+    if resolved is not None:
+        return resolved
+
+    key = _permission_cache_key(user.pk)
+    resolved = cache.get(key)
+    if resolved is None:
+        resolved = _load_admin_permissions(user)
+        cache.set(key, resolved, _permission_cache_timeout())
+
+    user._admin_permissions_cache = resolved
+    return resolved
+
+
+def _permission_cache_timeout():
+    if getattr(settings, 'CACHE_IS_SHARED', False):
+        return getattr(settings, 'ADMIN_PERMISSION_CACHE_TIMEOUT', 300)
+    return getattr(settings, 'ADMIN_PERMISSION_LOCAL_CACHE_TIMEOUT', 5)
+
+
+def _load_admin_permissions(user):
+    if user.is_superuser:
+        return (True, frozenset())
+
+    from app.models import UserProfile
+
+    profile = UserProfile.objects.filter(user=user).values('id', 'role', 'has_limited_access').first()
+    if not profile or profile['role'] != 'ADMIN':
+        return (False, frozenset())
+
+    if not profile['has_limited_access']:
+        return (True, frozenset())
+
+    codenames = UserProfile.admin_permissions.through.objects.filter(
+        userprofile_id=profile['id']
+    ).values_list('adminpermission__codename', flat=True)
+    return (False, frozenset(codenames))
+
+
+def invalidate_admin_permissions(user_id):
+    """Drop the cached admin permissions for a user."""
+    if user_id:
+        cache.delete(_permission_cache_key(user_id))
+
+
 def has_admin_permission(user, permission_codename):
     """
     Check if a user has a specific admin permission
@@ -23,16 +89,26 @@ def has_admin_permission(user, permission_codename):
     if not user.is_authenticated:
         return False
     
-    # Superusers have all permissions
-    if user.is_superuser:
-        return True
+    full_access, codenames = resolve_admin_permissions(user)
+    return full_access or permission_codename in codenames
+
+
+def has_admin_permissions(user, permission_codenames):
+    """
+    Check several admin permissions at once
     
-    try:
-        profile = user.userprofile
-    except:
-        return False
+    Args:
+        user: User object
+        permission_codenames: Iterable of permission codenames
+    
+    Returns:
+        Dict mapping each codename to a boolean
+    """
+    if not user.is_authenticated:
+        return {codename: False for codename in permission_codenames}
     
-    return profile.has_admin_permission(permission_codename)
+    full_access, codenames = resolve_admin_permissions(user)
+    return {codename: full_access or codename in codenames for codename in permission_codenames}
 
 
 def admin_permission_required(permission_codename, redirect_url='/dashboard/', raise_exception=True):
@@ -94,21 +170,12 @@ def check_multiple_permissions(user, permission_codenames, require_all=True):
     Returns:
         Boolean
     """
-    if not user.is_authenticated:
-        return False
-    
-    if user.is_superuser:
-        return True
-    
-    try:
-        profile = user.userprofile
-    except:
-        return False
+    results = has_admin_permissions(user, permission_codenames).values()
     
     if require_all:
-        return all(profile.has_admin_permission(perm) for perm in permission_codenames)
+        return all(results)
     else:
-        return any(profile.has_admin_permission(perm) for perm in permission_codenames)
+        return any(results)
 
 
 class AdminPermissionMixin:
@@ -157,16 +224,8 @@ def get_user_admin_permissions(user):
     if not user.is_authenticated:
         return {}
     
-    try:
-        profile = user.userprofile
-    except:
-        return {}
-    
-    permissions = {}
-    for perm in AdminPermission.objects.all():
-        permissions[perm.codename] = profile.has_admin_permission(perm.codename)
-    
-    return permissions
+    codenames = AdminPermission.objects.values_list('codename', flat=True)
+    return has_admin_permissions(user, list(codenames))
 
 
 def filter_admin_queryset_by_permission(user, queryset, permission_codename):
@@ -0,0 +1,122 @@
+"""
+Per-user request counters for the user panel dashboard cards.
+
+compute_request_counters() returns every (status bucket x request type)
+count for a user using one grouped query per source table. Batch requests
+count once per batch (COUNT(DISTINCT batch_request_id) for item-level
+statuses), legacy single-item requests count once each.
+
+The result is cached per user for REQUEST_COUNTERS_CACHE_TIMEOUT seconds and
+dropped early whenever one of the user's requests changes (see the request
+index receivers in app/signals.py).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+REQUEST_TYPES = ('supply', 'borrow', 'reservation')
+COUNTER_BUCKETS = ('pending', 'approved', 'active')
+
+PENDING_STATUSES = ['pending', 'pending_approval']
+APPROVED_STATUSES = ['approved', 'for_claiming']
+# Batches additionally count as approved while only some of their items are approved
+APPROVED_BATCH_STATUSES = APPROVED_STATUSES + ['partially_approved']
+
+
+def _cache_key(user_id):
+    return f"request_counters:{user_id}"
+
+
+def compute_request_counters(user, today=None):
+    """
+    Count a user's pending, approved and active requests per type.
+
+    Returns {'pending': {'supply': n, 'borrow': n, 'reservation': n, 'all': n},
+             'approved': {...}, 'active': {...}}.
+    Pending borrows whose return date has already passed are not counted, and
+    a borrow or reservation is active only between its start and return dates.
+    """
+    from .models import (
+        BorrowRequest, BorrowRequestItem, Reservation, ReservationBatch,
+        SupplyRequest, SupplyRequestBatch,
+    )
+
+    today = today or timezone.localdate()
+    tomorrow = today + timedelta(days=1)
+    counters = {bucket: dict.fromkeys(REQUEST_TYPES, 0) for bucket in COUNTER_BUCKETS}
+
+    def by_status(queryset, approved_statuses):
+        return queryset.aggregate(
+            pending=Count('id', filter=Q(status__in=PENDING_STATUSES)),
+            approved=Count('id', filter=Q(status__in=approved_statuses)),
+        )
+
+    # Supply: legacy requests and batches
+    for queryset, approved_statuses in (
+        (SupplyRequest.objects.filter(user=user), APPROVED_STATUSES),
+        (SupplyRequestBatch.objects.filter(user=user), APPROVED_BATCH_STATUSES),
+    ):
+        counts = by_status(queryset, approved_statuses)
+        counters['pending']['supply'] += counts['pending']
+        counters['approved']['supply'] += counts['approved']
+
+    # Borrow: legacy requests, and batches counted through their item statuses
+    counts = BorrowRequest.objects.filter(user=user).aggregate(
+        pending=Count('id', filter=Q(status__in=PENDING_STATUSES, return_date__gte=tomorrow)),
+        approved=Count('id', filter=Q(status__in=APPROVED_STATUSES)),
+    )
+    counters['pending']['borrow'] += counts['pending']
+    counters['approved']['borrow'] += counts['approved']
+
+    borrow_started = (
+        Q(claimed_date__date__lte=today) |
+        Q(claimed_date__isnull=True, batch_request__request_date__date__lte=today)
+    )
+    counts = BorrowRequestItem.objects.filter(batch_request__user=user).aggregate(
+        pending=Count('batch_request_id', distinct=True,
+                      filter=Q(status__in=PENDING_STATUSES, return_date__gte=tomorrow)),
+        approved=Count('batch_request_id', distinct=True, filter=Q(status__in=APPROVED_STATUSES)),
+        active=Count('batch_request_id', distinct=True,
+                     filter=Q(status='active', return_date__gte=today) & borrow_started),
+    )
+    for bucket in COUNTER_BUCKETS:
+        counters[bucket]['borrow'] += counts[bucket]
+
+    # Reservation: legacy reservations and batches
+    for queryset, approved_statuses in (
+        (Reservation.objects.filter(user=user), APPROVED_STATUSES),
+        (ReservationBatch.objects.filter(user=user), APPROVED_BATCH_STATUSES),
+    ):
+        counts = by_status(queryset, approved_statuses)
+        counters['pending']['reservation'] += counts['pending']
+        counters['approved']['reservation'] += counts['approved']
+
+    counters['active']['reservation'] = ReservationBatch.objects.filter(
+        user=user, status='active',
+    ).annotate(
+        needed_from=Min('items__needed_date'),
+        needed_until=Max('items__return_date'),
+    ).filter(needed_from__lte=today, needed_until__gte=today).count()
+
+    for bucket in COUNTER_BUCKETS:
+        counters[bucket]['all'] = sum(counters[bucket][t] for t in REQUEST_TYPES)
+    return counters
+
+
+def get_request_counters(user):
+    """Return the cached counters for a user, computing them on a cache miss."""
+    key = _cache_key(user.pk)
+    counters = cache.get(key)
+    if counters is None:
+        counters = compute_request_counters(user)
+        cache.set(key, counters, getattr(settings, 'REQUEST_COUNTERS_CACHE_TIMEOUT', 30))
+    return counters
+
+
+def invalidate_request_counters(user_id):
+    """Drop the cached counters for a user after one of their requests changes."""
+    if user_id:
+        cache.delete(_cache_key(user_id))
@@ -0,0 +1,248 @@
+"""
+Projection of supply, borrow and reservation requests into RequestIndex.
+
+Each request kind has a source queryset (with the related data the
+projection needs) and a projector (source object -> RequestIndex field
+values). sync_request_index() re-projects a single request;
+schedule_request_index_sync() does it once per transaction after a request
+or one of its items changes, so saving the N items of a batch one by one
+re-projects the batch once at commit instead of N times.
+rebuild_request_index() re-projects everything and is used by the
+rebuild_request_index management command.
+
+RequestIndex has one row per request, so it serves the request lists:
+UserAllRequestsView reads it. The views built on individual items stay on
+the source tables: the user dashboard (per-item borrow rows, claimable items
+and the trend and status charts), UserRequestsSummaryView (item tallies per
+year), ResourceAllocationDashboardView (per-item allocations, paginated in
+the database) and the admin batch lists (one request type each, paginated
+in the database).
+"""
+from django.db import transaction
+
+# Prefixes used for the request numbers shown to users, e.g. "SB-12"
+REQUEST_ID_PREFIXES = {
+    'supply': 'S',
+    'batch_supply': 'SB',
+    'borrow': 'B',
+    'batch_borrow': 'BB',
+    'legacy_reservation': 'R',
+    'reservation': 'RB',
+}
+
+ITEM_SUMMARY_LIMIT = 3
+
+
+def _department_id(user):
+    profile = getattr(user, 'userprofile', None)
+    return profile.department_id if profile else None
+
+
+def _summarize_items(items, item_name):
+    """'Bond Paper (x2), Pen (x5), and 3 more items' for the first few items of a batch."""
+    parts = [f"{item_name(item)} (x{item.quantity})" for item in items[:ITEM_SUMMARY_LIMIT]]
+    if len(items) > ITEM_SUMMARY_LIMIT:
+        parts.append(f"and {len(items) - ITEM_SUMMARY_LIMIT} more items")
+    return ", ".join(parts)
+
+
+def _project_supply(req):
+    return {
+        'request_date': req.request_date,
+        'item_summary': req.supply.supply_name,
+        'item_count': 1,
+        'total_quantity': req.quantity,
+    }
+
+
+def _project_batch_supply(batch):
+    items = list(batch.items.all())
+    return {
+        'request_date': batch.request_date,
+        'item_summary': _summarize_items(items, lambda item: item.supply.supply_name),
+        'item_count': len(items),
+        'total_quantity': sum(item.quantity for item in items),
+    }
+
+
+def _project_borrow(req):
+    return {
+        'request_date': req.borrow_date,
+        'return_date': req.return_date,
+        'item_summary': req.property.property_name,
+        'item_count': 1,
+        'total_quantity': req.quantity,
+    }
+
+
+def _project_batch_borrow(batch):
+    items = list(batch.items.all())
+    return_dates = [item.return_date for item in items if item.return_date]
+    return {
+        'request_date': batch.request_date,
+        'return_date': max(return_dates) if return_dates else None,
+        'item_summary': _summarize_items(items, lambda item: item.property.property_name),
+        'item_count': len(items),
+        'total_quantity': sum(item.quantity for item in items),
+    }
+
+
+def _project_legacy_reservation(res):
+    return {
+        'request_date': res.reservation_date,
+        'needed_date': res.needed_date,
+        'return_date': res.return_date,
+        'item_summary': res.item.property_name,
+        'item_count': 1,
+        'total_quantity': res.quantity,
+    }
+
+
+def _project_reservation(batch):
+    items = list(batch.items.all())
+    needed_dates = [item.needed_date for item in items if item.needed_date]
+    return_dates = [item.return_date for item in items if item.return_date]
+    return {
+        'request_date': batch.request_date,
+        'needed_date': min(needed_dates) if needed_dates else None,
+        'return_date': max(return_dates) if return_dates else None,
+        'item_summary': _summarize_items(items, lambda item: item.property.property_name) or "No items",
+        'item_count': len(items),
+        'total_quantity': sum(item.quantity for item in items),
+    }
+
+
+PROJECTORS = {
+    'supply': _project_supply,
+    'batch_supply': _project_batch_supply,
+    'borrow': _project_borrow,
+    'batch_borrow': _project_batch_borrow,
+    'legacy_reservation': _project_legacy_reservation,
+    'reservation': _project_reservation,
+}
+
+
+def source_queryset(kind):
+    """The source queryset for a kind, with the related data its projector reads."""
+    from .models import (
+        BorrowRequest, BorrowRequestBatch, Reservation, ReservationBatch,
+        SupplyRequest, SupplyRequestBatch,
+    )
+    return {
+        'supply': lambda: SupplyRequest.objects.select_related('user__userprofile', 'supply'),
+        'batch_supply': lambda: SupplyRequestBatch.objects.select_related('user__userprofile').prefetch_related('items__supply'),
+        'borrow': lambda: BorrowRequest.objects.select_related('user__userprofile', 'property'),
+        'batch_borrow': lambda: BorrowRequestBatch.objects.select_related('user__userprofile').prefetch_related('items__property'),
+        'legacy_reservation': lambda: Reservation.objects.select_related('user__userprofile', 'item'),
+        'reservation': lambda: ReservationBatch.objects.select_related('user__userprofile').prefetch_related('items__property'),
+    }[kind]()
+
+
+def project(kind, obj):
+    """Return the RequestIndex field values (except kind/source_id) for a source object."""
+    values = {
+        'user_id': obj.user_id,
+        'department_id': _department_id(obj.user),
+        'status': obj.status,
+        'status_display': obj.get_status_display(),
+        'purpose': obj.purpose or '',
+        'needed_date': None,
+        'return_date': None,
+    }
+    values.update(PROJECTORS[kind](obj))
+    values['item_summary'] = values['item_summary'][:255]
+    return values
+
+
+def sync_request_index(kind, source_id):
+    """Re-project one request or batch, removing its row if the source no longer exists."""
+    from .models import RequestIndex
+
+    obj = source_queryset(kind).filter(pk=source_id).first()
+    if obj is None:
+        RequestIndex.objects.filter(kind=kind, source_id=source_id).delete()
+        return None
+    row, _ = RequestIndex.objects.update_or_create(
+        kind=kind, source_id=source_id, defaults=project(kind, obj),
+    )
+    return row
+
+
+class _PendingSyncs:
+    """The requests to re-project when a transaction commits, with the callbacks to run after each."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.requests = {}
+
+    def add(self, kind, source_id, on_synced):
+        self.requests.setdefault((kind, source_id), set()).add(on_synced)
+
+    def __call__(self):
+        if getattr(self.connection, '_request_index_pending', None) is self:
+            del self.connection._request_index_pending
+        for (kind, source_id), callbacks in self.requests.items():
+            row = sync_request_index(kind, source_id)
+            for on_synced in callbacks:
+                on_synced(row)
+
+    def is_queued(self):
+        # Rolling back drops the on_commit callbacks, this one included
+        return any(func is self for _, func, _ in self.connection.run_on_commit)
+
+
+def schedule_request_index_sync(kind, source_id, on_synced):
+    """
+    Re-project a request when the current transaction commits (at once
+    outside a transaction), once however many times it is scheduled in it.
+    on_synced(row) is then called with the new RequestIndex row, or None if
+    the request no longer exists; each distinct on_synced runs once.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        on_synced(sync_request_index(kind, source_id))
+        return
+    pending = getattr(connection, '_request_index_pending', None)
+    if pending is None or not pending.is_queued():
+        pending = connection._request_index_pending = _PendingSyncs(connection)
+        transaction.on_commit(pending)
+    pending.add(kind, source_id, on_synced)
+
+
+def remove_from_request_index(kind, source_id):
+    from .models import RequestIndex
+
+    RequestIndex.objects.filter(kind=kind, source_id=source_id).delete()
+
+
+def rebuild_request_index(kinds=None, chunk_size=500):
+    """
+    Replace the RequestIndex rows of the given kinds (all kinds by default)
+    with fresh projections. Returns a dict of kind -> rows written.
+    """
+    from .models import RequestIndex
+
+    counts = {}
+    for kind in PROJECTORS:
+        if kinds and kind not in kinds:
+            continue
+        with transaction.atomic():
+            RequestIndex.objects.filter(kind=kind).delete()
+            rows = []
+            count = 0
+            for obj in source_queryset(kind).order_by('pk').iterator(chunk_size=chunk_size):
+                rows.append(RequestIndex(kind=kind, source_id=obj.pk, **project(kind, obj)))
+                if len(rows) >= chunk_size:
+                    RequestIndex.objects.bulk_create(rows)
+                    count += len(rows)
+                    rows = []
+            if rows:
+                RequestIndex.objects.bulk_create(rows)
+                count += len(rows)
+        counts[kind] = count
+    return counts
+
+
+def request_number(kind, source_id):
+    """The user-facing request number, e.g. request_number('batch_supply', 12) -> 'SB-12'."""
+    return f"{REQUEST_ID_PREFIXES[kind]}-{source_id}"
@@ -3,14 +3,35 @@ Scheduler for periodic tasks like sending near-overdue email reminders and overd
 """
 import logging
 from datetime import date
+from functools import wraps
 from django.conf import settings
+from django.db import close_old_connections, connection
 from apscheduler.schedulers.background import BackgroundScheduler
 from django_apscheduler.jobstores import DjangoJobStore
-from django_apscheduler.util import close_old_connections
 
 logger = logging.getLogger(__name__)
 
 
+def reuses_connection(job):
+    """
+    Close the scheduler thread's connection before and after the job if it
+    is broken or older than CONN_MAX_AGE, as Django does around requests;
+    otherwise the thread would hold one connection for the process lifetime.
+    """
+    @wraps(job)
+    def run(*args, **kwargs):
+        # Tests call the jobs directly inside their transaction
+        if not connection.in_atomic_block:
+            close_old_connections()
+        try:
+            return job(*args, **kwargs)
+        finally:
+            if not connection.in_atomic_block:
+                close_old_connections()
+    return run
+
+
+@reuses_connection
 def send_near_overdue_reminders():
     """Send email reminders for items approaching their return date."""
     # Don't close connections in test mode - just run directly
@@ -26,6 +47,7 @@ def send_near_overdue_reminders():
         logger.error(f"Error in send_near_overdue_reminders task: {str(e)}", exc_info=True)
 
 
+@reuses_connection
 def check_and_notify_overdue_items():
     """
     AUTOMATED OVERDUE CHECK - Runs via scheduler every 2 hours
@@ -60,6 +82,7 @@ def check_and_notify_overdue_items():
         logger.error(f"SCHEDULER ERROR in check_and_notify_overdue_items: {str(e)}", exc_info=True)
 
 
+@reuses_connection
 def check_and_update_reservations():
     """
     AUTOMATED RESERVATION CHECK - Runs via scheduler every hour
@@ -1,8 +1,20 @@
 import os
 import logging
-from django.db.models.signals import post_delete, pre_save
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
+from .activity_filters import invalidate_activity_filter_options, invalidate_activity_filter_user
+from .auth_state import invalidate_auth_state
+from .catalog import invalidate_catalog
+from .db_pool import record_connection_opened
+from .live_updates import ADMINS, publish, user_target
+from .permissions import invalidate_admin_permissions
+from .request_counters import invalidate_request_counters
+from .request_index import remove_from_request_index, schedule_request_index_sync
+
 logger = logging.getLogger(__name__)
 
 
@@ -87,3 +99,221 @@ def replace_ppmp_file(sender, instance, **kwargs):
         return
     if old.file and old.file != instance.file:
         _delete_file(old.file)
+
+
+# ── Auth state cache ──────────────────────────────────────────────────────────
+
+@receiver(post_save, sender='app.UserSession')
+@receiver(post_delete, sender='app.UserSession')
+@receiver(post_save, sender='app.UserProfile')
+@receiver(post_delete, sender='app.UserProfile')
+def invalidate_auth_state_for_instance(sender, instance, **kwargs):
+    """Drop the cached auth state when a user's session or profile changes."""
+    invalidate_auth_state(instance.user_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_auth_state_for_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop the cached auth state when a user's group membership changes."""
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_auth_state(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidate_auth_state(user_id)
+    else:
+        # group.user_set.clear(): affected users are unknown after the fact
+        for user_id in instance.user_set.values_list('pk', flat=True):
+            invalidate_auth_state(user_id)
+
+
+# ── Admin permission cache ────────────────────────────────────────────────────
+
+@receiver(post_save, sender='app.UserProfile')
+@receiver(post_delete, sender='app.UserProfile')
+def invalidate_admin_permissions_for_profile(sender, instance, **kwargs):
+    """Role or has_limited_access may have changed."""
+    invalidate_admin_permissions(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_admin_permissions_for_user(sender, instance, **kwargs):
+    """is_superuser may have changed."""
+    invalidate_admin_permissions(instance.pk)
+
+
+@receiver(m2m_changed, sender='app.UserProfile_admin_permissions')
+def invalidate_admin_permissions_for_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached permissions when admin_permissions are added, removed or cleared."""
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    from .models import UserProfile
+
+    if not reverse:
+        invalidate_admin_permissions(instance.user_id)
+    elif pk_set:
+        for user_id in UserProfile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True):
+            invalidate_admin_permissions(user_id)
+    else:
+        for user_id in instance.users.values_list('user_id', flat=True):
+            invalidate_admin_permissions(user_id)
+
+
+@receiver(pre_delete, sender='app.AdminPermission')
+def invalidate_admin_permissions_for_deleted_permission(sender, instance, **kwargs):
+    """Deleting a permission removes it from every profile without an m2m_changed signal."""
+    for user_id in instance.users.values_list('user_id', flat=True):
+        invalidate_admin_permissions(user_id)
+
+
+# ── Activity log filter options cache ─────────────────────────────────────────
+
+@receiver(post_save, sender='app.ActivityLog')
+def invalidate_activity_filters_for_log(sender, instance, created, **kwargs):
+    """A new log entry may introduce a user or model name not yet in the dropdowns."""
+    if created:
+        invalidate_activity_filter_options(user_id=instance.user_id, model_name=instance.model_name)
+
+
+@receiver(post_delete, sender='app.ActivityLog')
+def invalidate_activity_filters_for_deleted_log(sender, instance, **kwargs):
+    """The deleted entry may have been the last one for its user or model name."""
+    invalidate_activity_filter_options()
+
+
+@receiver(post_save, sender=User)
+def invalidate_activity_filters_for_user(sender, instance, **kwargs):
+    """The user dropdown shows usernames."""
+    invalidate_activity_filter_user(instance)
+
+
+# ── Catalog snapshot cache ────────────────────────────────────────────────────
+
+@receiver(post_save, sender='app.Supply')
+@receiver(post_delete, sender='app.Supply')
+@receiver(post_save, sender='app.SupplyQuantity')
+@receiver(post_save, sender='app.SupplyCategory')
+@receiver(post_delete, sender='app.SupplyCategory')
+@receiver(post_save, sender='app.SupplySubcategory')
+@receiver(post_delete, sender='app.SupplySubcategory')
+@receiver(post_save, sender='app.Property')
+@receiver(post_delete, sender='app.Property')
+@receiver(post_save, sender='app.PropertyCategory')
+@receiver(post_delete, sender='app.PropertyCategory')
+def invalidate_catalog_for_instance(sender, instance, raw=False, **kwargs):
+    """
+    Names, categories, units or quantities in the picker catalog may have
+    changed. Dropped after commit, so a concurrent rebuild cannot cache the
+    state from before this write.
+    """
+    if not raw:
+        transaction.on_commit(invalidate_catalog)
+
+
+# ── Request index projection ──────────────────────────────────────────────────
+
+REQUEST_INDEX_SOURCES = {
+    'app.SupplyRequest': 'supply',
+    'app.SupplyRequestBatch': 'batch_supply',
+    'app.BorrowRequest': 'borrow',
+    'app.BorrowRequestBatch': 'batch_borrow',
+    'app.Reservation': 'legacy_reservation',
+    'app.ReservationBatch': 'reservation',
+}
+
+REQUEST_INDEX_ITEMS = {
+    'app.SupplyRequestItem': 'batch_supply',
+    'app.BorrowRequestItem': 'batch_borrow',
+    'app.ReservationItem': 'reservation',
+}
+
+
+def _request_synced(row):
+    if row is not None:
+        invalidate_request_counters(row.user_id)
+        publish(user_target(row.user_id), ADMINS)
+
+
+def _request_items_synced(row):
+    if row is not None:
+        invalidate_request_counters(row.user_id)
+        publish(user_target(row.user_id))
+
+
+def _sync_request_index_for_source(sender, instance, raw=False, **kwargs):
+    """Re-project a request or batch after it is saved (once per transaction)."""
+    if raw:
+        return
+    schedule_request_index_sync(REQUEST_INDEX_SOURCES[sender._meta.label], instance.pk, _request_synced)
+
+
+def _remove_request_index_for_source(sender, instance, **kwargs):
+    remove_from_request_index(REQUEST_INDEX_SOURCES[sender._meta.label], instance.pk)
+    invalidate_request_counters(instance.user_id)
+    publish(user_target(instance.user_id), ADMINS)
+
+
+def _sync_request_index_for_item(sender, instance, raw=False, **kwargs):
+    """Item summary, quantities, dates and item-level status counts of a batch change with its items."""
+    if raw:
+        return
+    schedule_request_index_sync(REQUEST_INDEX_ITEMS[sender._meta.label], instance.batch_request_id,
+                                _request_items_synced)
+
+
+for _label in REQUEST_INDEX_SOURCES:
+    post_save.connect(_sync_request_index_for_source, sender=_label, dispatch_uid=f'request_index_save_{_label}')
+    post_delete.connect(_remove_request_index_for_source, sender=_label, dispatch_uid=f'request_index_delete_{_label}')
+
+for _label in REQUEST_INDEX_ITEMS:
+    post_save.connect(_sync_request_index_for_item, sender=_label, dispatch_uid=f'request_index_item_save_{_label}')
+    post_delete.connect(_sync_request_index_for_item, sender=_label, dispatch_uid=f'request_index_item_delete_{_label}')
+
+
+@receiver(post_save, sender='app.UserProfile')
+def sync_request_index_department(sender, instance, raw=False, **kwargs):
+    """Keep the denormalized department in step with the user's profile."""
+    if raw:
+        return
+    from .models import RequestIndex
+
+    RequestIndex.objects.filter(user_id=instance.user_id).exclude(
+        department_id=instance.department_id
+    ).update(department_id=instance.department_id)
+
+
+# ── Live updates (server-sent events) ─────────────────────────────────────────
+
+@receiver(post_save, sender='app.Notification')
+def publish_notification(sender, instance, raw=False, **kwargs):
+    """
+    New or read notification: refresh the user's badge. Bulk updates and
+    deletes publish from their views (a post_delete receiver here would turn
+    clearing notifications into one query per row).
+    """
+    if not raw:
+        publish(user_target(instance.user_id))
+
+
+@receiver(post_save, sender='app.SupplyQuantity')
+def publish_supply_quantity(sender, instance, raw=False, **kwargs):
+    """A supply running out of stock leaves the admins' near-expiry counts."""
+    if not raw:
+        publish(ADMINS)
+
+
+@receiver(post_save, sender='app.Supply')
+@receiver(post_delete, sender='app.Supply')
+def publish_supply(sender, instance, raw=False, **kwargs):
+    """The expiration date may have changed."""
+    if not raw:
+        publish(ADMINS)
+
+
+# ── Database connections ──────────────────────────────────────────────────────
+
+@receiver(connection_created)
+def count_connection_opened(sender, connection, **kwargs):
+    """Per-process count of connections opened (checked out, when pooling), for /ops/db-pool/."""
+    record_connection_opened(connection.alias)
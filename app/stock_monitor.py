@@ -0,0 +1,146 @@
+"""
+Low-stock and expiry alerts for supplies.
+
+Stock: every change to a supply's balance or minimum threshold goes through
+SupplyQuantity.save(), which stores the resulting stock status
+(available / low_stock / out_of_stock, see stock_status()) in an indexed
+column and calls check_stock_level(). The admins are alerted when the stored
+status crosses into a worse one, so an alert is raised where the balance
+changes instead of in each view that happens to deduct stock, and saving a
+supply that is already low again does not repeat the alert. The crossing is
+detected by a conditional UPDATE of the stored status, which also makes it
+safe against two concurrent deductions: only the one whose UPDATE matched
+the old status alerts.
+
+The stored stock_status and available_stock columns are indexed, so the
+supply list, the dashboard counts and the pickers filter, sort and count by
+them directly instead of comparing current_quantity with minimum_threshold
+across the join for every row.
+
+Expiry: check_expiring_supplies() (the check_expiring_supplies command, run
+daily) range-scans the supplies expiring within EXPIRY_ALERT_DAYS through
+the (expiry_alert, expiration_date) index. Supply.expiry_alert records the
+last alert sent for the current expiration date, so each supply is alerted
+once when it enters the window and once when it expires, a missed daily run
+is caught up by the next one, and editing the expiration date re-arms the
+alerts (see Supply.save()).
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .live_updates import publish, user_target
+
+AVAILABLE = 'available'
+LOW_STOCK = 'low_stock'
+OUT_OF_STOCK = 'out_of_stock'
+
+# Stock status -> severity; an alert is raised when the severity goes up
+STOCK_SEVERITY = {AVAILABLE: 0, LOW_STOCK: 1, OUT_OF_STOCK: 2}
+IN_STOCK = [AVAILABLE, LOW_STOCK]
+
+EXPIRY_ALERT_DAYS = 30
+EXPIRING = 'expiring'
+EXPIRED = 'expired'
+
+
+def stock_status(current_quantity, minimum_threshold):
+    """The stock status of a balance, as stored in SupplyQuantity.stock_status."""
+    if current_quantity == 0:
+        return OUT_OF_STOCK
+    if current_quantity <= minimum_threshold:
+        return LOW_STOCK
+    return AVAILABLE
+
+
+def stock_status_counts():
+    """Supplies per stock status, in one grouped query: {'available': n, 'low_stock': n, 'out_of_stock': n}."""
+    from .models import SupplyQuantity
+
+    counts = dict.fromkeys(STOCK_SEVERITY, 0)
+    counts.update(SupplyQuantity.objects.order_by().values_list('stock_status').annotate(Count('pk')))
+    return counts
+
+
+def _notify_admins(messages):
+    """Create a notification for every admin per (message, remarks) pair."""
+    from .models import Notification
+
+    if not messages:
+        return
+    admin_ids = list(User.objects.filter(userprofile__role='ADMIN').values_list('id', flat=True))
+    # bulk_create skips the Notification receiver, so publish to all admins at once
+    Notification.objects.bulk_create([
+        Notification(user_id=admin_id, message=message, remarks=remarks)
+        for message, remarks in messages
+        for admin_id in admin_ids
+    ])
+    publish(*(user_target(admin_id) for admin_id in admin_ids))
+
+
+def check_stock_level(quantity_info):
+    """
+    Store quantity_info's stock status and alert the admins if it got worse.
+
+    Called by SupplyQuantity.save() before the row is written, with
+    quantity_info.stock_status already set to the new status. Returns True if
+    an alert was raised.
+    """
+    from .models import SupplyQuantity
+
+    status = quantity_info.stock_status
+    better = [other for other, severity in STOCK_SEVERITY.items() if severity < STOCK_SEVERITY[status]]
+    if not better:
+        return False
+    if not SupplyQuantity.objects.filter(pk=quantity_info.pk, stock_status__in=better).update(stock_status=status):
+        # Already stored with this (or a worse) status: alerted before
+        return False
+
+    supply = quantity_info.supply
+    if status == OUT_OF_STOCK:
+        message = f"Supply '{supply.supply_name}' is out of stock"
+    else:
+        message = (f"Supply '{supply.supply_name}' is running low on stock "
+                   f"(Current: {quantity_info.current_quantity}, Minimum: {quantity_info.minimum_threshold})")
+    _notify_admins([(message, "Please restock soon.")])
+    return True
+
+
+def check_expiring_supplies(today=None):
+    """
+    Alert the admins of supplies that entered the expiry window or expired
+    since they were last alerted. Returns the number of supplies alerted.
+    """
+    from .models import Supply
+
+    today = today or timezone.now().date()
+    messages = []
+    with transaction.atomic():
+        # skip_locked: a second run started meanwhile leaves these rows to this one
+        expired = list(Supply.objects.select_for_update(skip_locked=True).filter(
+            expiry_alert__in=['', EXPIRING], expiration_date__lte=today,
+        ).only('pk', 'supply_name', 'expiration_date'))
+        for supply in expired:
+            if supply.expiration_date == today:
+                messages.append((f"Supply '{supply.supply_name}' has expired today",
+                                 "Please remove from inventory or take appropriate action."))
+            else:
+                messages.append((f"Supply '{supply.supply_name}' expired on {supply.expiration_date}",
+                                 "Please remove from inventory or take appropriate action."))
+        Supply.objects.filter(pk__in=[supply.pk for supply in expired]).update(expiry_alert=EXPIRED)
+
+        expiring = list(Supply.objects.select_for_update(skip_locked=True).filter(
+            expiry_alert='', expiration_date__gt=today,
+            expiration_date__lte=today + timedelta(days=EXPIRY_ALERT_DAYS),
+        ).only('pk', 'supply_name', 'expiration_date'))
+        for supply in expiring:
+            days = (supply.expiration_date - today).days
+            messages.append((f"Supply '{supply.supply_name}' will expire in {days} day{'s' if days != 1 else ''}",
+                             f"Expiration date: {supply.expiration_date}"))
+        Supply.objects.filter(pk__in=[supply.pk for supply in expiring]).update(expiry_alert=EXPIRING)
+
+        _notify_admins(messages)
+    return len(expired) + len(expiring)
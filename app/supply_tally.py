@@ -0,0 +1,179 @@
+"""
+Tally of claimed (released) supplies, aggregated in the database.
+
+Every tally starts from claimed_items(): completed SupplyRequestItems,
+optionally narrowed by department, requester, category and request date.
+From there:
+
+- supply_tally() groups the items per supply with SUM/COUNT in SQL, so
+  search, ordering and pagination never load individual items;
+- tally_cube() groups them per (supply x department x category x month)
+  cell, a small table that every chart and export rolls up with rollup()
+  instead of re-scanning items;
+- supply_batches() lists the batches behind one supply row and backs the
+  lazily loaded drill-down on the tally page.
+
+An item's approved quantity falls back to its requested quantity when no
+approved quantity was recorded.
+"""
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+# Batch statuses whose completed items count as given out on the admin tally
+CLAIMED_BATCH_STATUSES = ['approved', 'for_claiming', 'completed']
+
+APPROVED_QUANTITY = Coalesce('approved_quantity', 'quantity')
+
+NO_DEPARTMENT = 'Others'
+NO_CATEGORY = 'Uncategorized'
+
+
+def claimed_items(batch_statuses=CLAIMED_BATCH_STATUSES, department=None, user=None,
+                  category=None, category_name=None, date_from=None, date_to=None,
+                  year=None, month=None):
+    """
+    Completed SupplyRequestItems matching the given filters.
+
+    batch_statuses=None includes items of batches in any status. Dates are
+    compared against the local calendar date of the batch request.
+    """
+    from .models import SupplyRequestItem
+
+    items = SupplyRequestItem.objects.filter(status='completed')
+    if batch_statuses:
+        items = items.filter(batch_request__status__in=batch_statuses)
+    if department:
+        items = items.filter(batch_request__user__userprofile__department_id=department)
+    if user:
+        items = items.filter(batch_request__user_id=user)
+    if category:
+        items = items.filter(supply__category_id=category)
+    if category_name:
+        if category_name == NO_CATEGORY:
+            items = items.filter(supply__category__isnull=True)
+        else:
+            items = items.filter(supply__category__name=category_name)
+    if date_from:
+        items = items.filter(batch_request__request_date__date__gte=date_from)
+    if date_to:
+        items = items.filter(batch_request__request_date__date__lte=date_to)
+    if year:
+        items = items.filter(batch_request__request_date__year=year)
+    if month:
+        items = items.filter(batch_request__request_date__month=month)
+    return items
+
+
+def search_items(items, search):
+    """Narrow items to supplies whose name contains search, or whose ID matches it ("12" or "SUP-12")."""
+    search = (search or '').strip()
+    if not search:
+        return items
+    condition = Q(supply__supply_name__icontains=search)
+    supply_id = search[4:] if search.upper().startswith('SUP-') else search
+    if supply_id.isdigit():
+        condition |= Q(supply_id=int(supply_id))
+    return items.filter(condition)
+
+
+def supply_tally(items):
+    """
+    One row per supply, ordered by supply name.
+
+    Rows are dicts with supply_id, supply_name, unit, total_approved_quantity,
+    num_requests (items) and num_batches (distinct batch requests). The result
+    is a lazy queryset, so a Paginator only fetches the rows of its page.
+    """
+    return items.values(
+        'supply_id',
+        supply_name=F('supply__supply_name'),
+        unit=F('supply__unit'),
+    ).annotate(
+        total_approved_quantity=Sum(APPROVED_QUANTITY),
+        num_requests=Count('id'),
+        num_batches=Count('batch_request', distinct=True),
+    ).order_by('supply_name', 'supply_id')
+
+
+def tally_totals(items):
+    """Totals across items: {'total_items': supplies, 'total_quantity': approved, 'total_requests': items}."""
+    return items.aggregate(
+        total_items=Count('supply', distinct=True),
+        total_quantity=Coalesce(Sum(APPROVED_QUANTITY), 0),
+        total_requests=Count('id'),
+    )
+
+
+def tally_cube(items):
+    """
+    Aggregate items per (supply, department, category, month) cell.
+
+    Each cell is a dict with the dimensions supply_id, supply_name,
+    supply_barcode, department_id, department_name, category_id,
+    category_name and month (first day of the request month), and the
+    measures requested, approved, recorded_approved (approved quantities as
+    recorded, without the fallback to the requested quantity, as the user
+    summary page counts them) and requests. Items of users without a
+    department, and supplies without a category, are labelled
+    NO_DEPARTMENT / NO_CATEGORY.
+    """
+    cells = list(
+        items.annotate(
+            month=TruncMonth('batch_request__request_date'),
+        ).values(
+            'supply_id',
+            'month',
+            supply_name=F('supply__supply_name'),
+            supply_barcode=F('supply__barcode'),
+            department_id=F('batch_request__user__userprofile__department_id'),
+            department_name=F('batch_request__user__userprofile__department__name'),
+            category_id=F('supply__category_id'),
+            category_name=F('supply__category__name'),
+        ).annotate(
+            requested=Sum('quantity'),
+            approved=Sum(APPROVED_QUANTITY),
+            recorded_approved=Coalesce(Sum('approved_quantity'), 0),
+            requests=Count('id'),
+        ).order_by('supply_name', 'supply_id', 'month')
+    )
+    for cell in cells:
+        if cell['department_id'] is None:
+            cell['department_name'] = NO_DEPARTMENT
+        if cell['category_id'] is None:
+            cell['category_name'] = NO_CATEGORY
+    return cells
+
+
+def rollup(cells, *dimensions, measures=('approved',)):
+    """
+    Sum cube cells over every dimension not listed.
+
+    Returns one dict per distinct combination of the listed dimensions, with
+    those dimensions and the summed measures, in first-seen order.
+    """
+    groups = {}
+    for cell in cells:
+        key = tuple(cell[dimension] for dimension in dimensions)
+        row = groups.get(key)
+        if row is None:
+            row = groups[key] = dict(zip(dimensions, key), **dict.fromkeys(measures, 0))
+        for measure in measures:
+            row[measure] += cell[measure] or 0
+    return list(groups.values())
+
+
+def supply_batches(items, supply_id):
+    """The batch requests behind one supply row, newest first, with the approved quantity per batch."""
+    return list(
+        items.filter(supply_id=supply_id).values(
+            'batch_request_id',
+            batch_status=F('batch_request__status'),
+            first_name=F('batch_request__user__first_name'),
+            last_name=F('batch_request__user__last_name'),
+            username=F('batch_request__user__username'),
+            department_name=F('batch_request__user__userprofile__department__name'),
+        ).annotate(
+            approved=Sum(APPROVED_QUANTITY),
+            request_date=Max('batch_request__request_date'),
+        ).order_by('-request_date', '-batch_request_id')
+    )
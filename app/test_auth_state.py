@@ -0,0 +1,56 @@
+"""
+Tests for AuthStateMiddleware's cached auth state (app/auth_state.py) when
+the cache is stale, as in a Gunicorn worker that did not handle the change.
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .auth_state import _cache_key, get_auth_state
+from .models import UserProfile, UserSession
+
+
+class StaleAuthStateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='root')
+        UserProfile.objects.update_or_create(user=cls.admin, defaults={'role': 'ADMIN'})
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get('/dashboard/').status_code, 200)
+
+    def cache_stale_state(self, **changes):
+        cache.set(_cache_key(self.admin.pk), {**get_auth_state(self.admin), **changes})
+
+    def test_stale_session_key_does_not_log_out(self):
+        self.cache_stale_state(session_key='key-of-an-earlier-login')
+        self.assertEqual(self.client.get('/dashboard/').status_code, 200)
+        self.assertEqual(get_auth_state(self.admin)['session_key'], self.client.session.session_key)
+
+    def test_login_elsewhere_logs_out(self):
+        UserSession.objects.filter(user=self.admin).update(session_key='key-of-a-newer-login')
+        response = self.client.get('/dashboard/')
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+
+    def test_stale_password_change_flag_does_not_redirect(self):
+        self.cache_stale_state(must_change_password=True)
+        self.assertEqual(self.client.get('/dashboard/').status_code, 200)
+
+        UserProfile.objects.filter(user=self.admin).update(must_change_password=True)
+        self.assertRedirects(self.client.get('/dashboard/'), reverse('password_change'),
+                             fetch_redirect_response=False)
+
+    @override_settings(AUTH_STATE_CACHE_TIMEOUT=300, AUTH_STATE_LOCAL_CACHE_TIMEOUT=5)
+    def test_per_process_cache_keeps_the_state_briefly(self):
+        for shared, expected in ((True, 300), (False, 5)):
+            with self.subTest(shared=shared), override_settings(CACHE_IS_SHARED=shared), \
+                    mock.patch('app.auth_state.cache') as mocked:
+                mocked.get.return_value = None
+                get_auth_state(self.admin)
+                # A login on another worker does not clear this process's state
+                self.assertEqual(mocked.set.call_args.args[2], expected)
@@ -0,0 +1,86 @@
+"""
+Tests for the SQL-annotated batch aggregates (BatchQuerySet.with_aggregates())
+and the expiry sweeps that filter on them.
+"""
+import tempfile
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from .models import (
+    BorrowRequestBatch, BorrowRequestItem, Property, ReservationBatch, ReservationItem,
+    SupplyRequestBatch,
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class BatchAggregateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='borrower')
+        cls.projector = Property(property_name='Projector', overall_quantity=10)
+        cls.projector.save()
+        cls.speaker = Property(property_name='Speaker', overall_quantity=10)
+        cls.speaker.save()
+
+    def borrow_batch(self, status='pending', return_dates=()):
+        batch = BorrowRequestBatch.objects.create(user=self.user, purpose='Seminar', status=status)
+        for prop, (quantity, return_date) in zip((self.projector, self.speaker), return_dates):
+            BorrowRequestItem.objects.create(batch_request=batch, property=prop, quantity=quantity,
+                                             return_date=return_date, status=status)
+        return batch
+
+    def test_annotations_match_properties(self):
+        today = date.today()
+        batch = self.borrow_batch(return_dates=((2, today), (3, today + timedelta(days=4))))
+        reservation = ReservationBatch.objects.create(user=self.user, purpose='Seminar')
+        ReservationItem.objects.create(batch_request=reservation, property=self.projector, quantity=1,
+                                       needed_date=today, return_date=today + timedelta(days=2))
+
+        annotated = BorrowRequestBatch.objects.with_aggregates().get(pk=batch.pk)
+        with self.assertNumQueries(0):
+            values = (annotated.total_items, annotated.total_quantity,
+                      annotated.earliest_return_date, annotated.latest_return_date)
+        self.assertEqual(values, (batch.total_items, batch.total_quantity,
+                                  batch.earliest_return_date, batch.latest_return_date))
+        self.assertEqual(values, (2, 5, today, today + timedelta(days=4)))
+
+        annotated = ReservationBatch.objects.with_aggregates().get(pk=reservation.pk)
+        self.assertEqual(
+            (annotated.total_items, annotated.total_quantity, annotated.earliest_needed_date, annotated.latest_return_date),
+            (1, 1, today, today + timedelta(days=2)),
+        )
+
+    def test_batch_without_items(self):
+        SupplyRequestBatch.objects.create(user=self.user, purpose='Office')
+        batch = SupplyRequestBatch.objects.with_aggregates().get()
+        self.assertEqual((batch.total_items, batch.total_quantity), (0, 0))
+        batch = BorrowRequestBatch.objects.with_aggregates().get(pk=self.borrow_batch().pk)
+        self.assertIsNone(batch.latest_return_date)
+
+    def test_item_filters_do_not_change_aggregates(self):
+        today = date.today()
+        batch = self.borrow_batch(return_dates=((2, today), (3, today)))
+
+        found = BorrowRequestBatch.objects.with_aggregates().filter(
+            items__property__property_name__icontains='o'  # Matches both items
+        ).distinct()
+        self.assertEqual([(b.pk, b.total_items, b.total_quantity) for b in found], [(batch.pk, 2, 5)])
+
+    def test_expiry_sweeps_filter_on_latest_return_date(self):
+        yesterday = date.today() - timedelta(days=1)
+        expired = self.borrow_batch(return_dates=((1, yesterday - timedelta(days=3)), (1, yesterday)))
+        current = self.borrow_batch(return_dates=((1, yesterday), (1, date.today())))
+        reservation = ReservationBatch.objects.create(user=self.user, purpose='Seminar')
+        ReservationItem.objects.create(batch_request=reservation, property=self.projector, quantity=1,
+                                       return_date=yesterday)
+
+        BorrowRequestBatch.check_expired_batches()
+        ReservationBatch.check_and_update_batches()
+
+        statuses = dict(BorrowRequestBatch.objects.values_list('pk', 'status'))
+        self.assertEqual((statuses[expired.pk], statuses[current.pk]), ('expired', 'pending'))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'expired')
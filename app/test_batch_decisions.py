@@ -0,0 +1,122 @@
+"""
+Tests for the bulk approve/reject of batch items (app/batch_decisions.py).
+"""
+import json
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+
+from . import batch_decisions
+from .batch_decisions import apply_decisions
+from .models import (
+    BorrowRequestBatch, BorrowRequestItem, Notification, Property, Supply, SupplyQuantity,
+    SupplyRequestBatch, SupplyRequestItem,
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class BatchDecisionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='pw')
+        cls.user = User.objects.create_user(username='member', email='member@example.com')
+        cls.paper = Supply(supply_name='Bond Paper', date_received=date.today())
+        cls.paper.save()
+        SupplyQuantity.objects.create(supply=cls.paper, current_quantity=10, reserved_quantity=2)
+        cls.pens = Supply(supply_name='Ballpen', date_received=date.today())
+        cls.pens.save()
+        SupplyQuantity.objects.create(supply=cls.pens, current_quantity=100)
+        cls.projector = Property(property_name='Projector', overall_quantity=4, quantity=4)
+        cls.projector.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def supply_batch(self, *lines):
+        batch = SupplyRequestBatch.objects.create(user=self.user, purpose='Office use')
+        items = [SupplyRequestItem.objects.create(batch_request=batch, supply=supply, quantity=quantity)
+                 for supply, quantity in lines]
+        return batch, items
+
+    def test_decisions_across_batches_apply_together(self):
+        first, (paper, pens) = self.supply_batch((self.paper, 5), (self.pens, 20))
+        second, (more_paper,) = self.supply_batch((self.paper, 3))
+
+        # Run the email thread inline: a real one would not see this test's uncommitted rows
+        with mock.patch.object(batch_decisions, 'Thread') as thread, self.captureOnCommitCallbacks(execute=True):
+            statuses = apply_decisions('supply', [
+                {'item': paper.id, 'decision': 'approve', 'approved_quantity': 4},
+                {'item': pens.id, 'decision': 'reject', 'remarks': 'Out of budget'},
+                {'item': more_paper.id, 'decision': 'approve'},
+            ], self.admin)
+
+        self.assertEqual(statuses, {first.id: 'for_claiming', second.id: 'for_claiming'})
+        paper.refresh_from_db()
+        pens.refresh_from_db()
+        self.assertEqual((paper.status, paper.approved_quantity, pens.status, pens.remarks),
+                         ('approved', 4, 'rejected', 'Out of budget'))
+        self.assertEqual(SupplyQuantity.objects.get(supply=self.paper).reserved_quantity, 2 + 4 + 3)
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(mail.outbox, [])
+        thread.assert_called_once()
+        self.assertTrue(thread.call_args.kwargs['daemon'])
+        thread.call_args.kwargs['target'](*thread.call_args.kwargs['args'])
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_stock_is_checked_across_the_whole_call(self):
+        first, (paper,) = self.supply_batch((self.paper, 5))
+        second, (more_paper,) = self.supply_batch((self.paper, 5))
+
+        with self.assertRaises(ValidationError) as raised:
+            apply_decisions('supply', [
+                {'item': paper.id, 'decision': 'approve'},
+                {'item': more_paper.id, 'decision': 'approve'},
+                {'item': 999999, 'decision': 'approve'},
+            ], self.admin)
+
+        self.assertEqual(raised.exception.messages, ['Item #999999 was not found.'])
+        with self.assertRaises(ValidationError) as raised:
+            apply_decisions('supply', [
+                {'item': paper.id, 'decision': 'approve'},
+                {'item': more_paper.id, 'decision': 'approve'},
+            ], self.admin)
+        self.assertEqual(raised.exception.messages,
+                         ['Cannot approve 5 units of Bond Paper. Only 3 units available.'])
+        self.assertFalse(SupplyRequestItem.objects.exclude(status='pending').exists())
+        self.assertEqual(SupplyQuantity.objects.get(supply=self.paper).reserved_quantity, 2)
+
+    def test_borrow_approvals_reserve_the_shared_property(self):
+        return_date = date.today() + timedelta(days=3)
+        batches = [BorrowRequestBatch.objects.create(user=self.user, purpose='Seminar') for _ in range(2)]
+        items = [BorrowRequestItem.objects.create(batch_request=batch, property=self.projector, quantity=2,
+                                                  return_date=return_date) for batch in batches]
+
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            '/batch-decisions/borrow/',
+            json.dumps({'decisions': [{'item': item.id, 'decision': 'approve'} for item in items]}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.json(), {
+            'success': True, 'batches': {str(batch.id): 'for_claiming' for batch in batches},
+        })
+        self.projector.refresh_from_db()
+        self.assertEqual(self.projector.reserved_quantity, 4)
+
+        response = self.client.post('/batch-decisions/borrow/', 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        first, (paper,) = self.supply_batch((self.paper, 1))
+        response = self.client.post('/batch-decisions/supply/', json.dumps({'decisions': [{
+            'item': paper.id, 'decision': 'approve', 'ppmp_allocations': [{'ppmp_item_id': 'abc', 'quantity': 1}],
+        }]}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [f"Item #{paper.id}: invalid PPMP item 'abc'."])
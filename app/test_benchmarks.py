@@ -0,0 +1,104 @@
+"""
+Tests for the load dataset generator and the benchmark runner
+(app/benchmarks.py).
+"""
+import json
+from datetime import date
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .benchmarks import compare, percentile, summarize
+from .models import BorrowRequestItem, Property, RequestIndex, Supply, SupplyRequestBatch, UserProfile
+
+
+class BaselineComparisonTests(SimpleTestCase):
+
+    def test_percentile_is_nearest_rank(self):
+        values = [5, 1, 4, 2, 3, 6, 7, 8, 9, 10]
+        self.assertEqual(percentile(values, 50), 5)
+        self.assertEqual(percentile(values, 95), 10)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_regressions(self):
+        baseline = {
+            'fast': summarize([10.0] * 10, queries=5),
+            'slow': summarize([100.0] * 10, queries=5),
+        }
+        results = {
+            'fast': summarize([14.0] * 10, queries=5),   # +40%, but under the noise floor
+            'slow': summarize([130.0] * 10, queries=6),  # +30% and one more query
+            'new': summarize([1.0], queries=1),
+        }
+        self.assertEqual(compare(results, baseline, threshold=0.25), [
+            ('slow', 'p95 100.0ms -> 130.0ms'),
+            ('slow', 'queries 5 -> 6'),
+        ])
+        self.assertEqual(compare(results, baseline, threshold=0.5), [('slow', 'queries 5 -> 6')])
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class LoadDatasetTests(TestCase):
+    # run_benchmarks counts the queries of every alias, the reporting mirror included
+    databases = '__all__'
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('generate_load_dataset', scale=1, prefix='t', stdout=StringIO())
+
+    def test_dataset_is_consistent(self):
+        self.assertEqual(User.objects.filter(username__startswith='t_user_').count(), 60)
+        statuses = set(SupplyRequestBatch.objects.values_list('status', flat=True))
+        self.assertTrue({'pending', 'approved', 'completed', 'rejected'} <= statuses)
+        self.assertEqual(RequestIndex.objects.count(), 530)
+
+        for prop in Property.objects.filter(property_name__startswith='[t]'):
+            out = BorrowRequestItem.objects.filter(
+                property=prop, status__in=['active', 'overdue'],
+            ).aggregate(total=Sum('approved_quantity'))['total'] or 0
+            self.assertEqual(prop.quantity, prop.overall_quantity - out)
+
+    def test_refuses_to_duplicate_without_flush(self):
+        with self.assertRaises(CommandError):
+            call_command('generate_load_dataset', prefix='t', stdout=StringIO())
+
+        call_command('generate_load_dataset', prefix='t', flush=True, stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='t_').count(), 61)
+
+    def test_run_benchmarks_against_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'baseline.json'
+            options = dict(prefix='t', iterations=2, only=['request_counters', 'supply_barcode_lookup'],
+                           stdout=StringIO())
+            call_command('run_benchmarks', save_baseline=str(path), **options)
+            baseline = json.loads(path.read_text())
+            self.assertEqual(set(baseline['scenarios']), {'request_counters', 'supply_barcode_lookup'})
+
+            baseline['scenarios']['request_counters']['queries'] = 0
+            path.write_text(json.dumps(baseline))
+            with self.assertRaisesMessage(CommandError, '1 regression(s)'):
+                call_command('run_benchmarks', baseline=str(path), stderr=StringIO(), **options)
+
+    def test_sweeps_run_only_against_the_load_dataset(self):
+        options = dict(prefix='t', iterations=1, only=['sweep_borrow_batches', 'sweep_expiring_supplies'],
+                       stdout=StringIO())
+        # Generated borrowers with overdue items would be texted
+        UserProfile.objects.filter(user__username__startswith='t_user_').update(phone='09170000000')
+        BorrowRequestItem.objects.update(overdue_notified=False)
+        with override_settings(SMS_API_TOKEN='token'), mock.patch('requests.post') as post:
+            call_command('run_benchmarks', **options)
+            post.assert_not_called()
+
+            supply = Supply(supply_name='Bond Paper', date_received=date.today())
+            supply.save()
+            with self.assertRaisesMessage(CommandError, 'would update them'):
+                call_command('run_benchmarks', **options)
+            call_command('run_benchmarks', allow_mutations=True, **options)
+            post.assert_not_called()
@@ -0,0 +1,41 @@
+"""
+Tests for the worker boot import profile (app/boot_profile.py).
+"""
+from django.test import SimpleTestCase
+
+from .boot_profile import lazy_module_imports, parse_importtime, profile_worker_boot
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |       PIL._version
+import time:       300 |        420 |     PIL
+import time:       200 |        620 |   barcode.writer
+import time:       500 |       1120 | barcode
+import time:        80 |         80 |   json
+import time:       900 |       2100 | app.utils
+"""
+
+
+class ImportTimeParsingTests(SimpleTestCase):
+
+    def test_parse(self):
+        entries = parse_importtime(IMPORTTIME_OUTPUT)
+        self.assertEqual(entries[0], ('PIL._version', 120, 120, 3))
+        self.assertEqual(entries[-1], ('app.utils', 900, 2100, 0))
+        self.assertEqual(len(entries), 6)
+
+    def test_lazy_imports_report_their_importers(self):
+        entries = parse_importtime(IMPORTTIME_OUTPUT)
+        self.assertEqual(lazy_module_imports(entries), {
+            'PIL': ['barcode', 'barcode.writer', 'PIL'],
+            'barcode': ['barcode'],
+        })
+        self.assertEqual(lazy_module_imports(entries, lazy_modules=('json',)), {'json': ['app.utils', 'json']})
+
+
+class WorkerBootTests(SimpleTestCase):
+
+    def test_worker_boot_does_not_import_heavy_libraries(self):
+        profile = profile_worker_boot()
+        self.assertEqual(profile['lazy_imports'], {})
+        self.assertIn('app.views.reports', {module for module, _, _, _ in profile['entries']})
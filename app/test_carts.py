@@ -0,0 +1,143 @@
+"""
+Tests for the server-side request carts (app/carts.py) and the list views
+that use them.
+"""
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .carts import BORROW, RESERVATION, SUPPLY, add_to_cart, cart_lines, get_cart, submit_cart, validate_cart
+from .models import (
+    BorrowRequestBatch, BorrowRequestItem, Notification, Property, RequestIndex, Supply, SupplyQuantity,
+    SupplyRequestBatch, SupplyRequestItem, UserProfile,
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class CartTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='member', password='pw')
+        cls.admin = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=cls.admin, role='ADMIN')
+        cls.supplies = []
+        for name in ('Bond Paper', 'Ballpen', 'Stapler'):
+            supply = Supply(supply_name=name, date_received=date.today())
+            supply.save()
+            SupplyQuantity.objects.create(supply=supply, current_quantity=50)
+            cls.supplies.append(supply)
+        cls.projector = Property(property_name='Projector', overall_quantity=5, quantity=5)
+        cls.projector.save()
+
+    def test_adding_an_item_again_merges_into_its_line(self):
+        cart = get_cart(self.user, RESERVATION)
+        add_to_cart(cart, str(self.projector.id), 1, needed_date='2030-01-02', purpose='Seminar')
+        add_to_cart(cart, self.projector.id, 2, needed_date='2030-01-03', purpose='Seminar')
+
+        with self.assertNumQueries(1):
+            [line] = cart_lines(cart)
+            self.assertEqual(line.property.property_name, 'Projector')
+        self.assertEqual((line.quantity, line.needed_date), (3, date(2030, 1, 3)))
+        with self.assertRaises(ValueError):
+            add_to_cart(cart, 'not-a-number', 1)
+
+    def test_submit_creates_batch_in_bulk_and_empties_cart(self):
+        cart = get_cart(self.user, SUPPLY)
+        for quantity, supply in enumerate(self.supplies, start=1):
+            add_to_cart(cart, supply.id, quantity)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            batch = submit_cart(cart, cart_lines(cart), 'Office use')
+
+        self.assertEqual(
+            list(SupplyRequestItem.objects.filter(batch_request=batch).values_list('supply__supply_name', 'quantity')),
+            [('Bond Paper', 1), ('Ballpen', 2), ('Stapler', 3)],
+        )
+        self.assertEqual(cart_lines(cart), [])
+        row = RequestIndex.objects.get(kind='batch_supply', source_id=batch.id)
+        self.assertEqual((row.item_count, row.total_quantity), (3, 6))
+
+    def test_borrow_list_views(self):
+        self.client.force_login(self.user)
+        return_date = (date.today() + timedelta(days=3)).isoformat()
+        for _ in range(2):
+            response = self.client.post('/userpanel/add-to-borrow-list/', {
+                'property_id': self.projector.id, 'quantity': 1, 'return_date': return_date,
+            })
+            self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(response.json()['list_count'], 1)
+        self.assertNotIn('borrow_cart', self.client.session)
+
+        response = self.client.post('/userpanel/submit-borrow-list-request/', {
+            'batch_return_date': return_date, 'general_purpose': 'Seminar',
+        })
+        self.assertEqual(response.json()['status'], 'success')
+        batch = BorrowRequestBatch.objects.with_aggregates().get(user=self.user)
+        self.assertEqual((batch.total_items, batch.total_quantity, batch.purpose), (1, 2, 'Seminar'))
+        self.assertEqual(cart_lines(get_cart(self.user, BORROW)), [])
+
+    def submit_supplies(self, count):
+        """Submit a supply cart of count lines; returns the batch and the queries of the submission."""
+        cart = get_cart(self.user, SUPPLY)
+        for supply in self.supplies[:count]:
+            add_to_cart(cart, supply.id, 2)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            lines = cart_lines(cart)
+            self.assertEqual(validate_cart(cart, lines), [])
+            batch = submit_cart(cart, lines, 'Office use')
+        return batch, queries
+
+    def test_submission_cost_does_not_grow_with_the_cart(self):
+        _, one_line = self.submit_supplies(1)
+        _, three_lines = self.submit_supplies(3)
+        self.assertEqual(len(three_lines), len(one_line))
+
+    def test_admins_are_notified_once_after_commit(self):
+        batch, _ = self.submit_supplies(3)
+        notification = Notification.objects.get(user=self.admin)
+        self.assertEqual(notification.message, f'New batch supply request #{batch.id} submitted by member')
+        self.assertIn('Bond Paper (x2), Ballpen (x2), Stapler (x2)', notification.remarks)
+
+    def test_failed_admin_notification_does_not_fail_the_submission(self):
+        with mock.patch.object(Notification.objects, 'bulk_create', side_effect=RuntimeError), \
+                self.assertLogs('app.models', 'ERROR'):
+            batch, _ = self.submit_supplies(1)
+
+        self.assertTrue(SupplyRequestBatch.objects.filter(pk=batch.pk).exists())
+        self.assertFalse(Notification.objects.filter(user=self.admin).exists())
+
+    def test_failed_submission_leaves_no_partial_batch(self):
+        cart = get_cart(self.user, BORROW)
+        add_to_cart(cart, self.projector.id, 1)
+        with mock.patch.object(BorrowRequestItem.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                submit_cart(cart, cart_lines(cart), 'Seminar', return_date=date.today())
+
+        self.assertFalse(BorrowRequestBatch.objects.exists())
+        self.assertEqual(len(cart_lines(cart)), 1)
+
+    def test_validation_reports_every_line(self):
+        cart = get_cart(self.user, SUPPLY)
+        add_to_cart(cart, self.supplies[0].id, 60)
+        add_to_cart(cart, self.supplies[1].id, 70)
+        errors = validate_cart(cart, cart_lines(cart))
+        self.assertEqual([error.split(':')[0] for error in errors], ['Bond Paper', 'Ballpen'])
+        self.assertFalse(SupplyRequestBatch.objects.exists())
+
+    def test_supply_list_view_validates_before_submitting(self):
+        self.client.force_login(self.user)
+        cart = get_cart(self.user, SUPPLY)
+        add_to_cart(cart, self.supplies[0].id, 60)
+
+        # The admin panel's view; the userpanel one of the same URL name already validated
+        response = self.client.post('/submit-list-request/', {'purpose': 'Office use'})
+        self.assertRedirects(response, reverse('create_supply_request'), fetch_redirect_response=False)
+        self.assertFalse(SupplyRequestBatch.objects.exists())
+        self.assertEqual(len(cart_lines(cart)), 1)
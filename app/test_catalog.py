@@ -0,0 +1,81 @@
+"""
+Tests for the cached catalog snapshot served to the pickers (app/catalog.py).
+"""
+import json
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .catalog import get_catalog_snapshot, get_catalog_version
+from .models import Property, PropertyCategory, Supply, SupplyQuantity
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class CatalogSnapshotTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='member')
+        supply = Supply(supply_name='Bond Paper', unit='ream', date_received=date.today())
+        supply.save()
+        SupplyQuantity.objects.create(supply=supply, current_quantity=40, reserved_quantity=15)
+        archived = Supply(supply_name='Old Toner', date_received=date.today(), is_archived=True)
+        archived.save()
+        cls.projector = Property(property_name='Projector', property_number='P-1', overall_quantity=3,
+                                 quantity=3, category=PropertyCategory.objects.create(name='Equipment'))
+        cls.projector.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_snapshot_is_compact_and_cached(self):
+        catalog = json.loads(get_catalog_snapshot()['body'])
+        self.assertEqual(catalog['supplies'], [{
+            'id': catalog['supplies'][0]['id'], 'name': 'Bond Paper', 'category': None, 'subcategory': None,
+            'unit': 'ream', 'barcode': catalog['supplies'][0]['barcode'], 'description': '',
+            'quantity': 40, 'available_quantity': 25, 'available': True,
+        }])
+        self.assertEqual(
+            [(p['name'], p['number'], p['category'], p['availability']) for p in catalog['properties']],
+            [('Projector', 'P-1', 'Equipment', 'available')],
+        )
+        with self.assertNumQueries(0):
+            get_catalog_snapshot()
+            get_catalog_version()
+
+    def test_endpoint_validates_with_etag(self):
+        self.client.force_login(self.user)
+        version = get_catalog_version()
+
+        response = self.client.get('/catalog/', {'v': version})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{version}"')
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = self.client.get('/catalog/', {'v': 'outdated'}, HTTP_IF_NONE_MATCH=f'"{version}"')
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_catalog_edits_change_the_version(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projector.property_name = 'Projector (HD)'
+            self.projector.save()
+
+        self.assertNotEqual(get_catalog_version(), version)
+        names = [p['name'] for p in json.loads(get_catalog_snapshot()['body'])['properties']]
+        self.assertEqual(names, ['Projector (HD)'])
+
+    @override_settings(CATALOG_CACHE_TIMEOUT=600, CATALOG_LOCAL_CACHE_TIMEOUT=10)
+    def test_per_process_cache_keeps_the_snapshot_briefly(self):
+        for shared, expected in ((True, 600), (False, 10)):
+            with self.subTest(shared=shared), override_settings(CACHE_IS_SHARED=shared), \
+                    mock.patch('app.catalog.cache') as mocked:
+                mocked.get.return_value = None
+                get_catalog_version()
+                # Another worker's edit does not clear this process's snapshot or version
+                self.assertEqual({call.args[2] for call in mocked.set.call_args_list}, {expected})
@@ -0,0 +1,60 @@
+"""
+Tests for the connection reuse metrics (app/db_pool.py) and the scheduler's
+connection handling.
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from . import scheduler
+from .db_pool import pool_stats, reuse_mode
+
+
+class DBPoolStatsTests(TestCase):
+
+    def test_stats_describe_the_connection(self):
+        stats = pool_stats()
+        self.assertEqual((stats['alias'], stats['vendor'], stats['mode']),
+                         ('default', connection.vendor, reuse_mode()))
+        self.assertIsNone(stats['pool'])
+        if connection.vendor == 'postgresql':
+            self.assertGreaterEqual(stats['server']['active'], 1)
+
+    def test_endpoint_is_admin_only(self):
+        self.client.force_login(User.objects.create_user(username='member'))
+        self.assertEqual(self.client.get('/ops/db-pool/').status_code, 403)
+
+        self.client.force_login(User.objects.create_superuser(username='root'))
+        response = self.client.get('/ops/db-pool/')
+        self.assertEqual(response.json()['mode'], reuse_mode())
+
+    def test_pool_counters_are_mapped(self):
+        stats = {'pool_min': 2, 'pool_max': 10, 'pool_size': 4, 'pool_available': 1,
+                 'requests_waiting': 3, 'requests_wait_ms': 250}
+        fake = mock.Mock(vendor='sqlite', settings_dict={'OPTIONS': {'pool': {'max_size': 10}}})
+        fake.pool.get_stats.return_value = stats
+        with mock.patch('app.db_pool.connections') as connections:
+            connections.__getitem__.return_value = fake
+            result = pool_stats()
+        self.assertEqual(result['mode'], 'pool')
+        self.assertEqual({key: result['pool'][key] for key in ('size', 'idle', 'active', 'waiting', 'wait_ms_total')},
+                         {'size': 4, 'idle': 1, 'active': 3, 'waiting': 3, 'wait_ms_total': 250})
+
+
+class SchedulerConnectionTests(TransactionTestCase):
+
+    def run_job(self):
+        with mock.patch.object(scheduler, 'close_old_connections') as close_old_connections, \
+                mock.patch('app.models.BorrowRequestBatch.check_near_overdue_items') as job:
+            scheduler.send_near_overdue_reminders()
+        job.assert_called_once_with()
+        return close_old_connections.call_count
+
+    def test_jobs_release_stale_connections_around_each_run(self):
+        self.assertEqual(self.run_job(), 2)
+
+    def test_jobs_leave_an_open_transaction_alone(self):
+        with transaction.atomic():
+            self.assertEqual(self.run_job(), 0)
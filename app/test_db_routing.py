@@ -0,0 +1,103 @@
+"""
+Tests for the routing of reporting reads to the read replica (app/db_routing.py).
+"""
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from . import db_routing
+from .db_routing import REPORTING_DB_ALIAS, ReportingRouter, replica_lag, using_reporting
+from .models import Supply, SupplyCategory
+
+
+class ReportingRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        db_routing._last_check.clear()
+        self.addCleanup(db_routing._last_check.clear)
+        patcher = mock.patch.object(db_routing, 'replica_configured', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_alias(self, lag):
+        with mock.patch.object(db_routing, 'replica_lag', return_value=lag):
+            with using_reporting():
+                return ReportingRouter().db_for_read(Supply)
+
+    def test_reads_go_to_the_replica_only_inside_using_reporting(self):
+        self.assertEqual(self.read_alias(0.5), REPORTING_DB_ALIAS)
+        self.assertIsNone(ReportingRouter().db_for_read(Supply))
+        with using_reporting():
+            self.assertEqual(ReportingRouter().db_for_write(Supply), 'default')
+
+    @override_settings(REPORTING_MAX_LAG_SECONDS=30)
+    def test_lagging_or_unreachable_replica_falls_back_to_the_primary(self):
+        self.assertEqual(self.read_alias(120), 'default')
+        db_routing._last_check.clear()
+        self.assertEqual(self.read_alias(None), 'default')
+
+    def test_lag_is_checked_once_per_interval(self):
+        with mock.patch.object(db_routing, 'replica_lag', return_value=0) as lag:
+            for _ in range(3):
+                with using_reporting():
+                    pass
+        self.assertEqual(lag.call_count, 1)
+
+
+class ReportingViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='root')
+
+    def test_open_transaction_reads_the_primary(self):
+        # TestCase runs each test in a transaction on the primary
+        with mock.patch.object(db_routing, 'reporting_alias', return_value=REPORTING_DB_ALIAS):
+            with using_reporting():
+                self.assertIsNone(ReportingRouter().db_for_read(Supply))
+
+    def test_open_transaction_skips_the_lag_check(self):
+        with mock.patch.object(db_routing, 'replica_configured', return_value=True), \
+                mock.patch.object(db_routing, 'replica_lag') as lag:
+            self.assertEqual(db_routing.reporting_alias(), 'default')
+        lag.assert_not_called()
+
+    def test_reporting_views_choose_the_reporting_alias(self):
+        self.client.force_login(self.admin)
+        for url in ('/dashboard/', '/supply-approved-tally/', '/get-top-requested-supplies/'):
+            with self.subTest(url=url), \
+                    mock.patch.object(db_routing, 'reporting_alias', return_value='default') as alias:
+                self.assertEqual(self.client.get(url).status_code, 200)
+                alias.assert_called_once_with()
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'pg_last_xact_replay_timestamp is PostgreSQL only')
+    def test_primary_has_no_lag(self):
+        self.assertEqual(replica_lag('default'), 0)
+
+
+@unittest.skipUnless(REPORTING_DB_ALIAS in settings.DATABASES, 'no reporting replica configured')
+class ReplicaReadTests(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        db_routing._last_check.clear()
+
+    def test_streaming_replica_reports_its_lag(self):
+        # NULL, i.e. "unknown", when the WAL receiver is not streaming or its status is hidden
+        self.assertLess(replica_lag(), settings.REPORTING_MAX_LAG_SECONDS)
+
+    def test_reports_read_committed_rows_through_the_replica(self):
+        category = SupplyCategory.objects.create(name='Paper')
+        with using_reporting():
+            categories = SupplyCategory.objects.all()
+            self.assertEqual(categories.db, REPORTING_DB_ALIAS)
+            self.assertEqual(list(categories), [category])
+            # A row read from the replica is saved to the primary
+            replica_row = categories.get()
+            replica_row.name = 'Bond Paper'
+            replica_row.save()
+        self.assertEqual(SupplyCategory.objects.get().name, 'Bond Paper')
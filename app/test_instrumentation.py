@@ -0,0 +1,84 @@
+"""
+Tests for the SQL instrumentation middleware and its N+1 detection
+(app/instrumentation.py).
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .instrumentation import (
+    QueryRecorder, clear_recorded_requests, fingerprint, recorded_requests, summarize_by_view,
+)
+from .middleware import SQLInstrumentationMiddleware
+
+
+class FingerprintTests(SimpleTestCase):
+
+    def test_literals_and_in_lists_are_collapsed(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "app_supply" WHERE "id" IN (%s, %s, %s) AND name = \'Pen\' LIMIT 21'),
+            fingerprint('SELECT *  FROM "app_supply" WHERE "id" IN (%s) AND name = \'Paper\' LIMIT 5'),
+        )
+
+    def test_different_statements_differ(self):
+        self.assertNotEqual(
+            fingerprint('SELECT * FROM "app_supply" WHERE "id" = %s'),
+            fingerprint('SELECT * FROM "app_property" WHERE "id" = %s'),
+        )
+
+
+class QueryRecorderTests(TestCase):
+
+    def test_repeated_statement_is_reported(self):
+        users = [User.objects.create_user(username=f'user{i}') for i in range(6)]
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for user in users:
+                User.objects.get(pk=user.pk)
+            User.objects.count()
+
+        self.assertEqual(recorder.count, 7)
+        duplicates = recorder.duplicates(threshold=5)
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0][1], 6)
+        self.assertEqual(recorder.duplicates(threshold=7), [])
+
+
+@override_settings(SQL_INSTRUMENTATION_ENABLED=True, SQL_DUPLICATE_QUERY_THRESHOLD=3)
+class SQLInstrumentationMiddlewareTests(TestCase):
+
+    def setUp(self):
+        clear_recorded_requests()
+        self.addCleanup(clear_recorded_requests)
+
+    def test_request_is_profiled(self):
+        for i in range(4):
+            User.objects.create_user(username=f'user{i}')
+
+        def view(request):
+            from django.http import HttpResponse
+            for user in User.objects.all():
+                User.objects.filter(pk=user.pk).exists()
+            return HttpResponse('ok')
+
+        request = RequestFactory().get('/some/page/')
+        with self.assertLogs('app.instrumentation', 'WARNING'):
+            response = SQLInstrumentationMiddleware(view)(request)
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="5 queries"', response['Server-Timing'])
+        [profile] = recorded_requests()
+        self.assertEqual(profile['path'], '/some/page/')
+        self.assertEqual(profile['queries'], 5)
+        self.assertEqual(profile['duplicates'][0][1], 4)
+
+        [summary] = summarize_by_view(recorded_requests())
+        self.assertEqual(summary['n_plus_one'], 1)
+        self.assertEqual(summary['max_queries'], 5)
+
+    @override_settings(SQL_INSTRUMENTATION_ENABLED=False)
+    def test_disabled_by_default(self):
+        from django.core.exceptions import MiddlewareNotUsed
+
+        with self.assertRaises(MiddlewareNotUsed):
+            SQLInstrumentationMiddleware(lambda request: None)
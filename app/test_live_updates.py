@@ -0,0 +1,135 @@
+"""
+Tests for the server-sent event counters and their fan-out
+(app/live_updates.py).
+"""
+import asyncio
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import auth_state, live_updates, request_counters
+from .live_updates import (
+    ADMINS, counter_delta, event_stream, format_event, hub, live_counters, user_target,
+)
+from .models import Notification, Supply, SupplyQuantity, SupplyRequestBatch
+
+
+class EventFormatTests(SimpleTestCase):
+
+    def test_format_event(self):
+        self.assertEqual(
+            format_event('counters', {'notifications': 2}, retry_ms=5000),
+            'retry: 5000\nevent: counters\ndata: {"notifications":2}\n\n',
+        )
+
+    def test_counter_delta(self):
+        previous = {'notifications': 1, 'requests': {'pending': {'all': 2}}}
+        current = {'notifications': 1, 'requests': {'pending': {'all': 3}}}
+        self.assertEqual(counter_delta(previous, current), {'requests': {'pending': {'all': 3}}})
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class LiveCountersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(username='member')
+        cls.member.groups.add(Group.objects.create(name='USER'))
+        cls.admin = User.objects.create_user(username='admin_user')
+
+    def test_user_counters(self):
+        Notification.objects.create(user=self.member, message='Approved')
+        SupplyRequestBatch.objects.create(user=self.member, status='pending')
+
+        counters = live_counters(self.member)
+        self.assertEqual(counters['notifications'], 1)
+        self.assertEqual(counters['requests']['pending']['supply'], 1)
+        self.assertNotIn('pending_requests', counters)
+
+    def test_admin_counters(self):
+        SupplyRequestBatch.objects.create(user=self.member, status='pending')
+        for days, quantity in ((5, 10), (20, 10), (20, 0)):
+            supply = Supply(supply_name=f'Reagent {days}/{quantity}', date_received=date.today(),
+                            expiration_date=date.today() + timedelta(days=days))
+            supply.save()
+            SupplyQuantity.objects.create(supply=supply, current_quantity=quantity)
+
+        counters = live_counters(self.admin)
+        self.assertEqual(counters['pending_requests'], {'supply': 1, 'borrow': 0, 'all': 1})
+        self.assertEqual(counters['near_expiry'], {'7': 1, '14': 1, '30': 2, '60': 2, '90': 2})
+        self.assertNotIn('requests', counters)
+
+    def test_stream_ignores_stale_caches_of_other_processes(self):
+        # As left in the events process by writes handled in a web worker
+        cache.set(auth_state._cache_key(self.member.pk), {**auth_state.load_auth_state(self.member.pk),
+                                                          'session_key': 'earlier-login', 'groups': []})
+        cache.set(request_counters._cache_key(self.member.pk), request_counters.compute_request_counters(self.member))
+        self.addCleanup(cache.clear)
+        SupplyRequestBatch.objects.create(user=self.member, status='pending')
+
+        # The stream closes its worker thread's connection afterwards; not this test's transaction
+        with mock.patch.object(live_updates, 'close_old_connections'):
+            counters = live_updates._current_counters(self.member, 'this-login', is_admin=False)
+        self.assertEqual(counters['requests']['pending']['supply'], 1)
+        self.assertTrue(live_updates.is_user_account(self.member))
+
+    def test_writes_publish_after_commit(self):
+        with mock.patch.object(live_updates, '_send') as send:
+            with self.captureOnCommitCallbacks(execute=True):
+                Notification.objects.create(user=self.member, message='Approved')
+                SupplyRequestBatch.objects.create(user=self.member, status='pending')
+
+        published = set().union(*(call.args[0] for call in send.call_args_list))
+        self.assertEqual(published, {user_target(self.member.pk), ADMINS})
+
+    def test_stream_is_not_served_under_wsgi(self):
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get('/events/').status_code, 204)
+
+
+@override_settings(LIVE_EVENTS_DEBOUNCE_SECONDS=0, LIVE_EVENTS_HEARTBEAT_SECONDS=0.05)
+class EventStreamTests(SimpleTestCase):
+
+    def setUp(self):
+        # No NOTIFY listener thread (and database connection) for these tests
+        patcher = mock.patch.object(hub, 'start_listener')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stream_sends_snapshot_then_changes(self):
+        user = User(pk=7, username='member')
+        snapshots = iter([
+            {'notifications': 0, 'requests': {'pending': {'all': 1}}},
+            {'notifications': 1, 'requests': {'pending': {'all': 1}}},
+        ])
+
+        async def scenario():
+            stream = event_stream(user, 'session', is_admin=False)
+            first = await stream.__anext__()
+            heartbeat = await stream.__anext__()
+            hub.dispatch(ADMINS)  # Not this user's target
+            hub.dispatch(user_target(user.pk))
+            change = await stream.__anext__()
+            subscribers = len(hub)
+            await stream.aclose()
+            return first, heartbeat, change, subscribers
+
+        with mock.patch.object(live_updates, '_current_counters', lambda user, key, is_admin: next(snapshots)):
+            first, heartbeat, change, subscribers = asyncio.run(scenario())
+
+        self.assertIn('data: {"notifications":0,"requests":{"pending":{"all":1}}}', first)
+        self.assertEqual(heartbeat, ': ping\n\n')
+        self.assertEqual(change, 'event: counters\ndata: {"notifications":1}\n\n')
+        self.assertEqual((subscribers, len(hub)), (1, 0))
+
+    def test_stream_ends_when_session_is_replaced(self):
+        async def scenario():
+            return [frame async for frame in event_stream(User(pk=7), 'old-session', is_admin=True)]
+
+        with mock.patch.object(live_updates, '_current_counters', lambda user, key, is_admin: None):
+            self.assertEqual(asyncio.run(scenario()), [])
+        self.assertEqual(len(hub), 0)
@@ -0,0 +1,70 @@
+"""
+Tests for the load harness' failure classification and stock invariant
+checks (app/load_harness.py).
+"""
+import tempfile
+from datetime import date
+
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .load_harness import LoadStats, check_invariants, classify_failure, stock_snapshot
+from .models import Property, Supply, SupplyQuantity
+
+
+class LoadStatsTests(SimpleTestCase):
+
+    def test_failures_are_classified(self):
+        self.assertEqual(classify_failure(OperationalError('deadlock detected')), 'deadlock')
+        self.assertEqual(classify_failure(OperationalError('database is locked')), 'lock_timeout')
+        self.assertEqual(classify_failure(ValueError('boom')), 'error')
+        self.assertEqual(classify_failure('Only 2 unit(s) available'), 'rejected')
+
+    def test_summary(self):
+        stats = LoadStats()
+        for ms in (10, 20, 30, 40):
+            stats.record('supply.submit', ms)
+        stats.record('supply.submit', 50, failure=OperationalError('deadlock detected'))
+        stats.record('supply.submit', 60, failure='Not enough stock')
+
+        summary = stats.summary(wall_seconds=2)
+        row = summary['operations']['supply.submit']
+        self.assertEqual((row['count'], row['failed'], row['deadlock'], row['rejected']), (6, 1, 1, 1))
+        self.assertEqual(row['p50_ms'], 30)
+        self.assertEqual(summary['throughput_per_s'], 3)
+        self.assertEqual(len(summary['failure_samples']), 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class InvariantTests(TestCase):
+
+    def setUp(self):
+        self.supply = Supply(supply_name='Bond Paper', date_received=date.today())
+        self.supply.save()
+        SupplyQuantity.objects.create(supply=self.supply, current_quantity=50)
+        self.prop = Property(property_name='Projector', overall_quantity=10)
+        self.prop.save()
+        self.since = timezone.now()
+
+    def check(self, before):
+        return check_invariants(before, stock_snapshot([self.supply.pk], [self.prop.pk]), self.since)
+
+    def test_unchanged_stock_holds(self):
+        before = stock_snapshot([self.supply.pk], [self.prop.pk])
+        self.assertEqual(self.check(before), [])
+
+    def test_lost_updates_are_reported(self):
+        before = stock_snapshot([self.supply.pk], [self.prop.pk])
+        SupplyQuantity.objects.filter(supply=self.supply).update(current_quantity=45, reserved_quantity=48)
+        Property.objects.filter(pk=self.prop.pk).update(quantity=9)
+
+        kinds = sorted((v['kind'], v['object']) for v in self.check(before))
+        self.assertEqual(kinds, [
+            ('ledger_mismatch', f'Property #{self.prop.pk}'),
+            ('ledger_mismatch', f'Property #{self.prop.pk}'),
+            ('ledger_mismatch', f'Supply #{self.supply.pk}'),
+            ('ledger_mismatch', f'Supply #{self.supply.pk}'),
+            ('negative_available', f'Supply #{self.supply.pk}'),
+            ('reserved_drift', f'Supply #{self.supply.pk}'),
+        ])
@@ -0,0 +1,127 @@
+"""
+Tests for the queued JSON logging pipeline and runtime log levels
+(app/log_pipeline.py).
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .log_pipeline import (
+    LEVEL_OVERRIDES_CACHE_KEY, QueuedLogHandler, apply_level_overrides, listener_threads, set_level_override,
+)
+from .middleware import RequestLogContextMiddleware
+
+
+class QueuedLogHandlerTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, 'app.log')
+        self.logger = logging.getLogger('app.tests.log_pipeline')
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, 'propagate', True)
+
+    def attach(self, **kwargs):
+        handler = QueuedLogHandler(filename=self.filename, **kwargs)
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+        return handler
+
+    def records(self):
+        with open(self.filename, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_records_are_written_as_json_with_request_context(self):
+        handler = self.attach()
+        request = RequestFactory().get('/', HTTP_X_REQUEST_ID='abc-123')
+        request.user = User(username='maria')
+
+        def view(request):
+            self.logger.warning('Scanned %s', 'SUP-1')
+            try:
+                1 / 0
+            except ZeroDivisionError:
+                self.logger.exception('Lookup failed')
+            return HttpResponse()
+
+        response = RequestLogContextMiddleware(view)(request)
+        self.logger.info('Outside a request')
+        handler.close()
+
+        self.assertEqual(response['X-Request-ID'], 'abc-123')
+        scanned, failed, outside = self.records()
+        self.assertEqual(scanned['message'], 'Scanned SUP-1')
+        self.assertEqual((scanned['request_id'], scanned['user']), ('abc-123', 'maria'))
+        self.assertIn('ZeroDivisionError', failed['exc'])
+        self.assertEqual((outside['request_id'], outside['user']), ('-', '-'))
+
+    def test_file_moved_away_by_logrotate_is_reopened(self):
+        handler = self.attach()
+        self.logger.warning('Before rotation')
+        handler.listener.stop()  # Drains the queue, so the record is in the file before it moves
+        handler.listener.start()
+        os.rename(self.filename, self.filename + '.1')
+        self.logger.warning('After rotation')
+        handler.close()
+
+        self.assertEqual([record['message'] for record in self.records()], ['After rotation'])
+
+    def test_unsafe_request_ids_are_replaced(self):
+        request = RequestFactory().get('/', HTTP_X_REQUEST_ID='bad id\nforged')
+        request.user = AnonymousUser()
+        response = RequestLogContextMiddleware(lambda request: HttpResponse())(request)
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = self.attach(queue_size=1)
+        handler.listener.stop()  # Nothing drains the queue now
+        handler.listener = None
+
+        done = threading.Event()
+        threading.Thread(target=lambda: ([self.logger.error('x') for _ in range(5)], done.set())).start()
+        self.assertTrue(done.wait(timeout=2))
+        self.assertEqual(handler.dropped, 4)
+
+    def test_listener_threads_are_known_until_closed(self):
+        handler = self.attach()
+        thread = handler.listener._thread
+        self.assertIn(thread, listener_threads())
+        handler.close()
+        self.assertNotIn(thread, listener_threads())
+        self.assertFalse(thread.is_alive())
+
+
+@override_settings(LOG_LEVEL_REFRESH_SECONDS=3600)
+class RuntimeLevelTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.delete(LEVEL_OVERRIDES_CACHE_KEY)
+        self.logger = logging.getLogger('app.tests.runtime_level')
+        self.logger.setLevel(logging.DEBUG)
+        self.addCleanup(self.logger.setLevel, logging.NOTSET)
+        self.addCleanup(apply_level_overrides, force=True)
+        self.addCleanup(cache.delete, LEVEL_OVERRIDES_CACHE_KEY)
+
+    def test_override_and_reset(self):
+        set_level_override('app.tests.runtime_level', 'warning')
+        self.assertEqual(self.logger.level, logging.WARNING)
+
+        set_level_override('app.tests.runtime_level', None)
+        self.assertEqual(self.logger.level, logging.DEBUG)
+
+    def test_other_processes_pick_up_cached_overrides(self):
+        cache.set(LEVEL_OVERRIDES_CACHE_KEY, {'app.tests.runtime_level': 'ERROR'})
+        apply_level_overrides(force=True)
+        self.assertEqual(self.logger.level, logging.ERROR)
+
+    def test_unknown_level(self):
+        with self.assertRaises(ValueError):
+            set_level_override('app.tests.runtime_level', 'LOUD')
@@ -0,0 +1,69 @@
+"""
+Tests for the monthly archival of the audit tables (app/log_retention.py).
+"""
+import tempfile
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .live_updates import user_target
+from .log_retention import archive_cold_months, read_archive
+from .models import ActivityLog, LogArchive, Notification
+
+
+def at(year, month, day=15):
+    return timezone.make_aware(datetime(year, month, day, 12))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), LOG_RETENTION_HOT_MONTHS=3)
+class LogRetentionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='member')
+
+    def log(self, when, description):
+        entry = ActivityLog.log_activity(self.user, 'update', 'Supply', 'Bond Paper', description)
+        ActivityLog.objects.filter(pk=entry.pk).update(timestamp=when)
+        return entry
+
+    def test_months_before_the_hot_window_are_archived(self):
+        now = at(2026, 6)
+        for when, description in ((at(2026, 1, 3), 'jan 1'), (at(2026, 1, 30), 'jan 2'),
+                                  (at(2026, 3, 31), 'mar'), (at(2026, 4, 1), 'apr'), (now, 'jun')):
+            self.log(when, description)
+        note = Notification.objects.create(user=self.user, message='Old notice')
+        Notification.objects.filter(pk=note.pk).update(timestamp=at(2025, 12))
+
+        with mock.patch('app.live_updates.publish') as publish:
+            archives = archive_cold_months(now=now)
+
+        publish.assert_called_once_with(user_target(self.user.id))
+        self.assertEqual([(a.table, a.month.isoformat(), a.row_count) for a in archives], [
+            ('activity_log', '2026-01-01', 2),
+            ('activity_log', '2026-03-01', 1),
+            ('notification', '2025-12-01', 1),
+        ])
+        self.assertEqual(list(ActivityLog.objects.order_by('timestamp').values_list('description', flat=True)),
+                         ['apr', 'jun'])
+        self.assertFalse(Notification.objects.exists())
+        rows = list(read_archive(archives[0]))
+        self.assertEqual([(row['description'], row['user_id']) for row in rows],
+                         [('jan 1', self.user.id), ('jan 2', self.user.id)])
+        self.assertEqual(archive_cold_months(now=now), [])
+
+    def test_late_rows_are_archived_as_another_file(self):
+        self.log(at(2026, 1), 'first')
+        call_command('archive_logs', '--table', 'activity_log', '--hot-months', '1', stdout=StringIO())
+        self.log(at(2026, 1), 'late')
+        call_command('archive_logs', '--table', 'activity_log', '--hot-months', '1', stdout=StringIO())
+
+        archives = LogArchive.objects.filter(table='activity_log')
+        self.assertEqual(archives.count(), 2)
+        self.assertNotEqual(archives[0].file.name, archives[1].file.name)
+        self.assertFalse(ActivityLog.objects.exists())
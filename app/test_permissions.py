@@ -0,0 +1,39 @@
+"""
+Tests for the cached admin permission resolution (app/permissions.py).
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from .models import AdminPermission, UserProfile
+from .permissions import has_admin_permission
+
+
+@override_settings(ADMIN_PERMISSION_CACHE_TIMEOUT=300, ADMIN_PERMISSION_LOCAL_CACHE_TIMEOUT=5)
+class AdminPermissionCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        permission = AdminPermission.objects.create(name='Approve supply requests', codename='approve_supply_request')
+        cls.user = User.objects.create_user(username='clerk')
+        profile, _ = UserProfile.objects.update_or_create(
+            user=cls.user, defaults={'role': 'ADMIN', 'has_limited_access': True})
+        profile.admin_permissions.add(permission)
+
+    def cached_for(self):
+        with mock.patch('app.permissions.cache') as cache:
+            cache.get.return_value = None
+            self.assertTrue(has_admin_permission(User.objects.get(pk=self.user.pk), 'approve_supply_request'))
+        key, resolved, timeout = cache.set.call_args.args
+        self.assertEqual(resolved, (False, frozenset({'approve_supply_request'})))
+        return timeout
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_shared_cache_keeps_permissions_until_invalidated(self):
+        self.assertEqual(self.cached_for(), 300)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_per_process_cache_keeps_permissions_briefly(self):
+        # Another worker's revocation does not clear this process's cache
+        self.assertEqual(self.cached_for(), 5)
@@ -0,0 +1,108 @@
+"""
+Query plan checks for the hot filters covered by the indexes in
+migration 0114_add_query_indexes.
+
+Each query below mirrors a real query shape from the app/views package,
+userpanel/views.py or the scheduler sweeps in app/models.py. The test fails
+if the database would answer it with a sequential scan of the filtered
+table, i.e. if an index was dropped or the query drifted away from it.
+"""
+import re
+import unittest
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+
+from .models import (
+    ActivityLog, BorrowRequestBatch, BorrowRequestItem, Notification, Property,
+    PropertyHistory, RequestIndex, ReservationBatch, ReservationItem, Supply, SupplyHistory,
+    SupplyQuantity, SupplyRequestBatch, SupplyRequestItem,
+)
+
+
+def hot_queries(user):
+    """(label, queryset) pairs for the query shapes the index pack is meant to serve."""
+    today = date.today()
+    month_ago = today - timedelta(days=31)
+    return [
+        # BorrowRequestBatch.check_expired_batches
+        ('borrow item expiry sweep', BorrowRequestItem.objects.filter(
+            status__in=['approved', 'active'], return_date__lt=today)),
+        # BorrowRequestBatch.check_near_overdue_items
+        ('borrow item near-overdue sweep', BorrowRequestItem.objects.filter(
+            status='active', actual_return_date__isnull=True, near_overdue_notified=False)),
+        # ReservationBatch.check_and_update_batches
+        ('reservation item expiry sweep', ReservationItem.objects.filter(
+            status__in=['pending', 'approved']).filter(Q(needed_date__lt=today) | Q(return_date__lt=today))),
+        # app/stock_monitor.py check_expiring_supplies
+        ('supply expiry sweep', Supply.objects.filter(
+            expiry_alert__in=['', 'expiring'], expiration_date__lte=today)),
+        ('supply expiring soon sweep', Supply.objects.filter(
+            expiry_alert='', expiration_date__gt=today, expiration_date__lte=today + timedelta(days=30))),
+        # SupplyListView status filter / dashboard stock counts
+        ('supplies by stock status', SupplyQuantity.objects.filter(stock_status='low_stock')),
+        # supply_approved_tally
+        ('completed supply items', SupplyRequestItem.objects.filter(status='completed')),
+        # notification dropdown / unread badge
+        ('unread notifications', Notification.objects.filter(user=user, is_read=False)),
+        ('notification list', Notification.objects.filter(user=user).order_by('-timestamp')[:10]),
+        # ActivityPageView
+        ('activity log page', ActivityLog.objects.order_by('-timestamp', '-id')[:25]),
+        ('activity log by model', ActivityLog.objects.filter(model_name='Supply').order_by('-timestamp')[:25]),
+        # admin request lists and user dashboards
+        ('pending supply batches', SupplyRequestBatch.objects.filter(status='pending').order_by('-request_date')),
+        ('pending borrow batches', BorrowRequestBatch.objects.filter(status='pending').order_by('-request_date')),
+        ('pending reservation batches', ReservationBatch.objects.filter(status='pending').order_by('-request_date')),
+        ('user supply batches', SupplyRequestBatch.objects.filter(user=user, status='pending')),
+        # UserAllRequestsView
+        ('user request index', RequestIndex.objects.filter(user=user).order_by('-request_date', '-id')[:10]),
+        ('user request index by status', RequestIndex.objects.filter(user=user, status='pending').order_by('-request_date')[:10]),
+        # SupplyListView / PropertyListView
+        ('supply list', Supply.objects.filter(is_archived=False).order_by('supply_name')[:10]),
+        ('property list', Property.objects.filter(is_archived=False).order_by('property_name')[:10]),
+        # archive_cold_months
+        ('notification month scan', Notification.objects.filter(
+            timestamp__gte=month_ago, timestamp__lt=today).order_by('pk')),
+        ('supply history month scan', SupplyHistory.objects.filter(
+            timestamp__gte=month_ago, timestamp__lt=today).order_by('pk')),
+        ('property history month scan', PropertyHistory.objects.filter(
+            timestamp__gte=month_ago, timestamp__lt=today).order_by('pk')),
+        # get_supply_history / get_property_history
+        ('supply history', SupplyHistory.objects.filter(supply_id=1).order_by('-timestamp', '-id')[:50]),
+        ('property history', PropertyHistory.objects.filter(property_id=1).order_by('-timestamp', '-id')[:50]),
+    ]
+
+
+class HotQueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner')
+
+    def seq_scan_pattern(self, table):
+        if connection.vendor == 'postgresql':
+            return re.compile(rf'Seq Scan on {table}\b')
+        # SQLite: "SCAN <table>" without "USING ... INDEX" is a full table scan
+        return re.compile(rf'SCAN {table}\b(?! USING)')
+
+    def test_hot_queries_use_indexes(self):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise unittest.SkipTest('Query plan checks support PostgreSQL and SQLite only')
+
+        if connection.vendor == 'postgresql':
+            # With empty tables the planner prefers a sequential scan even when an index exists;
+            # disabling it makes Postgres fall back to a seq scan only if no usable index exists.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+        for label, queryset in hot_queries(self.user):
+            with self.subTest(query=label):
+                plan = queryset.explain()
+                table = queryset.model._meta.db_table
+                self.assertIsNone(
+                    self.seq_scan_pattern(table).search(plan),
+                    f"{label}: sequential scan on {table}\n{plan}",
+                )
@@ -0,0 +1,53 @@
+"""
+Tests for the once-per-transaction RequestIndex projection (app/request_index.py).
+"""
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from . import request_index
+from .models import RequestIndex, Supply, SupplyRequestBatch, SupplyRequestItem
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class RequestIndexSyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='member')
+        cls.supplies = []
+        for name in ('Bond Paper', 'Ballpen', 'Stapler', 'Folder', 'Marker'):
+            supply = Supply(supply_name=name, date_received=date.today())
+            supply.save()
+            cls.supplies.append(supply)
+
+    def submit(self):
+        batch = SupplyRequestBatch.objects.create(user=self.user, purpose='Office use')
+        for supply in self.supplies:
+            SupplyRequestItem.objects.create(batch_request=batch, supply=supply, quantity=2)
+        return batch
+
+    def test_batch_is_projected_once_at_commit(self):
+        with mock.patch.object(request_index, 'sync_request_index', wraps=request_index.sync_request_index) as sync, \
+                self.captureOnCommitCallbacks(execute=True):
+            batch = self.submit()
+            self.assertFalse(RequestIndex.objects.filter(source_id=batch.id).exists())
+
+        sync.assert_called_once_with('batch_supply', batch.id)
+        row = RequestIndex.objects.get(kind='batch_supply', source_id=batch.id)
+        self.assertEqual((row.item_count, row.total_quantity), (5, 10))
+
+    def test_rolled_back_transaction_does_not_block_later_syncs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.submit()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            batch = self.submit()
+        self.assertTrue(RequestIndex.objects.filter(kind='batch_supply', source_id=batch.id).exists())
@@ -0,0 +1,82 @@
+"""
+Tests for the ETag validation of the generated slips and damage report
+images (app/views/reports.py, app/views/inventory.py).
+"""
+import io
+import tempfile
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .models import (
+    ActivityLog, DamageReport, Property, Supply, SupplyQuantity, SupplyRequestBatch, SupplyRequestItem, UserProfile,
+)
+
+
+def jpeg(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, 'JPEG')
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class SlipETagTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', first_name='Ana', last_name='Cruz')
+        cls.member = User.objects.create_user(username='member')
+        UserProfile.objects.update_or_create(user=cls.admin, defaults={'role': 'ADMIN', 'designation': 'Supply Officer'})
+        UserProfile.objects.update_or_create(user=cls.member, defaults={'role': 'USER'})
+        paper = Supply(supply_name='Bond Paper', date_received=date.today())
+        paper.save()
+        SupplyQuantity.objects.create(supply=paper, current_quantity=10)
+        cls.batch = SupplyRequestBatch.objects.create(user=cls.member, purpose='Office use')
+        cls.item = SupplyRequestItem.objects.create(batch_request=cls.batch, supply=paper, quantity=2)
+        SupplyRequestBatch.objects.filter(pk=cls.batch.pk).update(status='approved', approved_by=cls.admin)
+        cls.url = f'/batch-request/{cls.batch.pk}/requisition-slip/view/'
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def views_logged(self):
+        return ActivityLog.objects.filter(model_name='SupplyRequestBatch', action='view').count()
+
+    def test_cached_slip_is_revalidated_and_logged(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.views_logged(), 2)
+
+    def test_any_printed_field_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        for change in (
+            lambda: SupplyRequestItem.objects.filter(pk=self.item.pk).update(remarks='Short one ream'),
+            lambda: User.objects.filter(pk=self.admin.pk).update(last_name='Reyes'),
+            lambda: SupplyRequestBatch.objects.filter(pk=self.batch.pk).update(purpose='Exams'),
+            lambda: SupplyQuantity.objects.filter(supply=self.item.supply).update(current_quantity=7),
+        ):
+            change()
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+
+    def test_replaced_image_of_the_same_size_and_name_changes_the_etag(self):
+        projector = Property(property_name='Projector', overall_quantity=1, quantity=1)
+        projector.save()
+        report = DamageReport(user=self.member, item=projector, description='Cracked lens')
+        report.set_image_from_file(jpeg('red'))
+        report.save()
+        url = f'/damage-report/{report.pk}/image/'
+        etag = self.client.get(url)['ETag']
+
+        report.set_image_from_file(jpeg('blue'))
+        report.image_size = DamageReport.objects.get(pk=report.pk).image_size
+        report.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,95 @@
+"""
+Tests for the low-stock and expiry alerts (app/stock_monitor.py).
+"""
+import tempfile
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from .models import Notification, Supply, SupplyQuantity, UserProfile
+from .stock_monitor import check_expiring_supplies, stock_status_counts
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class StockMonitorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=cls.admin, role='ADMIN')
+        cls.paper = Supply(supply_name='Bond Paper', date_received=date.today())
+        cls.paper.save()
+        cls.quantity = SupplyQuantity.objects.create(supply=cls.paper, current_quantity=50, minimum_threshold=10)
+
+    def messages(self):
+        return list(Notification.objects.filter(user=self.admin).order_by('id').values_list('message', flat=True))
+
+    def set_quantity(self, current_quantity):
+        quantity = SupplyQuantity.objects.get(pk=self.quantity.pk)
+        quantity.current_quantity = current_quantity
+        quantity.save()
+        return quantity
+
+    def test_crossings_alert_once_per_band(self):
+        for current_quantity in (40, 8, 5, 0, 0, 30, 12, 9):
+            self.set_quantity(current_quantity)
+
+        self.assertEqual(self.messages(), [
+            "Supply 'Bond Paper' is running low on stock (Current: 8, Minimum: 10)",
+            "Supply 'Bond Paper' is out of stock",
+            "Supply 'Bond Paper' is running low on stock (Current: 9, Minimum: 10)",
+        ])
+        self.assertEqual(SupplyQuantity.objects.filter(stock_status='low_stock').count(), 1)
+        self.assertEqual(Supply.objects.get(pk=self.paper.pk).status, 'low_stock')
+
+    def test_stale_instance_does_not_repeat_the_alert(self):
+        first = SupplyQuantity.objects.get(pk=self.quantity.pk)
+        second = SupplyQuantity.objects.get(pk=self.quantity.pk)
+        first.current_quantity = second.current_quantity = 5
+        first.save()
+        second.save()
+        self.assertEqual(len(self.messages()), 1)
+
+    def test_expiry_alerts_catch_up_and_rearm(self):
+        today = date.today()
+        self.paper.expiration_date = today + timedelta(days=12)
+        self.paper.save()
+        old = Supply(supply_name='Toner', date_received=today, expiration_date=today - timedelta(days=3))
+        old.save()
+        later = Supply(supply_name='Ink', date_received=today, expiration_date=today + timedelta(days=90))
+        later.save()
+
+        self.assertEqual(check_expiring_supplies(today), 2)
+        self.assertEqual(check_expiring_supplies(today), 0)
+        self.assertEqual(self.messages(), [
+            f"Supply 'Toner' expired on {old.expiration_date}",
+            "Supply 'Bond Paper' will expire in 12 days",
+        ])
+
+        # A run missed on the expiration day is caught up the next day
+        self.assertEqual(check_expiring_supplies(today + timedelta(days=13)), 1)
+        self.assertIn("Supply 'Bond Paper' expired on", self.messages()[-1])
+
+        self.paper.refresh_from_db()
+        self.paper.expiration_date = today + timedelta(days=40)
+        self.paper.save()
+        self.assertEqual(check_expiring_supplies(today + timedelta(days=10)), 1)
+        self.assertEqual(self.messages()[-1], "Supply 'Bond Paper' will expire in 30 days")
+
+    def test_list_and_counts_use_the_stored_status(self):
+        for name, current_quantity in (('Ballpen', 0), ('Stapler', 4), ('Folder', 3)):
+            supply = Supply(supply_name=name, date_received=date.today())
+            supply.save()
+            SupplyQuantity.objects.create(supply=supply, current_quantity=current_quantity)
+        quantity = SupplyQuantity.objects.get(pk=self.quantity.pk)
+        quantity.reserved_quantity = 20
+        quantity.save()
+
+        self.assertEqual(SupplyQuantity.objects.get(pk=self.quantity.pk).available_stock, 30)
+        self.assertEqual(stock_status_counts(), {'available': 1, 'low_stock': 2, 'out_of_stock': 1})
+
+        self.client.force_login(User.objects.create_superuser(username='root'))
+        response = self.client.get('/supplies/', {'status': ['', 'low_stock', 'out_of_stock']})
+        self.assertEqual([supply.supply_name for supply in response.context['supplies']],
+                         ['Ballpen', 'Folder', 'Stapler'])
@@ -0,0 +1,43 @@
+"""
+Tests for the claimed supplies tally (app/supply_tally.py) and its exports.
+"""
+import io
+import tempfile
+from datetime import date
+
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase, override_settings
+from openpyxl import load_workbook
+
+from .models import Supply, SupplyRequestBatch, SupplyRequestItem, UserProfile
+from .supply_tally import claimed_items, rollup, tally_cube
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class ClaimedTallyTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='member')
+        UserProfile.objects.update_or_create(user=cls.user, defaults={'role': 'USER'})
+        cls.user.user_permissions.add(Permission.objects.get(codename='view_user_module'))
+        paper = Supply(supply_name='Bond Paper', date_received=date.today())
+        paper.save()
+        for quantity, approved_quantity in ((5, 4), (3, None)):  # None: claimed before it was recorded
+            batch = SupplyRequestBatch.objects.create(user=cls.user, purpose='Office use', status='completed')
+            SupplyRequestItem.objects.create(batch_request=batch, supply=paper, quantity=quantity,
+                                             approved_quantity=approved_quantity, status='completed')
+
+    def test_cube_keeps_both_approved_measures(self):
+        [row] = rollup(tally_cube(claimed_items()), 'supply_name',
+                       measures=('requested', 'approved', 'recorded_approved'))
+        self.assertEqual((row['requested'], row['approved'], row['recorded_approved']), (8, 7, 4))
+
+    def test_user_export_matches_the_summary_page(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/userpanel/export-claimed-supplies-tally-excel/')
+        self.assertEqual(response.status_code, 200)
+
+        sheet = load_workbook(io.BytesIO(response.content)).active
+        rows = [row for row in sheet.iter_rows(values_only=True) if row[1] == 'Bond Paper']
+        self.assertEqual([row[3:5] for row in rows], [(8, 4)])
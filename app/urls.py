@@ -72,6 +72,7 @@ from .views import (
     get_ppmp_year_options,
     approve_batch_item,
     reject_batch_item,
+    batch_item_decisions,
     claim_batch_items,
     claim_individual_item,
     get_subcategories,
@@ -112,7 +113,12 @@ from .views import (
 urlpatterns = [
     # Supply Approved Tally
     path('supply-approved-tally/', views.supply_approved_tally, name='supply_approved_tally'),
+    path('supply-approved-tally/<int:supply_id>/batches/', views.supply_approved_tally_batches, name='supply_approved_tally_batches'),
     
+    # Per-request SQL profiles (SQLInstrumentationMiddleware) and connection pool metrics
+    path('ops/slow-requests/', views.slow_requests, name='slow_requests'),
+    path('ops/db-pool/', views.db_pool_stats, name='db_pool_stats'),
+
     # Sample page for sidebar preview
     path('sample-admin/', views.sample_admin, name='sample_admin'),
     
@@ -133,6 +139,7 @@ urlpatterns = [
     path('dashboard/', DashboardPageView.as_view(), name='dashboard'),
     path('api/near-expiry-count/', views.get_near_expiry_count, name='get_near_expiry_count'),
     path('api/pending-requests-count/', views.get_pending_requests_count, name='get_pending_requests_count'),
+    path('events/', views.live_events, name='live_events'),
     path('activity/', ActivityPageView.as_view(), name='activity'),
 
     path('supplies/', SupplyListView.as_view(), name='supply_list'),
@@ -150,6 +157,7 @@ urlpatterns = [
     path('property/<int:property_id>/mark-damaged/', views.admin_mark_property_damaged, name='admin_mark_property_damaged'),
     path('property/<int:property_id>/report-lost/', views.report_lost_item, name='report_lost_item'),
     path('api/all-properties/', views.get_all_properties, name='get_all_properties'),
+    path('catalog/', views.catalog_snapshot, name='catalog_snapshot'),
     path('property/modify_quantity/', views.modify_property_quantity_generic, name='modify_property_quantity_generic'),
     path('property/modify_quantity_batch/', views.modify_property_quantity_batch, name='modify_property_quantity_batch'),
     path('add-property-category/', add_property_category, name='add_property_category'),
@@ -271,6 +279,7 @@ urlpatterns = [
     path('batch-request/<int:batch_id>/item/<int:item_id>/ppmp-years/', get_ppmp_year_options, name='get_ppmp_year_options'),
     path('batch-request/<int:batch_id>/item/<int:item_id>/approve/', approve_batch_item, name='approve_batch_item'),
     path('batch-request/<int:batch_id>/item/<int:item_id>/reject/', reject_batch_item, name='reject_batch_item'),
+    path('batch-decisions/<str:request_type>/', batch_item_decisions, name='batch_item_decisions'),
     
     # Claiming workflow URLs
     path('batch-request/<int:batch_id>/claim/', claim_batch_items, name='claim_batch_items'),
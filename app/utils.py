@@ -1,5 +1,3 @@
-import barcode
-from barcode.writer import ImageWriter
 from io import BytesIO
 import base64
 from django.core.mail import send_mail
@@ -9,9 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.core.files.base import ContentFile
 import logging
-import requests
 import os
-from openpyxl import load_workbook
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +16,10 @@ def generate_barcode(code):
     Generate a Code128 barcode and return it as a base64 encoded string.
     Deprecated: Use generate_barcode_image() for new implementations.
     """
+    # python-barcode (and Pillow, for ImageWriter) load on first use, not at startup
+    import barcode
+    from barcode.writer import ImageWriter
+
     # Create barcode instance
     code128 = barcode.get_barcode_class('code128')
     
@@ -49,6 +49,9 @@ def generate_barcode_image(code):
     Generate a Code128 barcode and return it as a ContentFile for ImageField.
     Returns a tuple: (filename, ContentFile)
     """
+    import barcode
+    from barcode.writer import ImageWriter
+
     # Create barcode instance
     code128 = barcode.get_barcode_class('code128')
     
@@ -225,6 +228,8 @@ def send_sms_alert(phone_number, message, sms_provider=0):
     Returns:
         tuple: (success: bool, response_data: dict or str)
     """
+    import requests
+
     try:
         # Get API token from environment or settings
         api_token = os.getenv('SMS_API_TOKEN') or getattr(settings, 'SMS_API_TOKEN', None)
@@ -622,6 +627,7 @@ def parse_ppmp_excel(ppmp_instance):
     Returns:
         tuple: (success: bool, message: str, items_count: int)
     """
+    from openpyxl import load_workbook
     from .models import PPMPItem
     
     try:
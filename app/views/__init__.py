@@ -0,0 +1,62 @@
+"""
+Views of the app, split by feature. Everything is re-exported here so
+`from app import views` and `from app.views import ...` keep working.
+"""
+from .admin_users import (
+    create_user, create_department, edit_department, delete_department, toggle_user_status,
+    UserProfileListView, manage_admin_permissions, initialize_admin_permissions,
+    get_user_permissions, save_user_permissions, LandingPageView, CustomLoginView, logout_view,
+    AdminPasswordChangeView, AdminPasswordChangeDoneView, AdminProfileView,
+)
+from .dashboard import (
+    mark_all_notifications_as_read, clear_all_notifications, mark_notification_as_read_ajax,
+    get_top_requested_supplies, get_department_requests_filtered, DashboardPageView,
+    get_near_expiry_count, get_pending_requests_count, live_events, ActivityPageView,
+    CheckOutPageView, ResourceAllocationDashboardView, get_latest_batch_request,
+    get_latest_supply_request, get_latest_damage_report, get_latest_reservation, slow_requests,
+    db_pool_stats, sample_admin,
+)
+from .inventory import (
+    redirect_with_tab, update_damage_status, mark_lost_item_found, mark_property_as_lost,
+    delete_lost_item, archive_lost_item, update_property_condition, DamagedItemsManagementView,
+    SupplyListView, add_supply, edit_supply, delete_supply, report_bad_stock, bad_stock_list,
+    PropertyListView, modify_supply_quantity_generic, add_property, edit_property,
+    change_property_number, delete_property, admin_mark_property_damaged, report_lost_item,
+    get_all_properties, catalog_snapshot, add_property_category, get_property_categories, get_supply_history,
+    get_supply_quantity_activity, get_property_history, add_category, add_subcategory,
+    get_subcategories, update_property_category, delete_property_category, archive_supply,
+    unarchive_supply, condemn_property, archive_property, unarchive_property,
+    delete_archived_supply, delete_archived_property, ArchivedItemsView, update_supply_category,
+    delete_supply_category, update_supply_subcategory, delete_supply_subcategory, supply_list,
+    ManagePropertyInventoryView, ManageSupplyInventoryView, damage_report_image,
+    lost_item_image, delete_damage_report_image, bulk_delete_damage_report_images,
+)
+from .barcodes import (
+    get_supply_by_barcode, get_all_supply_barcodes, modify_property_quantity_generic,
+    get_property_by_barcode, modify_property_quantity_batch, get_all_property_barcodes,
+)
+from .reports import (
+    export_unserviceable_items, export_needs_repair_items, export_lost_items,
+    export_supply_to_excel, generate_quantity_activity_report, export_property_to_pdf_ics,
+    export_inventory_count_form_cvsu, export_archived_supplies_excel,
+    export_archived_properties_excel, download_requisition_slip, view_requisition_slip,
+    download_borrowers_slip, view_borrowers_slip, generate_completed_supply_requests_pdf,
+    generate_items_tally_report_pdf, supply_approved_tally, supply_approved_tally_batches,
+)
+from .ppmp import (
+    check_ppmp_before_approval, get_ppmp_year_options, ppmp_upload, ppmp_list, ppmp_detail,
+    ppmp_delete, get_ppmp_matches, get_property_ppmp_references, release_property,
+)
+from .requests import (
+    reservation_detail, reservation_batch_detail, approve_reservation_item,
+    reject_reservation_item, approve_reservation_batch, reject_reservation_batch,
+    damage_report_detail, borrow_request_details, borrow_request_status_update, request_detail,
+    UserSupplyRequestListView, UserDamageReportListView, UserReservationListView,
+    create_supply_request, add_to_list, remove_from_list, clear_supply_list, update_list_item,
+    submit_list_request, create_borrow_request, approve_borrow_request, reject_borrow_request,
+    approve_batch_item, reject_batch_item, batch_item_decisions, batch_request_detail, claim_batch_items,
+    claim_individual_item, borrow_batch_request_detail, claim_borrow_batch_items,
+    return_borrow_batch_items, UserBorrowRequestBatchListView, approve_borrow_item,
+    reject_borrow_item, claim_individual_borrow_item, return_individual_borrow_item,
+    mark_individual_borrow_item_lost,
+)
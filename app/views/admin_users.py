@@ -0,0 +1,753 @@
+"""
+Admin views for user accounts, departments, admin permissions, login and
+the admin profile.
+"""
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import logout
+from django.contrib.auth.decorators import login_required, permission_required
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.contrib.auth.models import Group, User
+from django.contrib.auth.views import (
+    LoginView, LogoutView, PasswordChangeDoneView, PasswordChangeView,
+)
+from django.core.mail import send_mail
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.views import View
+from django.views.decorators.http import require_POST
+from django.views.generic import ListView, TemplateView
+
+from ..forms import UserRegistrationForm
+from ..models import ActivityLog, AdminPermission, Department, UserProfile, UserSession
+from ..permissions import AdminPermissionMixin, admin_permission_required, has_admin_permission
+
+
+#user create user
+@admin_permission_required('manage_users')
+def create_user(request):
+    if request.method == 'POST':
+        form = UserRegistrationForm(request.POST)
+        if form.is_valid():
+            try:
+                # Create user
+                initial_password = form.cleaned_data['password']
+                user = User.objects.create_user(
+                    username=form.cleaned_data['username'],
+                    first_name=form.cleaned_data['first_name'],
+                    last_name=form.cleaned_data['last_name'],
+                    email=form.cleaned_data['email'],
+                    password=initial_password,
+                )
+                user.is_staff = True
+                user.save()
+
+                role = form.cleaned_data['role']
+            
+                # Add user to group
+                try:
+                    group = Group.objects.get(name=role)
+                    user.groups.add(group)
+                except Group.DoesNotExist:
+                    messages.warning(request, f'Group {role} does not exist. User created without group assignment.')
+
+                # Create user profile
+                # Set must_change_password to True for USER and ADMIN roles (new users must change password on first login)
+                must_change_pwd = (role == 'USER' or role == 'ADMIN')
+                
+                profile = UserProfile.objects.create(
+                    user=user,
+                    role=role,
+                    department=form.cleaned_data['department'],
+                    phone=form.cleaned_data['phone'],
+                    must_change_password=must_change_pwd,
+                )
+
+                # Send welcome email
+                try:
+                    context = {
+                        'user': user,
+                        'user_profile': profile,
+                        'initial_password': initial_password,
+                    }
+                    html_message = render_to_string('app/email/account_created.html', context)
+                    plain_message = strip_tags(html_message)
+                    
+                    send_mail(
+                        subject='Welcome to ResourceHive - Your Account Has Been Created',
+                        message=plain_message,
+                        from_email=settings.EMAIL_HOST_USER,
+                        recipient_list=[user.email],
+                        html_message=html_message,
+                        fail_silently=False,
+                    )
+                    messages.success(request, f'Account created successfully for {user.username} and welcome email sent.')
+                except Exception as e:
+                    messages.warning(request, f'Account created successfully but failed to send welcome email.')
+
+                # Log the activity
+                ActivityLog.log_activity(
+                    user=request.user,
+                    action='create',
+                    model_name='User',
+                    object_repr=user.username,
+                    description=f"Created new user account for {user.username} with role {role}"
+                )
+
+                # Check if custom permissions configuration was requested
+                configure_permissions = request.POST.get('configure_permissions') == 'true'
+                
+                # If AJAX request (for permissions flow), return JSON
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({
+                        'success': True,
+                        'user_id': profile.id,
+                        'username': user.username,
+                        'configure_permissions': configure_permissions
+                    })
+                
+                # Store flag for opening permissions modal after redirect
+                if configure_permissions and role == 'ADMIN':
+                    request.session['open_permissions_for'] = profile.id
+                    request.session['permissions_user_created'] = user.username
+                
+                return redirect('user_profile_list')
+                
+            except Exception as e:
+                # If AJAX request, return JSON error
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({
+                        'success': False,
+                        'error': str(e)
+                    })
+                
+                messages.error(request, f'Error creating account: {str(e)}')
+                # Store form data in session to preserve it
+                request.session['form_data'] = request.POST.dict()
+                request.session['show_modal'] = True
+                return redirect('manage_users')
+        else:
+            # If AJAX request, return JSON with errors
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                form_errors_dict = {}
+                for field, errors in form.errors.items():
+                    form_errors_dict[field] = list(errors)
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Please correct the errors below.',
+                    'errors': form_errors_dict
+                })
+            
+            # Store form data and errors in session as simple dict
+            request.session['form_data'] = request.POST.dict()
+            # Convert errors to simple list of strings per field
+            form_errors_dict = {}
+            for field, errors in form.errors.items():
+                form_errors_dict[field] = list(errors)
+            request.session['form_errors'] = form_errors_dict
+            request.session['show_modal'] = True
+            return redirect('manage_users')
+    
+    return redirect('manage_users')
+
+
+def create_department(request):
+    if request.method == 'POST':
+        name = request.POST.get('name')
+        if name:
+            Department.objects.create(name=name)
+            messages.success(request, "Department added.")
+    return redirect('manage_users')
+
+
+@permission_required('app.view_admin_module')
+def edit_department(request, dept_id):
+    if request.method == 'POST':
+        department = get_object_or_404(Department, id=dept_id)
+        new_name = request.POST.get('name')
+        if new_name:
+            department.name = new_name
+            department.save()
+            return JsonResponse({"success": True})
+    return JsonResponse({"success": False})
+
+
+@permission_required('app.view_admin_module')
+def delete_department(request, dept_id):
+    if request.method == 'POST':
+        department = get_object_or_404(Department, id=dept_id)
+        # Check if there are any users in this department
+        if UserProfile.objects.filter(department=department).exists():
+            return JsonResponse({
+                "success": False,
+                "error": "Cannot delete department that has users assigned to it. Please reassign or remove users first."
+            })
+        department.delete()
+        return JsonResponse({"success": True})
+    return JsonResponse({"success": False})
+
+
+@permission_required('app.view_admin_module')
+@require_POST
+def toggle_user_status(request, user_id):
+    """Toggle user active/inactive status"""
+    try:
+        user = get_object_or_404(User, id=user_id)
+        user_profile = get_object_or_404(UserProfile, user=user)
+        
+        # Prevent admin from deactivating themselves
+        if user == request.user:
+            messages.error(request, "You cannot deactivate your own account.")
+            return redirect('manage_users')
+        
+        # Toggle the is_active status
+        user.is_active = not user.is_active
+        
+        if not user.is_active:
+            # User is being deactivated - check for auto-reactivation date
+            auto_enable_date = request.POST.get('auto_enable_date')
+            if auto_enable_date:
+                try:
+                    from datetime import datetime
+                    # Parse the datetime-local input format
+                    enable_datetime = datetime.strptime(auto_enable_date, '%Y-%m-%dT%H:%M')
+                    # Make it timezone aware
+                    from django.utils import timezone as tz
+                    enable_datetime_aware = tz.make_aware(enable_datetime)
+                    
+                    # Ensure the date is in the future
+                    if enable_datetime_aware > timezone.now():
+                        user_profile.auto_enable_at = enable_datetime_aware
+                        user_profile.save()
+                        status_text = f"deactivated (will auto-reactivate on {enable_datetime_aware.strftime('%b %d, %Y at %I:%M %p')})"
+                    else:
+                        messages.warning(request, "Auto-reactivation date must be in the future. Account deactivated without auto-reactivation.")
+                        user_profile.auto_enable_at = None
+                        user_profile.save()
+                        status_text = "deactivated"
+                except ValueError:
+                    messages.warning(request, "Invalid date format. Account deactivated without auto-reactivation.")
+                    user_profile.auto_enable_at = None
+                    user_profile.save()
+                    status_text = "deactivated"
+            else:
+                user_profile.auto_enable_at = None
+                user_profile.save()
+                status_text = "deactivated"
+        else:
+            # User is being reactivated - clear auto_enable_at
+            user_profile.auto_enable_at = None
+            user_profile.save()
+            status_text = "activated"
+        
+        user.save()
+        
+        # Log the activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='activate' if user.is_active else 'update',
+            model_name='User',
+            object_repr=user.username,
+            description=f"{status_text.capitalize()} user account for {user.username}"
+        )
+        
+        messages.success(request, f"User {user.username} has been {status_text}.")
+        return redirect('manage_users')
+        
+    except Exception as e:
+        messages.error(request, f"Error updating user status: {str(e)}")
+        return redirect('manage_users')
+
+
+class UserProfileListView(AdminPermissionMixin, PermissionRequiredMixin, ListView):
+    model = UserProfile
+    template_name = 'app/manage_users.html'
+    permission_required = 'app.view_admin_module'
+    required_permission = 'manage_users'
+    context_object_name = 'users'
+    paginate_by = 10
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related('user', 'department')
+        
+        # Get filter parameters from the URL
+        search = self.request.GET.get('search', '')
+        role = self.request.GET.get('role', '')
+        department = self.request.GET.get('department', '')
+        status = self.request.GET.get('status', '')
+        
+        if search:
+            queryset = queryset.filter(
+                Q(user__username__icontains=search) |
+                Q(user__first_name__icontains=search) |
+                Q(user__last_name__icontains=search) |
+                Q(user__email__icontains=search) |
+                Q(department__name__icontains=search)
+            )
+        
+        if role:
+            queryset = queryset.filter(role=role)
+            
+        if department:
+            queryset = queryset.filter(department__name=department)
+        
+        if status:
+            if status == 'active':
+                queryset = queryset.filter(user__is_active=True)
+            elif status == 'inactive':
+                queryset = queryset.filter(user__is_active=False)
+        
+        # Order by account creation date (newest first) to fix pagination warning
+        return queryset.order_by('-user__date_joined')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        
+        # Check if there's form data in session (from validation errors)
+        form_data = self.request.session.pop('form_data', None)
+        form_errors = self.request.session.pop('form_errors', None)
+        show_modal = self.request.session.pop('show_modal', False)
+        
+        if form_data:
+            # Recreate form with previous data
+            form = UserRegistrationForm(data=form_data)
+            if form_errors:
+                # Replace the form errors with stored errors
+                from django.forms.utils import ErrorDict
+                form._errors = ErrorDict()
+                for field, errors in form_errors.items():
+                    form._errors[field] = errors
+        else:
+            form = UserRegistrationForm()
+        
+        context['form'] = form
+        context['departments'] = Department.objects.all()
+        context['show_modal'] = show_modal
+        context['now'] = timezone.now()
+        # Add current filter values to context
+        context['search'] = self.request.GET.get('search', '')
+        context['selected_role'] = self.request.GET.get('role', '')
+        context['selected_department'] = self.request.GET.get('department', '')
+        context['selected_status'] = self.request.GET.get('status', '')
+        return context
+
+
+@login_required
+@permission_required('app.view_admin_module')
+def manage_admin_permissions(request, user_id):
+    """
+    View to manage admin permissions for a specific user
+    Allows assigning/removing granular permissions for admin users
+    """
+    # Superusers, full-access admins and limited admins with manage_users can manage permissions
+    if not has_admin_permission(request.user, 'manage_users'):
+        messages.error(request, "You don't have permission to manage user permissions.")
+        return redirect('user_profile_list')
+    
+    user_profile = get_object_or_404(UserProfile, id=user_id)
+    
+    # Ensure target user is an admin
+    if user_profile.role != 'ADMIN':
+        messages.error(request, "Permissions can only be managed for admin users.")
+        return redirect('user_profile_list')
+    
+    # Prevent modifying superuser permissions
+    if user_profile.user.is_superuser:
+        messages.error(request, "Cannot modify permissions for superuser accounts.")
+        return redirect('user_profile_list')
+    
+    if request.method == 'POST':
+        # Get the has_limited_access checkbox
+        has_limited_access = request.POST.get('has_limited_access') == 'on'
+        user_profile.has_limited_access = has_limited_access
+        
+        if has_limited_access:
+            # Get selected permissions
+            selected_permissions = request.POST.getlist('permissions')
+            # Replace existing permissions with the selected ones (unknown ids are ignored)
+            user_profile.admin_permissions.set(
+                AdminPermission.objects.filter(id__in=[perm_id for perm_id in selected_permissions if perm_id.isdigit()])
+            )
+        else:
+            # Full access - clear all specific permissions
+            user_profile.admin_permissions.clear()
+        
+        user_profile.save()
+        
+        # Log the activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='update',
+            model_name='UserProfile',
+            object_repr=user_profile.user.username,
+            description=f"Updated admin permissions for {user_profile.user.username}"
+        )
+        
+        messages.success(request, f"Permissions updated successfully for {user_profile.user.get_full_name() or user_profile.user.username}.")
+        return redirect('user_profile_list')
+    
+    # GET request - display form
+    all_permissions = AdminPermission.objects.all().order_by('name')
+    user_permission_ids = user_profile.admin_permissions.values_list('id', flat=True)
+    
+    context = {
+        'user_profile': user_profile,
+        'all_permissions': all_permissions,
+        'user_permission_ids': list(user_permission_ids),
+    }
+    
+    return render(request, 'app/manage_admin_permissions.html', context)
+
+
+@login_required
+@permission_required('app.view_admin_module')
+def initialize_admin_permissions(request):
+    """
+    Initialize default admin permissions
+    This should be run once after adding the permission system
+    """
+    if not request.user.is_superuser:
+        messages.error(request, "Only superusers can initialize permissions.")
+        return redirect('dashboard')
+    
+    AdminPermission.initialize_permissions()
+    
+    messages.success(request, "Admin permissions have been initialized successfully.")
+    return redirect('user_profile_list')
+
+
+@login_required
+@permission_required('app.view_admin_module')
+def get_user_permissions(request, user_id):
+    """
+    AJAX endpoint to get user permissions data for the modal
+    """
+    # Check if user has permission to manage permissions
+    if not has_admin_permission(request.user, 'manage_users'):
+        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+    
+    try:
+        user_profile = UserProfile.objects.get(id=user_id)
+        
+        # Ensure target user is an admin
+        if user_profile.role != 'ADMIN':
+            return JsonResponse({'success': False, 'error': 'Permissions can only be managed for admin users'})
+        
+        # Prevent modifying superuser permissions
+        if user_profile.user.is_superuser:
+            return JsonResponse({'success': False, 'error': 'Cannot modify permissions for superuser accounts'})
+        
+        all_permissions = AdminPermission.objects.all().order_by('name')
+        user_permission_ids = list(user_profile.admin_permissions.values_list('id', flat=True))
+        
+        data = {
+            'success': True,
+            'user_profile': {
+                'username': user_profile.user.username,
+                'full_name': user_profile.user.get_full_name(),
+                'role': user_profile.get_role_display(),
+                'department': user_profile.department.name if user_profile.department else None,
+                'has_limited_access': user_profile.has_limited_access,
+            },
+            'all_permissions': [
+                {
+                    'id': perm.id,
+                    'name': perm.name,
+                    'codename': perm.codename,
+                    'description': perm.description
+                }
+                for perm in all_permissions
+            ],
+            'user_permission_ids': user_permission_ids,
+        }
+        
+        return JsonResponse(data)
+    except UserProfile.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'User not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@login_required
+@permission_required('app.view_admin_module')
+@require_POST
+def save_user_permissions(request, user_id):
+    """
+    AJAX endpoint to save user permissions from the modal
+    """
+    # Check if user has permission to manage permissions
+    if not has_admin_permission(request.user, 'manage_users'):
+        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+    
+    try:
+        user_profile = UserProfile.objects.get(id=user_id)
+        
+        # Ensure target user is an admin
+        if user_profile.role != 'ADMIN':
+            return JsonResponse({'success': False, 'error': 'Permissions can only be managed for admin users'})
+        
+        # Prevent modifying superuser permissions
+        if user_profile.user.is_superuser:
+            return JsonResponse({'success': False, 'error': 'Cannot modify permissions for superuser accounts'})
+        
+        # Get the has_limited_access value
+        has_limited_access = request.POST.get('has_limited_access') == 'on'
+        user_profile.has_limited_access = has_limited_access
+        
+        if has_limited_access:
+            # Get selected permissions
+            selected_permissions = request.POST.getlist('permissions')
+            # Replace existing permissions with the selected ones (unknown ids are ignored)
+            user_profile.admin_permissions.set(
+                AdminPermission.objects.filter(id__in=[perm_id for perm_id in selected_permissions if perm_id.isdigit()])
+            )
+        else:
+            # Full access - clear all specific permissions
+            user_profile.admin_permissions.clear()
+        
+        user_profile.save()
+        
+        # Log the activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='update',
+            model_name='UserProfile',
+            object_repr=user_profile.user.username,
+            description=f"Updated admin permissions for {user_profile.user.username}"
+        )
+        
+        messages.success(request, f"Permissions updated successfully for {user_profile.user.get_full_name() or user_profile.user.username}.")
+        
+        return JsonResponse({'success': True})
+    except UserProfile.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'User not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+class LandingPageView(TemplateView):
+    """View for the landing page that provides login options for both admin and regular users."""
+    template_name = "app/landing_page.html"
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        return context
+
+
+#meow   
+class CustomLoginView(LoginView):
+    template_name = 'registration/login.html'
+    
+    def get_form_class(self):
+        """Use custom authentication form"""
+        from ..forms import CustomAuthenticationForm
+        return CustomAuthenticationForm
+    
+    def form_invalid(self, form):
+        """Override to replace default inactive message with custom one"""
+        # Check if the error is about inactive account and replace the message
+        if form.errors.get('__all__'):
+            for i, error in enumerate(form.errors['__all__']):
+                # Replace Django's default inactive account messages
+                if 'inactive' in str(error).lower() or 'disabled' in str(error).lower():
+                    form.errors['__all__'][i] = 'This account is inactive. Please contact the administrator for assistance.'
+        return super().form_invalid(form)
+    
+    def form_valid(self, form):
+        """
+        Handle successful login - enforce single session per user.
+        If user has an existing active session, invalidate it.
+        """
+        user = form.get_user()
+        
+        # Invalidate previous session if it exists
+        previous_session = UserSession.objects.filter(user=user).first()
+        if previous_session:
+            # Delete the old session from the sessions table to force logout
+            try:
+                from django.contrib.sessions.models import Session
+                Session.objects.filter(session_key=previous_session.session_key).delete()
+            except Exception as e:
+                pass
+            previous_session.delete()
+        
+        # Call parent's form_valid to create new session
+        response = super().form_valid(form)
+        
+        # Create new UserSession record after session is created
+        session_key = self.request.session.session_key
+        if session_key:
+            try:
+                UserSession.objects.update_or_create(
+                    user=user,
+                    defaults={
+                        'session_key': session_key,
+                        'ip_address': self.get_client_ip(self.request),
+                        'user_agent': self.request.META.get('HTTP_USER_AGENT', '')[:500]
+                    }
+                )
+                
+                # Log login activity
+                ActivityLog.log_activity(
+                    user=user,
+                    action='login',
+                    model_name='User',
+                    object_repr=user.username,
+                    description=f"User {user.username} logged in"
+                )
+            except Exception as e:
+                # Log any errors but don't fail the login
+                import logging
+                logger = logging.getLogger(__name__)
+                logger.error(f"Error creating UserSession: {str(e)}")
+        
+        return response
+    
+    @staticmethod
+    def get_client_ip(request):
+        """Get the client's IP address"""
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            ip = x_forwarded_for.split(',')[0]
+        else:
+            ip = request.META.get('REMOTE_ADDR')
+        return ip
+    
+    def get_success_url(self):
+        user = self.request.user
+
+        if user.groups.filter(name='ADMIN').exists():
+            return reverse('dashboard')
+        elif user.groups.filter(name='USER').exists():
+            return reverse('user_dashboard')
+        else:
+            logout(self.request)
+            messages.error(self.request, "You do not have permission to access the system. Contact the Admin.")
+            return reverse('login')
+
+
+    def dashboard(request):
+        return render(request, 'app/dashboard.html')
+
+    def user_dashboard(request):
+        return render(request, 'userpanel/user_dashboard.html')
+
+
+def logout_view(request):
+    if request.user.is_authenticated:
+        username = request.user.username
+        
+        # Delete UserSession record on logout
+        try:
+            UserSession.objects.filter(user=request.user).delete()
+        except:
+            pass
+        
+        ActivityLog.log_activity(
+            user=request.user,
+            action='logout',
+            model_name='User',
+            object_repr=username,
+            description=f"User {username} logged out"
+        )
+    
+    # Clear any pending messages before logout to prevent them from showing on login page
+    storage = messages.get_messages(request)
+    storage.used = True
+    
+    return LogoutView.as_view()(request)
+
+
+class AdminPasswordChangeView(LoginRequiredMixin, PasswordChangeView):
+    template_name = 'app/password_change.html'
+    success_url = reverse_lazy('password_change_done')
+
+    def get_template_names(self):
+        return [self.template_name]
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        
+        # Clear the must_change_password flag after successful password change
+        try:
+            profile = UserProfile.objects.get(user=self.request.user)
+            if profile.must_change_password:
+                profile.must_change_password = False
+                profile.save()
+        except UserProfile.DoesNotExist:
+            pass
+        
+        return response
+
+
+class AdminPasswordChangeDoneView(LoginRequiredMixin, PasswordChangeDoneView):
+    template_name = 'app/password_change_done.html'
+
+    def get_template_names(self):
+        return [self.template_name]
+    
+    def get(self, request, *args, **kwargs):
+        # Add success message on the done page
+        messages.success(request, 'Your password was successfully updated!')
+        # Display success message on the done page, then redirect
+        return render(request, self.get_template_names()[0])
+
+
+class AdminProfileView(PermissionRequiredMixin, View):
+    permission_required = 'auth.view_user'
+    template_name = 'app/admin_profile.html'
+    
+    def get(self, request):
+        from ..forms import AdminProfileUpdateForm
+        form = AdminProfileUpdateForm(user=request.user)
+        
+        # Get user profile or create one if it doesn't exist
+        user_profile, created = UserProfile.objects.get_or_create(user=request.user)
+        
+        return render(request, self.template_name, {
+            'form': form,
+            'user_profile': user_profile
+        })
+    
+    def post(self, request):
+        from ..forms import AdminProfileUpdateForm
+        form = AdminProfileUpdateForm(user=request.user, data=request.POST)
+        
+        # Get user profile or create one if it doesn't exist
+        user_profile, created = UserProfile.objects.get_or_create(user=request.user)
+        
+        if form.is_valid():
+            # Update user fields
+            request.user.username = form.cleaned_data['username']
+            request.user.first_name = form.cleaned_data['first_name']
+            request.user.last_name = form.cleaned_data['last_name']
+            request.user.email = form.cleaned_data['email']
+            
+            # Update phone and designation in user profile
+            user_profile.phone = form.cleaned_data['phone']
+            user_profile.designation = form.cleaned_data['designation']
+            user_profile.save()
+            
+            request.user.save()
+            
+            # Log profile update activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='update',
+                model_name='UserProfile',
+                object_repr=f"{request.user.get_full_name() or request.user.username}",
+                description="Admin updated their profile information"
+            )
+            
+            messages.success(request, 'Profile updated successfully!')
+            return redirect('admin_profile')
+        
+        return render(request, self.template_name, {
+            'form': form,
+            'user_profile': user_profile
+        })
@@ -0,0 +1,383 @@
+"""
+Barcode scanner endpoints: look up supplies and properties by barcode and
+adjust their quantities.
+"""
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, permission_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_POST
+
+from ..models import ActivityLog, Property, PropertyHistory, Supply
+
+
+@login_required
+def get_supply_by_barcode(request, barcode):
+    import logging
+    import re
+    logger = logging.getLogger(__name__)
+
+    # Preserve original for logging, then normalize scanned barcode
+    original_barcode = barcode
+    # Replace non-breaking spaces and collapse whitespace, then strip
+    barcode = (barcode or '').replace('\u00A0', ' ')
+    barcode = re.sub(r"\s+", ' ', barcode).strip()
+
+    logger.debug(f"Barcode lookup - Original: {repr(original_barcode)} | Normalized: {repr(barcode)} | Length: {len(barcode)}")
+    logger.debug(f"Barcode bytes: {original_barcode.encode('utf-8')}")
+
+    supply = None
+
+    # 1) Try exact (case-sensitive) then case-insensitive exact
+    try:
+        supply = Supply.objects.get(barcode=barcode)
+        logger.debug(f"Found supply by exact barcode match: {supply.id}, archived: {supply.is_archived}")
+    except Supply.DoesNotExist:
+        try:
+            supply = Supply.objects.get(barcode__iexact=barcode)
+            logger.debug(f"Found supply by case-insensitive barcode match: {supply.id}, archived: {supply.is_archived}")
+        except Supply.DoesNotExist:
+            logger.debug(f"No direct barcode match for '{barcode}', attempting ID and fuzzy searches")
+
+    # 2) If still not found, try extracting numeric ID from SUP-{id}
+    if not supply and barcode.upper().startswith('SUP-'):
+        try:
+            supply_id = int(barcode.split('-')[1])
+            logger.debug(f"Attempting lookup by extracted ID: {supply_id}")
+            supply = Supply.objects.get(id=supply_id)
+            logger.debug(f"Found supply by ID: {supply.id}, archived: {supply.is_archived}")
+        except (IndexError, ValueError, Supply.DoesNotExist) as e:
+            logger.debug(f"Lookup by extracted ID failed: {e}")
+
+    # 3) Fallback: scan for exact barcode match (case-insensitive, trimmed) or barcode image filename
+    # REMOVED partial "contains" matching to avoid matching wrong items on partial scans
+    if not supply and len(barcode) >= 5:  # Only run fallback if barcode is reasonable length
+        logger.debug("Running fallback search for exact/filename matches")
+        candidates = Supply.objects.filter(is_archived=False)[:500]  # Only non-archived
+        scanned_lower = barcode.lower()
+        for cand in candidates:
+            try:
+                # Exact match (case-insensitive, trimmed)
+                cand_barcode = (cand.barcode or '').strip().lower()
+                if cand_barcode and cand_barcode == scanned_lower:
+                    supply = cand
+                    logger.debug(f"Matched by exact candidate barcode: {supply.id}")
+                    break
+
+                # If barcode image present, compare filename (SUP-26.png etc.)
+                if cand.barcode_image:
+                    img_name = cand.barcode_image.name.split('/')[-1].split('\\')[-1].split('.')[0]
+                    if img_name and img_name.strip().lower() == scanned_lower:
+                        supply = cand
+                        logger.debug(f"Matched by barcode image filename: {supply.id}")
+                        break
+            except Exception:
+                continue
+
+    # If still not found, return not found with log samples
+    if not supply:
+        logger.error(f"Supply not found for barcode after all attempts: {repr(barcode)}")
+        try:
+            sample = list(Supply.objects.filter(barcode__icontains='SUP').values_list('id', 'barcode')[:10])
+            logger.info(f"Sample supplies: {sample}")
+        except Exception:
+            logger.exception('Error fetching sample supplies')
+        return JsonResponse({
+            'success': False,
+            'error': f'Supply not found for barcode: {barcode}'
+        })
+
+    # Check if supply is archived
+    if supply.is_archived:
+        logger.info(f"Supply {supply.id} is archived; rejecting barcode use")
+        return JsonResponse({
+            'success': False,
+            'error': f'Supply "{supply.supply_name}" is archived and cannot be used'
+        })
+    
+    return JsonResponse({
+        'success': True,
+        'supply': {
+            'id': supply.id,
+            'name': supply.supply_name,
+            'current_quantity': supply.quantity_info.current_quantity if hasattr(supply, 'quantity_info') else 0,
+            'description': supply.description or ''
+        }
+    })
+
+
+@login_required
+def get_all_supply_barcodes(request):
+    """
+    Returns all supply barcodes as JSON for the barcode selection modal
+    """
+    try:
+        # Get all non-archived supplies
+        supplies = Supply.objects.filter(is_archived=False).order_by('supply_name')
+        
+        barcodes_data = []
+        for supply in supplies:
+            # Get barcode URL - prefer barcode_image if available
+            barcode_url = supply.barcode_image.url if supply.barcode_image else supply.barcode
+            
+            # Get category name
+            category_name = supply.category.name if supply.category else 'N/A'
+            
+            barcodes_data.append({
+                'id': supply.id,
+                'supply_name': supply.supply_name,
+                'category': category_name,
+                'barcode': barcode_url
+            })
+        
+        return JsonResponse({
+            'success': True,
+            'count': len(barcodes_data),
+            'barcodes': barcodes_data
+        })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
+@permission_required('app.view_admin_module')
+@require_POST
+def modify_property_quantity_generic(request):
+    try:
+        property_id = request.POST.get("property_id")
+        amount = int(request.POST.get("amount", 0))
+        reason = request.POST.get("reason", "").strip()  # Get optional reason for deduction
+
+        prop = get_object_or_404(Property, pk=property_id)
+        old_quantity = prop.quantity
+
+        # Always add the quantity since we removed the action type selection
+        prop.quantity += amount
+        prop.overall_quantity += amount
+        
+        # Set flag to skip automatic quantity synchronization in save()
+        prop._skip_quantity_sync = True
+        prop.save()
+
+        # Build remarks with reason if provided
+        if amount < 0:
+            # Deduction - include reason if provided
+            if reason:
+                remarks = f"Deducted {abs(amount)} units. Reason: {reason}. Modified by: {request.user.get_full_name() or request.user.username}"
+            else:
+                remarks = f"Deducted {abs(amount)} units. Modified by: {request.user.get_full_name() or request.user.username}"
+        else:
+            # Addition
+            if reason:
+                remarks = f"Added {amount} units. Reason: {reason}. Modified by: {request.user.get_full_name() or request.user.username}"
+            else:
+                remarks = f"Added {amount} units. Modified by: {request.user.get_full_name() or request.user.username}"
+
+        PropertyHistory.objects.create(
+            property=prop,
+            user=request.user,
+            action='quantity_update',
+            field_name='quantity',
+            old_value=str(old_quantity),
+            new_value=str(prop.quantity),
+            remarks=remarks
+        )
+
+        # Add activity log
+        ActivityLog.log_activity(
+            user=request.user,
+            action='quantity_update',
+            model_name='Property',
+            object_repr=str(prop),
+            description=f"{'Added' if amount > 0 else 'Deducted'} {abs(amount)} units to property '{prop.property_name}'. Changed quantity from {old_quantity} to {prop.quantity}" + (f". Reason: {reason}" if reason else "")
+        )
+
+        messages.success(request, f"Quantity successfully {'added' if amount > 0 else 'deducted'}.")
+        
+        # Return JSON response for AJAX request
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': True,
+                'message': 'Quantity updated successfully',
+                'new_quantity': prop.quantity
+            })
+        return redirect('property_list')
+        
+    except Exception as e:
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            })
+        messages.error(request, f"Error modifying quantity: {str(e)}")
+        return redirect('property_list')
+
+
+@login_required
+def get_property_by_barcode(request, barcode):
+    # Strip whitespace from scanned barcode (handles padded barcodes)
+    barcode = barcode.strip()
+    
+    # Check if request is AJAX/JSON
+    if not request.headers.get('Content-Type') == 'application/json' and not request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        # For non-AJAX requests, handle authentication differently
+        if not request.user.is_authenticated:
+            return JsonResponse({
+                'success': False,
+                'error': 'Authentication required'
+            }, status=401)
+    
+    try:
+        # Try to find the property by the exact barcode first
+        property = Property.objects.get(barcode=barcode)
+    except Property.DoesNotExist:
+        try:
+            # If not found, try to find by property number
+            property = Property.objects.get(property_number=barcode)
+        except Property.DoesNotExist:
+            try:
+                # If still not found, try to find by ID (extract ID from PROP-{id} format)
+                if barcode.startswith('PROP-'):
+                    property_id = barcode.split('-')[1]
+                    property = Property.objects.get(id=property_id)
+                else:
+                    raise Property.DoesNotExist
+            except (Property.DoesNotExist, IndexError, ValueError):
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Property not found'
+                })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Database error: {str(e)}'
+        })
+    
+    return JsonResponse({
+        'success': True,
+        'property': {
+            'id': property.id,
+            'property_name': property.property_name,
+            'property_number': property.property_number,
+            'quantity': property.quantity
+        }
+    })
+
+
+@login_required
+def modify_property_quantity_batch(request):
+    """
+    Handle batch property quantity modifications from barcode scanning
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+    
+    try:
+        import json
+        data = json.loads(request.body)
+        items = data.get('items', [])
+        
+        if not items:
+            return JsonResponse({'success': False, 'error': 'No items provided'})
+        
+        updated_count = 0
+        errors = []
+        
+        for item_data in items:
+            try:
+                property_id = item_data.get('property_id')
+                quantity_to_add = int(item_data.get('quantity_to_add', 0))
+                
+                if quantity_to_add <= 0:
+                    continue
+                    
+                prop = get_object_or_404(Property, pk=property_id)
+                old_quantity = prop.quantity
+                
+                # Add the quantity
+                prop.quantity += quantity_to_add
+                prop.overall_quantity += quantity_to_add
+                
+                # Set flag to skip automatic quantity synchronization in save()
+                prop._skip_quantity_sync = True
+                prop.save()
+                
+                # Create history record
+                PropertyHistory.objects.create(
+                    property=prop,
+                    user=request.user,
+                    action='quantity_update',
+                    field_name='quantity',
+                    old_value=str(old_quantity),
+                    new_value=str(prop.quantity),
+                    remarks=f"Batch added {quantity_to_add} units. Modified by: {request.user.get_full_name() or request.user.username}"
+                )
+                
+                # Add activity log
+                ActivityLog.log_activity(
+                    user=request.user,
+                    action='quantity_update',
+                    model_name='Property',
+                    object_repr=str(prop),
+                    description=f"Batch added {quantity_to_add} units to property '{prop.property_name}'. Changed quantity from {old_quantity} to {prop.quantity}"
+                )
+                
+                updated_count += 1
+                
+            except Exception as e:
+                errors.append(f"Error updating property {property_id}: {str(e)}")
+                continue
+        
+        if updated_count > 0:
+            return JsonResponse({
+                'success': True,
+                'updated_count': updated_count,
+                'message': f'Successfully updated {updated_count} properties',
+                'errors': errors if errors else None
+            })
+        else:
+            return JsonResponse({
+                'success': False,
+                'error': 'No properties were updated',
+                'errors': errors
+            })
+            
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON data'}, status=400)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@login_required
+def get_all_property_barcodes(request):
+    """
+    Returns all property barcodes as JSON for the barcode selection modal
+    """
+    try:
+        # Get all non-archived properties
+        properties = Property.objects.filter(is_archived=False).order_by('property_name')
+        
+        barcodes_data = []
+        for prop in properties:
+            # Get barcode URL - prefer barcode_image if available
+            barcode_url = prop.barcode_image.url if prop.barcode_image else prop.barcode
+            
+            barcodes_data.append({
+                'id': prop.id,
+                'property_name': prop.property_name,
+                'property_number': prop.property_number or 'Not assigned',
+                'barcode': barcode_url
+            })
+        
+        return JsonResponse({
+            'success': True,
+            'count': len(barcodes_data),
+            'barcodes': barcodes_data
+        })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
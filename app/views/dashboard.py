@@ -0,0 +1,1130 @@
+"""
+Admin dashboard, activity log, resource allocation dashboard, notification
+actions and dashboard counter endpoints.
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, permission_required
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.contrib.auth.models import User
+from django.db import models
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
+from django.utils.timezone import now
+from django.views.decorators.http import require_http_methods, require_POST
+from django.views.generic import ListView, TemplateView
+
+from ..activity_filters import get_activity_filter_options
+from ..db_routing import ReportingViewMixin, using_reporting
+from ..live_updates import (
+    event_stream, is_user_account, near_expiry_counts, pending_requests_counts, publish,
+    user_target,
+)
+from ..models import (
+    ActivityLog, BorrowRequest, BorrowRequestBatch, DamageReport, Department, Notification,
+    Property, PropertyCategory, Reservation, Supply, SupplyRequest, SupplyRequestBatch,
+    SupplyRequestItem, UserProfile,
+)
+from ..pagination import keyset_paginate
+from ..stock_monitor import IN_STOCK, stock_status_counts
+
+logger = logging.getLogger(__name__)
+
+
+@login_required
+@require_POST
+def mark_all_notifications_as_read(request):
+    try:
+        data = json.loads(request.body)
+        ids = data.get('notification_ids', [])
+        Notification.objects.filter(id__in=ids, user=request.user, is_read=False).update(is_read=True)
+        publish(user_target(request.user.pk))
+        return JsonResponse({'success': True})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@login_required
+@require_POST
+def clear_all_notifications(request):
+    try:
+        Notification.objects.filter(user=request.user).delete()
+        publish(user_target(request.user.pk))
+        return JsonResponse({'success': True})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@login_required
+@require_POST
+def mark_notification_as_read_ajax(request):
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            notification_id = data.get('notification_id')
+        except json.JSONDecodeError:
+            notification_id = request.POST.get('notification_id')
+        
+        if not notification_id:
+            return JsonResponse({'error': 'No notification ID provided'}, status=400)
+
+        notification = get_object_or_404(Notification, id=notification_id, user=request.user)
+        notification.is_read = True
+        notification.save()
+        return JsonResponse({'success': True})
+    return JsonResponse({'error': 'Invalid request method'}, status=400)
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@using_reporting()
+def get_top_requested_supplies(request):
+    """
+    API endpoint to get top 10 most requested supplies with optional date and department filtering
+    """
+    try:
+        # Get filter parameters from request
+        days = request.GET.get('days')  # 30, 90, etc.
+        date_from = request.GET.get('date_from')
+        date_to = request.GET.get('date_to')
+        department_id = request.GET.get('department')  # department filter
+        
+        # Build filter
+        filter_kwargs = {}
+        if days:
+            try:
+                days = int(days)
+                cutoff_date = timezone.now() - timedelta(days=days)
+                filter_kwargs['request_date__gte'] = cutoff_date
+            except ValueError:
+                pass
+        elif date_from and date_to:
+            try:
+                from datetime import datetime
+                start_dt = datetime.strptime(date_from, '%Y-%m-%d')
+                end_dt = datetime.strptime(date_to, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+                filter_kwargs['request_date__range'] = [start_dt, end_dt]
+            except ValueError:
+                pass
+        
+        # Add department filter if specified
+        if department_id:
+            filter_kwargs['user__userprofile__department_id'] = department_id
+        
+        # Get supply requests from both legacy and batch systems
+        legacy_requests = SupplyRequest.objects.filter(**filter_kwargs).values('supply_id', 'supply__supply_name').annotate(
+            total_quantity=models.Sum('quantity'),
+            request_count=models.Count('id')
+        ).order_by('-total_quantity')[:10]
+        
+        # Build batch items filter
+        batch_filter = {
+            'batch_request__status__in': ['approved', 'completed', 'for_claiming'],
+            'batch_request__request_date__gte': filter_kwargs.get('request_date__gte', timezone.now() - timedelta(days=999))
+        }
+        
+        # Add date range if specified
+        if 'request_date__range' in filter_kwargs:
+            batch_filter['batch_request__request_date__range'] = filter_kwargs['request_date__range']
+        
+        # Add department filter if specified
+        if department_id:
+            batch_filter['batch_request__user__userprofile__department_id'] = department_id
+        
+        batch_items = SupplyRequestItem.objects.filter(**batch_filter).values('supply_id', 'supply__supply_name').annotate(
+            total_quantity=models.Sum('quantity'),
+            request_count=models.Count('id')
+        ).order_by('-total_quantity')[:10]
+        
+        # Combine and deduplicate
+        combined_data = {}
+        for item in legacy_requests:
+            combined_data[item['supply_id']] = {
+                'supply_id': item['supply_id'],
+                'supply_name': item['supply__supply_name'],
+                'total_quantity': item['total_quantity'],
+                'request_count': item['request_count']
+            }
+        
+        for item in batch_items:
+            if item['supply_id'] in combined_data:
+                combined_data[item['supply_id']]['total_quantity'] += item['total_quantity']
+                combined_data[item['supply_id']]['request_count'] += item['request_count']
+            else:
+                combined_data[item['supply_id']] = {
+                    'supply_id': item['supply_id'],
+                    'supply_name': item['supply__supply_name'],
+                    'total_quantity': item['total_quantity'],
+                    'request_count': item['request_count']
+                }
+        
+        # Sort and get top 10
+        sorted_data = sorted(combined_data.values(), key=lambda x: x['total_quantity'], reverse=True)[:10]
+        
+        return JsonResponse({
+            'success': True,
+            'data': sorted_data
+        })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@using_reporting()
+def get_department_requests_filtered(request):
+    """
+    API endpoint to get department requests with optional date filtering
+    """
+    try:
+        # Get filter parameters from request
+        days = request.GET.get('days')  # 30, 90, etc.
+        date_from = request.GET.get('date_from')
+        date_to = request.GET.get('date_to')
+        
+        # Build filter
+        filter_kwargs = {}
+        if days:
+            try:
+                days = int(days)
+                cutoff_date = timezone.now() - timedelta(days=days)
+                filter_kwargs['request_date__gte'] = cutoff_date
+            except ValueError:
+                pass
+        elif date_from and date_to:
+            try:
+                from datetime import datetime
+                start_dt = datetime.strptime(date_from, '%Y-%m-%d')
+                end_dt = datetime.strptime(date_to, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+                filter_kwargs['request_date__range'] = [start_dt, end_dt]
+            except ValueError:
+                pass
+        
+        # Get requests by department
+        departments = Department.objects.all()
+        department_request_data = []
+        
+        for department in departments:
+            # Count supply requests
+            legacy_supply_count = SupplyRequest.objects.filter(
+                user__userprofile__department=department,
+                **filter_kwargs
+            ).count()
+            batch_supply_count = SupplyRequestBatch.objects.filter(
+                user__userprofile__department=department,
+                **filter_kwargs
+            ).count()
+            total_supply_requests = legacy_supply_count + batch_supply_count
+            
+            # Count borrow requests
+            borrow_count = BorrowRequest.objects.filter(
+                user__userprofile__department=department,
+                **({} if not filter_kwargs else {'borrow_date__gte': filter_kwargs.get('request_date__gte', timezone.now() - timedelta(days=999))})
+            ).count()
+            
+            # Count reservations
+            reservation_count = Reservation.objects.filter(
+                user__userprofile__department=department,
+                **({} if not filter_kwargs else {'reservation_date__gte': filter_kwargs.get('request_date__gte', timezone.now() - timedelta(days=999))})
+            ).count()
+            
+            total_requests = total_supply_requests + borrow_count + reservation_count
+            
+            if total_requests > 0:
+                department_request_data.append({
+                    'department': department.name,
+                    'total_requests': total_requests,
+                    'supply_requests': total_supply_requests,
+                    'borrow_requests': borrow_count,
+                    'reservations': reservation_count
+                })
+        
+        # Sort by total requests
+        department_request_data.sort(key=lambda x: x['total_requests'], reverse=True)
+        
+        return JsonResponse({
+            'success': True,
+            'data': department_request_data
+        })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
+class DashboardPageView(PermissionRequiredMixin, ReportingViewMixin, TemplateView):
+    template_name = 'app/dashboard.html'
+    permission_required = 'app.view_admin_module'  
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        
+
+        # Notifications
+        user_notifications = Notification.objects.filter(user=self.request.user).order_by('-timestamp')
+        unread_notifications = user_notifications.filter(is_read=False)
+
+        # Calculate date ranges for percentage changes
+        today = timezone.now().date()
+        first_day_this_month = today.replace(day=1)
+        last_day_last_month = first_day_this_month - timedelta(days=1)
+        first_day_last_month = last_day_last_month.replace(day=1)
+
+        #expiry count
+        seven_days_later = today + timedelta(days=30) #30 days before the expiry date para ma trigger
+        near_expiry_count = Supply.objects.filter(
+            expiration_date__range=(today, seven_days_later),
+            quantity_info__stock_status__in=IN_STOCK
+        ).count()
+        context['near_expiry_count'] = near_expiry_count
+        
+        # Calculate near expiry count for last month
+        near_expiry_count_last_month = Supply.objects.filter(
+            expiration_date__range=(first_day_last_month, last_day_last_month),
+            quantity_info__stock_status__in=IN_STOCK
+        ).count()
+
+        # Supply Status Counts
+        stock_counts = stock_status_counts()
+        supply_status_counts = [stock_counts['available'], stock_counts['low_stock'], stock_counts['out_of_stock']]
+
+        # Property Condition Counts
+        property_condition_choices = [
+            'In good condition',
+            'Needing repair',
+            'Unserviceable',
+            'Obsolete',
+            'No longer needed',
+            'Not used since purchased',
+        ]
+        property_condition_counts = [
+            Property.objects.filter(condition=condition).count()
+            for condition in property_condition_choices
+        ]
+
+        # Request Status Counts (SupplyRequest + SupplyRequestBatch)
+        request_status_choices = ['pending', 'approved', 'rejected', 'partially_approved', 'for_claiming']
+        request_status_counts = []
+        for status in request_status_choices:
+            legacy_count = SupplyRequest.objects.filter(status__iexact=status).count()
+            batch_count = SupplyRequestBatch.objects.filter(status__iexact=status).count()
+            request_status_counts.append(legacy_count + batch_count)
+
+        # Damage Report Status Counts
+        damage_status_choices = ['pending', 'reviewed', 'resolved']
+        damage_status_counts = [
+            DamageReport.objects.filter(status__iexact=status).count()
+            for status in damage_status_choices
+        ]
+
+        # Borrow Request Trends (last 6 months)
+        now_date = now().date()
+        borrow_trends_data = []
+
+        for i in reversed(range(6)):
+            start_date = now_date.replace(day=1) - timedelta(days=30*i)
+            if i == 0:
+                end_date = now_date
+            else:
+                end_date = now_date.replace(day=1) - timedelta(days=30*(i-1))
+
+            # Count old borrow requests
+            old_count = BorrowRequest.objects.filter(
+                borrow_date__date__gte=start_date,
+                borrow_date__date__lt=end_date
+            ).count()
+            
+            # Count new batch borrow requests
+            batch_count = BorrowRequestBatch.objects.filter(
+                request_date__date__gte=start_date,
+                request_date__date__lt=end_date
+            ).count()
+            
+            # Total count combines both systems
+            count = old_count + batch_count
+
+            month_str = start_date.strftime('%b %Y')
+
+            borrow_trends_data.append({
+                'month': month_str,
+                'count': count
+            })
+
+        # Property Categories Counts
+        try:
+            # Get all categories from PropertyCategory model
+            categories = PropertyCategory.objects.all()
+            property_categories_data = []
+            for category in categories:
+                count = Property.objects.filter(category=category).count()
+                if count > 0:
+                    property_categories_data.append({
+                        'category': category.name,
+                        'count': count
+                    })
+        except Exception as e:
+            logger.error(f"Error getting property categories data: {str(e)}")
+            property_categories_data = []
+
+        # User Activity by Role
+        try:
+            user_roles = [choice[0] for choice in UserProfile.ROLE_CHOICES]
+            user_activity_data = []
+            for role in user_roles:
+                try:
+                    count = ActivityLog.objects.filter(
+                        user__userprofile__role=role
+                    ).count()
+                except:
+                    count = UserProfile.objects.filter(role=role).count()
+
+                if count > 0:
+                    user_activity_data.append({
+                        'role': role.replace('_', ' ').title(),
+                        'count': count
+                    })
+        except (AttributeError, NameError):
+            user_activity_data = []
+
+        # Department Request Analysis
+        try:
+            # Get requests by department for both SupplyRequest and BorrowRequest
+            departments = Department.objects.all()
+            department_request_data = []
+            
+            for department in departments:
+                # Count supply requests from users in this department (legacy system)
+                legacy_supply_request_count = SupplyRequest.objects.filter(
+                    user__userprofile__department=department
+                ).count()
+                
+                # Count batch supply requests from users in this department (new system)
+                batch_supply_request_count = SupplyRequestBatch.objects.filter(
+                    user__userprofile__department=department
+                ).count()
+                
+                # Total supply requests (legacy + batch)
+                total_supply_requests = legacy_supply_request_count + batch_supply_request_count
+                
+                # Count borrow requests from users in this department
+                borrow_request_count = BorrowRequest.objects.filter(
+                    user__userprofile__department=department
+                ).count()
+                
+                # Count reservations from users in this department
+                reservation_count = Reservation.objects.filter(
+                    user__userprofile__department=department
+                ).count()
+                
+                # Total requests from this department
+                total_requests = total_supply_requests + borrow_request_count + reservation_count
+                
+                if total_requests > 0:
+                    department_request_data.append({
+                        'department': department.name,
+                        'total_requests': total_requests,
+                        'supply_requests': total_supply_requests,
+                        'borrow_requests': borrow_request_count,
+                        'reservations': reservation_count
+                    })
+            
+            # Sort by total requests descending
+            department_request_data.sort(key=lambda x: x['total_requests'], reverse=True)
+            
+        except Exception as e:
+            logger.error(f"Error getting department request data: {str(e)}")
+            department_request_data = []
+
+        # Recent Requests for Preview Table
+        recent_supply_requests = SupplyRequest.objects.select_related(
+            'user', 'supply'
+        ).order_by('-request_date')[:5]
+
+        recent_batch_requests = SupplyRequestBatch.objects.with_aggregates().select_related(
+            'user'
+        ).order_by('-request_date')[:5]
+
+        recent_borrow_requests = BorrowRequest.objects.select_related(
+            'user', 'property'
+        ).order_by('-borrow_date')[:5]
+
+        recent_reservations = Reservation.objects.select_related(
+            'user', 'item'
+        ).order_by('-reservation_date')[:5]
+
+        all_recent_requests = []
+        
+        # Add legacy supply requests
+        for req in recent_supply_requests:
+            all_recent_requests.append({
+                'type': 'Supply Request',
+                'user': req.user.username,
+                'item': req.supply.supply_name,
+                'quantity': req.quantity,
+                'status': req.get_status_display(),
+                'date': req.request_date,
+                'purpose': req.purpose[:50] + '...' if len(req.purpose) > 50 else req.purpose
+            })
+        
+        # Add batch supply requests
+        for req in recent_batch_requests:
+            items_text = f"{req.total_items} items"
+            if req.total_items <= 3:
+                try:
+                    items_list = ", ".join([f"{item.supply.supply_name} (x{item.quantity})" for item in req.items.all()])
+                    items_text = items_list
+                except:
+                    items_text = f"{req.total_items} items"
+            
+            all_recent_requests.append({
+                'type': 'Batch Supply Request',
+                'user': req.user.username,
+                'item': items_text,
+                'quantity': req.total_quantity,
+                'status': req.get_status_display(),
+                'date': req.request_date,
+                'purpose': req.purpose[:50] + '...' if len(req.purpose) > 50 else req.purpose
+            })
+        
+        for req in recent_borrow_requests:
+            all_recent_requests.append({
+                'type': 'Borrow Request',
+                'user': req.user.username,
+                'item': req.property.property_name,
+                'quantity': req.quantity,
+                'status': req.get_status_display(),
+                'date': req.borrow_date,
+                'purpose': req.purpose[:50] + '...' if len(req.purpose) > 50 else req.purpose
+            })
+        
+        for req in recent_reservations:
+            all_recent_requests.append({
+                'type': 'Reservation',
+                'user': req.user.username,
+                'item': req.item.property_name,
+                'quantity': req.quantity,
+                'status': req.get_status_display(),
+                'date': req.reservation_date,
+                'purpose': req.purpose[:50] + '...' if len(req.purpose) > 50 else req.purpose
+            })
+            
+        all_recent_requests.sort(key=lambda x: x['date'], reverse=True)
+        recent_requests_preview = all_recent_requests[:5]
+
+        context.update({
+            # Notifications
+            'notifications': user_notifications,
+            'unread_count': unread_notifications.count(),
+
+            # supply status summary
+            'supply_available': supply_status_counts[0],
+            'supply_low_stock': supply_status_counts[1],
+            'supply_out_of_stock': supply_status_counts[2],
+
+            # property condition summary
+            'property_in_good_condition': property_condition_counts[0],
+            'property_needing_repair': property_condition_counts[1],
+            'property_unserviceable': property_condition_counts[2],
+            'property_obsolete': property_condition_counts[3],
+            'property_no_longer_needed': property_condition_counts[4],
+            'property_not_used_since_purchased': property_condition_counts[5],
+
+            # request status summary
+            'request_status_pending': request_status_counts[0],
+            'request_status_approved': request_status_counts[1],
+            'request_status_rejected': request_status_counts[2],
+
+            # damage status summary
+            'damage_status_pending': damage_status_counts[0],
+            'damage_status_reviewed': damage_status_counts[1],
+            'damage_status_resolved': damage_status_counts[2],
+
+            # JSON serialized data for charts
+            'borrow_trends_data': json.dumps(borrow_trends_data),
+            'user_activity_by_role': json.dumps(user_activity_data),
+            'department_requests_data': json.dumps(department_request_data),
+
+            # total counts for cards
+            'supply_count': Supply.objects.count(),
+            'property_count': Property.objects.count(),
+            'pending_supply_requests': SupplyRequest.objects.filter(status__iexact='pending').count() + SupplyRequestBatch.objects.filter(status__iexact='pending').count(),
+            'pending_borrow_requests': BorrowRequest.objects.filter(status__iexact='pending').count() + BorrowRequestBatch.objects.filter(status__iexact='pending').count(),
+            'pending_requests': SupplyRequest.objects.filter(status__iexact='pending').count() + SupplyRequestBatch.objects.filter(status__iexact='pending').count() + BorrowRequest.objects.filter(status__iexact='pending').count() + BorrowRequestBatch.objects.filter(status__iexact='pending').count(),
+            'damage_reports': DamageReport.objects.filter(status__iexact='pending').count(),
+            
+            # Recent requests for preview table
+            'recent_requests_preview': recent_requests_preview,
+            
+            # Departments for filters
+            'departments': Department.objects.all().order_by('name'),
+        })
+        
+        # Calculate percentage changes for dashboard cards
+        # Helper function to calculate percentage change
+        def calculate_percentage_change(current, previous):
+            if previous == 0:
+                return {'percentage': 0, 'direction': 'neutral'} if current == 0 else {'percentage': 100, 'direction': 'positive'}
+            change = ((current - previous) / previous) * 100
+            return {
+                'percentage': abs(round(change, 1)),
+                'direction': 'positive' if change > 0 else 'negative' if change < 0 else 'neutral'
+            }
+        
+        # Count items created/added last month for comparison
+        supply_count_current = context['supply_count']
+        supply_count_last_month = Supply.objects.filter(
+            created_at__lt=first_day_this_month
+        ).count() if hasattr(Supply, 'created_at') else supply_count_current
+        
+        property_count_current = context['property_count']
+        property_count_last_month = Property.objects.filter(
+            created_at__lt=first_day_this_month
+        ).count() if hasattr(Property, 'created_at') else property_count_current
+        
+        pending_requests_current = context['pending_requests']
+        pending_requests_last_month = (
+            SupplyRequest.objects.filter(
+                status__iexact='pending',
+                request_date__gte=first_day_last_month,
+                request_date__lt=first_day_this_month
+            ).count() +
+            SupplyRequestBatch.objects.filter(
+                status__iexact='pending',
+                request_date__gte=first_day_last_month,
+                request_date__lt=first_day_this_month
+            ).count() +
+            BorrowRequest.objects.filter(
+                status__iexact='pending',
+                borrow_date__gte=first_day_last_month,
+                borrow_date__lt=first_day_this_month
+            ).count() +
+            BorrowRequestBatch.objects.filter(
+                status__iexact='pending',
+                request_date__gte=first_day_last_month,
+                request_date__lt=first_day_this_month
+            ).count()
+        )
+        
+        damage_reports_current = context['damage_reports']
+        damage_reports_last_month = DamageReport.objects.filter(
+            status__iexact='pending',
+            report_date__gte=first_day_last_month,
+            report_date__lt=first_day_this_month
+        ).count()
+        
+        # Add percentage changes to context
+        context.update({
+            'supply_change': calculate_percentage_change(supply_count_current, supply_count_last_month),
+            'property_change': calculate_percentage_change(property_count_current, property_count_last_month),
+            'pending_requests_change': calculate_percentage_change(pending_requests_current, pending_requests_last_month),
+            'damage_reports_change': calculate_percentage_change(damage_reports_current, damage_reports_last_month),
+            'near_expiry_change': calculate_percentage_change(near_expiry_count, near_expiry_count_last_month),
+        })
+
+        return context
+
+
+@login_required
+def get_near_expiry_count(request):
+    """API endpoint to get near expiry count based on days filter"""
+    from django.http import JsonResponse
+    
+    try:
+        days = int(request.GET.get('days', 30))
+        count = near_expiry_counts(windows=(days,))[str(days)]
+        return JsonResponse({'count': count})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+@login_required
+def get_pending_requests_count(request):
+    """API endpoint to get pending requests count by type (all, supply, borrow)"""
+    from django.http import JsonResponse
+    
+    try:
+        request_type = request.GET.get('type', 'all')
+        counts = pending_requests_counts()
+        return JsonResponse({'count': counts.get(request_type, counts['all'])})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+@login_required
+async def live_events(request):
+    """
+    Server-sent event stream of the user's notification and dashboard
+    counters (see app/live_updates.py). Only served under ASGI; WSGI workers
+    answer 204 so EventSource stops reconnecting.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import HttpResponse, StreamingHttpResponse
+    from asgiref.sync import sync_to_async
+
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    is_admin = not await sync_to_async(is_user_account)(user)
+    response = StreamingHttpResponse(
+        event_stream(user, request.session.session_key, is_admin),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Tell Nginx not to buffer the stream
+    return response
+
+
+class ActivityPageView(PermissionRequiredMixin, ListView):
+    model = ActivityLog
+    template_name = 'app/activity.html'
+    permission_required = 'app.view_admin_module'
+    permission_denied_message = "You do not have permission to view the activity log."
+    context_object_name = 'activitylog_list'
+    # Keyset pagination (see app/pagination.py): OFFSET pages get slower as the audit log grows
+    page_size = 20
+
+    def get_queryset(self):
+        # Use select_related to prevent N+1 queries on user lookups
+        queryset = ActivityLog.objects.select_related('user').order_by('-timestamp', '-id')
+        
+        # Apply filters
+        user_filter = self.request.GET.get('user')
+        model_filter = self.request.GET.get('model')
+        start_date = self.request.GET.get('start_date')
+        end_date = self.request.GET.get('end_date')
+
+        if user_filter:
+            queryset = queryset.filter(user_id=user_filter)
+        if model_filter:
+            queryset = queryset.filter(model_name=model_filter)
+        if start_date:
+            try:
+                from datetime import datetime
+                start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
+                start_date_aware = timezone.make_aware(start_date_obj.replace(hour=0, minute=0, second=0))
+                queryset = queryset.filter(timestamp__gte=start_date_aware)
+            except (ValueError, TypeError):
+                pass
+        if end_date:
+            try:
+                from datetime import datetime
+                end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
+                end_date_aware = timezone.make_aware(end_date_obj.replace(hour=23, minute=59, second=59))
+                queryset = queryset.filter(timestamp__lte=end_date_aware)
+            except (ValueError, TypeError):
+                pass
+
+        # Filter by category if specified (duplicate of model_filter, kept for compatibility)
+        category = self.request.GET.get('category')
+        if category:
+            queryset = queryset.filter(model_name=category)
+
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        page = keyset_paginate(self.object_list, self.request.GET.get('cursor'), page_size=self.page_size)
+        context['page'] = page
+        context[self.context_object_name] = page.object_list
+
+        # Current filters, carried over into the pagination links
+        filters = self.request.GET.copy()
+        filters.pop('cursor', None)
+        filters.pop('page', None)
+        context['filter_query'] = filters.urlencode()
+
+        # Users (including inactive ones, for audit trails) and model names that appear in the log
+        filter_options = get_activity_filter_options()
+        context['users'] = filter_options['users']
+        context['models'] = filter_options['models']
+        
+        # Get current category for highlighting in template
+        context['current_category'] = self.request.GET.get('category', '')
+        
+        return context
+
+
+class CheckOutPageView(PermissionRequiredMixin, TemplateView):
+    template_name = 'app/checkout.html'
+    permission_required = 'app.view_admin_module'  # Adjust permission as needed
+
+
+# Resource Allocation Dashboard View (Unified for all request types)
+class ResourceAllocationDashboardView(PermissionRequiredMixin, TemplateView):
+    """
+    Unified dashboard for viewing all resource allocations across:
+    - Borrow Requests
+    - Reservations  
+    - Supply Requests
+    
+    Accessible only to admin users.
+
+    Each tab is paginated in the database over a values() projection, so a
+    page view reads one page of rows (plus one COUNT per tab) no matter how
+    many allocations are outstanding.
+    """
+    permission_required = 'app.view_admin_module'
+    template_name = 'app/resource_allocation_dashboard.html'
+    paginate_by = 15
+
+    # Columns read for every allocation row, on top of each tab's own columns
+    BASE_COLUMNS = (
+        'id', 'quantity', 'status', 'remarks',
+        'batch_request_id', 'batch_request__request_date', 'batch_request__purpose',
+        'batch_request__user_id', 'batch_request__user__first_name',
+        'batch_request__user__last_name', 'batch_request__user__username',
+        'batch_request__user__userprofile__department__name',
+    )
+
+    def allocation_querysets(self):
+        """The unfiltered allocation queryset of each tab."""
+        from app.models import BorrowRequestItem, ReservationItem, SupplyRequestItem
+
+        # Exclude items from voided or cancelled batch requests
+        return {
+            'borrow': BorrowRequestItem.objects.filter(
+                status__in=['approved', 'active', 'overdue']
+            ).exclude(batch_request__status__in=['voided', 'cancelled']),
+            'reservation': ReservationItem.objects.filter(status__in=['approved', 'active']),
+            # Only show approved supply items (once approved, they're allocated)
+            'supply': SupplyRequestItem.objects.filter(
+                status='approved'
+            ).exclude(batch_request__status__in=['voided', 'cancelled']),
+        }
+
+    @staticmethod
+    def search_filter(tab, search_query):
+        """
+        Match the requester, the item and the batch purpose.
+
+        Users and items are matched in their own (small) tables and joined
+        back through the indexed foreign keys, so every item row appears at
+        most once and no DISTINCT is needed.
+        """
+        users = User.objects.filter(
+            Q(first_name__icontains=search_query) |
+            Q(last_name__icontains=search_query) |
+            Q(username__icontains=search_query)
+        ).values('id')
+        if tab == 'supply':
+            item_filter = Q(supply__in=Supply.objects.filter(
+                Q(supply_name__icontains=search_query) | Q(barcode__icontains=search_query)
+            ).values('id'))
+        else:
+            item_filter = Q(property__in=Property.objects.filter(
+                Q(property_name__icontains=search_query) | Q(property_number__icontains=search_query)
+            ).values('id'))
+        return (
+            Q(batch_request__user__in=users) |
+            item_filter |
+            Q(batch_request__purpose__icontains=search_query)
+        )
+
+    @staticmethod
+    def allocation_columns(tab):
+        if tab == 'borrow':
+            return ('approved_quantity', 'return_date', 'property__property_name', 'property__property_number')
+        if tab == 'reservation':
+            return ('needed_date', 'return_date', 'property__property_name', 'property__property_number')
+        return ('approved_quantity', 'supply__supply_name', 'supply__barcode')
+
+    @staticmethod
+    def allocation_row(tab, values, status_labels):
+        """Template row for one projected allocation."""
+        row = {
+            'request_id': values['batch_request_id'],
+            'user': {
+                'id': values['batch_request__user_id'],
+                'first_name': values['batch_request__user__first_name'],
+                'last_name': values['batch_request__user__last_name'],
+                'username': values['batch_request__user__username'],
+                'userprofile': {'department': values['batch_request__user__userprofile__department__name'] or ''},
+            },
+            'quantity': values.get('approved_quantity') or values['quantity'],
+            'status': status_labels.get(values['status'], values['status']),
+            'status_value': values['status'],
+            'request_date': values['batch_request__request_date'],
+            'purpose': values['batch_request__purpose'],
+            'remarks': values['remarks'] or '',
+        }
+        if tab == 'borrow':
+            row.update({
+                'type': 'Borrow Request',
+                'type_class': 'borrow',
+                'property': {'property_name': values['property__property_name'],
+                             'property_number': values['property__property_number']},
+                'return_date': values['return_date'],
+                'detail_url': 'borrow_batch_request_detail',
+            })
+        elif tab == 'reservation':
+            row.update({
+                'type': 'Reservation',
+                'type_class': 'reservation',
+                'property': {'property_name': values['property__property_name'],
+                             'property_number': values['property__property_number']},
+                'needed_date': values['needed_date'],
+                'return_date': values['return_date'],
+                'detail_url': 'reservation_batch_detail',
+            })
+        else:
+            row.update({
+                'type': 'Supply Request',
+                'type_class': 'supply',
+                'supply': {'supply_name': values['supply__supply_name'],
+                           'barcode': values['supply__barcode']},
+                'detail_url': 'batch_request_detail',
+            })
+        return row
+
+    def get_context_data(self, **kwargs):
+        from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+        
+        context = super().get_context_data(**kwargs)
+        
+        # Get the current tab from request - default to borrow
+        current_tab = self.request.GET.get('tab', 'borrow')
+        
+        # Get search and filter parameters
+        search_query = self.request.GET.get('search', '').strip()
+        department_filter = self.request.GET.get('department', '')
+        date_from = self.request.GET.get('date_from', '')
+        date_to = self.request.GET.get('date_to', '')
+        status_filter = self.request.GET.get('status', '')
+        
+        # Parse dates if provided
+        date_from_obj = None
+        date_to_obj = None
+        if date_from:
+            try:
+                date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+            except ValueError:
+                pass
+        if date_to:
+            try:
+                date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+            except ValueError:
+                pass
+        
+        # Apply the shared filters to every tab; only the current tab is paginated
+        allocations = self.allocation_querysets()
+        for tab, items in allocations.items():
+            if search_query:
+                items = items.filter(self.search_filter(tab, search_query))
+            if department_filter:
+                items = items.filter(batch_request__user__userprofile__department__name=department_filter)
+            if date_from_obj:
+                items = items.filter(batch_request__request_date__date__gte=date_from_obj)
+            if date_to_obj:
+                items = items.filter(batch_request__request_date__date__lte=date_to_obj)
+            if status_filter and (tab != 'supply' or status_filter == 'approved'):
+                items = items.filter(status=status_filter)
+            allocations[tab] = items
+
+        # Tab badges: one COUNT per tab
+        tab_counts = {tab: items.count() for tab, items in allocations.items()}
+        
+        page_objs = dict.fromkeys(allocations)
+        if current_tab in allocations:
+            items = allocations[current_tab]
+            projection = items.values(
+                *self.BASE_COLUMNS, *self.allocation_columns(current_tab)
+            ).order_by('-batch_request__request_date', '-id')
+            paginator = Paginator(projection, self.paginate_by)
+            # The count is already known, don't let the paginator run it again
+            paginator.count = tab_counts[current_tab]
+            try:
+                page_obj = paginator.page(self.request.GET.get(f'{current_tab}_page', 1))
+            except (PageNotAnInteger, EmptyPage):
+                page_obj = paginator.page(1)
+            status_labels = dict(items.model._meta.get_field('status').flatchoices)
+            page_obj.object_list = [
+                self.allocation_row(current_tab, values, status_labels) for values in page_obj.object_list
+            ]
+            page_objs[current_tab] = page_obj
+        
+        # Build URL parameters string for pagination
+        url_params = ''
+        if search_query:
+            url_params += f'&search={search_query}'
+        if department_filter:
+            url_params += f'&department={department_filter}'
+        if date_from:
+            url_params += f'&date_from={date_from}'
+        if date_to:
+            url_params += f'&date_to={date_to}'
+        if status_filter:
+            url_params += f'&status={status_filter}'
+        
+        context.update({
+            'current_tab': current_tab,
+            'borrow_allocations': page_objs['borrow'],
+            'reservation_allocations': page_objs['reservation'],
+            'supply_allocations': page_objs['supply'],
+            'tab_counts': tab_counts,
+            'search_query': search_query,
+            'department_filter': department_filter,
+            'date_from': date_from,
+            'date_to': date_to,
+            'status_filter': status_filter,
+            'departments': Department.objects.all(),
+            'url_params': url_params,
+            'allocation_statuses': ['approved', 'active'],
+        })
+        
+        return context
+
+
+@require_http_methods(["GET"])
+def get_latest_batch_request(request):
+    """Get the latest batch request ID for a user"""
+    from django.contrib.auth.models import User
+    from django.http import JsonResponse
+    
+    username = request.GET.get('username')
+    if not username:
+        return JsonResponse({'error': 'Username required'}, status=400)
+    
+    try:
+        user = User.objects.get(username=username)
+        latest_batch = BorrowRequestBatch.objects.filter(user=user).order_by('-request_date').first()
+        
+        if latest_batch:
+            return JsonResponse({'batch_id': latest_batch.id, 'user': username})
+        else:
+            return JsonResponse({'error': 'No batch requests found'}, status=404)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def get_latest_supply_request(request):
+    """Get the latest supply request ID for a user"""
+    from django.contrib.auth.models import User
+    from django.http import JsonResponse
+    
+    username = request.GET.get('username')
+    if not username:
+        return JsonResponse({'error': 'Username required'}, status=400)
+    
+    try:
+        user = User.objects.get(username=username)
+        # Try batch supply requests first
+        latest_batch = SupplyRequestBatch.objects.filter(user=user).order_by('-request_date').first()
+        
+        if latest_batch:
+            return JsonResponse({'batch_id': latest_batch.id, 'user': username, 'type': 'batch'})
+        else:
+            # Try individual supply requests
+            latest_supply = SupplyRequest.objects.filter(user=user).order_by('-request_date').first()
+            if latest_supply:
+                return JsonResponse({'supply_id': latest_supply.id, 'user': username, 'type': 'individual'})
+            else:
+                return JsonResponse({'error': 'No supply requests found'}, status=404)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def get_latest_damage_report(request):
+    """Get the latest damage report ID for a user"""
+    from django.contrib.auth.models import User
+    from django.http import JsonResponse
+    
+    username = request.GET.get('username')
+    if not username:
+        return JsonResponse({'error': 'Username required'}, status=400)
+    
+    try:
+        user = User.objects.get(username=username)
+        latest_report = DamageReport.objects.filter(user=user).order_by('-date_reported').first()
+        
+        if latest_report:
+            return JsonResponse({'report_id': latest_report.id, 'user': username})
+        else:
+            return JsonResponse({'error': 'No damage reports found'}, status=404)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def get_latest_reservation(request):
+    """Get the latest reservation ID for a user"""
+    from django.contrib.auth.models import User
+    from django.http import JsonResponse
+    
+    username = request.GET.get('username')
+    if not username:
+        return JsonResponse({'error': 'Username required'}, status=400)
+    
+    try:
+        user = User.objects.get(username=username)
+        latest_reservation = Reservation.objects.filter(user=user).order_by('-reservation_date').first()
+        
+        if latest_reservation:
+            return JsonResponse({'reservation_id': latest_reservation.id, 'user': username})
+        else:
+            return JsonResponse({'error': 'No reservations found'}, status=404)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+def slow_requests(request):
+    """
+    Ops page listing the slowest recently profiled requests and a per-view
+    summary, from the SQLInstrumentationMiddleware ring buffer of this
+    worker process. ?view=<view name> narrows the list to one view.
+    """
+    from ..instrumentation import recorded_requests, summarize_by_view
+
+    profiles = recorded_requests()
+    view_filter = request.GET.get('view', '')
+    slowest = [p for p in profiles if not view_filter or p['view'] == view_filter]
+    slowest.sort(key=lambda p: p['total_ms'], reverse=True)
+    for profile in slowest:
+        profile['recorded_at'] = datetime.fromtimestamp(profile['timestamp'], tz=timezone.get_current_timezone())
+
+    return render(request, 'app/slow_requests.html', {
+        'instrumentation_enabled': settings.SQL_INSTRUMENTATION_ENABLED,
+        'duplicate_threshold': settings.SQL_DUPLICATE_QUERY_THRESHOLD,
+        'recorded_count': len(profiles),
+        'view_summary': summarize_by_view(profiles),
+        'slowest': slowest[:50],
+        'view_filter': view_filter,
+    })
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+def db_pool_stats(request):
+    """JSON ops endpoint with this worker's database connection reuse and pool metrics (app/db_pool.py)."""
+    from ..db_pool import pool_stats
+
+    return JsonResponse(pool_stats())
+
+
+@login_required
+def sample_admin(request):
+    """Sample page demonstrating modern sidebar implementation"""
+    return render(request, 'app/sample_admin.html')
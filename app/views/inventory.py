@@ -0,0 +1,2822 @@
+"""
+Supply and property inventory: lists, CRUD, quantities, history,
+categories, archiving and damaged/lost item management.
+"""
+import hashlib
+import json
+import re
+from collections import defaultdict
+from datetime import date
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, permission_required, user_passes_test
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods, require_POST
+from django.views.generic import ListView, TemplateView
+
+from ..cache_policy import IMMUTABLE, REVALIDATE, cache_policy
+from ..catalog import catalog_url, get_catalog_snapshot, get_catalog_version
+from ..forms import BadStockReportForm, PropertyForm, PropertyNumberChangeForm, SupplyForm
+from ..models import (
+    ActivityLog, BadStockReport, DamageReport, LostItem, Notification, Property,
+    PropertyCategory, Supply, SupplyCategory, SupplyHistory, SupplyQuantity, SupplySubcategory,
+)
+from ..pagination import keyset_paginate
+from ..permissions import admin_permission_required, has_admin_permissions
+from ..stock_monitor import STOCK_SEVERITY
+
+
+def redirect_with_tab(request, view_name):
+    """
+    Helper function to redirect while preserving the current tab from the referer URL.
+    
+    Args:
+        request: The HTTP request object
+        view_name: The name of the view to redirect to
+    
+    Returns:
+        HttpResponseRedirect to the view, optionally with tab parameter preserved
+    """
+    referer = request.META.get('HTTP_REFERER', '')
+    if 'tab=' in referer:
+        # Extract the tab parameter from the referer
+        tab_match = re.search(r'tab=([^&]+)', referer)
+        if tab_match:
+            tab = tab_match.group(1)
+            return redirect(f"{reverse(view_name)}?tab={tab}")
+    return redirect(view_name)
+
+
+@require_POST
+def update_damage_status(request, pk):
+    report = get_object_or_404(DamageReport, pk=pk)
+    action = request.POST.get('update_action')
+    remarks = report.remarks or ''
+    if action == 'unserviceable':
+        report.remarks = f"Classified as Unserviceable. {remarks}"
+        report.save()
+    elif action == 'needs_repair':
+        report.remarks = f"Classified as Needs Repair. {remarks}"
+        report.save()
+    elif action == 'back_in_use':
+        report.status = 'reviewed'
+        report.remarks = f"Marked as Back in Use. {remarks}"
+        report.save()
+    return HttpResponseRedirect(reverse('damaged_items_management'))
+
+
+@require_POST
+@admin_permission_required('manage_lost_items')
+def mark_lost_item_found(request, pk):
+    """Mark a lost item as found and restore property availability"""
+    from ..models import LostItem
+    lost_item = get_object_or_404(LostItem, pk=pk)
+    
+    # Restore property condition to 'In good condition' and mark as available
+    lost_item.item.condition = 'In good condition'
+    lost_item.item.availability = 'available'
+    lost_item.item.save(update_fields=['condition', 'availability'])
+    
+    # Update lost item status to 'found'
+    lost_item.status = 'found'
+    lost_item.remarks = f"Item marked as found by {request.user.username}"
+    lost_item.save()
+    
+    # Log the activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='update',
+        model_name='LostItem',
+        object_repr=str(lost_item.item.property_name),
+        description=f"Marked lost property '{lost_item.item.property_name}' as found and restored to available status"
+    )
+    
+    messages.success(request, f"{lost_item.item.property_name} has been marked as found and is now available.")
+    return HttpResponseRedirect(reverse('damaged_items_management') + '?tab=lost-items')
+
+
+@admin_permission_required('manage_lost_items')
+def mark_property_as_lost(request, property_id):
+    """
+    View for admins to verify and mark a property as lost.
+    This is typically used after reviewing a lost item report to confirm the item is indeed lost.
+    Updates the property condition to 'Lost' and availability to 'not_available'.
+    """
+    # Check if user is authenticated and has admin permissions
+    if not request.user.is_authenticated:
+        return JsonResponse({'success': False, 'message': 'Authentication required'}, status=401)
+    
+    try:
+        if not request.user.userprofile.role == 'ADMIN':
+            return JsonResponse({'success': False, 'message': 'Admin access required'}, status=403)
+    except:
+        return JsonResponse({'success': False, 'message': 'Access denied'}, status=403)
+    
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'POST method required'}, status=405)
+    
+    property_obj = get_object_or_404(Property, id=property_id)
+    
+    # Store old condition for logging
+    old_condition = property_obj.condition
+    
+    # Update property condition to Lost
+    property_obj.condition = 'Lost'
+    property_obj.availability = 'not_available'
+    property_obj.save(update_fields=['condition', 'availability'])
+    
+    # Log the activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='update',
+        model_name='Property',
+        object_repr=str(property_obj.property_name),
+        description=f"Admin verified and marked property '{property_obj.property_name}' as Lost (previous condition: {old_condition})"
+    )
+    
+    messages.success(request, f"{property_obj.property_name} has been marked as Lost.")
+    
+    # Return JSON response for AJAX calls, or redirect to damaged items page
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({
+            'success': True,
+            'message': f'{property_obj.property_name} has been marked as Lost.'
+        })
+    
+    # Redirect to damaged items management page with lost-items tab
+    return HttpResponseRedirect(reverse('damaged_items_management') + '?tab=lost-items')
+
+
+@require_POST
+@admin_permission_required('manage_lost_items')
+def delete_lost_item(request, pk):
+    """Delete a lost item report"""
+    from ..models import LostItem
+    lost_item = get_object_or_404(LostItem, pk=pk)
+    item_name = lost_item.item.property_name
+    
+    # Optionally restore property availability
+    lost_item.item.availability = 'available'
+    lost_item.item.save(update_fields=['availability'])
+    
+    lost_item.delete()
+    
+    messages.success(request, f"Lost item report for {item_name} has been deleted.")
+    return HttpResponseRedirect(reverse('damaged_items_management') + '?tab=lost-items')
+
+
+@require_POST
+@admin_permission_required('manage_lost_items')
+def archive_lost_item(request, pk):
+    """Archive a lost item and its associated property"""
+    from ..models import LostItem, ActivityLog
+    lost_item = get_object_or_404(LostItem, pk=pk)
+    property_obj = lost_item.item
+    item_name = property_obj.property_name
+    
+    # Archive the property
+    property_obj.is_archived = True
+    property_obj.save(user=request.user)
+    
+    # Log the activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='archive',
+        model_name='Property',
+        object_repr=str(property_obj),
+        description=f"Archived lost property '{item_name}' via lost item report"
+    )
+    
+    messages.success(request, f"Property '{item_name}' has been archived successfully.")
+    return HttpResponseRedirect(reverse('damaged_items_management') + '?tab=lost-items')
+
+
+@require_POST
+def update_property_condition(request, pk):
+    property_obj = get_object_or_404(Property, pk=pk)
+    new_condition = request.POST.get('condition')
+    if new_condition in ['Unserviceable', 'Needing repair', 'Working', 'In good condition']:
+        property_obj.condition = new_condition
+        if new_condition in ['Unserviceable', 'Needing repair']:
+            property_obj.availability = 'not_available'
+        else:
+            property_obj.availability = 'available'
+        property_obj.save()
+    return HttpResponseRedirect(reverse('damaged_items_management'))
+
+
+class DamagedItemsManagementView(PermissionRequiredMixin, TemplateView):
+    permission_required = 'app.view_admin_module'
+    template_name = 'app/damaged_items_management.html'
+
+    def _get_reported_date_for_property(self, prop, condition):
+        """Get the date when a property was set to a specific condition"""
+        from ..models import PropertyHistory
+        from django.utils import timezone
+        from datetime import datetime
+        
+        # Try to find the most recent history entry where condition was changed to the specified condition
+        history = PropertyHistory.objects.filter(
+            property=prop,
+            field_name='condition',
+            new_value=condition
+        ).order_by('-timestamp').first()
+        
+        if history:
+            return history.timestamp
+        
+        # Fallback to minimum aware datetime if no history found (will sort to end)
+        return timezone.make_aware(datetime.min.replace(year=1900))
+
+    def get_context_data(self, **kwargs):
+        from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+        from django.utils import timezone
+        context = super().get_context_data(**kwargs)
+        
+        # Get properties with unserviceable condition
+        unserviceable_properties = Property.objects.filter(condition__iexact='Unserviceable').order_by('-id')
+        
+        # Get properties needing repair
+        needs_repair_properties = Property.objects.filter(condition__iexact='Needing repair').order_by('-id')
+        
+        # Add reported_date to each property by fetching from PropertyHistory
+        for prop in unserviceable_properties:
+            prop.reported_date = self._get_reported_date_for_property(prop, 'Unserviceable')
+        
+        for prop in needs_repair_properties:
+            prop.reported_date = self._get_reported_date_for_property(prop, 'Needing repair')
+        
+        # Sort by reported_date (most recent first)
+        from datetime import datetime
+        min_aware_datetime = timezone.make_aware(datetime.min.replace(year=1900))
+        unserviceable_properties = sorted(unserviceable_properties, key=lambda x: x.reported_date if x.reported_date else min_aware_datetime, reverse=True)
+        needs_repair_properties = sorted(needs_repair_properties, key=lambda x: x.reported_date if x.reported_date else min_aware_datetime, reverse=True)
+        
+        # Get lost items (only show items with 'lost' status, exclude 'found' items)
+        from ..models import LostItem
+        lost_items = LostItem.objects.filter(status='lost').select_related('item', 'user').order_by('-report_date')
+        
+        # Get URL parameters for building pagination links
+        url_params = ""
+        
+        # Paginate each tab separately with 15 items per page
+        paginate_by = 15
+        
+        # Get page numbers for each tab
+        unserviceable_page = self.request.GET.get('unserviceable_page', 1)
+        needs_repair_page = self.request.GET.get('needs_repair_page', 1)
+        lost_items_page = self.request.GET.get('lost_items_page', 1)
+        
+        # Paginate unserviceable items
+        unserviceable_paginator = Paginator(unserviceable_properties, paginate_by)
+        try:
+            unserviceable_page_obj = unserviceable_paginator.page(unserviceable_page)
+        except PageNotAnInteger:
+            unserviceable_page_obj = unserviceable_paginator.page(1)
+        except EmptyPage:
+            unserviceable_page_obj = unserviceable_paginator.page(unserviceable_paginator.num_pages)
+        
+        # Paginate needs repair items
+        needs_repair_paginator = Paginator(needs_repair_properties, paginate_by)
+        try:
+            needs_repair_page_obj = needs_repair_paginator.page(needs_repair_page)
+        except PageNotAnInteger:
+            needs_repair_page_obj = needs_repair_paginator.page(1)
+        except EmptyPage:
+            needs_repair_page_obj = needs_repair_paginator.page(needs_repair_paginator.num_pages)
+        
+        # Paginate lost items
+        lost_items_paginator = Paginator(lost_items, paginate_by)
+        try:
+            lost_items_page_obj = lost_items_paginator.page(lost_items_page)
+        except PageNotAnInteger:
+            lost_items_page_obj = lost_items_paginator.page(1)
+        except EmptyPage:
+            lost_items_page_obj = lost_items_paginator.page(lost_items_paginator.num_pages)
+        
+        # Also include damage reports that have been classified (for backward compatibility)
+        unserviceable_reports = DamageReport.objects.filter(status='resolved', remarks__icontains='Unserviceable')
+        needs_repair_reports = DamageReport.objects.filter(status='resolved', remarks__icontains='Needs Repair')
+        
+        # Add paginated objects to context
+        context['unserviceable_items'] = unserviceable_page_obj
+        context['needs_repair_items'] = needs_repair_page_obj
+        context['lost_items'] = lost_items_page_obj
+        
+        # Add total counts for badges
+        context['unserviceable_count'] = len(unserviceable_properties)
+        context['needs_repair_count'] = len(needs_repair_properties)
+        context['lost_items_count'] = lost_items.count()
+        
+        # Add legacy reports for backward compatibility
+        context['unserviceable_reports'] = unserviceable_reports
+        context['needs_repair_reports'] = needs_repair_reports
+        context['url_params'] = url_params
+        
+        return context
+
+
+class SupplyListView(PermissionRequiredMixin, ListView):
+    model = Supply
+    template_name = 'app/supply.html'
+    permission_required = 'app.view_admin_module'
+    context_object_name = 'supplies'
+    paginate_by = 15  # Enable pagination with 15 items per page
+
+    def get_queryset(self):
+        queryset = Supply.objects.filter(is_archived=False).select_related('quantity_info', 'category', 'subcategory').order_by('supply_name')
+        
+        # Apply search filter
+        search_query = self.request.GET.get('search')
+        if search_query:
+            queryset = queryset.filter(
+                Q(supply_name__icontains=search_query) |
+                Q(description__icontains=search_query) |
+                Q(category__name__icontains=search_query) |
+                Q(subcategory__name__icontains=search_query) |
+                Q(barcode__icontains=search_query)
+            )
+        
+        # Apply category filter
+        category_filters = self.request.GET.getlist('category')
+        if category_filters:
+            queryset = queryset.filter(category__name__in=category_filters)
+        
+        # Apply status filter
+        # (stored on SupplyQuantity, see app/stock_monitor.py)
+        status_filters = [status for status in self.request.GET.getlist('status') if status in STOCK_SEVERITY]
+        if status_filters:
+            queryset = queryset.filter(quantity_info__stock_status__in=status_filters)
+        
+        # Apply availability filter
+        availability_filters = self.request.GET.getlist('availability')
+        if availability_filters:
+            availability_conditions = []
+            for availability in availability_filters:
+                if availability == 'Yes':
+                    availability_conditions.append(Q(available_for_request=True))
+                elif availability == 'No':
+                    availability_conditions.append(Q(available_for_request=False))
+            
+            if availability_conditions:
+                availability_q = availability_conditions[0]
+                for condition in availability_conditions[1:]:
+                    availability_q |= condition
+                queryset = queryset.filter(availability_q)
+        
+        # Apply expiry filter
+        expiry_filters = self.request.GET.getlist('expiry')
+        if expiry_filters:
+            today = timezone.now().date()
+            
+            expiry_conditions = []
+            for expiry in expiry_filters:
+                if expiry == 'expired':
+                    expiry_conditions.append(Q(expiration_date__lt=today))
+                elif expiry == 'expiring_soon':
+                    # Expires within 30 days
+                    expiry_conditions.append(Q(expiration_date__gte=today, expiration_date__lte=today + timezone.timedelta(days=30)))
+                elif expiry == 'not_expired':
+                    expiry_conditions.append(Q(expiration_date__gt=today + timezone.timedelta(days=30)) | Q(expiration_date__isnull=True))
+                elif expiry == 'no_expiry':
+                    expiry_conditions.append(Q(expiration_date__isnull=True))
+            
+            if expiry_conditions:
+                expiry_q = expiry_conditions[0]
+                for condition in expiry_conditions[1:]:
+                    expiry_q |= condition
+                queryset = queryset.filter(expiry_q)
+        
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = SupplyForm()
+        context['form'] = form
+        context['today'] = date.today()
+        
+        # Get the paginated supplies from the current page
+        supplies = context['supplies']
+        
+        # Ensure barcodes are generated for supplies that don't have them
+        from ..utils import generate_barcode_image
+        for supply in supplies:
+            if not supply.barcode or not supply.barcode_image:
+                barcode_text = f"SUP-{supply.id}"
+                supply.barcode = barcode_text
+                filename, content = generate_barcode_image(barcode_text)
+                supply.barcode_image.save(filename, content, save=False)
+                supply.save(update_fields=['barcode', 'barcode_image'])
+            
+            # Calculate days until expiration
+            if supply.expiration_date:
+                days_until = (supply.expiration_date - date.today()).days
+                supply.days_until_expiration = days_until
+        
+        # Get all categories and subcategories for the filter dropdowns, with their supply counts
+        context['categories'] = SupplyCategory.objects.annotate(supply_count=Count('supply'))
+        context['subcategories'] = SupplySubcategory.objects.annotate(supply_count=Count('supply'))
+        
+        # The "Report Bad Stock" and modify quantity dropdowns list every supply (not just this page);
+        # they load the cached catalog snapshot instead of rendering it into the page
+        context['catalog_url'] = catalog_url()
+        
+        # Only include paginated supplies for grouped view (not all supplies)
+        # This improves page load performance by not loading entire database
+        grouped = defaultdict(list)
+        for supply in supplies:
+            category_name = supply.category.name if supply.category else 'Uncategorized'
+            grouped[category_name].append(supply)
+        context['grouped_supplies'] = dict(sorted(grouped.items()))
+        
+        # Add user permissions to context
+        permissions = has_admin_permissions(self.request.user, ['report_bad_stock', 'edit_supply'])
+        context['can_report_bad_stock'] = permissions['report_bad_stock']
+        context['can_edit_supply'] = permissions['edit_supply']
+        
+        return context
+
+
+@permission_required('app.view_admin_module')
+def add_supply(request):
+    if request.method == 'POST':
+        form = SupplyForm(request.POST)
+        if form.is_valid():
+            try:
+                # First save the supply
+                supply = form.save(commit=False)
+                supply._logged_in_user = request.user
+                supply.save(user=request.user)
+
+                # Create and save quantity info
+                quantity_info = SupplyQuantity.objects.create(
+                    supply=supply,
+                    current_quantity=form.cleaned_data['current_quantity'],
+                    minimum_threshold=form.cleaned_data['minimum_threshold']
+                )
+
+                # available_for_request is already set from the form, no need to override
+
+                # Create activity log
+                ActivityLog.log_activity(
+                    user=request.user,
+                    action='create',
+                    model_name='Supply',
+                    object_repr=str(supply),
+                    description=f"Added new supply '{supply.supply_name}' with initial quantity {form.cleaned_data['current_quantity']}"
+                )
+                messages.success(request, 'Supply added successfully.')
+                # For AJAX requests, return JSON
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({'success': True, 'message': 'Supply added successfully.'})
+            except Exception as e:
+                if 'supply' in locals() and supply.pk:
+                    supply.delete()
+                error_msg = f'Error adding supply: {str(e)}'
+                messages.error(request, error_msg)
+                # For AJAX requests, return JSON
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({'success': False, 'message': error_msg})
+        else:
+            # Display form validation errors
+            error_messages = {}
+            for field, errors in form.errors.items():
+                error_messages[field] = [str(e) for e in errors]
+            # For AJAX requests, return JSON with field errors
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse({'success': False, 'errors': error_messages})
+            # For regular requests, show error message
+            error_text = "; ".join([f"{field}: {', '.join(errors)}" for field, errors in error_messages.items()])
+            messages.error(request, f'Please fix the following errors: {error_text}')
+    return redirect('supply_list')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@admin_permission_required('edit_supply')
+def edit_supply(request):
+    if request.method == 'POST':
+        supply_id = request.POST.get('id')
+        supply = get_object_or_404(Supply, id=supply_id)
+        
+        try:
+            # Store old values for activity log
+            old_values = {
+                'supply_name': supply.supply_name,
+                'description': supply.description,
+                'unit': supply.unit,
+                'available_for_request': supply.available_for_request,
+                'category': supply.category.id if supply.category else None,
+                'subcategory': supply.subcategory.id if supply.subcategory else None,
+                'date_received': supply.date_received,
+                'expiration_date': supply.expiration_date,
+                'current_quantity': supply.quantity_info.current_quantity if supply.quantity_info else 0,
+                'minimum_threshold': supply.quantity_info.minimum_threshold if supply.quantity_info else 0
+            }
+
+            # Update supply fields
+            supply.supply_name = request.POST.get('supply_name')
+            supply.description = request.POST.get('description')
+            supply.unit = request.POST.get('unit') or None
+            supply.available_for_request = request.POST.get('available_for_request') == 'on'
+            
+            # Handle category and subcategory
+            category_id = request.POST.get('category')
+            subcategory_id = request.POST.get('subcategory')
+            
+            if category_id:
+                supply.category = get_object_or_404(SupplyCategory, id=category_id)
+            else:
+                supply.category = None
+                
+            if subcategory_id:
+                supply.subcategory = get_object_or_404(SupplySubcategory, id=subcategory_id)
+            else:
+                supply.subcategory = None
+                
+            supply.date_received = request.POST.get('date_received')
+            supply.expiration_date = request.POST.get('expiration_date') or None
+            
+            # Only update minimum_threshold, NOT current_quantity
+            minimum_threshold = int(request.POST.get('minimum_threshold', 0))
+            
+            if not supply.quantity_info:
+                # Create new quantity info, set current_quantity to 0 by default
+                quantity_info = SupplyQuantity(
+                    supply=supply,
+                    current_quantity=0,
+                    minimum_threshold=minimum_threshold
+                )
+                quantity_info.save(user=request.user)
+            else:
+                # Only update minimum_threshold
+                supply.quantity_info.minimum_threshold = minimum_threshold
+                supply.quantity_info.save(user=request.user)
+            
+            # Save supply with user information
+            supply.save(user=request.user)
+
+            # Create activity log for the update
+            changes = []
+            for field, old_value in old_values.items():
+                if field == 'minimum_threshold':
+                    new_value = minimum_threshold
+                elif field == 'current_quantity':
+                    new_value = old_value  # current_quantity is not changed here
+                else:
+                    new_value = getattr(supply, field)
+                if str(old_value) != str(new_value):
+                    changes.append(f"{field}: {old_value} → {new_value}")
+
+            if changes:
+                ActivityLog.log_activity(
+                    user=request.user,
+                    action='update',
+                    model_name='Supply',
+                    object_repr=str(supply),
+                    description=f"Updated supply '{supply.supply_name}'. Changes: {', '.join(changes)}"
+                )
+
+            messages.success(request, 'Supply updated successfully!')
+            return redirect('supply_list')
+        except Exception as e:
+            messages.error(request, f'Error updating supply: {str(e)}')
+            return redirect('supply_list')
+    return JsonResponse({'error': 'Invalid request method'}, status=400)
+
+
+@permission_required('app.view_admin_module')
+def delete_supply(request, pk):
+    supply = get_object_or_404(Supply, pk=pk)
+    if request.method == 'POST':
+        supply_name = supply.supply_name
+        repr_str = str(supply)
+        supply._logged_in_user = request.user
+        supply.delete()
+
+        ActivityLog.objects.create(
+            user=request.user,
+            action='delete',
+            model_name='Supply',
+            object_repr=repr_str,
+            description=f"Supply '{supply_name}' was deleted."
+        )
+        messages.success(request, 'Supply deleted successfully.')
+    return redirect('supply_list')
+
+
+@permission_required('app.view_admin_module')
+@require_POST
+@admin_permission_required('report_bad_stock')
+def report_bad_stock(request):
+    """Handle bad stock report submission via AJAX"""
+    try:
+        form = BadStockReportForm(request.POST)
+        if form.is_valid():
+            bad_stock = form.save(commit=False)
+            bad_stock.reported_by = request.user
+            bad_stock.save()
+            
+            return JsonResponse({
+                'success': True,
+                'message': f'Successfully removed {bad_stock.quantity_removed} units of {bad_stock.supply.supply_name} from inventory.'
+            })
+        else:
+            errors = {}
+            for field, error_list in form.errors.items():
+                errors[field] = error_list[0]
+            return JsonResponse({
+                'success': False,
+                'errors': errors
+            })
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': 'An unexpected error occurred. Please try again.'
+        })
+
+
+@permission_required('app.view_admin_module')
+def bad_stock_list(request):
+    """Return list of bad stock reports as JSON for datatable"""
+    reports = BadStockReport.objects.select_related(
+        'supply', 'reported_by'
+    ).order_by('-reported_at')
+    
+    # Apply filters if provided
+    supply_id = request.GET.get('supply_id')
+    if supply_id:
+        reports = reports.filter(supply_id=supply_id)
+    
+    date_from = request.GET.get('date_from')
+    if date_from:
+        reports = reports.filter(reported_at__gte=date_from)
+    
+    date_to = request.GET.get('date_to')
+    if date_to:
+        reports = reports.filter(reported_at__lte=date_to)
+    
+    data = []
+    for report in reports:
+        data.append({
+            'id': report.id,
+            'supply_name': report.supply.supply_name,
+            'quantity_removed': report.quantity_removed,
+            'remarks': report.remarks,
+            'reported_by': report.reported_by.get_full_name() or report.reported_by.username if report.reported_by else 'Unknown',
+            'reported_at': report.reported_at.strftime('%Y-%m-%d %H:%M:%S')
+        })
+    
+    return JsonResponse({'data': data})
+
+
+class PropertyListView(PermissionRequiredMixin, ListView):
+    model = Property
+    template_name = 'app/property.html'
+    context_object_name = 'properties'
+    permission_required = 'app.view_admin_module'
+    paginate_by = 15
+
+    def get_queryset(self):
+        queryset = Property.objects.filter(is_archived=False).select_related('category').order_by('property_name')
+        
+        # Apply search filter
+        search_query = self.request.GET.get('search')
+        if search_query:
+            queryset = queryset.filter(
+                Q(property_name__icontains=search_query) |
+                Q(description__icontains=search_query) |
+                Q(category__name__icontains=search_query) |
+                Q(property_number__icontains=search_query) |
+                Q(barcode__icontains=search_query)
+            )
+        
+        # Apply category filter (support multiple categories)
+        category_filters = self.request.GET.getlist('category')
+        if category_filters:
+            queryset = queryset.filter(category__name__in=category_filters)
+        
+        # Apply availability filter
+        availability_filter = self.request.GET.get('availability')
+        if availability_filter == 'available':
+            queryset = queryset.filter(availability='available')
+        elif availability_filter == 'not_available':
+            queryset = queryset.exclude(availability='available')
+        
+        # Apply condition filter (support multiple conditions)
+        condition_filters = self.request.GET.getlist('condition')
+        if condition_filters:
+            queryset = queryset.filter(condition__in=condition_filters)
+        
+        # Apply price range filter
+        price_range_filter = self.request.GET.get('priceRange')
+        if price_range_filter == 'below50000':
+            queryset = queryset.filter(unit_value__lt=50000)
+        elif price_range_filter == 'above50000':
+            queryset = queryset.filter(unit_value__gte=50000)
+        
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        
+        # Get the paginated properties from the parent context
+        properties = context['properties']
+        
+        # Ensure barcodes are generated for properties that don't have them
+        from ..utils import generate_barcode_image
+        for prop in properties:
+            if not prop.barcode or not prop.barcode_image:
+                barcode_text = prop.property_number if prop.property_number else f"PROP-{prop.id}"
+                prop.barcode = barcode_text
+                filename, content = generate_barcode_image(barcode_text)
+                prop.barcode_image.save(filename, content, save=False)
+                prop.save(update_fields=['barcode', 'barcode_image'])
+        
+        # Get all categories for the filter dropdown
+        context['categories'] = PropertyCategory.objects.all()
+        context['form'] = PropertyForm()
+        
+        # The Property Inventory modal dropdown lists ALL non-archived properties (not just paginated ones);
+        # it loads the cached catalog snapshot instead of rendering it into the page
+        context['catalog_url'] = catalog_url()
+        
+        # Add user permissions to context
+        permissions = has_admin_permissions(self.request.user, ['report_lost_items', 'manage_lost_items', 'edit_property'])
+        context['can_report_lost_items'] = permissions['report_lost_items']
+        context['can_manage_lost_items'] = permissions['manage_lost_items']
+        context['can_edit_property'] = permissions['edit_property']
+        
+        return context
+
+
+@require_POST
+def modify_supply_quantity_generic(request):
+    try:
+        supply_id = request.POST.get("supply_id")
+        if not supply_id:
+            return JsonResponse({
+                'success': False,
+                'error': 'Supply ID is required'
+            })
+
+        amount = int(request.POST.get("amount", 0))
+        supply = get_object_or_404(Supply, pk=supply_id)
+
+        quantity_info = supply.quantity_info
+        old_quantity = quantity_info.current_quantity
+
+        # Always add the quantity since we removed the action type selection
+        quantity_info.current_quantity += amount
+
+        # Update supply's available_for_request status
+        supply.available_for_request = (quantity_info.current_quantity > 0)
+        supply.save(user=request.user)
+
+        SupplyHistory.objects.create(
+            supply=supply,
+            user=request.user,
+            action='quantity_update',
+            field_name='quantity',
+            old_value=str(old_quantity),
+            new_value=str(quantity_info.current_quantity),
+            remarks=f"add {amount}"
+        )
+        
+        # Save with skip_history to avoid duplicate entry
+        quantity_info.save(skip_history=True)
+
+        # Add activity log
+        ActivityLog.log_activity(
+            user=request.user,
+            action='quantity_update',
+            model_name='Supply',
+            object_repr=str(supply),
+            description=f"Added {amount} units to supply '{supply.supply_name}'. Changed quantity from {old_quantity} to {quantity_info.current_quantity}"
+        )
+
+        messages.success(request, f"Quantity successfully added.")
+        
+        # Check if request expects JSON
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': True,
+                'message': 'Quantity updated successfully',
+                'new_quantity': quantity_info.current_quantity
+            })
+        return redirect('supply_list')
+
+    except SupplyQuantity.DoesNotExist:
+        error_msg = "Supply quantity information not found."
+        messages.error(request, error_msg)
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': False,
+                'error': error_msg
+            })
+        return redirect('supply_list')
+    except ValueError as e:
+        error_msg = str(e)
+        messages.error(request, error_msg)
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': False,
+                'error': error_msg
+            })
+        return redirect('supply_list')
+
+
+@permission_required('app.view_admin_module')
+def add_property(request):
+    if request.method == 'POST':
+        form = PropertyForm(request.POST)
+        if form.is_valid():
+            try:
+                # First save the property
+                prop = form.save(commit=False)
+                
+                # Get PPMP selections from POST data
+                ppmp_selections = request.POST.get('ppmp_selections', '[]')
+                try:
+                    import json
+                    ppmp_data = json.loads(ppmp_selections)
+                    prop.ppmp_references = ppmp_data
+                    
+                    # Calculate total PPMP allocated quantity
+                    total_ppmp_qty = sum(item.get('selectedQty', 0) for item in ppmp_data)
+                except (json.JSONDecodeError, ValueError):
+                    prop.ppmp_references = []
+                    total_ppmp_qty = 0
+                
+                # Set initial quantity: overall_quantity minus PPMP allocations
+                if not prop.pk:
+                    prop.quantity = form.cleaned_data['overall_quantity'] - total_ppmp_qty
+                    prop._quantity_already_set = True  # Flag to prevent model from overriding
+                
+                prop._logged_in_user = request.user
+                prop.save(user=request.user)  # Pass the user to save method
+
+                # Ensure barcode and barcode image are generated
+                if not prop.barcode or not prop.barcode_image:
+                    from ..utils import generate_barcode_image
+                    barcode_text = prop.property_number if prop.property_number else f"PROP-{prop.id}"
+                    prop.barcode = barcode_text
+                    filename, content = generate_barcode_image(barcode_text)
+                    prop.barcode_image.save(filename, content, save=False)
+                    prop.save(update_fields=['barcode', 'barcode_image'], user=request.user)
+                
+                # Process PPMP allocations and update PPMPItem released quantities
+                if ppmp_data:
+                    from ..models import PPMPItem, PropertyPPMPAllocation, Department, User
+                    from django.db.models import Q
+                    from django.core.mail import send_mail
+                    from django.template.loader import render_to_string
+                    from django.utils.html import strip_tags
+                    from django.conf import settings
+                    
+                    departments_notified = {}  # Track departments and their allocated items
+                    
+                    for selection in ppmp_data:
+                        try:
+                            # Use ppmp_item_id for direct lookup if available
+                            ppmp_item_id = selection.get('ppmp_item_id')
+                            ppmp_item = None
+                            
+                            if ppmp_item_id:
+                                ppmp_item = PPMPItem.objects.filter(id=ppmp_item_id).first()
+                            else:
+                                # Fallback: Find by department, year, and description
+                                department_name = selection.get('department', '')
+                                year = selection.get('year')
+                                item_name = selection.get('item_name', '')
+                                
+                                department = Department.objects.filter(name=department_name).first()
+                                if department:
+                                    ppmp_item = PPMPItem.objects.filter(
+                                        ppmp__department=department,
+                                        ppmp__year=year
+                                    ).filter(
+                                        Q(description__icontains=item_name) | 
+                                        Q(unit_measure__icontains=item_name)
+                                    ).first()
+                            
+                            if ppmp_item:
+                                # Create allocation record
+                                PropertyPPMPAllocation.objects.create(
+                                    property=prop,
+                                    ppmp_item=ppmp_item,
+                                    quantity_allocated=selection.get('selectedQty', 0),
+                                    allocated_by=request.user
+                                )
+                                
+                                # Update PPMP item released quantity
+                                ppmp_item.released = (ppmp_item.released or 0) + selection.get('selectedQty', 0)
+                                ppmp_item.save(update_fields=['released'])
+                                
+                                # Track departments for email notifications
+                                department = ppmp_item.ppmp.department
+                                dept_key = department.id
+                                if dept_key not in departments_notified:
+                                    departments_notified[dept_key] = {
+                                        'department': department,
+                                        'items': []
+                                    }
+                                departments_notified[dept_key]['items'].append({
+                                    'property_name': prop.property_name,
+                                    'property_number': prop.property_number or 'N/A',
+                                    'quantity': selection.get('selectedQty', 0),
+                                    'ppmp_year': ppmp_item.ppmp.year,
+                                    'ppmp_item': ppmp_item.description,
+                                    'remarks': prop.remarks or 'New property added to inventory'
+                                })
+                        except Exception as e:
+                            # Log error but don't fail the entire operation
+                            import logging
+                            logger = logging.getLogger(__name__)
+                            logger.warning(f"Error processing PPMP allocation: {e}")
+                    
+                    # Send email notifications to departments
+                    for dept_data in departments_notified.values():
+                        department = dept_data['department']
+                        items = dept_data['items']
+                        
+                        # Get all users from this department
+                        dept_users = User.objects.filter(
+                            userprofile__department=department,
+                            is_active=True
+                        ).exclude(email='')
+                        
+                        print(f"DEBUG: Found {dept_users.count()} users in department {department.name}")
+                        
+                        if dept_users.exists():
+                            # Prepare email context
+                            context = {
+                                'department_name': department.name,
+                                'items': items,
+                                'released_by': request.user.get_full_name() or request.user.username,
+                            }
+                            
+                            # Send email to each user in the department
+                            for user in dept_users:
+                                try:
+                                    print(f"DEBUG: Attempting to send email to {user.email}")
+                                    html_message = render_to_string('app/email/property_released_notification.html', {**context, 'user': user})
+                                    plain_message = strip_tags(html_message)
+                                    
+                                    send_mail(
+                                        subject=f'Property Ready for Claiming - {prop.property_name}',
+                                        message=plain_message,
+                                        from_email=settings.EMAIL_HOST_USER,
+                                        recipient_list=[user.email],
+                                        html_message=html_message,
+                                        fail_silently=False,
+                                    )
+                                    print(f"DEBUG: Email sent successfully to {user.email}")
+                                except Exception as e:
+                                    # Log the error for debugging
+                                    print(f"ERROR: Failed to send email to {user.email}: {str(e)}")
+                                    import traceback
+                                    traceback.print_exc()
+                
+                # Create activity log using log_activity method
+                ActivityLog.log_activity(
+                    user=request.user,
+                    action='create',
+                    model_name='Property',
+                    object_repr=str(prop),
+                    description=f"Added new property '{prop.property_name}' with property number {prop.property_number}, overall quantity {prop.overall_quantity}, and initial quantity {prop.quantity}"
+                )
+                messages.success(request, 'Property added successfully.')
+            except Exception as e:
+                # If anything goes wrong, delete the property to maintain data consistency
+                if 'prop' in locals() and prop.pk:
+                    prop.delete()
+                messages.error(request, f'Error adding property: {str(e)}')
+                return redirect('property_list')
+        else:
+            # Add form errors to messages
+            error_messages = []
+            for field, errors in form.errors.items():
+                for error in errors:
+                    error_messages.append(f"{field}: {error}")
+            messages.error(request, f'Please correct the following errors: {", ".join(error_messages)}')
+    return redirect('property_list')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@admin_permission_required('edit_property')
+def edit_property(request):
+    from ..models import PPMPItem, PropertyPPMPAllocation, Department
+    from django.db.models import Q
+    
+    if request.method == 'POST':
+        property_id = request.POST.get('id')
+        property_obj = get_object_or_404(Property, id=property_id)
+
+        try:
+            # Store old values for activity log
+            old_values = {
+                'property_number': property_obj.property_number,
+                'serial_number': property_obj.serial_number,
+                'property_name': property_obj.property_name,
+                'description': property_obj.description,
+                'barcode': property_obj.barcode,
+                'unit_of_measure': property_obj.unit_of_measure,
+                'unit_value': property_obj.unit_value,
+                'overall_quantity': property_obj.overall_quantity,
+                'quantity': property_obj.quantity,
+                'location': property_obj.location,
+                'accountable_person': property_obj.accountable_person,
+                'year_acquired': property_obj.year_acquired,
+                'condition': property_obj.condition,
+                'category': property_obj.category,
+                'availability': property_obj.availability
+            }
+
+            # Update property fields from POST data
+            property_number = request.POST.get('property_number')
+            # Convert empty string to None to avoid unique constraint issues
+            if property_number and property_number.strip():
+                property_obj.property_number = property_number.upper()
+            else:
+                property_obj.property_number = None
+            
+            # Update serial number
+            serial_number = request.POST.get('serial_number')
+            if serial_number and serial_number.strip():
+                property_obj.serial_number = serial_number.strip()
+            else:
+                property_obj.serial_number = None
+            
+            property_obj.property_name = request.POST.get('property_name')
+            property_obj.description = request.POST.get('description')
+            property_obj.barcode = request.POST.get('barcode')
+            property_obj.unit_of_measure = request.POST.get('unit_of_measure')
+
+            # Convert unit_value to float safely - only if provided
+            unit_value_str = request.POST.get('unit_value')
+            if unit_value_str is not None and unit_value_str != '':
+                try:
+                    new_unit_value = float(unit_value_str)
+                    property_obj.unit_value = new_unit_value
+                except (TypeError, ValueError):
+                    # Keep the existing value if conversion fails
+                    pass
+
+            # Convert overall_quantity to int safely
+            try:
+                property_obj.overall_quantity = int(request.POST.get('overall_quantity', 0))
+            except (TypeError, ValueError):
+                property_obj.overall_quantity = 0
+
+            property_obj.location = request.POST.get('location')
+            property_obj.accountable_person = request.POST.get('accountable_person')
+            
+            # Handle year_acquired date field
+            year_acquired_str = request.POST.get('year_acquired')
+            if year_acquired_str:
+                try:
+                    from datetime import datetime
+                    property_obj.year_acquired = datetime.strptime(year_acquired_str, '%Y-%m-%d').date()
+                except ValueError as e:
+                    property_obj.year_acquired = None
+            else:
+                property_obj.year_acquired = None
+
+            # Handle ForeignKey category assignment
+            category_id = request.POST.get('category')
+            if category_id:
+                property_obj.category = get_object_or_404(PropertyCategory, id=category_id)
+            else:
+                property_obj.category = None  # or keep existing?
+
+            # Handle condition and availability
+            new_condition = request.POST.get('condition')
+            property_obj.condition = new_condition
+
+            unavailable_conditions = ['Needing repair', 'Unserviceable', 'No longer needed', 'Obsolete']
+            if new_condition in unavailable_conditions:
+                property_obj.availability = 'not_available'
+            else:
+                # Only use submitted availability if condition allows it
+                property_obj.availability = request.POST.get('availability')
+
+            # Save the updated property, assuming your model's save method accepts user param
+            property_obj.save(user=request.user)
+            
+            # Handle PPMP selections if provided
+            ppmp_selections_json = request.POST.get('ppmp_selections', '[]')
+            if ppmp_selections_json and ppmp_selections_json != '[]':
+                try:
+                    ppmp_selections = json.loads(ppmp_selections_json)
+                    property_obj.ppmp_references = ppmp_selections
+                    property_obj.save(user=request.user)
+                    
+                    # Clear existing allocations for this property
+                    PropertyPPMPAllocation.objects.filter(property=property_obj).delete()
+                    
+                    # Create new allocations and update PPMPItem released quantities
+                    for selection in ppmp_selections:
+                        try:
+                            # Use ppmp_item_id for direct lookup if available
+                            ppmp_item_id = selection.get('ppmp_item_id')
+                            ppmp_item = None
+                            
+                            if ppmp_item_id:
+                                ppmp_item = PPMPItem.objects.filter(id=ppmp_item_id).first()
+                            else:
+                                # Fallback: Find by department, year, and description
+                                department_name = selection.get('department', '')
+                                year = selection.get('year')
+                                item_name = selection.get('item_name', '')
+                                
+                                department = Department.objects.filter(name=department_name).first()
+                                if department:
+                                    ppmp_item = PPMPItem.objects.filter(
+                                        ppmp__department=department,
+                                        ppmp__year=year
+                                    ).filter(
+                                        Q(description__icontains=item_name) | 
+                                        Q(unit_measure__icontains=item_name)
+                                    ).first()
+                            
+                            if ppmp_item:
+                                # Create allocation record
+                                PropertyPPMPAllocation.objects.create(
+                                    property=property_obj,
+                                    ppmp_item=ppmp_item,
+                                    quantity_allocated=selection.get('selectedQty', 0),
+                                    allocated_by=request.user
+                                )
+                                
+                                # Update PPMPItem released quantity
+                                ppmp_item.released = (ppmp_item.released or 0) + selection.get('selectedQty', 0)
+                                ppmp_item.save()
+                        except Exception as e:
+                            print(f"Error creating PPMP allocation: {e}")
+                            # Continue with other allocations even if one fails
+                except json.JSONDecodeError as e:
+                    print(f"Error parsing PPMP selections JSON: {e}")
+            
+            # Debug: Print the saved values
+            print(f"DEBUG: After save - accountable_person: '{property_obj.accountable_person}'")
+            print(f"DEBUG: After save - year_acquired: '{property_obj.year_acquired}'")
+
+            # Create activity log for changes
+            changes = []
+            for field, old_value in old_values.items():
+                new_value = getattr(property_obj, field)
+                # For category FK, compare by id or name for clarity
+                if field == 'category':
+                    old_val_repr = old_value.name if old_value else 'None'
+                    new_val_repr = new_value.name if new_value else 'None'
+                    if old_val_repr != new_val_repr:
+                        changes.append(f"category: {old_val_repr} → {new_val_repr}")
+                else:
+                    if str(old_value) != str(new_value):
+                        if field == 'overall_quantity':
+                            changes.append(f"overall quantity: {old_value} → {new_value} (current quantity updated accordingly)")
+                        elif field == 'quantity_per_physical_count':
+                            changes.append(f"quantity per physical count: {old_value} → {new_value}")
+                        elif field == 'condition' and new_value in unavailable_conditions:
+                            changes.append(f"condition: {old_value} → {new_value} (automatically set availability to Not Available)")
+                        else:
+                            changes.append(f"{field.replace('_', ' ')}: {old_value} → {new_value}")
+
+            if changes:
+                ActivityLog.log_activity(
+                    user=request.user,
+                    action='update',
+                    model_name='Property',
+                    object_repr=str(property_obj),
+                    description=f"Updated property '{property_obj.property_name}'. Changes: {', '.join(changes)}"
+                )
+
+            messages.success(request, 'Property updated successfully!')
+
+        except Exception as e:
+            messages.error(request, f'Error updating property: {str(e)}')
+
+        return redirect('property_list')
+
+    return JsonResponse({'error': 'Invalid request method'}, status=400)
+
+
+@permission_required('app.view_admin_module')
+def change_property_number(request, pk):
+    """View to handle changing property numbers"""
+    property_obj = get_object_or_404(Property, pk=pk)
+    
+    if request.method == 'POST':
+        form = PropertyNumberChangeForm(request.POST, instance=property_obj)
+        if form.is_valid():
+            old_number = property_obj.property_number
+            new_number = form.cleaned_data['new_property_number']
+            
+            # Save with user context for proper history tracking
+            form.save(user=request.user)
+            
+            # Create specific activity log for property number change
+            ActivityLog.log_activity(
+                user=request.user,
+                action='update',
+                model_name='Property',
+                object_repr=str(property_obj),
+                description=f"Changed property number from '{old_number}' to '{new_number}' for property '{property_obj.property_name}'"
+            )
+            
+            return JsonResponse({
+                'success': True, 
+                'message': f'Property number changed from {old_number} to {new_number}',
+                'new_number': new_number,
+                'old_number': old_number
+            })
+        else:
+            return JsonResponse({
+                'success': False, 
+                'errors': form.errors
+            })
+    
+    else:
+        form = PropertyNumberChangeForm(instance=property_obj)
+    
+    # For GET requests or form errors, return the form data
+    return JsonResponse({
+        'success': False,
+        'message': 'Invalid request method' if request.method != 'POST' else 'Form validation failed'
+    })
+
+
+@permission_required('app.view_admin_module')
+def delete_property(request, pk):
+    prop = get_object_or_404(Property, pk=pk)
+    if request.method == 'POST':
+        prop_name = prop.property_name
+        repr_str = str(prop)
+        prop._logged_in_user = request.user
+        prop.delete()
+
+        ActivityLog.objects.create(
+            user=request.user,
+            action='delete',
+            model_name='Property',
+            object_repr=repr_str,
+            description=f"Property '{prop_name}' was deleted."
+        )
+
+        messages.success(request, 'Property deleted successfully.')
+    return redirect('property_list')
+
+
+@permission_required('app.view_admin_module')
+@require_POST
+def admin_mark_property_damaged(request, property_id):
+    """
+    View for admins to mark a property as damaged directly.
+    Creates a damage report and immediately marks the property as damaged.
+    """
+    from ..forms import AdminDamageReportForm
+    
+    property_obj = get_object_or_404(Property, id=property_id)
+    
+    # Check if item is already damaged or lost
+    if property_obj.condition in ['Needing repair', 'Unserviceable', 'Lost']:
+        return JsonResponse({
+            'success': False,
+            'message': f'This item is already marked as "{property_obj.get_condition_display()}". Cannot submit duplicate damage report.'
+        }, status=400)
+    
+    form = AdminDamageReportForm(request.POST, request.FILES)
+    
+    if form.is_valid():
+        damage_report = form.save(commit=False)
+        damage_report.user = request.user  # Admin is the reporter
+        damage_report.item = property_obj  # Set the property
+        damage_report.status = 'approved'  # Automatically approved since admin created it
+        damage_report.save()
+        
+        # Immediately mark the property as damaged
+        property_obj.condition = 'Needing repair'
+        property_obj.availability = 'not_available'
+        property_obj.save(user=request.user)
+        
+        # Log the activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='report',
+            model_name='DamageReport',
+            object_repr=str(property_obj.property_name),
+            description=f"Admin marked property '{property_obj.property_name}' as damaged and moved to Damage Items. Reason: {damage_report.description[:100]}..."
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Property marked as damaged and moved to Damage Items successfully.',
+            'damage_report_id': damage_report.id
+        })
+    else:
+        return JsonResponse({
+            'success': False,
+            'errors': form.errors
+        }, status=400)
+
+
+@require_POST
+@permission_required('app.view_admin_module')
+@admin_permission_required('report_lost_items')
+def report_lost_item(request, property_id):
+    """
+    View for admins to report a property as lost.
+    When admin directly reports via this endpoint, it immediately marks as Lost without verification.
+    Creates a lost item report and marks the property condition as Lost.
+    """
+    from ..forms import LostItemForm
+    
+    property_obj = get_object_or_404(Property, id=property_id)
+    
+    # Check if item is already lost
+    if property_obj.condition == 'Lost':
+        return JsonResponse({
+            'success': False,
+            'message': 'This item is already marked as "Lost". Cannot submit duplicate lost item report.'
+        }, status=400)
+    
+    form = LostItemForm(request.POST, request.FILES)
+    
+    if form.is_valid():
+        lost_item = form.save(commit=False)
+        lost_item.user = request.user  # Admin is the reporter
+        lost_item.item = property_obj  # Set the property
+        
+        # Skip automatic status changes since admin is directly marking it
+        lost_item.save(skip_auto_status=True)
+        
+        # Admin directly reporting - immediately mark as Lost without verification needed
+        property_obj.condition = 'Lost'
+        property_obj.availability = 'not_available'
+        property_obj.save(update_fields=['condition', 'availability'])
+        
+        # Log the activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='report',
+            model_name='LostItem',
+            object_repr=str(property_obj.property_name),
+            description=f"Admin directly reported and marked property '{property_obj.property_name}' as Lost (no verification needed). Description: {lost_item.description[:100]}..."
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Item successfully reported and marked as Lost by admin.',
+            'lost_item_id': lost_item.id
+        })
+    else:
+        return JsonResponse({
+            'success': False,
+            'errors': form.errors
+        }, status=400)
+
+
+@login_required
+@permission_required('app.view_admin_module')
+def get_all_properties(request):
+    """
+    API endpoint to get all properties for the lost item dropdown.
+    Returns all non-archived, available properties with distinct IDs.
+    """
+    properties = Property.objects.filter(
+        is_archived=False
+    ).values('id', 'property_name', 'property_number').distinct().order_by('property_name')
+    
+    properties_data = [{
+        'id': prop['id'],
+        'property_name': prop['property_name'],
+        'property_number': prop['property_number'] or 'N/A'
+    } for prop in properties]
+    
+    return JsonResponse({'properties': properties_data})
+
+
+def _catalog_etag(request):
+    return get_catalog_version()
+
+
+def _catalog_policy(request):
+    """A URL carrying the current version never changes; anything else is revalidated."""
+    return IMMUTABLE if request.GET.get('v') == get_catalog_version() else REVALIDATE
+
+
+@login_required
+@cache_policy(_catalog_policy, etag_func=_catalog_etag)
+def catalog_snapshot(request):
+    """
+    API endpoint returning the cached supply and property catalog for the
+    pickers (see app/catalog.py): {"supplies": [...], "properties": [...]}.
+    """
+    snapshot = get_catalog_snapshot()
+    response = HttpResponse(snapshot['body'], content_type='application/json')
+    response['ETag'] = f'"{snapshot["version"]}"'
+    return response
+
+
+@permission_required('app.view_admin_module')
+def add_property_category(request):
+    if request.method == 'POST':
+        name = request.POST.get('name')
+        uacs = request.POST.get('uacs')  # Get UACS field
+        
+        # Check if this is an AJAX request
+        is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        
+        if name:
+            # Check if category already exists
+            if PropertyCategory.objects.filter(name=name).exists():
+                if is_ajax:
+                    return JsonResponse({
+                        'success': False, 
+                        'error': f'Category "{name}" already exists.'
+                    })
+                else:
+                    messages.error(request, f'Category "{name}" already exists.')
+            else:
+                try:
+                    # Convert UACS to integer if provided, otherwise set to None
+                    uacs_value = None
+                    if uacs and uacs.strip():
+                        try:
+                            uacs_value = int(uacs)
+                        except ValueError:
+                            if is_ajax:
+                                return JsonResponse({
+                                    'success': False, 
+                                    'error': 'UACS must be a valid number.'
+                                })
+                            else:
+                                messages.error(request, 'UACS must be a valid number.')
+                                return redirect('add_property_category')
+                    
+                    category = PropertyCategory.objects.create(name=name, uacs=uacs_value)
+                    
+                    # Log the activity
+                    ActivityLog.log_activity(
+                        user=request.user,
+                        action='create',
+                        model_name='PropertyCategory',
+                        object_repr=str(category),
+                        description=f"Added new property category '{name}'" + (f" with UACS {uacs_value}" if uacs_value else "")
+                    )
+                    
+                    if is_ajax:
+                        return JsonResponse({
+                            'success': True, 
+                            'message': 'Category added successfully.',
+                            'category': {
+                                'id': category.id,
+                                'name': category.name,
+                                'uacs': category.uacs
+                            }
+                        })
+                    else:
+                        messages.success(request, 'Category added successfully.')
+                except Exception as e:
+                    if is_ajax:
+                        return JsonResponse({
+                            'success': False, 
+                            'error': f'Error adding category: {str(e)}'
+                        })
+                    else:
+                        messages.error(request, f'Error adding category: {str(e)}')
+        else:
+            if is_ajax:
+                return JsonResponse({
+                    'success': False, 
+                    'error': 'Category name is required.'
+                })
+            else:
+                messages.error(request, 'Category name is required.')
+    
+    return redirect('property_list')
+
+
+@login_required
+def get_property_categories(request):
+    """Return all property categories as JSON for dropdown updates"""
+    categories = PropertyCategory.objects.all().order_by('name')
+    categories_data = [
+        {'id': category.id, 'name': category.name}
+        for category in categories
+    ]
+    return JsonResponse({'categories': categories_data})
+
+
+HISTORY_PAGE_SIZE = 50
+
+
+HISTORY_MAX_PAGE_SIZE = 200
+
+
+def _history_page_size(request):
+    """Page size for the history APIs from ?limit=, clamped to HISTORY_MAX_PAGE_SIZE."""
+    try:
+        limit = int(request.GET.get('limit', HISTORY_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return HISTORY_PAGE_SIZE
+    return min(max(limit, 1), HISTORY_MAX_PAGE_SIZE)
+
+
+def _supply_history_etag(request, supply_id):
+    """ETag for the supply history JSON: changes whenever a history row is added or the supply is edited."""
+    row = Supply.objects.filter(id=supply_id).annotate(
+        history_count=Count('history'),
+        history_max_id=Max('history__id'),
+    ).values('supply_name', 'last_updated', 'history_count', 'history_max_id').first()
+    if not row:
+        return None
+    return hashlib.md5(repr(sorted(row.items())).encode()).hexdigest()
+
+
+@login_required
+@cache_policy(REVALIDATE, etag_func=_supply_history_etag)
+def get_supply_history(request, supply_id):
+    try:
+        supply = get_object_or_404(Supply, id=supply_id)
+        # One keyset page (newest first); the client follows next_cursor to load older entries
+        history = keyset_paginate(
+            supply.history.select_related('user'),
+            request.GET.get('cursor'),
+            page_size=_history_page_size(request),
+        )
+        
+        def get_field_display_name(field_name):
+            """Convert field names to user-friendly display names"""
+            field_mapping = {
+                'supply_name': 'Supply Name',
+                'category': 'Category',
+                'subcategory': 'Subcategory',
+                'description': 'Description',
+                'minimum_threshold': 'Minimum Threshold',
+                'current_quantity': 'Current Quantity',
+                'available_for_request': 'Available for Request',
+                'date_received': 'Date Received',
+                'expiration_date': 'Expiration Date',
+                'initial_creation': 'Supply Creation'
+            }
+            return field_mapping.get(field_name, field_name.replace('_', ' ').title())
+        
+        def get_action_display(action):
+            """Convert action codes to user-friendly display names"""
+            action_mapping = {
+                'create': 'Created',
+                'update': 'Updated',
+                'quantity_update': 'Quantity Changed'
+            }
+            return action_mapping.get(action, action.replace('_', ' ').title())
+        
+        def format_change_description(entry):
+            """Create a descriptive change summary"""
+            try:
+                field_display = get_field_display_name(entry.field_name)
+                
+                if entry.action == 'create':
+                    return f"Supply was created in the system"
+                elif entry.action == 'quantity_update':
+                    if entry.remarks:
+                        return f"{field_display}: {entry.remarks}"
+                    else:
+                        return f"{field_display} was modified"
+                elif entry.action == 'update':
+                    if entry.field_name == 'available_for_request':
+                        old_display = 'Available' if entry.old_value == 'True' else 'Not Available'
+                        new_display = 'Available' if entry.new_value == 'True' else 'Not Available'
+                        return f"Availability changed from '{old_display}' to '{new_display}'"
+                    elif entry.field_name == 'category':
+                        return f"Category changed from '{entry.old_value or 'None'}' to '{entry.new_value or 'None'}'"
+                    elif entry.field_name == 'subcategory':
+                        return f"Subcategory changed from '{entry.old_value or 'None'}' to '{entry.new_value or 'None'}'"
+                    elif entry.field_name == 'current_quantity':
+                        return f"Current Quantity changed from {entry.old_value or '0'} to {entry.new_value or '0'}"
+                    elif entry.field_name == 'minimum_threshold':
+                        return f"Minimum Threshold changed from {entry.old_value or '0'} to {entry.new_value or '0'}"
+                    elif 'quantity' in entry.field_name:
+                        return f"{field_display} changed from {entry.old_value or '0'} to {entry.new_value or '0'}"
+                    else:
+                        return f"{field_display} was updated"
+                else:
+                    return f"{field_display} was modified"
+            except Exception as e:
+                return f"Supply change recorded"
+        
+        def format_value_change(entry):
+            """Format the value change display"""
+            try:
+                if entry.action == 'create':
+                    return entry.new_value if entry.new_value else 'Supply created'
+                elif entry.old_value and entry.new_value and entry.old_value != entry.new_value:
+                    # Handle special formatting for different field types
+                    if 'quantity' in entry.field_name:
+                        return f"{entry.old_value} → {entry.new_value}"
+                    elif entry.field_name == 'available_for_request':
+                        old_display = 'Available' if entry.old_value == 'True' else 'Not Available'
+                        new_display = 'Available' if entry.new_value == 'True' else 'Not Available'
+                        return f"{old_display} → {new_display}"
+                    else:
+                        # Escape HTML and limit length for long values
+                        old_val = str(entry.old_value)[:100] + ('...' if len(str(entry.old_value)) > 100 else '')
+                        new_val = str(entry.new_value)[:100] + ('...' if len(str(entry.new_value)) > 100 else '')
+                        return f"{old_val} → {new_val}"
+                elif entry.new_value:
+                    new_val = str(entry.new_value)[:100] + ('...' if len(str(entry.new_value)) > 100 else '')
+                    return f"Set to: {new_val}"
+                elif entry.old_value:
+                    # Field was cleared/removed
+                    if 'quantity' in entry.field_name.lower():
+                        return f"{entry.old_value} → 0"
+                    else:
+                        old_val = str(entry.old_value)[:100] + ('...' if len(str(entry.old_value)) > 100 else '')
+                        return f"Removed: {old_val}"
+                else:
+                    return "No value change"
+            except Exception as e:
+                return "Value changed"
+        
+        history_data = []
+        for entry in history:
+            try:
+                # Format timestamp for better readability
+                formatted_date = entry.timestamp.strftime('%m/%d/%Y')
+                formatted_time = entry.timestamp.strftime('%I:%M %p')
+                formatted_datetime = f"{formatted_date}<br><small style='color: #6c757d;'>{formatted_time}</small>"
+                
+                history_data.append({
+                    'id': entry.id,
+                    'datetime': formatted_datetime,
+                    'action': entry.action,
+                    'action_display': get_action_display(entry.action),
+                    'field_name': entry.field_name,
+                    'field_display': get_field_display_name(entry.field_name),
+                    'old_value': entry.old_value if entry.old_value is not None else '',
+                    'new_value': entry.new_value if entry.new_value is not None else '',
+                    'value_change': format_value_change(entry),
+                    'change_description': format_change_description(entry),
+                    'user': entry.user.get_full_name() if entry.user and entry.user.get_full_name() else (entry.user.username if entry.user else 'System'),
+                    'remarks': entry.remarks if entry.remarks else '',
+                    'timestamp_iso': entry.timestamp.isoformat(),
+                    'raw_timestamp': entry.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                    # Debug information
+                    'debug_field': entry.field_name,
+                    'debug_old': entry.old_value,
+                    'debug_new': entry.new_value
+                })
+            except Exception as e:
+                # Log error but continue processing other entries
+                print(f"Error processing supply history entry {entry.id}: {str(e)}")
+                continue
+        
+        return JsonResponse({
+            'success': True,
+            'history': history_data,
+            'supply_name': supply.supply_name,
+            'supply_id': supply.id,
+            'next_cursor': history.next_cursor,
+            'has_more': history.has_next
+        })
+        
+    except Supply.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': 'Supply not found'
+        }, status=404)
+    except Exception as e:
+        print(f"Error in get_supply_history: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': 'An error occurred while fetching supply history'
+        }, status=500)
+
+
+@login_required
+def get_supply_quantity_activity(request, supply_id):
+    """
+    Fetch quantity change activity for a specific supply.
+    Returns JSON with quantity-related history entries only.
+    Supports filtering by user, date range, month, and activity type.
+    """
+    try:
+        supply = get_object_or_404(Supply, id=supply_id)
+        
+        # Get filter parameters
+        user_filter = request.GET.get('user_filter', 'all')
+        activity_type_filter = request.GET.get('activity_type_filter', 'all')
+        date_filter_type = request.GET.get('date_filter_type', 'all')
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
+        month = request.GET.get('month')
+        year = request.GET.get('year')
+        
+        # Filter history for quantity-related changes only
+        quantity_history = supply.history.filter(
+            field_name__in=['quantity', 'current_quantity', 'initial_quantity']
+        ).order_by('-timestamp')
+        
+        # Apply user filter (filter by requestor name in remarks)
+        if user_filter != 'all' and user_filter:
+            # Filter by requestor name mentioned in remarks
+            quantity_history = quantity_history.filter(remarks__icontains=f'Supply request by {user_filter}')
+        
+        # Apply activity type filter
+        if activity_type_filter != 'all':
+            if activity_type_filter == 'supply_request':
+                quantity_history = quantity_history.filter(remarks__icontains='Supply request by')
+            elif activity_type_filter == 'manual':
+                quantity_history = quantity_history.exclude(remarks__icontains='Supply request by').exclude(action='create')
+            elif activity_type_filter == 'addition':
+                # For additions, we need to check if new_value > old_value
+                addition_entries = []
+                for entry in quantity_history:
+                    old_qty = int(entry.old_value) if entry.old_value and entry.old_value.isdigit() else 0
+                    new_qty = int(entry.new_value) if entry.new_value and entry.new_value.isdigit() else 0
+                    if entry.action == 'create' or new_qty > old_qty:
+                        addition_entries.append(entry.id)
+                quantity_history = quantity_history.filter(id__in=addition_entries)
+            elif activity_type_filter == 'deduction':
+                # For deductions, we need to check if new_value < old_value
+                deduction_entries = []
+                for entry in quantity_history:
+                    old_qty = int(entry.old_value) if entry.old_value and entry.old_value.isdigit() else 0
+                    new_qty = int(entry.new_value) if entry.new_value and entry.new_value.isdigit() else 0
+                    if entry.action != 'create' and new_qty < old_qty:
+                        deduction_entries.append(entry.id)
+                quantity_history = quantity_history.filter(id__in=deduction_entries)
+        
+        # Apply date filters
+        if date_filter_type == 'date_range' and start_date and end_date:
+            try:
+                from datetime import datetime
+                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+                end_dt = datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+                quantity_history = quantity_history.filter(
+                    timestamp__range=[start_dt, end_dt]
+                )
+            except ValueError:
+                pass  # Invalid date format, ignore filter
+        elif date_filter_type == 'month' and month and year:
+            try:
+                month_int = int(month)
+                year_int = int(year)
+                quantity_history = quantity_history.filter(
+                    timestamp__year=year_int,
+                    timestamp__month=month_int
+                )
+            except ValueError:
+                pass  # Invalid month or year, ignore filter
+        
+        # Extract unique requestor names from remarks (e.g., "Supply request by john vales (Batch #4)")
+        import re
+        
+        request_entries = supply.history.filter(
+            field_name__in=['quantity', 'current_quantity', 'initial_quantity'],
+            remarks__icontains='Supply request by'
+        )
+        
+        requestor_names = set()
+        for entry in request_entries:
+            if entry.remarks and 'Supply request by' in entry.remarks:
+                # Extract requestor name using regex pattern
+                # Pattern matches "Supply request by [name] (" or "Supply request by [name]" at end
+                match = re.search(r'Supply request by ([^(]+?)(?:\s*\(|$)', entry.remarks)
+                if match:
+                    requestor_name = match.group(1).strip()
+                    if requestor_name:
+                        requestor_names.add(requestor_name)
+        
+        # Create users_data with requestor names
+        users_data = []
+        for name in sorted(requestor_names):
+            users_data.append({
+                'id': name,  # Use name as ID since we're filtering by name
+                'name': name,
+                'username': name
+            })
+        
+        activity_data = []
+        for entry in quantity_history:
+            try:
+                # Calculate quantity change
+                old_qty = int(entry.old_value) if entry.old_value and entry.old_value.isdigit() else 0
+                new_qty = int(entry.new_value) if entry.new_value and entry.new_value.isdigit() else 0
+                quantity_change = new_qty - old_qty
+                
+                # Determine action type based on change and remarks
+                if entry.action == 'create':
+                    action_type = 'Initial Creation'
+                    quantity_change = new_qty  # For creation, the change is the initial amount
+                elif 'Supply request by' in (entry.remarks or ''):
+                    action_type = 'Supply Request'
+                    # Keep the original quantity_change calculation
+                elif quantity_change > 0:
+                    action_type = 'Addition'
+                elif quantity_change < 0:
+                    action_type = 'Deduction'
+                else:
+                    action_type = 'Adjustment'
+                
+                activity_data.append({
+                    'id': entry.id,
+                    'date': entry.timestamp.isoformat(),
+                    'action': action_type,
+                    'quantity_change': quantity_change,
+                    'previous_quantity': old_qty,
+                    'new_quantity': new_qty,
+                    'user': entry.user.get_full_name() if entry.user and entry.user.get_full_name() else (entry.user.username if entry.user else 'System'),
+                    'user_id': entry.user.id if entry.user else None,
+                    'remarks': entry.remarks if entry.remarks else '',
+                    'timestamp': entry.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+                })
+            except Exception as e:
+                print(f"Error processing quantity activity entry {entry.id}: {str(e)}")
+                continue
+        
+        return JsonResponse({
+            'success': True,
+            'activity': activity_data,
+            'users': users_data,
+            'supply_name': supply.supply_name,
+            'supply_id': supply.id,
+            'total_entries': len(activity_data),
+            'filters_applied': {
+                'user_filter': user_filter,
+                'activity_type_filter': activity_type_filter,
+                'date_filter_type': date_filter_type
+            }
+        })
+        
+    except Supply.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': 'Supply not found'
+        }, status=404)
+    except Exception as e:
+        print(f"Error in get_supply_quantity_activity: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': 'An error occurred while fetching quantity activity'
+        }, status=500)
+
+
+def _property_history_etag(request, property_id):
+    """ETag for the property history JSON: every property edit also writes a history row."""
+    row = Property.objects.filter(id=property_id).annotate(
+        history_count=Count('history'),
+        history_max_id=Max('history__id'),
+    ).values('property_name', 'property_number', 'history_count', 'history_max_id').first()
+    if not row:
+        return None
+    return hashlib.md5(repr(sorted(row.items())).encode()).hexdigest()
+
+
+@login_required
+@cache_policy(REVALIDATE, etag_func=_property_history_etag)
+def get_property_history(request, property_id):
+    try:
+        property_obj = get_object_or_404(Property, id=property_id)
+        # One keyset page (newest first); the client follows next_cursor to load older entries
+        history = keyset_paginate(
+            property_obj.history.select_related('user'),
+            request.GET.get('cursor'),
+            page_size=_history_page_size(request),
+        )
+        
+        def get_field_display_name(field_name):
+            """Convert field names to user-friendly display names"""
+            field_mapping = {
+                'property_number': 'Property Number',
+                'property_name': 'Property Name',
+                'category': 'Category',
+                'description': 'Description',
+                'barcode': 'Barcode',
+                'unit_of_measure': 'Unit of Measure',
+                'unit_value': 'Unit Value',
+                'overall_quantity': 'Overall Quantity',
+                'quantity': 'Current Quantity',
+                'quantity_per_physical_count': 'Physical Count Quantity',
+                'location': 'Location',
+                'accountable_person': 'Accountable Person',
+                'year_acquired': 'Year Acquired',
+                'condition': 'Condition',
+                'availability': 'Availability',
+                'initial_creation': 'Property Creation'
+            }
+            return field_mapping.get(field_name, field_name.replace('_', ' ').title())
+        
+        def get_action_display(action):
+            """Convert action codes to user-friendly display names"""
+            action_mapping = {
+                'create': 'Created',
+                'update': 'Updated',
+                'quantity_update': 'Quantity Changed'
+            }
+            return action_mapping.get(action, action.replace('_', ' ').title())
+        
+        def format_change_description(entry):
+            """Create a descriptive change summary"""
+            try:
+                field_display = get_field_display_name(entry.field_name)
+                
+                if entry.action == 'create':
+                    return f"Property was created in the system"
+                elif entry.action == 'quantity_update':
+                    if entry.remarks:
+                        return f"{field_display}: {entry.remarks}"
+                    else:
+                        return f"{field_display} was modified"
+                elif entry.action == 'update':
+                    if entry.field_name == 'condition':
+                        return f"Condition changed from '{entry.old_value}' to '{entry.new_value}'"
+                    elif entry.field_name == 'availability':
+                        old_display = 'Available' if entry.old_value == 'available' else 'Not Available'
+                        new_display = 'Available' if entry.new_value == 'available' else 'Not Available'
+                        return f"Availability changed from '{old_display}' to '{new_display}'"
+                    elif entry.field_name == 'category':
+                        return f"Category changed from '{entry.old_value or 'None'}' to '{entry.new_value or 'None'}'"
+                    elif entry.field_name == 'quantity_per_physical_count':
+                        return f"Physical Count Quantity changed from {entry.old_value or '0'} to {entry.new_value or '0'}"
+                    elif entry.field_name == 'overall_quantity':
+                        return f"Overall Quantity changed from {entry.old_value or '0'} to {entry.new_value or '0'}"
+                    elif entry.field_name == 'quantity':
+                        return f"Current Quantity changed from {entry.old_value or '0'} to {entry.new_value or '0'}"
+                    elif 'quantity' in entry.field_name:
+                        return f"{field_display} changed from {entry.old_value or '0'} to {entry.new_value or '0'}"
+                    else:
+                        return f"{field_display} was updated"
+                else:
+                    return f"{field_display} was modified"
+            except Exception as e:
+                return f"Property change recorded"
+        
+        def format_value_change(entry):
+            """Format the value change display"""
+            try:
+                if entry.action == 'create':
+                    return entry.new_value if entry.new_value else 'Property created'
+                elif entry.old_value and entry.new_value and entry.old_value != entry.new_value:
+                    # Handle special formatting for different field types
+                    if entry.field_name == 'unit_value':
+                        try:
+                            old_val = f"₱{float(entry.old_value):,.2f}"
+                            new_val = f"₱{float(entry.new_value):,.2f}"
+                            return f"{old_val} → {new_val}"
+                        except (ValueError, TypeError):
+                            return f"{entry.old_value} → {entry.new_value}"
+                    elif 'quantity' in entry.field_name:
+                        return f"{entry.old_value} → {entry.new_value}"
+                    elif entry.field_name == 'availability':
+                        old_display = 'Available' if entry.old_value == 'available' else 'Not Available'
+                        new_display = 'Available' if entry.new_value == 'available' else 'Not Available'
+                        return f"{old_display} → {new_display}"
+                    else:
+                        # Escape HTML and limit length for long values
+                        old_val = str(entry.old_value)[:100] + ('...' if len(str(entry.old_value)) > 100 else '')
+                        new_val = str(entry.new_value)[:100] + ('...' if len(str(entry.new_value)) > 100 else '')
+                        return f"{old_val} → {new_val}"
+                elif entry.new_value:
+                    new_val = str(entry.new_value)[:100] + ('...' if len(str(entry.new_value)) > 100 else '')
+                    return f"Set to: {new_val}"
+                elif entry.old_value:
+                    # Field was cleared/removed
+                    # Only show "Removed" for fields where it makes sense (not quantities)
+                    if 'quantity' in entry.field_name.lower():
+                        return f"{entry.old_value} → 0"
+                    else:
+                        old_val = str(entry.old_value)[:100] + ('...' if len(str(entry.old_value)) > 100 else '')
+                        return f"Removed: {old_val}"
+                else:
+                    return "No value change"
+            except Exception as e:
+                return "Value changed"
+        
+        history_data = []
+        for entry in history:
+            try:
+                # Debug logging for quantity-related entries
+                if 'quantity' in entry.field_name.lower():
+                    print(f"DEBUG: Processing quantity entry - Field: {entry.field_name}, Old: {entry.old_value}, New: {entry.new_value}, Action: {entry.action}")
+                
+                # Format timestamp for better readability
+                formatted_date = entry.timestamp.strftime('%m/%d/%Y')
+                formatted_time = entry.timestamp.strftime('%I:%M %p')
+                formatted_datetime = f"{formatted_date}<br><small style='color: #6c757d;'>{formatted_time}</small>"
+                
+                history_data.append({
+                    'id': entry.id,
+                    'datetime': formatted_datetime,
+                    'action': entry.action,
+                    'action_display': get_action_display(entry.action),
+                    'field_name': entry.field_name,
+                    'field_display': get_field_display_name(entry.field_name),
+                    'old_value': entry.old_value if entry.old_value is not None else '',
+                    'new_value': entry.new_value if entry.new_value is not None else '',
+                    'value_change': format_value_change(entry),
+                    'change_description': format_change_description(entry),
+                    'user': entry.user.get_full_name() if entry.user and entry.user.get_full_name() else (entry.user.username if entry.user else 'System'),
+                    'remarks': entry.remarks if entry.remarks else '',
+                    'timestamp_iso': entry.timestamp.isoformat(),
+                    'raw_timestamp': entry.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                    # Debug information
+                    'debug_field': entry.field_name,
+                    'debug_old': entry.old_value,
+                    'debug_new': entry.new_value
+                })
+            except Exception as e:
+                # Log error but continue processing other entries
+                print(f"Error processing history entry {entry.id}: {str(e)}")
+                continue
+        
+        return JsonResponse({
+            'success': True,
+            'history': history_data,
+            'property_name': property_obj.property_name,
+            'property_number': property_obj.property_number,
+            'next_cursor': history.next_cursor,
+            'has_more': history.has_next
+        })
+        
+    except Property.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': 'Property not found'
+        }, status=404)
+    except Exception as e:
+        print(f"Error in get_property_history: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': 'An error occurred while fetching property history'
+        }, status=500)
+
+
+@require_POST
+def modify_supply_quantity_generic(request):
+    try:
+        supply_id = request.POST.get("supply_id")
+        if not supply_id:
+            return JsonResponse({
+                'success': False,
+                'error': 'Supply ID is required'
+            })
+
+        amount = int(request.POST.get("amount", 0))
+        supply = get_object_or_404(Supply, pk=supply_id)
+
+        quantity_info = supply.quantity_info
+        old_quantity = quantity_info.current_quantity
+
+        # Always add the quantity since we removed the action type selection
+        quantity_info.current_quantity += amount
+
+        # Update supply's available_for_request status
+        supply.available_for_request = (quantity_info.current_quantity > 0)
+        supply.save(user=request.user)
+
+        SupplyHistory.objects.create(
+            supply=supply,
+            user=request.user,
+            action='quantity_update',
+            field_name='quantity',
+            old_value=str(old_quantity),
+            new_value=str(quantity_info.current_quantity),
+            remarks=f"add {amount}"
+        )
+        
+        # Save with skip_history to avoid duplicate entry
+        quantity_info.save(skip_history=True)
+
+        # Add activity log
+        ActivityLog.log_activity(
+            user=request.user,
+            action='quantity_update',
+            model_name='Supply',
+            object_repr=str(supply),
+            description=f"Added {amount} units to supply '{supply.supply_name}'. Changed quantity from {old_quantity} to {quantity_info.current_quantity}"
+        )
+
+        messages.success(request, f"Quantity successfully added.")
+        
+        # Check if request expects JSON
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': True,
+                'message': 'Quantity updated successfully',
+                'new_quantity': quantity_info.current_quantity
+            })
+        return redirect('supply_list')
+
+    except SupplyQuantity.DoesNotExist:
+        error_msg = "Supply quantity information not found."
+        messages.error(request, error_msg)
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': False,
+                'error': error_msg
+            })
+        return redirect('supply_list')
+    except ValueError as e:
+        error_msg = str(e)
+        messages.error(request, error_msg)
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': False,
+                'error': error_msg
+            })
+        return redirect('supply_list')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def add_category(request):
+    if request.method == 'POST':
+        name = request.POST.get('name')
+        
+        if not name:
+            return JsonResponse({'success': False, 'error': 'Category name is required'})
+        
+        try:
+            category = SupplyCategory.objects.create(name=name)
+            return JsonResponse({
+                'success': True,
+                'category': {
+                    'id': category.id,
+                    'name': category.name
+                }
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def add_subcategory(request):
+    if request.method == 'POST':
+        name = request.POST.get('name')
+        
+        if not name:
+            return JsonResponse({'success': False, 'error': 'Name is required'})
+        
+        try:
+            subcategory = SupplySubcategory.objects.create(name=name)
+            return JsonResponse({
+                'success': True,
+                'subcategory': {
+                    'id': subcategory.id,
+                    'name': subcategory.name
+                }
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
+@login_required
+def get_subcategories(request):
+    category_id = request.GET.get('category_id')
+    if category_id:
+        subcategories = SupplySubcategory.objects.filter(category_id=category_id)
+        return JsonResponse({
+            'subcategories': [
+                {'id': sub.id, 'name': sub.name}
+                for sub in subcategories
+            ]
+        })
+    return JsonResponse({'subcategories': []})
+
+
+   #new
+@permission_required('app.view_admin_module')
+@login_required
+def update_property_category(request):
+    if request.method == 'POST':
+        category_id = request.POST.get('id')
+        new_name = request.POST.get('name')
+        new_uacs = request.POST.get('uacs')
+       
+        try:
+            category = PropertyCategory.objects.get(id=category_id)
+            old_name = category.name
+            old_uacs = category.uacs
+            
+            # Update name
+            category.name = new_name
+            
+            # Update UACS - convert to int if provided, otherwise set to None
+            if new_uacs and new_uacs.strip():
+                try:
+                    category.uacs = int(new_uacs)
+                except ValueError:
+                    return JsonResponse({'success': False, 'error': 'UACS must be a valid number'})
+            else:
+                category.uacs = None
+            
+            category.save()
+           
+            # Log the activity with details
+            changes = []
+            if old_name != new_name:
+                changes.append(f"name from '{old_name}' to '{new_name}'")
+            if old_uacs != category.uacs:
+                changes.append(f"UACS from '{old_uacs}' to '{category.uacs}'")
+            
+            description = f"Updated category {' and '.join(changes)}" if changes else f"Updated category '{category.name}'"
+            
+            ActivityLog.log_activity(
+                user=request.user,
+                action='update',
+                model_name='PropertyCategory',
+                object_repr=str(category),
+                description=description
+            )
+           
+            return JsonResponse({'success': True})
+        except PropertyCategory.DoesNotExist:
+            return JsonResponse({'success': False, 'error': 'Category not found'})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+           
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def delete_property_category(request, category_id):
+    if request.method == 'POST':
+        try:
+            category = PropertyCategory.objects.get(id=category_id)
+            category_name = category.name
+            category.delete()
+           
+            # Log the activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='delete',
+                model_name='PropertyCategory',
+                object_repr=category_name,
+                description=f"Deleted property category '{category_name}'"
+            )
+           
+            messages.success(request, 'Category deleted successfully.')
+        except PropertyCategory.DoesNotExist:
+            messages.error(request, 'Category not found.')
+        except Exception as e:
+            messages.error(request, f'Error deleting category: {str(e)}')
+           
+    return redirect('property_list')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def archive_supply(request, pk):
+    supply = get_object_or_404(Supply, pk=pk)
+    if request.method == 'POST':
+        # Allow archive if expired, otherwise only if quantity is zero
+        if not supply.is_expired and hasattr(supply, 'quantity_info') and supply.quantity_info.current_quantity > 0:
+            messages.error(request, f"Cannot archive supply '{supply.supply_name}' because it still has {supply.quantity_info.current_quantity} units.")
+            return redirect('supply_list')
+        
+        supply.is_archived = True
+        supply.save(user=request.user)
+        
+        ActivityLog.log_activity(
+            user=request.user,
+            action='archive',
+            model_name='Supply',
+            object_repr=str(supply),
+            description=f"Archived supply '{supply.supply_name}'"
+        )
+        messages.success(request, 'Supply archived successfully.')
+    return redirect('supply_list')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def unarchive_supply(request, pk):
+    supply = get_object_or_404(Supply, pk=pk)
+    if request.method == 'POST':
+        supply.is_archived = False
+        supply.save(user=request.user)
+        
+        ActivityLog.log_activity(
+            user=request.user,
+            action='unarchive',
+            model_name='Supply',
+            object_repr=str(supply),
+            description=f"Unarchived supply '{supply.supply_name}'"
+        )
+        messages.success(request, 'Supply unarchived successfully.')
+    return redirect('archived_items')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def condemn_property(request, pk):
+    property_obj = get_object_or_404(Property, pk=pk)
+    if request.method == 'POST':
+        property_obj.condition = 'For condemn'
+        property_obj.is_archived = True
+        property_obj.save(user=request.user)
+        
+        ActivityLog.log_activity(
+            user=request.user,
+            action='update',
+            model_name='Property',
+            object_repr=str(property_obj),
+            description=f"Condemned property '{property_obj.property_name}' - set condition to 'For condemn' and archived"
+        )
+        messages.success(request, f'Property "{property_obj.property_name}" has been condemned and archived.')
+    return redirect('property_list')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def archive_property(request, pk):
+    property_obj = get_object_or_404(Property, pk=pk)
+    if request.method == 'POST':
+        # Check if property condition is Obsolete, Unserviceable, or Lost
+        if property_obj.condition not in ['Obsolete', 'Unserviceable', 'Lost']:
+            messages.error(request, f"Cannot archive property '{property_obj.property_name}'. Property must be marked as 'Obsolete', 'Unserviceable', or 'Lost' to archive.")
+            return redirect('property_list')
+        
+        property_obj.is_archived = True
+        property_obj.save(user=request.user)
+        
+        ActivityLog.log_activity(
+            user=request.user,
+            action='archive',
+            model_name='Property',
+            object_repr=str(property_obj),
+            description=f"Archived property '{property_obj.property_name}'"
+        )
+        messages.success(request, 'Property archived successfully.')
+    return redirect('property_list')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def unarchive_property(request, pk):
+    property_obj = get_object_or_404(Property, pk=pk)
+    if request.method == 'POST':
+        property_obj.is_archived = False
+        property_obj.save(user=request.user)
+        
+        ActivityLog.log_activity(
+            user=request.user,
+            action='unarchive',
+            model_name='Property',
+            object_repr=str(property_obj),
+            description=f"Unarchived property '{property_obj.property_name}'"
+        )
+        messages.success(request, 'Property unarchived successfully.')
+    return redirect('archived_items')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@admin_permission_required('delete_archived_items')
+def delete_archived_supply(request, pk):
+    supply = get_object_or_404(Supply, pk=pk)
+    if request.method == 'POST':
+        # Check if the supply is archived before deleting
+        if not supply.is_archived:
+            messages.error(request, 'Cannot delete a supply that is not archived.')
+            return redirect('archived_items')
+        
+        supply_name = supply.supply_name
+        
+        try:
+            ActivityLog.log_activity(
+                user=request.user,
+                action='delete',
+                model_name='Supply',
+                object_repr=str(supply),
+                description=f"Permanently deleted archived supply '{supply_name}'"
+            )
+            
+            # Delete the supply and all related objects
+            supply.delete()
+            messages.success(request, f"Supply '{supply_name}' has been permanently deleted.")
+        except Exception as e:
+            messages.error(request, f"Error deleting supply: {str(e)}")
+    return redirect('archived_items')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@admin_permission_required('delete_archived_items')
+def delete_archived_property(request, pk):
+    property_obj = get_object_or_404(Property, pk=pk)
+    if request.method == 'POST':
+        # Check if the property is archived before deleting
+        if not property_obj.is_archived:
+            messages.error(request, 'Cannot delete a property that is not archived.')
+            return redirect('archived_items')
+        
+        property_name = property_obj.property_name
+        
+        try:
+            ActivityLog.log_activity(
+                user=request.user,
+                action='delete',
+                model_name='Property',
+                object_repr=str(property_obj),
+                description=f"Permanently deleted archived property '{property_name}'"
+            )
+            
+            # Delete the property and all related objects
+            property_obj.delete()
+            messages.success(request, f"Property '{property_name}' has been permanently deleted.")
+        except Exception as e:
+            messages.error(request, f"Error deleting property: {str(e)}")
+    return redirect('archived_items')
+
+
+class ArchivedItemsView(PermissionRequiredMixin, TemplateView):
+    template_name = 'app/archived_items.html'
+    permission_required = 'app.view_admin_module'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        
+        # Get archived supplies
+        supplies = Supply.objects.filter(is_archived=True).select_related(
+            'category', 'subcategory', 'quantity_info'
+        ).order_by('supply_name')
+        
+        # Barcodes are already stored in database, no need to generate
+        # They will be displayed using barcode_image field
+        
+        # Group supplies by category
+        supplies_by_category = defaultdict(list)
+        for supply in supplies:
+            category_name = supply.category.name if supply.category else 'Uncategorized'
+            supplies_by_category[category_name].append(supply)
+        
+        # Get archived properties
+        properties = Property.objects.filter(is_archived=True).select_related('category').order_by('property_name')
+        
+        # Barcodes are already stored in database, no need to generate
+        # They will be displayed using barcode_image field
+        
+        # Group properties by category
+        properties_by_category = defaultdict(list)
+        for prop in properties:
+            category_name = prop.category.name if prop.category else 'Uncategorized'
+            properties_by_category[category_name].append(prop)
+        
+        context.update({
+            'supplies_by_category': dict(supplies_by_category),
+            'properties_by_category': dict(properties_by_category),
+        })
+        return context
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def update_supply_category(request):
+    if request.method == 'POST':
+        category_id = request.POST.get('id')
+        new_name = request.POST.get('name')
+       
+        try:
+            category = SupplyCategory.objects.get(id=category_id)
+            old_name = category.name
+            category.name = new_name
+            category.save()
+           
+            # Log the activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='update',
+                model_name='SupplyCategory',
+                object_repr=str(category),
+                description=f"Updated category name from '{old_name}' to '{new_name}'"
+            )
+           
+            # Return more data for UI update
+            return JsonResponse({
+                'success': True,
+                'category': {
+                    'id': category.id,
+                    'name': category.name,
+                    'supply_count': category.supply_set.count()
+                }
+            })
+        except SupplyCategory.DoesNotExist:
+            return JsonResponse({'success': False, 'error': 'Category not found'})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+           
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def delete_supply_category(request, category_id):
+    if request.method == 'POST':
+        try:
+            category = SupplyCategory.objects.get(id=category_id)
+            category_name = category.name
+            category.delete()
+           
+            # Log the activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='delete',
+                model_name='SupplyCategory',
+                object_repr=category_name,
+                description=f"Deleted supply category '{category_name}'"
+            )
+           
+            messages.success(request, 'Category deleted successfully.')
+        except SupplyCategory.DoesNotExist:
+            messages.error(request, 'Category not found.')
+        except Exception as e:
+            messages.error(request, f'Error deleting category: {str(e)}')
+           
+    return redirect('supply_list')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def update_supply_subcategory(request):
+    if request.method == 'POST':
+        subcategory_id = request.POST.get('id')
+        new_name = request.POST.get('name')
+       
+        try:
+            subcategory = SupplySubcategory.objects.get(id=subcategory_id)
+            old_name = subcategory.name
+            subcategory.name = new_name
+            subcategory.save()
+           
+            # Log the activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='update',
+                model_name='SupplySubcategory',
+                object_repr=str(subcategory),
+                description=f"Updated subcategory name from '{old_name}' to '{new_name}'"
+            )
+           
+            # Return more data for UI update
+            return JsonResponse({
+                'success': True,
+                'subcategory': {
+                    'id': subcategory.id,
+                    'name': subcategory.name,
+                    'supply_count': subcategory.supply_set.count()
+                }
+            })
+        except SupplySubcategory.DoesNotExist:
+            return JsonResponse({'success': False, 'error': 'Subcategory not found'})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+           
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def delete_supply_subcategory(request, subcategory_id):
+    if request.method == 'POST':
+        try:
+            print(f"Attempting to delete subcategory {subcategory_id}")
+            subcategory = SupplySubcategory.objects.get(id=subcategory_id)
+            subcategory_name = subcategory.name
+           
+            # Check if there are any supplies using this subcategory
+            supply_count = subcategory.supply_set.count()
+            print(f"Subcategory {subcategory_name} has {supply_count} supplies")
+           
+            if subcategory.supply_set.exists():
+                print(f"Cannot delete subcategory {subcategory_name} - has supplies assigned")
+                messages.error(request, 'Cannot delete subcategory that has supplies assigned to it.')
+                return redirect('supply_list')
+               
+            subcategory.delete()
+            print(f"Successfully deleted subcategory {subcategory_name}")
+           
+            # Log the activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='delete',
+                model_name='SupplySubcategory',
+                object_repr=subcategory_name,
+                description=f"Deleted supply subcategory '{subcategory_name}'"
+            )
+           
+            messages.success(request, 'Subcategory deleted successfully.')
+        except SupplySubcategory.DoesNotExist:
+            print(f"Subcategory {subcategory_id} not found")
+            messages.error(request, 'Subcategory not found.')
+        except Exception as e:
+            print(f"Error deleting subcategory: {str(e)}")
+            messages.error(request, f'Error deleting subcategory: {str(e)}')
+           
+    return redirect('supply_list')
+
+
+def supply_list(request):
+    # Redirect to the class-based view
+    return redirect('supplies')
+
+
+class ManagePropertyInventoryView(PermissionRequiredMixin, TemplateView):
+    template_name = 'app/manage_property_inventory.html'
+    permission_required = 'app.view_admin_module'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        return context
+
+
+class ManageSupplyInventoryView(PermissionRequiredMixin, TemplateView):
+    template_name = 'app/manage_supply_inventory.html'
+    permission_required = 'app.view_admin_module'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        return context
+
+
+def _damage_report_image_etag(request, report_id):
+    """ETag for a damage report image: the digest of its bytes, stored when the image is set."""
+    row = DamageReport.objects.filter(pk=report_id).values('image_digest', 'deleted_at').first()
+    if not row or row['deleted_at'] or not row['image_digest']:
+        return None
+    return f"damage-report-{report_id}-{row['image_digest']}"
+
+
+@cache_policy(REVALIDATE, etag_func=_damage_report_image_etag)
+def damage_report_image(request, report_id):
+    """
+    Serve damage report image stored as binary data in PostgreSQL.
+    Returns the image as HTTP response with proper MIME type.
+    """
+    report = get_object_or_404(DamageReport, pk=report_id)
+    
+    # Check if report has image and it hasn't been deleted
+    if report.image_data and not report.deleted_at:
+        response = HttpResponse(report.image_data, content_type=report.image_type)
+        response['Content-Disposition'] = f'inline; filename="{report.image_name or f"damage_report_{report_id}.jpg"}"'
+        return response
+    else:
+        # Return 404 if no image or image was deleted
+        from django.http import Http404
+        raise Http404("Image not found or has been deleted")
+
+
+def lost_item_image(request, report_id):
+    """
+    Serve lost item report image stored as binary data in PostgreSQL.
+    Returns the image as HTTP response with proper MIME type.
+    """
+    report = get_object_or_404(LostItem, pk=report_id)
+    
+    # Check if report has image and it hasn't been deleted
+    if report.image_data and not report.deleted_at:
+        response = HttpResponse(report.image_data, content_type=report.image_type)
+        response['Content-Disposition'] = f'inline; filename="{report.image_name or f"lost_item_{report_id}.jpg"}"'
+        return response
+    else:
+        # Return 404 if no image or image was deleted
+        from django.http import Http404
+        raise Http404("Image not found or has been deleted")
+
+
+@login_required
+@user_passes_test(lambda u: u.userprofile.role == 'ADMIN', login_url='user_dashboard')
+@require_http_methods(["POST"])
+def delete_damage_report_image(request, report_id):
+    """
+    Delete a damage report image (admin only).
+    Marks the image as deleted with audit trail.
+    """
+    from django.utils import timezone
+    from django.contrib import messages
+    from django.http import JsonResponse
+    
+    report = get_object_or_404(DamageReport, pk=report_id)
+    
+    # Check if report has an image to delete
+    if not report.has_image:
+        return JsonResponse({
+            'success': False,
+            'message': 'No image to delete or image already deleted.'
+        }, status=400)
+    
+    # Soft delete: Mark as deleted but keep the data for audit
+    report.deleted_at = timezone.now()
+    report.deleted_by = request.user
+    report.save()
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='delete',
+        model_name='DamageReport Image',
+        object_repr=f"Report #{report.id} - {report.item.property_name}",
+        description=f"Deleted image '{report.image_name}' from damage report #{report.id}"
+    )
+    
+    # Notify the user who submitted the report
+    Notification.objects.create(
+        user=report.user,
+        message=f"The image attached to your damage report #{report.id} for {report.item.property_name} has been removed by an administrator.",
+        remarks=f"Image removed by {request.user.username} on {timezone.now().strftime('%Y-%m-%d %H:%M')}"
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'Image deleted successfully. Report #{report.id} remains in the system.'
+    })
+
+
+@login_required
+@user_passes_test(lambda u: u.userprofile.role == 'ADMIN', login_url='user_dashboard')
+@require_http_methods(["POST"])
+def bulk_delete_damage_report_images(request):
+    """
+    Bulk delete damage report images (admin only).
+    Accepts a list of report IDs via POST.
+    """
+    from django.utils import timezone
+    from django.http import JsonResponse
+    import json
+    
+    try:
+        data = json.loads(request.body)
+        report_ids = data.get('report_ids', [])
+        
+        if not report_ids:
+            return JsonResponse({
+                'success': False,
+                'message': 'No reports selected.'
+            }, status=400)
+        
+        # Get reports that have images
+        reports = DamageReport.objects.filter(
+            id__in=report_ids,
+            image_data__isnull=False,
+            deleted_at__isnull=True
+        )
+        
+        deleted_count = 0
+        for report in reports:
+            report.deleted_at = timezone.now()
+            report.deleted_by = request.user
+            report.save()
+            
+            # Log activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='delete',
+                model_name='DamageReport Image',
+                object_repr=f"Report #{report.id} - {report.item.property_name}",
+                description=f"Bulk deleted image '{report.image_name}' from damage report #{report.id}"
+            )
+            
+            # Notify the user
+            Notification.objects.create(
+                user=report.user,
+                message=f"The image attached to your damage report #{report.id} for {report.item.property_name} has been removed by an administrator.",
+                remarks=f"Bulk deletion by {request.user.username} on {timezone.now().strftime('%Y-%m-%d %H:%M')}"
+            )
+            
+            deleted_count += 1
+        
+        return JsonResponse({
+            'success': True,
+            'message': f'{deleted_count} image(s) deleted successfully.',
+            'deleted_count': deleted_count
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid request data.'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }, status=500)
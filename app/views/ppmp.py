@@ -0,0 +1,667 @@
+"""
+PPMP uploads, matching against requests, approval checks and property
+releases against PPMP allocations.
+"""
+from django.contrib.auth.decorators import login_required, permission_required
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
+
+from ..models import SupplyRequestBatch, SupplyRequestItem
+from ..permissions import admin_permission_required
+
+
+# Batch Request Item Management Views
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+@admin_permission_required('approve_supply_request')
+def check_ppmp_before_approval(request, batch_id, item_id):
+    """AJAX endpoint to check PPMP before approving an item - now supports multi-year PPMP"""
+    from django.http import JsonResponse
+    from django.core.exceptions import ObjectDoesNotExist
+    from django.db.models import Sum
+    from ..models import PPMP, PPMPItem
+    
+    # Optimize queries with select_related
+    batch_request = SupplyRequestBatch.objects.select_related('user__userprofile__department').get(id=batch_id)
+    item = SupplyRequestItem.objects.select_related('supply').get(id=item_id, batch_request=batch_request)
+    
+    # Get approved quantity from request
+    approved_quantity = request.POST.get('approved_quantity', item.quantity)
+    try:
+        approved_quantity = int(approved_quantity)
+    except (ValueError, TypeError):
+        approved_quantity = item.quantity
+    
+    # Get department from user's profile
+    try:
+        user_department = batch_request.user.userprofile.department
+    except (AttributeError, ObjectDoesNotExist):
+        return JsonResponse({'needs_confirmation': False, 'proceed': True})
+    
+    # Get all PPMPs for this department
+    ppmp_list = PPMP.objects.filter(department=user_department).order_by('-year')
+    
+    if not ppmp_list.exists():
+        return JsonResponse({'needs_confirmation': False, 'proceed': True})
+    
+    # Find matching PPMP items across all years
+    available_years = []
+    supply_key = item.supply.supply_name.strip().lower()
+    supply_desc_key = item.supply.description.strip().lower() if item.supply.description else ""
+    
+    for ppmp in ppmp_list:
+        all_ppmp_items = PPMPItem.objects.filter(ppmp=ppmp).only('id', 'unit_measure', 'description', 'quantity', 'released')
+        
+        matched_item_ids = []
+        
+        for ppmp_item in all_ppmp_items:
+            # Use unit_measure as the primary item name
+            item_name = ppmp_item.unit_measure if ppmp_item.unit_measure else ppmp_item.description
+            if not item_name:
+                continue
+                
+            ppmp_key = item_name.strip().lower()
+            
+            # Try exact match
+            if ppmp_key == supply_key or ppmp_key == supply_desc_key:
+                matched_item_ids.append(ppmp_item.id)
+                continue
+            
+            # Try word matching (at least 2 common words)
+            supply_words = set(supply_key.replace(',', ' ').split())
+            ppmp_words = set(ppmp_key.replace(',', ' ').split())
+            common_words = supply_words & ppmp_words
+            
+            if len(common_words) >= 2 or (len(common_words) >= 1 and len(common_words) / max(len(supply_words), 1) >= 0.5):
+                matched_item_ids.append(ppmp_item.id)
+                continue
+            
+            # Try substring matching
+            if ppmp_key in supply_key or supply_key in ppmp_key:
+                matched_item_ids.append(ppmp_item.id)
+        
+        if matched_item_ids:
+            # Get matched items for aggregation
+            matched_items = PPMPItem.objects.filter(id__in=matched_item_ids)
+            
+            # Use aggregate to calculate sums in database (faster than Python)
+            totals = matched_items.aggregate(
+                total_planned=Sum('quantity'),
+                total_released=Sum('released')
+            )
+            
+            total_ppmp_planned = totals['total_planned'] or 0
+            total_ppmp_released = totals['total_released'] or 0
+            total_ppmp_remaining = max(0, total_ppmp_planned - total_ppmp_released)
+            
+            # Only include this year if there's remaining quantity
+            if total_ppmp_remaining > 0:
+                available_years.append({
+                    'year': ppmp.year,
+                    'ppmp_id': ppmp.id,
+                    'planned': total_ppmp_planned,
+                    'released': total_ppmp_released,
+                    'remaining': total_ppmp_remaining,
+                    'matched_item_ids': matched_item_ids
+                })
+    
+    if not available_years:
+        # No matches or all are fully released
+        return JsonResponse({'needs_confirmation': False, 'proceed': True})
+    
+    # If there are available years with PPMP matches, ask admin to select which year
+    if len(available_years) == 1:
+        # Only one year available, check if quantity exceeds
+        year_data = available_years[0]
+        if approved_quantity > year_data['remaining']:
+            total_after_approval = year_data['released'] + approved_quantity
+            total_excess = total_after_approval - year_data['planned']
+            
+            return JsonResponse({
+                'needs_confirmation': True,
+                'type': 'exceed_warning',
+                'warning_message': (
+                    f'Approving {approved_quantity} units of {item.supply.supply_name} '
+                    f'exceeds the PPMP {year_data["year"]} remaining quantity.<br><br>'
+                    f'<strong>PPMP {year_data["year"]} Planned:</strong> {year_data["planned"]} units<br>'
+                    f'<strong>Already Released:</strong> {year_data["released"]} units<br>'
+                    f'<strong>PPMP Remaining:</strong> {year_data["remaining"]} units<br>'
+                    f'<strong>Approved Quantity:</strong> {approved_quantity} units<br>'
+                    f'<strong>Total Excess:</strong> {total_excess} units<br><br>'
+                    f'Do you want to proceed with this approval?'
+                ),
+                'item_name': item.supply.supply_name,
+                'ppmp_year': year_data['year'],
+                'ppmp_remaining': year_data['remaining'],
+                'approved_quantity': approved_quantity
+            })
+        else:
+            # Auto-select this year since it's the only one and has enough quantity
+            return JsonResponse({
+                'needs_confirmation': False,
+                'proceed': True,
+                'auto_select_year': year_data['year']
+            })
+    else:
+        # Multiple years available - ask admin to select
+        return JsonResponse({
+            'needs_confirmation': True,
+            'type': 'year_selection',
+            'available_years': available_years,
+            'item_name': item.supply.supply_name,
+            'approved_quantity': approved_quantity,
+            'message': f'Multiple PPMP years found for {item.supply.supply_name}. Please select which year to release from.'
+        })
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@admin_permission_required('approve_supply_request')
+def get_ppmp_year_options(request, batch_id, item_id):
+    """
+    AJAX endpoint to get available PPMP years for a supply request item.
+    Returns years with remaining quantities for the modal selection.
+    """
+    from django.http import JsonResponse
+    from ..utils import check_ppmp_match_multi_year
+    
+    try:
+        batch_request = get_object_or_404(SupplyRequestBatch, id=batch_id)
+        item = get_object_or_404(SupplyRequestItem, id=item_id, batch_request=batch_request)
+        
+        user_department = batch_request.user.userprofile.department if hasattr(batch_request.user, 'userprofile') and batch_request.user.userprofile.department else None
+        
+        if not user_department:
+            return JsonResponse({
+                'success': False,
+                'error': 'No department found for this user'
+            })
+        
+        # Get multi-year PPMP matches
+        match_result = check_ppmp_match_multi_year(
+            supply_name=item.supply.supply_name,
+            department=user_department,
+            current_year=batch_request.request_date.year
+        )
+        
+        if not match_result['match_found']:
+            return JsonResponse({
+                'success': False,
+                'error': 'No PPMP matches found for this item',
+                'message': match_result['message']
+            })
+        
+        # Format year options for the frontend
+        year_options = []
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        for year_data in match_result['years_with_matches']:
+            # Get the first matched item (we'll use this for tracking)
+            first_item = year_data['matched_items'][0] if year_data['matched_items'] else None
+            
+            if first_item:
+                # Verify the PPMP item actually belongs to this year
+                logger.info(f"Year {year_data['year']}: ppmp_item_id={first_item.id}, ppmp_item's actual year={first_item.ppmp.year}, item_name={first_item.unit_measure}")
+                logger.info(f"  -> PPMP Item #{first_item.id} details: ppmp_id={first_item.ppmp.id}, ppmp_year={first_item.ppmp.year}, qty={first_item.quantity}, released={first_item.released}, remaining={first_item.remaining}")
+                # Log ALL matched items for this year
+                for idx, matched_ppmp_item in enumerate(year_data['matched_items']):
+                    logger.info(f"  -> Matched item {idx+1}/{len(year_data['matched_items'])}: ID={matched_ppmp_item.id}, year={matched_ppmp_item.ppmp.year}, desc={matched_ppmp_item.unit_measure}, qty={matched_ppmp_item.quantity}, released={matched_ppmp_item.released}, remaining={matched_ppmp_item.remaining}")
+            
+            year_options.append({
+                'year': year_data['year'],
+                'ppmp_id': year_data['ppmp'].id,
+                'ppmp_item_id': first_item.id if first_item else None,
+                'total_remaining': year_data['total_remaining'],
+                'matched_items_count': len(year_data['matched_items']),
+                'items_details': [
+                    {
+                        'id': ppmp_item.id,
+                        'description': str(ppmp_item.unit_measure),
+                        'quantity': ppmp_item.quantity,
+                        'released': ppmp_item.released,
+                        'remaining': ppmp_item.remaining
+                    }
+                    for ppmp_item in year_data['matched_items']
+                ]
+            })
+        
+        logger.info(f"Returning year options: {year_options}")
+        
+        return JsonResponse({
+            'success': True,
+            'year_options': year_options,
+            'supply_name': item.supply.supply_name,
+            'requested_quantity': item.quantity,
+            'department_name': user_department.name
+        })
+        
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error getting PPMP year options: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        })
+
+
+# ==================== PPMP VIEWS ====================
+@login_required
+@admin_permission_required('approve_supply_request')
+def ppmp_upload(request):
+    """Upload and parse PPMP Excel files"""
+    from ..models import PPMP, Department
+    from ..forms import PPMPUploadForm
+    from ..utils import parse_ppmp_excel
+    from django.contrib import messages
+    
+    if request.method == 'POST':
+        form = PPMPUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            ppmp = form.save(commit=False)
+            ppmp.uploaded_by = request.user
+            ppmp.save()
+            
+            # Parse the Excel file
+            success, message, items_count = parse_ppmp_excel(ppmp)
+            
+            if success:
+                messages.success(request, message)
+                return redirect('ppmp_list')
+            else:
+                # Delete the PPMP if parsing failed
+                ppmp.delete()
+                messages.error(request, message)
+    else:
+        form = PPMPUploadForm()
+    
+    return render(request, 'app/ppmp_upload.html', {'form': form})
+
+
+@login_required
+@admin_permission_required('approve_supply_request')
+def ppmp_list(request):
+    """List all uploaded PPMPs"""
+    from ..models import PPMP, Department
+    
+    # Filtering
+    department_filter = request.GET.get('department', '')
+    year_filter = request.GET.get('year', '')
+    
+    ppmps = PPMP.objects.select_related('department', 'uploaded_by').all()
+    
+    if department_filter:
+        ppmps = ppmps.filter(department_id=department_filter)
+    if year_filter:
+        ppmps = ppmps.filter(year=year_filter)
+    
+    # Get unique years for filter
+    years = PPMP.objects.values_list('year', flat=True).distinct().order_by('-year')
+    departments = Department.objects.all().order_by('name')
+    
+    context = {
+        'ppmps': ppmps,
+        'departments': departments,
+        'years': years,
+        'department_filter': department_filter,
+        'year_filter': year_filter,
+    }
+    
+    return render(request, 'app/ppmp_list.html', context)
+
+
+@login_required
+@admin_permission_required('approve_supply_request')
+def ppmp_detail(request, pk):
+    """View details of a specific PPMP and its items"""
+    from ..models import PPMP, PPMPItem
+    
+    ppmp = get_object_or_404(PPMP.objects.select_related('department', 'uploaded_by'), pk=pk)
+    
+    # Get all items for this PPMP
+    all_items = ppmp.items.all()
+    total_items = all_items.count()
+    
+    # Search functionality
+    search_query = request.GET.get('search', '')
+    items = all_items
+    if search_query:
+        items = items.filter(unit_measure__icontains=search_query)
+    
+    # Pagination
+    from django.core.paginator import Paginator
+    paginator = Paginator(items, 50)  # Show 50 items per page
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'ppmp': ppmp,
+        'page_obj': page_obj,
+        'search_query': search_query,
+        'total_items': total_items,
+        'filtered_count': items.count(),
+    }
+    
+    return render(request, 'app/ppmp_detail.html', context)
+
+
+@login_required
+@admin_permission_required('approve_supply_request')
+def ppmp_delete(request, pk):
+    """Delete a PPMP and all its items"""
+    from ..models import PPMP
+    from django.contrib import messages
+    from django.db import connection
+    
+    ppmp = get_object_or_404(PPMP, pk=pk)
+    
+    if request.method == 'POST':
+        department_name = ppmp.department.name
+        year = ppmp.year
+        
+        # Get all PPMP item IDs associated with this PPMP
+        ppmp_item_ids = list(ppmp.items.values_list('id', flat=True))
+        
+        # Delete related PPMPItemRelease records first (if table exists)
+        if ppmp_item_ids:
+            with connection.cursor() as cursor:
+                try:
+                    # Delete all PPMPItemRelease records that reference these PPMP items
+                    placeholders = ','.join(['%s'] * len(ppmp_item_ids))
+                    cursor.execute(
+                        f"DELETE FROM app_ppmpitemrelease WHERE ppmp_item_id IN ({placeholders})",
+                        ppmp_item_ids
+                    )
+                except Exception as e:
+                    # Table might not exist or other error - log but continue
+                    import logging
+                    logger = logging.getLogger(__name__)
+                    logger.warning(f"Could not delete PPMPItemRelease records: {e}")
+        
+        # Delete the PPMP (cascade will delete all PPMPItems)
+        ppmp.delete()
+        
+        messages.success(request, f'PPMP for {department_name} ({year}) has been deleted.')
+        return redirect('ppmp_list')
+    
+    return render(request, 'app/ppmp_delete_confirm.html', {'ppmp': ppmp})
+
+
+@login_required
+def get_ppmp_matches(request):
+    """
+    API endpoint to get PPMP matches based on property name.
+    Returns a list of matching PPMP items across all departments and years.
+    """
+    from django.http import JsonResponse
+    from ..models import PPMPItem
+    from difflib import SequenceMatcher
+    
+    property_name = request.GET.get('property_name', '').strip()
+    
+    if not property_name:
+        return JsonResponse({'matches': []})
+    
+    # Get all PPMP items
+    ppmp_items = PPMPItem.objects.select_related('ppmp', 'ppmp__department').all()
+    
+    matches = []
+    property_name_lower = property_name.lower()
+    
+    for item in ppmp_items:
+        # Check both unit_measure and description fields
+        item_name = item.unit_measure if item.unit_measure else item.description
+        
+        if not item_name:
+            continue
+            
+        item_name_lower = item_name.strip().lower()
+        
+        # Calculate similarity ratio
+        similarity = SequenceMatcher(None, property_name_lower, item_name_lower).ratio()
+        
+        # Include if exact match or high similarity (>= 0.9) AND has remaining quantity
+        if (property_name_lower in item_name_lower or item_name_lower in property_name_lower or similarity >= 0.9) and item.remaining > 0:
+            matches.append({
+                'ppmp_item_id': item.id,  # Add unique ID for matching
+                'department': item.ppmp.department.name,
+                'year': item.ppmp.year,
+                'item_name': item_name,
+                'quantity': item.quantity,
+                'remaining': item.remaining,
+                'unit_measure': item.unit_measure or '',
+                'similarity': similarity
+            })
+    
+    # Sort by similarity (highest first), then by year (most recent first)
+    matches.sort(key=lambda x: (-x['similarity'], -x['year']))
+    
+    # Limit to top 20 matches to avoid overwhelming the dropdown
+    matches = matches[:20]
+    
+    return JsonResponse({'matches': matches})
+
+
+@login_required
+def get_property_ppmp_references(request, property_id):
+    """
+    API endpoint to get PPMP references for a specific property.
+    Returns the ppmp_references JSONField data.
+    """
+    from django.http import JsonResponse
+    from ..models import Property
+    
+    try:
+        property_obj = Property.objects.get(id=property_id)
+        ppmp_references = property_obj.ppmp_references or []
+        
+        return JsonResponse({'ppmp_references': ppmp_references})
+    except Property.DoesNotExist:
+        return JsonResponse({'ppmp_references': []})
+
+
+@login_required
+@require_POST
+def release_property(request):
+    """
+    Release/assign property quantity to someone.
+    Deducts from property current quantity and PPMP allocated items.
+    """
+    from django.http import JsonResponse
+    from ..models import Property, PPMPItem, PropertyPPMPAllocation, Department, ActivityLog, User
+    from django.db.models import Q
+    from django.core.mail import send_mail
+    from django.template.loader import render_to_string
+    from django.utils.html import strip_tags
+    from django.conf import settings
+    import json
+    
+    try:
+        property_id = request.POST.get('property_id')
+        release_quantity = int(request.POST.get('release_quantity', 0))
+        remarks = request.POST.get('remarks', '')
+        ppmp_deductions = request.POST.get('ppmp_deductions', '[]')
+        
+        if release_quantity <= 0:
+            return JsonResponse({'success': False, 'error': 'Invalid release quantity'})
+        
+        property_obj = Property.objects.get(id=property_id)
+        
+        # Check if enough quantity available
+        if property_obj.quantity < release_quantity:
+            return JsonResponse({'success': False, 'error': f'Not enough quantity available. Current: {property_obj.quantity}'})
+        
+        # Parse PPMP deductions
+        try:
+            ppmp_deductions_data = json.loads(ppmp_deductions)
+        except:
+            ppmp_deductions_data = []
+        
+        # Deduct from property current quantity
+        property_obj.quantity -= release_quantity
+        
+        # Get existing PPMP references or initialize empty list
+        existing_ppmp_refs = property_obj.ppmp_references or []
+        
+        # Process PPMP allocations and create records
+        ppmp_info_list = []
+        departments_notified = {}  # Track departments and their allocated items
+        
+        for deduction in ppmp_deductions_data:
+            ppmp_item_id = deduction.get('ppmp_item_id')
+            deduct_qty = deduction.get('quantity', 0)
+            
+            if ppmp_item_id and deduct_qty > 0:
+                try:
+                    ppmp_item = PPMPItem.objects.get(id=ppmp_item_id)
+                    department = ppmp_item.ppmp.department
+                    
+                    # Update PPMP item released quantity
+                    ppmp_item.released = (ppmp_item.released or 0) + deduct_qty
+                    ppmp_item.save()
+                    
+                    # Create PropertyPPMPAllocation record
+                    PropertyPPMPAllocation.objects.create(
+                        property=property_obj,
+                        ppmp_item=ppmp_item,
+                        quantity_allocated=deduct_qty,
+                        allocated_by=request.user
+                    )
+                    
+                    # Add to ppmp_references JSONField
+                    ppmp_ref_entry = {
+                        'ppmp_item_id': ppmp_item.id,
+                        'department': department.name,
+                        'year': ppmp_item.ppmp.year,
+                        'item_name': ppmp_item.description,
+                        'selectedQty': deduct_qty,
+                        'remaining': ppmp_item.quantity - ppmp_item.released,
+                        'unit_measure': ppmp_item.unit_measure or ''
+                    }
+                    
+                    # Check if this PPMP item already exists in references
+                    existing_index = None
+                    for idx, ref in enumerate(existing_ppmp_refs):
+                        if ref.get('ppmp_item_id') == ppmp_item.id:
+                            existing_index = idx
+                            break
+                    
+                    if existing_index is not None:
+                        # Update existing reference quantity
+                        existing_ppmp_refs[existing_index]['selectedQty'] += deduct_qty
+                    else:
+                        # Add new reference
+                        existing_ppmp_refs.append(ppmp_ref_entry)
+                    
+                    # Collect info for activity log
+                    ppmp_info_list.append(f"{department.name} {ppmp_item.ppmp.year} - {ppmp_item.description} ({deduct_qty} units)")
+                    
+                    # Track departments for email notifications
+                    dept_key = department.id
+                    if dept_key not in departments_notified:
+                        departments_notified[dept_key] = {
+                            'department': department,
+                            'items': []
+                        }
+                    departments_notified[dept_key]['items'].append({
+                        'property_name': property_obj.property_name,
+                        'property_number': property_obj.property_number,
+                        'quantity': deduct_qty,
+                        'ppmp_year': ppmp_item.ppmp.year,
+                        'ppmp_item': ppmp_item.description,
+                        'remarks': remarks
+                    })
+                    
+                except PPMPItem.DoesNotExist:
+                    pass
+        
+        # Update property's ppmp_references JSONField and remarks
+        property_obj.ppmp_references = existing_ppmp_refs
+        
+        # Update remarks if provided
+        if remarks:
+            # Append new remarks to existing ones with timestamp
+            from datetime import datetime
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
+            new_remark = f"[{timestamp}] {remarks}"
+            
+            if property_obj.remarks:
+                property_obj.remarks = f"{property_obj.remarks}\n{new_remark}"
+            else:
+                property_obj.remarks = new_remark
+        
+        property_obj.save(user=request.user)
+        
+        # Build activity log description
+        description = f"Released {release_quantity} unit(s) of '{property_obj.property_name}'. Remaining quantity: {property_obj.quantity}."
+        
+        if ppmp_info_list:
+            description += f" Assigned to PPMP: {'; '.join(ppmp_info_list)}."
+        
+        if remarks:
+            description += f" Remarks: {remarks}"
+        
+        # Log activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='update',
+            model_name='Property',
+            object_repr=str(property_obj),
+            description=description
+        )
+        
+        # Send email notifications to departments
+        for dept_data in departments_notified.values():
+            department = dept_data['department']
+            items = dept_data['items']
+            
+            # Get all users from this department
+            dept_users = User.objects.filter(
+                userprofile__department=department,
+                is_active=True
+            ).exclude(email='')
+            
+            print(f"DEBUG: Found {dept_users.count()} users in department {department.name}")
+            
+            if dept_users.exists():
+                # Prepare email context
+                context = {
+                    'department_name': department.name,
+                    'items': items,
+                    'released_by': request.user.get_full_name() or request.user.username,
+                }
+                
+                # Send email to each user in the department
+                for user in dept_users:
+                    try:
+                        print(f"DEBUG: Attempting to send email to {user.email}")
+                        html_message = render_to_string('app/email/property_released_notification.html', {**context, 'user': user})
+                        plain_message = strip_tags(html_message)
+                        
+                        send_mail(
+                            subject=f'Property Ready for Claiming - {property_obj.property_name}',
+                            message=plain_message,
+                            from_email=settings.EMAIL_HOST_USER,
+                            recipient_list=[user.email],
+                            html_message=html_message,
+                            fail_silently=False,
+                        )
+                        print(f"DEBUG: Email sent successfully to {user.email}")
+                    except Exception as e:
+                        # Log the error for debugging
+                        print(f"ERROR: Failed to send email to {user.email}: {str(e)}")
+                        import traceback
+                        traceback.print_exc()
+        
+        return JsonResponse({
+            'success': True,
+            'new_quantity': property_obj.quantity,
+            'message': f'Successfully released {release_quantity} unit(s)'
+        })
+        
+    except Property.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Property not found'})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
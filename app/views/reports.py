@@ -0,0 +1,2580 @@
+"""
+Excel and PDF exports, requisition and borrower slips, and the approved
+supply tally. openpyxl and reportlab are imported inside the views that
+use them, so loading the URLconf does not import them.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, permission_required
+from django.contrib.auth.models import User
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+
+from ..cache_policy import REVALIDATE, cache_policy
+from ..db_routing import using_reporting
+from ..models import (
+    ActivityLog, BorrowRequestBatch, BorrowRequestItem, Department, Property, Supply,
+    SupplyCategory, SupplyRequestBatch, SupplyRequestItem,
+)
+
+
+@using_reporting()
+def export_unserviceable_items(request):
+    """Export unserviceable items to Excel"""
+    # Check permissions
+    if not request.user.is_authenticated or not request.user.userprofile.role == 'ADMIN':
+        return HttpResponse('Unauthorized', status=403)
+    
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from django.utils import timezone
+    
+    # Get unserviceable properties
+    properties = Property.objects.filter(condition__iexact='Unserviceable').select_related('category').order_by('-id')
+    
+    # Create workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Unserviceable Items"
+    
+    # Header styling
+    header_fill = PatternFill(start_color="152d64", end_color="152d64", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    # Add title
+    ws.merge_cells('A1:I1')
+    ws['A1'] = 'Unserviceable Items Report'
+    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].alignment = Alignment(horizontal='center')
+    
+    ws.merge_cells('A2:I2')
+    ws['A2'] = f'Generated on: {timezone.now().strftime("%B %d, %Y %I:%M %p")}'
+    ws['A2'].alignment = Alignment(horizontal='center')
+    
+    # Headers
+    headers = ['Property No.', 'Item Name', 'Category', 'Description', 'Location', 
+               'Accountable Person', 'Year Acquired', 'Unit Value', 'Quantity']
+    ws.append([])  # Empty row
+    ws.append(headers)
+    
+    # Style headers
+    for cell in ws[4]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+    
+    # Add data
+    for prop in properties:
+        ws.append([
+            prop.property_number or 'N/A',
+            prop.property_name,
+            prop.category.name if prop.category else 'N/A',
+            prop.description or 'N/A',
+            prop.location or 'N/A',
+            prop.accountable_person or 'N/A',
+            prop.year_acquired.strftime('%Y-%m-%d') if prop.year_acquired else 'N/A',
+            float(prop.unit_value) if prop.unit_value else 0,
+            prop.quantity or 0
+        ])
+    
+    # Style data rows
+    for row in ws.iter_rows(min_row=5, max_row=ws.max_row, min_col=1, max_col=9):
+        for cell in row:
+            cell.border = border
+            cell.alignment = Alignment(vertical='center')
+    
+    # Adjust column widths
+    column_widths = [15, 25, 20, 30, 20, 25, 15, 12, 10]
+    for i, width in enumerate(column_widths, 1):
+        ws.column_dimensions[chr(64 + i)].width = width
+    
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename=Unserviceable_Items_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    wb.save(response)
+    
+    return response
+
+
+@using_reporting()
+def export_needs_repair_items(request):
+    """Export items needing repair to Excel"""
+    # Check permissions
+    if not request.user.is_authenticated or not request.user.userprofile.role == 'ADMIN':
+        return HttpResponse('Unauthorized', status=403)
+    
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from django.utils import timezone
+    
+    # Get properties needing repair
+    properties = Property.objects.filter(condition__iexact='Needing repair').select_related('category').order_by('-id')
+    
+    # Create workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Items Needing Repair"
+    
+    # Header styling
+    header_fill = PatternFill(start_color="152d64", end_color="152d64", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    # Add title
+    ws.merge_cells('A1:I1')
+    ws['A1'] = 'Items Needing Repair Report'
+    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].alignment = Alignment(horizontal='center')
+    
+    ws.merge_cells('A2:I2')
+    ws['A2'] = f'Generated on: {timezone.now().strftime("%B %d, %Y %I:%M %p")}'
+    ws['A2'].alignment = Alignment(horizontal='center')
+    
+    # Headers
+    headers = ['Property No.', 'Item Name', 'Category', 'Description', 'Location', 
+               'Accountable Person', 'Year Acquired', 'Unit Value', 'Quantity']
+    ws.append([])  # Empty row
+    ws.append(headers)
+    
+    # Style headers
+    for cell in ws[4]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+    
+    # Add data
+    for prop in properties:
+        ws.append([
+            prop.property_number or 'N/A',
+            prop.property_name,
+            prop.category.name if prop.category else 'N/A',
+            prop.description or 'N/A',
+            prop.location or 'N/A',
+            prop.accountable_person or 'N/A',
+            prop.year_acquired.strftime('%Y-%m-%d') if prop.year_acquired else 'N/A',
+            float(prop.unit_value) if prop.unit_value else 0,
+            prop.quantity or 0
+        ])
+    
+    # Style data rows
+    for row in ws.iter_rows(min_row=5, max_row=ws.max_row, min_col=1, max_col=9):
+        for cell in row:
+            cell.border = border
+            cell.alignment = Alignment(vertical='center')
+    
+    # Adjust column widths
+    column_widths = [15, 25, 20, 30, 20, 25, 15, 12, 10]
+    for i, width in enumerate(column_widths, 1):
+        ws.column_dimensions[chr(64 + i)].width = width
+    
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename=Items_Needing_Repair_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    wb.save(response)
+    
+    return response
+
+
+@using_reporting()
+def export_lost_items(request):
+    """Export lost items to Excel"""
+    # Check permissions
+    if not request.user.is_authenticated or not request.user.userprofile.role == 'ADMIN':
+        return HttpResponse('Unauthorized', status=403)
+    
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from django.utils import timezone
+    from ..models import LostItem
+    
+    # Get lost items
+    lost_items = LostItem.objects.filter(status='lost').select_related('item', 'item__category', 'user').order_by('-report_date')
+    
+    # Create workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Lost Items"
+    
+    # Header styling
+    header_fill = PatternFill(start_color="152d64", end_color="152d64", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    # Add title
+    ws.merge_cells('A1:L1')
+    ws['A1'] = 'Lost Items Report'
+    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].alignment = Alignment(horizontal='center')
+    
+    ws.merge_cells('A2:L2')
+    ws['A2'] = f'Generated on: {timezone.now().strftime("%B %d, %Y %I:%M %p")}'
+    ws['A2'].alignment = Alignment(horizontal='center')
+    
+    # Headers
+    headers = ['Property No.', 'Item Name', 'Category', 'Reported By', 'Report Date',
+               'Last Seen Location', 'Last Seen Date', 'Description', 'Condition Status',
+               'Unit Value', 'Quantity', 'Remarks']
+    ws.append([])  # Empty row
+    ws.append(headers)
+    
+    # Style headers
+    for cell in ws[4]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+    
+    # Add data
+    for lost_item in lost_items:
+        prop = lost_item.item
+        condition_status = 'Verified Lost' if prop.condition == 'Lost' else 'Pending Verification'
+        
+        ws.append([
+            prop.property_number or 'N/A',
+            prop.property_name,
+            prop.category.name if prop.category else 'N/A',
+            lost_item.user.username,
+            lost_item.report_date.strftime('%Y-%m-%d %I:%M %p'),
+            lost_item.last_seen_location or 'N/A',
+            lost_item.last_seen_date.strftime('%Y-%m-%d') if lost_item.last_seen_date else 'N/A',
+            lost_item.description[:100] if lost_item.description else 'N/A',
+            condition_status,
+            float(prop.unit_value) if prop.unit_value else 0,
+            prop.quantity or 0,
+            lost_item.remarks or 'N/A'
+        ])
+    
+    # Style data rows
+    for row in ws.iter_rows(min_row=5, max_row=ws.max_row, min_col=1, max_col=12):
+        for cell in row:
+            cell.border = border
+            cell.alignment = Alignment(vertical='center')
+    
+    # Adjust column widths
+    column_widths = [15, 25, 20, 15, 20, 20, 15, 35, 18, 12, 10, 25]
+    for i, width in enumerate(column_widths, 1):
+        ws.column_dimensions[chr(64 + i)].width = width
+    
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename=Lost_Items_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    wb.save(response)
+    
+    return response
+
+
+@permission_required('app.view_admin_module')
+@using_reporting()
+def export_supply_to_excel(request):
+    """Export supply data to Excel with filters"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Border, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+    from openpyxl.cell.cell import MergedCell
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Supply Inventory"
+
+    # Title and Header Styling
+    title_font = ws['A1'].font.copy(bold=True, size=16)
+    header_font = ws['A1'].font.copy(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="152D64", end_color="152D64", fill_type="solid")
+    thin_border = Side(border_style="thin", color="000000")
+    category_font = ws['A1'].font.copy(bold=True, size=12)
+
+    # Get selected fields from request
+    selected_fields = request.POST.getlist('fields', [
+        'barcode', 'supply_name', 'description', 'unit', 'category', 'subcategory',
+        'current_quantity', 'status', 'date_received', 'expiration_date', 'available_for_request'
+    ])
+
+    # Define all possible fields and their display names
+    field_mapping = {
+        'barcode': 'Supply ID',
+        'supply_name': 'Supply Name',
+        'description': 'Description',
+        'unit': 'Unit of Measure',
+        'category': 'Category',
+        'subcategory': 'Sub Category',
+        'current_quantity': 'Current Quantity',
+        'status': 'Stock Status',
+        'date_received': 'Date Received',
+        'expiration_date': 'Expiration Date',
+        'available_for_request': 'Available for Request'
+    }
+
+    # Create header row with title and metadata
+    num_columns = len(selected_fields)
+    merge_range = f'A1:{chr(64 + num_columns)}1'
+    ws.merge_cells(merge_range)
+    ws['A1'] = 'INVENTORY REPORT FOR SUPPLY'
+    ws['A1'].font = title_font
+    ws['A1'].alignment = ws['A1'].alignment.copy(horizontal='center')
+
+    # Add metadata
+    ws['A3'] = 'Department:'
+    ws['B3'] = request.user.userprofile.department.name if hasattr(request.user, 'userprofile') and request.user.userprofile.department else '_____________________'
+    ws['G3'] = 'Date:'
+    ws['H3'] = datetime.now().strftime("%B %d, %Y")
+    
+    ws['A4'] = 'Prepared by:'
+    ws['B4'] = f'{request.user.first_name} {request.user.last_name}'
+    ws['G4'] = 'Page:'
+    ws['H4'] = '1 of 1'
+
+    # Headers start at row 6
+    ws['A6'] = 'SUPPLY INVENTORY'
+    ws['A6'].font = ws['A6'].font.copy(bold=True)
+
+    # Get all supplies with related data and group by category
+    supplies = Supply.objects.select_related(
+        'category', 'subcategory', 'quantity_info'
+    ).order_by('category__name', 'supply_name').all()
+
+    # Group supplies by category
+    supplies_by_category = {}
+    for supply in supplies:
+        category_name = supply.category.name if supply.category else 'Uncategorized'
+        if category_name not in supplies_by_category:
+            supplies_by_category[category_name] = []
+        supplies_by_category[category_name].append(supply)
+
+    current_row = 8  # Start after the title and metadata
+
+    # Process each category
+    for category_name, category_supplies in supplies_by_category.items():
+        # Add category header
+        ws.cell(row=current_row, column=1, value=category_name)
+        ws.cell(row=current_row, column=1).font = category_font
+        current_row += 1
+
+        # Add headers for this category
+        headers = [field_mapping[field] for field in selected_fields]
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=current_row, column=col)
+            cell.value = header
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.border = Border(top=thin_border, left=thin_border, right=thin_border, bottom=thin_border)
+        current_row += 1
+
+        # Add data for this category
+        for supply in category_supplies:
+            row_data = []
+            for field in selected_fields:
+                if field == 'barcode':
+                    row_data.append(supply.barcode or 'N/A')
+                elif field == 'supply_name':
+                    row_data.append(supply.supply_name)
+                elif field == 'description':
+                    row_data.append(supply.description or 'N/A')
+                elif field == 'unit':
+                    row_data.append(supply.unit or 'N/A')
+                elif field == 'category':
+                    row_data.append(supply.category.name if supply.category else 'N/A')
+                elif field == 'subcategory':
+                    row_data.append(supply.subcategory.name if supply.subcategory else 'N/A')
+                elif field == 'current_quantity':
+                    row_data.append(supply.quantity_info.current_quantity if supply.quantity_info else 0)
+                elif field == 'status':
+                    row_data.append(supply.get_status_display)
+                elif field == 'date_received':
+                    row_data.append(supply.date_received.strftime('%Y-%m-%d') if supply.date_received else 'N/A')
+                elif field == 'expiration_date':
+                    row_data.append(supply.expiration_date.strftime('%Y-%m-%d') if supply.expiration_date else 'N/A')
+                elif field == 'available_for_request':
+                    row_data.append('Yes' if supply.available_for_request else 'No')
+
+            for col, value in enumerate(row_data, 1):
+                cell = ws.cell(row=current_row, column=col)
+                cell.value = value
+                cell.border = Border(top=thin_border, left=thin_border, right=thin_border, bottom=thin_border)
+            current_row += 1
+
+        current_row += 1  # Add space between categories
+
+    # Add signature section
+    signature_row = current_row + 2
+    ws.cell(row=signature_row, column=1, value='Prepared by:')
+    ws.cell(row=signature_row, column=4, value='Reviewed by:')
+    ws.cell(row=signature_row, column=7, value='Approved by:')
+
+    ws.cell(row=signature_row + 2, column=1, value='_____________________')
+    ws.cell(row=signature_row + 2, column=4, value='_____________________')
+    ws.cell(row=signature_row + 2, column=7, value='_____________________')
+
+    ws.cell(row=signature_row + 3, column=1, value='Inventory Officer')
+    ws.cell(row=signature_row + 3, column=4, value='Department Head')
+    ws.cell(row=signature_row + 3, column=7, value='Property Custodian')
+
+    # Add notes section
+    notes_row = signature_row + 5
+    ws.cell(row=notes_row, column=1, value='Notes:')
+    ws.cell(row=notes_row + 1, column=1, value='1. This report shows the current inventory status of supplies.')
+    ws.cell(row=notes_row + 2, column=1, value='2. Please verify physical count against this report.')
+    ws.cell(row=notes_row + 3, column=1, value='3. Report any discrepancies to the inventory officer.')
+
+    # Auto-adjust column widths
+    for col_idx, column in enumerate(ws.columns, 1):
+        max_length = 0
+        column_letter = get_column_letter(col_idx)
+        
+        for cell in column[1:]:
+            if isinstance(cell, MergedCell):
+                continue
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            except:
+                pass
+        
+        adjusted_width = (max_length + 2)
+        ws.column_dimensions[column_letter].width = adjusted_width
+
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename=supply_inventory_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    
+    wb.save(response)
+    return response
+
+
+@login_required
+@using_reporting()
+def generate_quantity_activity_report(request):
+    """
+    Generate a PDF or Excel report for supply quantity activity.
+    Supports filtering by date range, month, or all time.
+    """
+    try:
+        # Get parameters
+        supply_id = request.GET.get('supply_id')
+        filter_type = request.GET.get('filter_type', 'all')
+        user_filter = request.GET.get('user_filter', 'all')
+        activity_type_filter = request.GET.get('activity_type_filter', 'all')
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
+        month = request.GET.get('month')
+        year = request.GET.get('year')
+        format_type = request.GET.get('format', 'pdf')  # 'pdf' or 'excel'
+        
+        if not supply_id:
+            return JsonResponse({'error': 'Supply ID is required'}, status=400)
+        
+        # Get supply
+        supply = get_object_or_404(Supply, id=supply_id)
+        
+        # Filter quantity activity
+        quantity_history = supply.history.filter(
+            field_name__in=['quantity', 'current_quantity', 'initial_quantity']
+        ).order_by('-timestamp')
+        
+        # Apply user filter (filter by requestor name in remarks)
+        if user_filter != 'all' and user_filter:
+            quantity_history = quantity_history.filter(remarks__icontains=f'Supply request by {user_filter}')
+        
+        # Apply activity type filter
+        if activity_type_filter != 'all':
+            if activity_type_filter == 'supply_request':
+                quantity_history = quantity_history.filter(remarks__icontains='Supply request by')
+            elif activity_type_filter == 'manual':
+                quantity_history = quantity_history.exclude(remarks__icontains='Supply request by').exclude(action='create')
+            elif activity_type_filter == 'addition':
+                # For additions, we need to check if new_value > old_value
+                addition_entries = []
+                for entry in quantity_history:
+                    old_qty = int(entry.old_value) if entry.old_value and entry.old_value.isdigit() else 0
+                    new_qty = int(entry.new_value) if entry.new_value and entry.new_value.isdigit() else 0
+                    if entry.action == 'create' or new_qty > old_qty:
+                        addition_entries.append(entry.id)
+                quantity_history = quantity_history.filter(id__in=addition_entries)
+            elif activity_type_filter == 'deduction':
+                # For deductions, we need to check if new_value < old_value
+                deduction_entries = []
+                for entry in quantity_history:
+                    old_qty = int(entry.old_value) if entry.old_value and entry.old_value.isdigit() else 0
+                    new_qty = int(entry.new_value) if entry.new_value and entry.new_value.isdigit() else 0
+                    if entry.action != 'create' and new_qty < old_qty:
+                        deduction_entries.append(entry.id)
+                quantity_history = quantity_history.filter(id__in=deduction_entries)
+        
+        # Apply date filters
+        if filter_type == 'date_range' and start_date and end_date:
+            try:
+                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+                end_dt = datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+                quantity_history = quantity_history.filter(
+                    timestamp__range=[start_dt, end_dt]
+                )
+            except ValueError:
+                return JsonResponse({'error': 'Invalid date format'}, status=400)
+        elif filter_type == 'month' and month and year:
+            try:
+                month_int = int(month)
+                year_int = int(year)
+                quantity_history = quantity_history.filter(
+                    timestamp__year=year_int,
+                    timestamp__month=month_int
+                )
+            except ValueError:
+                return JsonResponse({'error': 'Invalid month or year'}, status=400)
+        
+        # Process activity data
+        activity_data = []
+        total_additions = 0
+        total_deductions = 0
+        
+        for entry in quantity_history:
+            try:
+                old_qty = int(entry.old_value) if entry.old_value and entry.old_value.isdigit() else 0
+                new_qty = int(entry.new_value) if entry.new_value and entry.new_value.isdigit() else 0
+                quantity_change = new_qty - old_qty
+                
+                if entry.action == 'create':
+                    action_type = 'Initial Creation'
+                    quantity_change = new_qty
+                elif quantity_change > 0:
+                    action_type = 'Addition'
+                    total_additions += quantity_change
+                elif quantity_change < 0:
+                    action_type = 'Deduction'
+                    total_deductions += abs(quantity_change)
+                else:
+                    action_type = 'Adjustment'
+                
+                activity_data.append({
+                    'date': entry.timestamp.strftime('%Y-%m-%d'),
+                    'time': entry.timestamp.strftime('%H:%M:%S'),
+                    'action': action_type,
+                    'quantity_change': quantity_change,
+                    'previous_quantity': old_qty,
+                    'new_quantity': new_qty,
+                    'user': entry.user.get_full_name() if entry.user and entry.user.get_full_name() else (entry.user.username if entry.user else 'System'),
+                    'remarks': entry.remarks if entry.remarks else 'N/A'
+                })
+            except Exception as e:
+                print(f"Error processing entry {entry.id}: {str(e)}")
+                continue
+        
+        net_change = total_additions - total_deductions
+        
+        # Prepare filter info for the report
+        filter_info = {
+            'filter_type': filter_type,
+            'user_filter': user_filter,
+            'activity_type_filter': activity_type_filter
+        }
+        
+        if format_type == 'excel':
+            return _generate_excel_quantity_report(supply, activity_data, total_additions, total_deductions, net_change, filter_info)
+        else:
+            return _generate_pdf_quantity_report(supply, activity_data, total_additions, total_deductions, net_change, filter_info)
+        
+    except Supply.DoesNotExist:
+        return JsonResponse({'error': 'Supply not found'}, status=404)
+    except Exception as e:
+        print(f"Error generating quantity activity report: {str(e)}")
+        return JsonResponse({'error': 'An error occurred while generating the report'}, status=500)
+
+
+def _generate_excel_quantity_report(supply, activity_data, total_additions, total_deductions, net_change, filter_info):
+    """Generate Excel report for quantity activity"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill
+    wb = Workbook()
+    ws = wb.active
+    ws.title = f"Quantity Activity - {supply.supply_name}"
+    
+    # Set column widths
+    ws.column_dimensions['A'].width = 15  # Date
+    ws.column_dimensions['B'].width = 12  # Time
+    ws.column_dimensions['C'].width = 18  # Action
+    ws.column_dimensions['D'].width = 15  # Quantity Change
+    ws.column_dimensions['E'].width = 15  # Previous Qty
+    ws.column_dimensions['F'].width = 12  # New Qty
+    ws.column_dimensions['G'].width = 20  # User
+    ws.column_dimensions['H'].width = 30  # Remarks
+    
+    # Title and summary
+    ws['A1'] = f"Quantity Activity Report - {supply.supply_name}"
+    ws['A1'].font = Font(size=16, bold=True)
+    
+    # Add filter information
+    row_offset = 3
+    if filter_info['user_filter'] != 'all':
+        ws[f'A{row_offset}'] = f"Filtered by Requestor: {filter_info['user_filter']}"
+        row_offset += 1
+    if filter_info['activity_type_filter'] != 'all':
+        ws[f'A{row_offset}'] = f"Activity Type Filter: {filter_info['activity_type_filter']}"
+        row_offset += 1
+    
+    ws[f'A{row_offset}'] = f"Total Additions: {total_additions}"
+    ws[f'A{row_offset + 1}'] = f"Total Deductions: {total_deductions}"
+    ws[f'A{row_offset + 2}'] = f"Net Change: {net_change}"
+    ws[f'A{row_offset + 3}'] = f"Total Transactions: {len(activity_data)}"
+    
+    # Headers
+    headers = ['Date', 'Time', 'Action', 'Quantity Change', 'Previous Qty', 'New Qty', 'User', 'Remarks']
+    header_row = row_offset + 5
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=header_row, column=col, value=header)
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+    
+    # Data rows
+    for row, activity in enumerate(activity_data, header_row + 1):
+        ws.cell(row=row, column=1, value=activity['date'])
+        ws.cell(row=row, column=2, value=activity['time'])
+        ws.cell(row=row, column=3, value=activity['action'])
+        ws.cell(row=row, column=4, value=activity['quantity_change'])
+        ws.cell(row=row, column=5, value=activity['previous_quantity'])
+        ws.cell(row=row, column=6, value=activity['new_quantity'])
+        ws.cell(row=row, column=7, value=activity['user'])
+        ws.cell(row=row, column=8, value=activity['remarks'])
+    
+    # Create response
+    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    response['Content-Disposition'] = f'attachment; filename="quantity_activity_{supply.supply_name}_{datetime.now().strftime("%Y%m%d")}.xlsx"'
+    
+    wb.save(response)
+    return response
+
+
+def _generate_pdf_quantity_report(supply, activity_data, total_additions, total_deductions, net_change, filter_info):
+    """Generate PDF report for quantity activity"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    response = HttpResponse(content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="quantity_activity_{supply.supply_name}_{datetime.now().strftime("%Y%m%d")}.pdf"'
+    
+    doc = SimpleDocTemplate(response, pagesize=landscape(A4))
+    styles = getSampleStyleSheet()
+    story = []
+    
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=1  # Center
+    )
+    story.append(Paragraph(f"Quantity Activity Report - {supply.supply_name}", title_style))
+    
+    # Add filter information
+    filter_text = []
+    if filter_info['user_filter'] != 'all':
+        filter_text.append(f"<b>Filtered by Requestor:</b> {filter_info['user_filter']}")
+    if filter_info['activity_type_filter'] != 'all':
+        filter_text.append(f"<b>Activity Type Filter:</b> {filter_info['activity_type_filter']}")
+    
+    if filter_text:
+        filter_para = Paragraph("<br/>".join(filter_text), styles['Normal'])
+        story.append(filter_para)
+        story.append(Spacer(1, 12))
+    
+    # Summary section
+    summary_data = [
+        ['Summary', '', '', ''],
+        ['Total Additions:', total_additions, 'Total Deductions:', total_deductions],
+        ['Net Change:', net_change, 'Total Transactions:', len(activity_data)]
+    ]
+    
+    summary_table = Table(summary_data, colWidths=[120, 80, 120, 80])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    
+    story.append(summary_table)
+    story.append(Spacer(1, 20))
+    
+    # Activity table
+    if activity_data:
+        table_data = [['Date', 'Time', 'Action', 'Change', 'Previous', 'New', 'User', 'Remarks']]
+        
+        for activity in activity_data:
+            table_data.append([
+                activity['date'],
+                activity['time'],
+                activity['action'],
+                str(activity['quantity_change']),
+                str(activity['previous_quantity']),
+                str(activity['new_quantity']),
+                activity['user'][:15] + '...' if len(activity['user']) > 15 else activity['user'],
+                activity['remarks'][:20] + '...' if len(activity['remarks']) > 20 else activity['remarks']
+            ])
+        
+        table = Table(table_data, colWidths=[80, 60, 80, 50, 60, 50, 100, 120])
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ]))
+        story.append(table)
+    else:
+        story.append(Paragraph("No quantity activity found for the selected period.", styles['Normal']))
+    
+    doc.build(story)
+    return response
+
+
+@login_required
+@using_reporting()
+def export_property_to_pdf_ics(request):
+    """Export properties with unit value below 50,000 as Excel Inventory Custodian Slip (ICS)"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from django.utils import timezone
+    
+    # Get form data
+    college_campus = request.POST.get('college_campus', 'BACOOR')
+    accountable_person_filter = request.POST.get('accountable_person_ics', '(All)')
+    
+    # Get all properties
+    properties = Property.objects.select_related('category').all()
+    
+    # Filter properties with unit value (unit cost) below 50,000
+    filtered_properties = []
+    for prop in properties:
+        unit_cost = float(prop.unit_value or 0)
+        qty_per_card = int(prop.overall_quantity or 0)  # Use overall_quantity instead of quantity
+        total_value = unit_cost * qty_per_card
+        
+        # Filter based on unit cost being below 50,000
+        if unit_cost < 50000:
+            # Apply accountable person filter if specified
+            if accountable_person_filter == '(All)' or prop.accountable_person == accountable_person_filter:
+                filtered_properties.append({
+                    'article': prop.property_name or 'N/A',  # Property name as Article
+                    'description': prop.description or '',
+                    'property_number': prop.property_number or 'N/A',
+                    'unit_of_measure': prop.unit_of_measure or 'unit',
+                    'unit_cost': unit_cost,
+                    'total_value': total_value,
+                    'qty_per_card': qty_per_card,
+                    'qty_per_physical_count': prop.quantity_per_physical_count or qty_per_card,
+                    'remarks': 'test',
+                    'accountable_person': prop.accountable_person or 'N/A',
+                    'year_acquired': prop.year_acquired.strftime('%m/%d/%Y') if prop.year_acquired else 'N/A'
+                })
+    
+    # Create workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "ICS Below 50000"
+    
+    # Header styling
+    header_fill = PatternFill(start_color="152d64", end_color="152d64", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    # Add title
+    ws.merge_cells('A1:K1')
+    ws['A1'] = 'List of Inventories / Inventory Custodian Slip (ICS)'
+    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].alignment = Alignment(horizontal='center')
+    
+    # Add info rows
+    ws.merge_cells('A2:K2')
+    ws['A2'] = f'College / Campus: {college_campus}'
+    ws['A2'].alignment = Alignment(horizontal='left')
+    
+    ws.merge_cells('A3:K3')
+    ws['A3'] = f'Accountable Person: {accountable_person_filter}'
+    ws['A3'].alignment = Alignment(horizontal='left')
+    
+    ws.merge_cells('A4:K4')
+    ws['A4'] = f'Generated on: {timezone.now().strftime("%B %d, %Y %I:%M %p")}'
+    ws['A4'].alignment = Alignment(horizontal='center')
+    
+    # Headers
+    headers = ['Article', 'Description', 'Property Number', 'Unit Of Measure', 
+               'Unit Cost', 'Total Value', 'QTY Per card', 'Qty Per Physical Count', 
+               'Remarks', 'Accountable Person', 'Year Acquired']
+    ws.append([])  # Empty row
+    ws.append(headers)
+    
+    # Style headers (row 6)
+    for cell in ws[6]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+        cell.border = border
+    
+    # Add data
+    if filtered_properties:
+        for prop in filtered_properties:
+            ws.append([
+                prop['article'],
+                prop['description'],
+                prop['property_number'],
+                prop['unit_of_measure'],
+                prop['unit_cost'],
+                prop['total_value'],
+                prop['qty_per_card'],
+                prop['qty_per_physical_count'],
+                prop['remarks'],
+                prop['accountable_person'],
+                prop['year_acquired']
+            ])
+    else:
+        ws.append(['No properties found with unit cost below ₱50,000.00', '', '', '', '', '', '', '', '', '', ''])
+    
+    # Style data rows
+    for row in ws.iter_rows(min_row=7, max_row=ws.max_row, min_col=1, max_col=11):
+        for cell in row:
+            cell.border = border
+            cell.alignment = Alignment(vertical='center', wrap_text=True)
+    
+    # Format number columns
+    for row in ws.iter_rows(min_row=7, max_row=ws.max_row, min_col=5, max_col=6):
+        for cell in row:
+            if isinstance(cell.value, (int, float)):
+                cell.number_format = '#,##0.00'
+                cell.alignment = Alignment(horizontal='right', vertical='center')
+    
+    # Center align specific columns
+    for row in ws.iter_rows(min_row=7, max_row=ws.max_row):
+        # Property Number
+        row[2].alignment = Alignment(horizontal='center', vertical='center')
+        # Unit of Measure
+        row[3].alignment = Alignment(horizontal='center', vertical='center')
+        # QTY columns
+        row[6].alignment = Alignment(horizontal='center', vertical='center')
+        row[7].alignment = Alignment(horizontal='center', vertical='center')
+    
+    # Adjust column widths
+    column_widths = [20, 30, 18, 15, 12, 12, 12, 18, 15, 20, 15]
+    for i, width in enumerate(column_widths, 1):
+        ws.column_dimensions[chr(64 + i)].width = width
+    
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename=ICS_Below_50000_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    wb.save(response)
+    
+    return response
+
+
+@login_required
+@using_reporting()
+def export_inventory_count_form_cvsu(request):
+    """
+    Generate Excel Inventory Count Form matching CvSU format.
+    Filters items with unit value >= 50,000 and groups them by PPE Account Group (category).
+    All categories are in one sheet with footer sections between them.
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Side, Font as OpenpyxlFont
+    from openpyxl.drawing.image import Image as OpenpyxlImage
+    from PIL import Image as PILImage
+    from collections import OrderedDict
+    
+    # Filter properties with unit_value at or above 50,000
+    properties = Property.objects.filter(
+        unit_value__gte=50000
+    ).select_related('category').order_by('category__name', 'property_name')
+    
+    # Check if there are any properties
+    if not properties.exists():
+        messages.warning(request, 'No properties with unit value at or above ₱50,000.00 were found. Please ensure you have properties meeting this criteria in your inventory.')
+        return redirect('property')
+    
+    # Group properties by category
+    properties_by_category = OrderedDict()
+    for prop in properties:
+        if prop.category:
+            category_key = prop.category.id
+            if category_key not in properties_by_category:
+                properties_by_category[category_key] = {
+                    'category': prop.category,
+                    'properties': []
+                }
+            properties_by_category[category_key]['properties'].append(prop)
+        else:
+            # Handle properties without category
+            if 'uncategorized' not in properties_by_category:
+                properties_by_category['uncategorized'] = {
+                    'category': None,
+                    'properties': []
+                }
+            properties_by_category['uncategorized']['properties'].append(prop)
+    
+    # Get optional column selections from request
+    include_accountable_person = request.POST.get('include_accountable_person') == 'yes'
+    include_year_acquired = request.POST.get('include_year_acquired') == 'yes'
+    
+    # Calculate total columns and last column letter
+    base_columns = 11  # A-K (Article to Remarks)
+    total_columns = base_columns
+    if include_accountable_person:
+        total_columns += 1
+    if include_year_acquired:
+        total_columns += 1
+    last_col_letter = chr(64 + total_columns)  # Convert to letter (A=65, so A=1+64)
+    
+    # Create workbook with single sheet
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Inventory Count Form"
+    
+    # Define styles
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    header_font = OpenpyxlFont(name='Calibri', size=10, bold=True)
+    normal_font = OpenpyxlFont(name='Calibri', size=9)
+    title_font = OpenpyxlFont(name='Calibri', size=11, bold=True)
+    center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    left_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    
+    # Set column widths
+    ws.column_dimensions['A'].width = 18  # Article/Item
+    ws.column_dimensions['B'].width = 35  # Description
+    ws.column_dimensions['C'].width = 15  # Old Property No.
+    ws.column_dimensions['D'].width = 15  # New Property No.
+    ws.column_dimensions['E'].width = 10  # Unit of Measure
+    ws.column_dimensions['F'].width = 12  # Unit Value
+    ws.column_dimensions['G'].width = 10  # Qty per Property Card
+    ws.column_dimensions['H'].width = 10  # Qty per Physical Count
+    ws.column_dimensions['I'].width = 20  # Location
+    ws.column_dimensions['J'].width = 15  # Condition
+    ws.column_dimensions['K'].width = 15  # Remarks
+    
+    # Set widths for optional columns
+    current_col_index = 12  # Start after K (column 11)
+    if include_accountable_person:
+        ws.column_dimensions[chr(64 + current_col_index)].width = 18  # Accountable Person
+        current_col_index += 1
+    if include_year_acquired:
+        ws.column_dimensions[chr(64 + current_col_index)].width = 12  # Year Acquired
+    
+    current_row = 1
+    
+    # Process each category
+    for idx, (cat_key, cat_data) in enumerate(properties_by_category.items()):
+        category = cat_data['category']
+        category_properties = cat_data['properties']
+        
+        # Add header for each category section
+        # Add logo for EVERY section - position it on the left side overlapping rows 1-5
+        logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'cvsu logo.png')
+        if os.path.exists(logo_path):
+            try:
+                # Load and resize logo
+                img = OpenpyxlImage(logo_path)
+                # Resize logo to approximately 80x80 pixels to span multiple rows
+                img.width = 80
+                img.height = 80
+                # Position logo at C row (left area, will span across rows 1-5)
+                ws.add_image(img, f'C{current_row}')
+            except Exception as e:
+                print(f"Error adding logo: {e}")
+        
+        # Row 1: Republic of the Philippines
+        ws.merge_cells(f'A{current_row}:{last_col_letter}{current_row}')
+        cell = ws[f'A{current_row}']
+        cell.value = 'Republic of the Philippines'
+        cell.font = OpenpyxlFont(name='Calibri', size=10, bold=False)
+        cell.alignment = center_alignment
+        current_row += 1
+        
+        # Row 2: CAVITE STATE UNIVERSITY
+        ws.merge_cells(f'A{current_row}:{last_col_letter}{current_row}')
+        cell = ws[f'A{current_row}']
+        cell.value = 'CAVITE STATE UNIVERSITY'
+        cell.font = OpenpyxlFont(name='Calibri', size=12, bold=True)
+        cell.alignment = center_alignment
+        current_row += 1
+        
+        # Row 3: Don Severino de las Alas Campus
+        ws.merge_cells(f'A{current_row}:{last_col_letter}{current_row}')
+        cell = ws[f'A{current_row}']
+        cell.value = 'Don Severino de las Alas Campus'
+        cell.font = OpenpyxlFont(name='Calibri', size=10, bold=True)
+        cell.alignment = center_alignment
+        current_row += 1
+        
+        # Row 4: Indang, Cavite
+        ws.merge_cells(f'A{current_row}:{last_col_letter}{current_row}')
+        cell = ws[f'A{current_row}']
+        cell.value = 'Indang, Cavite'
+        cell.font = OpenpyxlFont(name='Calibri', size=10, bold=False)
+        cell.alignment = center_alignment
+        current_row += 1
+        
+        # Row 5: www.cvsu.edu.ph
+        ws.merge_cells(f'A{current_row}:{last_col_letter}{current_row}')
+        cell = ws[f'A{current_row}']
+        cell.value = 'www.cvsu.edu.ph'
+        cell.font = OpenpyxlFont(name='Calibri', size=9, bold=False, color='0000FF', underline='single')
+        cell.alignment = center_alignment
+        current_row += 1
+        
+        # Blank row
+        current_row += 1
+        
+        # Inventory Count Form title
+        ws.merge_cells(f'A{current_row}:{last_col_letter}{current_row}')
+        cell = ws[f'A{current_row}']
+        cell.value = 'Inventory Count Form'
+        cell.font = OpenpyxlFont(name='Calibri', size=12, bold=True)
+        cell.alignment = center_alignment
+        current_row += 1
+        
+        # Blank row
+        current_row += 1
+        
+        # PPE Account Group - Label in column A
+        cell = ws.cell(row=current_row, column=1)
+        cell.value = 'PPE Account Group:'
+        cell.font = OpenpyxlFont(name='Calibri', size=10, bold=True)
+        cell.alignment = left_alignment
+        
+        # UACS + Category in columns B-C (merged with bottom border)
+        ws.merge_cells(f'B{current_row}:C{current_row}')
+        cell_b = ws.cell(row=current_row, column=2)
+        cell_c = ws.cell(row=current_row, column=3)
+        
+        if category and category.uacs:
+            cell_b.value = f'{category.uacs} - {category.name}'
+        elif category:
+            cell_b.value = f'{category.name}'
+        else:
+            cell_b.value = 'Uncategorized'
+        
+        cell_b.font = OpenpyxlFont(name='Calibri', size=10, bold=False)
+        cell_b.alignment = left_alignment
+        # Add bottom border to both B and C cells
+        cell_b.border = Border(bottom=Side(style='thin', color='000000'))
+        cell_c.border = Border(bottom=Side(style='thin', color='000000'))
+        current_row += 1
+        
+        # Blank row
+        current_row += 1
+        
+        # Table Headers (base columns)
+        headers = [
+            'Article/Item',
+            'Description',
+            'Old Property No.\nassigned',
+            'New Property No.\nassigned\n(to be filled up during\nvalidation)',
+            'Unit of\nMeasure',
+            'Unit Value',
+            'Quantity per\nProperty Card',
+            'Quantity per\nPhysical Count',
+            'Location/Whereabouts\n(Building, Floor and\nRoom No.)',
+            'Condition\n(in good condition,\nneeding repair,\nunserviceable,\nobsolete, etc.)',
+            'Remarks\n(Non-existing\nor Missing)'
+        ]
+        
+        # Add optional headers
+        if include_accountable_person:
+            headers.append('Accountable Person')
+        if include_year_acquired:
+            headers.append('Year Acquired')
+        
+        for col_idx, header in enumerate(headers, start=1):
+            cell = ws.cell(row=current_row, column=col_idx)
+            cell.value = header
+            cell.font = header_font
+            cell.alignment = center_alignment
+            cell.border = thin_border
+        
+        # Set row height for header
+        ws.row_dimensions[current_row].height = 60
+        current_row += 1
+        
+        # Data rows
+        for prop in category_properties:
+            # Article/Item
+            cell = ws.cell(row=current_row, column=1)
+            cell.value = prop.property_name or ''
+            cell.font = normal_font
+            cell.alignment = left_alignment
+            cell.border = thin_border
+            
+            # Description
+            cell = ws.cell(row=current_row, column=2)
+            cell.value = prop.description or ''
+            cell.font = normal_font
+            cell.alignment = left_alignment
+            cell.border = thin_border
+            
+            # Old Property No.
+            cell = ws.cell(row=current_row, column=3)
+            cell.value = prop.old_property_number or ''
+            cell.font = normal_font
+            cell.alignment = center_alignment
+            cell.border = thin_border
+            
+            # New Property No.
+            cell = ws.cell(row=current_row, column=4)
+            cell.value = prop.property_number or ''
+            cell.font = normal_font
+            cell.alignment = center_alignment
+            cell.border = thin_border
+            
+            # Unit of Measure
+            cell = ws.cell(row=current_row, column=5)
+            cell.value = prop.unit_of_measure or ''
+            cell.font = normal_font
+            cell.alignment = center_alignment
+            cell.border = thin_border
+            
+            # Unit Value
+            cell = ws.cell(row=current_row, column=6)
+            cell.value = float(prop.unit_value) if prop.unit_value else 0
+            cell.font = normal_font
+            cell.alignment = Alignment(horizontal='right', vertical='center')
+            cell.border = thin_border
+            cell.number_format = '#,##0.00'
+            
+            # Quantity per Property Card
+            cell = ws.cell(row=current_row, column=7)
+            cell.value = prop.quantity or 0
+            cell.font = normal_font
+            cell.alignment = center_alignment
+            cell.border = thin_border
+            
+            # Quantity per Physical Count
+            cell = ws.cell(row=current_row, column=8)
+            cell.value = prop.quantity_per_physical_count or 0
+            cell.font = normal_font
+            cell.alignment = center_alignment
+            cell.border = thin_border
+            
+            # Location/Whereabouts
+            cell = ws.cell(row=current_row, column=9)
+            cell.value = prop.location or ''
+            cell.font = normal_font
+            cell.alignment = left_alignment
+            cell.border = thin_border
+            
+            # Condition
+            cell = ws.cell(row=current_row, column=10)
+            cell.value = prop.condition or ''
+            cell.font = normal_font
+            cell.alignment = center_alignment
+            cell.border = thin_border
+            
+            # Remarks
+            cell = ws.cell(row=current_row, column=11)
+            cell.value = ''  # Empty for manual entry
+            cell.font = normal_font
+            cell.alignment = left_alignment
+            cell.border = thin_border
+            
+            # Optional columns - dynamically add after Remarks
+            opt_col = 12  # Start after column 11 (Remarks)
+            if include_accountable_person:
+                cell = ws.cell(row=current_row, column=opt_col)
+                cell.value = prop.accountable_person or ''
+                cell.font = normal_font
+                cell.alignment = left_alignment
+                cell.border = thin_border
+                opt_col += 1
+            
+            if include_year_acquired:
+                cell = ws.cell(row=current_row, column=opt_col)
+                cell.value = prop.year_acquired.strftime('%Y') if prop.year_acquired else ''
+                cell.font = normal_font
+                cell.alignment = center_alignment
+                cell.border = thin_border
+            
+            # Set row height
+            ws.row_dimensions[current_row].height = 30
+            current_row += 1
+        
+        # Add footer section after each category
+        # Blank row
+        current_row += 1
+        
+        # Note section - "Note:" in column A (bold), rest of text in B-lastcol (not bold)
+        cell = ws.cell(row=current_row, column=1)
+        cell.value = 'Note:'
+        cell.font = OpenpyxlFont(name='Calibri', size=9, bold=True)
+        cell.alignment = left_alignment
+        
+        # Note content text - merge dynamically based on total columns
+        ws.merge_cells(f'B{current_row}:{last_col_letter}{current_row}')
+        cell = ws[f'B{current_row}']
+        cell.value = 'for PPE items without Property No., provide in the "Remarks" column other information such as Serial No./Model No./brief description that can be useful during the reconciliation process.'
+        cell.font = OpenpyxlFont(name='Calibri', size=9, bold=False)
+        cell.alignment = left_alignment
+        current_row += 1
+        
+        # Blank rows for spacing
+        current_row += 2
+        
+        # Prepared by section (LEFT SIDE - Columns A-C)
+        prepared_row = current_row
+        cell = ws.cell(row=current_row, column=1)
+        cell.value = 'Prepared by:'
+        cell.font = OpenpyxlFont(name='Calibri', size=9, bold=True)
+        cell.alignment = left_alignment
+        
+        # Reviewed by section (RIGHT SIDE - Column G)
+        cell = ws.cell(row=current_row, column=7)
+        cell.value = 'Reviewed by:'
+        cell.font = OpenpyxlFont(name='Calibri', size=9, bold=True)
+        cell.alignment = left_alignment
+        current_row += 1
+        
+        # Blank row before signatures
+        current_row += 1
+        
+        # Signature line for Prepared by (bottom border only in column B)
+        cell = ws.cell(row=current_row, column=2)
+        cell.border = Border(bottom=Side(style='thin', color='000000'))
+        cell.alignment = center_alignment
+        
+        # Signature line for Reviewed by (bottom border in columns H-J)
+        ws.merge_cells(f'H{current_row}:J{current_row}')
+        for col in range(8, 11):  # Columns H, I, J
+            cell = ws.cell(row=current_row, column=col)
+            cell.border = Border(bottom=Side(style='thin', color='000000'))
+            cell.alignment = center_alignment
+        current_row += 1
+        
+        # Title for Prepared by (only in column B)
+        cell = ws.cell(row=current_row, column=2)
+        cell.value = 'Concerned Inventory Committee Member'
+        cell.font = OpenpyxlFont(name='Calibri', size=9)
+        cell.alignment = center_alignment
+        
+        # Title for Reviewed by (merged in H-J)
+        ws.merge_cells(f'H{current_row}:J{current_row}')
+        cell = ws.cell(row=current_row, column=8)
+        cell.value = 'Chairman, Inventory Committee'
+        cell.font = OpenpyxlFont(name='Calibri', size=9)
+        cell.alignment = center_alignment
+        current_row += 1
+        
+        # Blank rows
+        current_row += 2
+        
+        # Date section (LEFT SIDE)
+        cell = ws.cell(row=current_row, column=1)
+        cell.value = 'Date:'
+        cell.font = OpenpyxlFont(name='Calibri', size=9, bold=True)
+        cell.alignment = left_alignment
+        current_row += 1
+        
+        # Blank row before date line
+        current_row += 1
+        
+        # Date line for left side (bottom border only in column A)
+        cell = ws.cell(row=current_row, column=1)
+        cell.border = Border(bottom=Side(style='thin', color='000000'))
+        cell.alignment = center_alignment
+        current_row += 1
+        
+        # Add spacing before next category (7 blank rows)
+        if idx < len(properties_by_category) - 1:
+            current_row += 7
+    
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename=Inventory_Count_Over50k_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    
+    wb.save(response)
+    return response
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@using_reporting()
+def export_archived_supplies_excel(request):
+    """Export archived supplies to Excel, respecting category/subcategory filters."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+    category_filter = request.GET.get('category', '')
+    subcategory_filter = request.GET.get('subcategory', '')
+
+    supplies = Supply.objects.filter(is_archived=True).select_related(
+        'category', 'subcategory', 'quantity_info'
+    ).order_by('category__name', 'supply_name')
+
+    if category_filter:
+        supplies = supplies.filter(category__name=category_filter)
+    if subcategory_filter:
+        supplies = supplies.filter(subcategory__name=subcategory_filter)
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Archived Supplies"
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="152D64", end_color="152D64", fill_type="solid")
+    title_font = Font(bold=True, size=14)
+    category_font = Font(bold=True, size=11, color="152D64")
+    thin = Side(border_style="thin", color="000000")
+    thin_border = Border(top=thin, left=thin, right=thin, bottom=thin)
+    center = Alignment(horizontal='center', vertical='center')
+
+    # Title
+    ws.merge_cells('A1:G1')
+    ws['A1'] = 'ARCHIVED SUPPLIES REPORT'
+    ws['A1'].font = title_font
+    ws['A1'].alignment = center
+
+    # Metadata
+    ws['A3'] = 'Department:'
+    ws['B3'] = (request.user.userprofile.department.name
+                if hasattr(request.user, 'userprofile') and request.user.userprofile.department
+                else '_____________________')
+    ws['E3'] = 'Date:'
+    ws['F3'] = datetime.now().strftime("%B %d, %Y")
+
+    ws['A4'] = 'Prepared by:'
+    ws['B4'] = f'{request.user.first_name} {request.user.last_name}'
+
+    filter_desc = []
+    if category_filter:
+        filter_desc.append(f'Category: {category_filter}')
+    if subcategory_filter:
+        filter_desc.append(f'Subcategory: {subcategory_filter}')
+    if filter_desc:
+        ws['A5'] = 'Filters:'
+        ws['B5'] = ' | '.join(filter_desc)
+
+    col_headers = ['Supply Name', 'Description', 'Category', 'Subcategory',
+                   'Date Received', 'Expiration Date', 'Unit']
+    col_fields = ['supply_name', 'description', 'category', 'subcategory',
+                  'date_received', 'expiration_date', 'unit']
+
+    current_row = 7
+
+    # Group by category for display
+    from collections import defaultdict as _dd
+    grouped = _dd(list)
+    for s in supplies:
+        cat = s.category.name if s.category else 'Uncategorized'
+        grouped[cat].append(s)
+
+    for cat_name, cat_supplies in grouped.items():
+        # Category header row
+        ws.cell(row=current_row, column=1, value=cat_name).font = category_font
+        current_row += 1
+
+        # Column headers
+        for col_idx, header in enumerate(col_headers, 1):
+            cell = ws.cell(row=current_row, column=col_idx)
+            cell.value = header
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.border = thin_border
+            cell.alignment = center
+        current_row += 1
+
+        # Data rows
+        for supply in cat_supplies:
+            row_values = [
+                supply.supply_name,
+                supply.description or 'N/A',
+                supply.category.name if supply.category else 'N/A',
+                supply.subcategory.name if supply.subcategory else 'None',
+                supply.date_received.strftime("%B %d, %Y") if supply.date_received else 'N/A',
+                supply.expiration_date.strftime("%B %d, %Y") if supply.expiration_date else 'N/A',
+                supply.unit or 'N/A',
+            ]
+            for col_idx, value in enumerate(row_values, 1):
+                cell = ws.cell(row=current_row, column=col_idx)
+                cell.value = value
+                cell.border = thin_border
+            current_row += 1
+
+        current_row += 1  # Spacer between categories
+
+    # Auto-width columns (skip MergedCell objects)
+    from openpyxl.utils import get_column_letter
+    from openpyxl.cell.cell import MergedCell
+    for col_idx in range(1, ws.max_column + 1):
+        max_len = 0
+        col_letter = get_column_letter(col_idx)
+        for cell in ws[col_letter]:
+            if not isinstance(cell, MergedCell) and cell.value:
+                max_len = max(max_len, len(str(cell.value)))
+        ws.column_dimensions[col_letter].width = min(max_len + 4, 50)
+
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    filename_parts = ['archived_supplies']
+    if category_filter:
+        filename_parts.append(category_filter.replace(' ', '_'))
+    if subcategory_filter:
+        filename_parts.append(subcategory_filter.replace(' ', '_'))
+    filename = '_'.join(filename_parts) + '.xlsx'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    wb.save(response)
+    return response
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@using_reporting()
+def export_archived_properties_excel(request):
+    """Export archived properties to Excel, respecting category/condition filters."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+    category_filter = request.GET.get('category', '')
+    condition_filter = request.GET.get('condition', '')
+
+    properties = Property.objects.filter(is_archived=True).select_related(
+        'category'
+    ).order_by('category__name', 'property_name')
+
+    if category_filter:
+        properties = properties.filter(category__name=category_filter)
+    if condition_filter:
+        properties = properties.filter(condition=condition_filter)
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Archived Properties"
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="152D64", end_color="152D64", fill_type="solid")
+    title_font = Font(bold=True, size=14)
+    category_font = Font(bold=True, size=11, color="152D64")
+    thin = Side(border_style="thin", color="000000")
+    thin_border = Border(top=thin, left=thin, right=thin, bottom=thin)
+    center = Alignment(horizontal='center', vertical='center')
+
+    # Title
+    ws.merge_cells('A1:I1')
+    ws['A1'] = 'ARCHIVED PROPERTIES REPORT'
+    ws['A1'].font = title_font
+    ws['A1'].alignment = center
+
+    # Metadata
+    ws['A3'] = 'Department:'
+    ws['B3'] = (request.user.userprofile.department.name
+                if hasattr(request.user, 'userprofile') and request.user.userprofile.department
+                else '_____________________')
+    ws['F3'] = 'Date:'
+    ws['G3'] = datetime.now().strftime("%B %d, %Y")
+
+    ws['A4'] = 'Prepared by:'
+    ws['B4'] = f'{request.user.first_name} {request.user.last_name}'
+
+    filter_desc = []
+    if category_filter:
+        filter_desc.append(f'Category: {category_filter}')
+    if condition_filter:
+        filter_desc.append(f'Condition: {condition_filter}')
+    if filter_desc:
+        ws['A5'] = 'Filters:'
+        ws['B5'] = ' | '.join(filter_desc)
+
+    col_headers = ['Property No.', 'Property Name', 'Description', 'Category',
+                   'Location', 'Accountable Person', 'Year Acquired', 'Condition']
+
+    current_row = 7
+
+    from collections import defaultdict as _dd
+    grouped = _dd(list)
+    for p in properties:
+        cat = p.category.name if p.category else 'Uncategorized'
+        grouped[cat].append(p)
+
+    for cat_name, cat_properties in grouped.items():
+        ws.cell(row=current_row, column=1, value=cat_name).font = category_font
+        current_row += 1
+
+        for col_idx, header in enumerate(col_headers, 1):
+            cell = ws.cell(row=current_row, column=col_idx)
+            cell.value = header
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.border = thin_border
+            cell.alignment = center
+        current_row += 1
+
+        for prop in cat_properties:
+            prop_no = prop.property_number if prop.property_number else f'ID-{prop.id}'
+            year = prop.year_acquired.strftime("%B %d, %Y") if prop.year_acquired else 'N/A'
+            row_values = [
+                prop_no,
+                prop.property_name,
+                prop.description or 'N/A',
+                prop.category.name if prop.category else 'N/A',
+                prop.location or 'N/A',
+                prop.accountable_person or 'N/A',
+                year,
+                prop.get_condition_display() if hasattr(prop, 'get_condition_display') else (prop.condition or 'N/A'),
+            ]
+            for col_idx, value in enumerate(row_values, 1):
+                cell = ws.cell(row=current_row, column=col_idx)
+                cell.value = value
+                cell.border = thin_border
+            current_row += 1
+
+        current_row += 1
+
+    # Auto-width columns (skip MergedCell objects)
+    from openpyxl.utils import get_column_letter
+    from openpyxl.cell.cell import MergedCell
+    for col_idx in range(1, ws.max_column + 1):
+        max_len = 0
+        col_letter = get_column_letter(col_idx)
+        for cell in ws[col_letter]:
+            if not isinstance(cell, MergedCell) and cell.value:
+                max_len = max(max_len, len(str(cell.value)))
+        ws.column_dimensions[col_letter].width = min(max_len + 4, 50)
+
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    filename_parts = ['archived_properties']
+    if category_filter:
+        filename_parts.append(category_filter.replace(' ', '_'))
+    if condition_filter:
+        filename_parts.append(condition_filter.replace(' ', '_'))
+    filename = '_'.join(filename_parts) + '.xlsx'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    wb.save(response)
+    return response
+
+
+# Statuses in which each slip can be printed
+REQUISITION_SLIP_STATUSES = ['approved', 'partially_approved', 'for_claiming', 'completed']
+BORROWERS_SLIP_STATUSES = ['approved', 'partially_approved', 'for_claiming', 'active', 'returned', 'completed']
+
+# Requisition and Issue Slip PDF Generation Views
+@login_required
+def download_requisition_slip(request, batch_id):
+    """
+    Download the requisition and issue slip PDF for a supply request batch.
+    Available for both admin users and the requester.
+    """
+    batch_request = get_object_or_404(SupplyRequestBatch, id=batch_id)
+    
+    # Check permissions: admin users can download any slip, regular users can only download their own
+    if not (request.user.userprofile.role == 'ADMIN' or batch_request.user == request.user):
+        messages.error(request, 'You do not have permission to access this requisition slip.')
+        return redirect('user_supply_requests')
+    
+    # Only generate slip for approved, partially approved, for_claiming, or completed requests
+    if batch_request.status not in REQUISITION_SLIP_STATUSES:
+        messages.error(request, 'Requisition slip is only available for approved requests.')
+        return redirect('batch_request_detail' if request.user.userprofile.role == 'ADMIN' else 'user_supply_requests', batch_id=batch_id)
+    
+    try:
+        from ..pdf_utils import download_requisition_slip
+        
+        # Log the download activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='view',
+            model_name='SupplyRequestBatch',
+            object_repr=f"Requisition Slip #{batch_id}",
+            description=f"Downloaded requisition slip for batch request #{batch_id}"
+        )
+        
+        return download_requisition_slip(batch_request)
+        
+    except Exception as e:
+        messages.error(request, f'Error generating requisition slip: {str(e)}')
+        return redirect('batch_request_detail' if request.user.userprofile.role == 'ADMIN' else 'user_supply_requests', batch_id=batch_id)
+
+
+# Bump when the slip layout in app/pdf_utils.py changes, so cached slips are regenerated
+SLIP_LAYOUT_VERSION = 1
+
+# Printed for the requester, the approver and the releasing admin
+SLIP_PERSON_FIELDS = (
+    'id', 'username', 'first_name', 'last_name',
+    'userprofile__designation', 'userprofile__department__name',
+)
+
+
+def _slip_etag(request, batch_model, item_model, batch_id, statuses, item_fields, activity):
+    """
+    ETag for a generated slip PDF, built from every batch, item and person
+    field app/pdf_utils.py prints on it.
+
+    Returns None (no validation, the view answers) when the user may not
+    view the slip or it cannot be printed yet. Otherwise the view is logged
+    here rather than in the view, so a slip served from the browser's cache
+    with a 304 is in the audit trail like a regenerated one.
+    """
+    batch = batch_model.objects.filter(id=batch_id).values(
+        'user_id', 'status', 'purpose', 'remarks', 'request_date', 'approved_date', 'claimed_date',
+        'completed_date', 'approved_by_id', 'claimed_by_id',
+    ).first()
+    if not batch or batch['status'] not in statuses:
+        return None
+    if not (request.user.userprofile.role == 'ADMIN' or batch['user_id'] == request.user.id):
+        return None
+    items = list(item_model.objects.filter(batch_request_id=batch_id).order_by('id').values_list(*item_fields))
+    people = list(User.objects.filter(
+        pk__in=[batch['user_id'], batch['approved_by_id'], batch['claimed_by_id']]
+    ).order_by('pk').values_list(*SLIP_PERSON_FIELDS))
+
+    model_name, object_repr, description = activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='view',
+        model_name=model_name,
+        object_repr=object_repr.format(batch_id=batch_id),
+        description=description.format(batch_id=batch_id),
+    )
+    fingerprint = (SLIP_LAYOUT_VERSION, sorted(batch.items()), items, people)
+    return hashlib.md5(repr(fingerprint).encode()).hexdigest()
+
+
+def _requisition_slip_etag(request, batch_id):
+    return _slip_etag(
+        request, SupplyRequestBatch, SupplyRequestItem, batch_id, REQUISITION_SLIP_STATUSES,
+        ('id', 'supply_id', 'supply__supply_name', 'supply__quantity_info__current_quantity',
+         'quantity', 'approved_quantity', 'status', 'remarks', 'claimed_date'),
+        ('SupplyRequestBatch', "Requisition Slip #{batch_id}",
+         "Viewed requisition slip for batch request #{batch_id}"),
+    )
+
+
+def _borrowers_slip_etag(request, batch_id):
+    return _slip_etag(
+        request, BorrowRequestBatch, BorrowRequestItem, batch_id, BORROWERS_SLIP_STATUSES,
+        ('id', 'property_id', 'property__property_name', 'quantity', 'approved_quantity', 'status',
+         'return_date', 'actual_return_date', 'claimed_date'),
+        ('BorrowRequestBatch', "Borrower's Slip #{batch_id}",
+         "Viewed borrower's slip for borrow batch request #{batch_id}"),
+    )
+
+
+@login_required
+@cache_policy(REVALIDATE, etag_func=_requisition_slip_etag)
+def view_requisition_slip(request, batch_id):
+    """
+    View the requisition and issue slip PDF in browser for a supply request batch.
+    Available for both admin users and the requester.
+    """
+    batch_request = get_object_or_404(SupplyRequestBatch, id=batch_id)
+    
+    # Check permissions: admin users can view any slip, regular users can only view their own
+    if not (request.user.userprofile.role == 'ADMIN' or batch_request.user == request.user):
+        messages.error(request, 'You do not have permission to access this requisition slip.')
+        return redirect('user_supply_requests')
+    
+    # Only generate slip for approved, partially approved, for_claiming, or completed requests
+    if batch_request.status not in REQUISITION_SLIP_STATUSES:
+        messages.error(request, 'Requisition slip is only available for approved requests.')
+        return redirect('batch_request_detail' if request.user.userprofile.role == 'ADMIN' else 'user_supply_requests', batch_id=batch_id)
+    
+    try:
+        from ..pdf_utils import view_requisition_slip
+
+        # The view was logged by _requisition_slip_etag()
+        return view_requisition_slip(batch_request)
+        
+    except Exception as e:
+        messages.error(request, f'Error generating requisition slip: {str(e)}')
+        return redirect('batch_request_detail' if request.user.userprofile.role == 'ADMIN' else 'user_supply_requests', batch_id=batch_id)
+
+
+# Borrower's Slip PDF Generation Views
+@login_required
+def download_borrowers_slip(request, batch_id):
+    """
+    Download the borrower's slip PDF for a borrow request batch.
+    Available for both admin users and the borrower.
+    """
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    
+    # Check permissions: admin users can download any slip, regular users can only download their own
+    if not (request.user.userprofile.role == 'ADMIN' or batch_request.user == request.user):
+        messages.error(request, 'You do not have permission to access this borrower\'s slip.')
+        return redirect('user_all_requests')
+    
+    # Only generate slip for approved, partially approved, for_claiming, active, or completed requests
+    if batch_request.status not in BORROWERS_SLIP_STATUSES:
+        messages.error(request, 'Borrower\'s slip is only available for approved requests.')
+        return redirect('borrow_batch_request_detail' if request.user.userprofile.role == 'ADMIN' else 'user_all_requests', batch_id=batch_id)
+    
+    try:
+        from ..pdf_utils import download_borrowers_slip
+        
+        # Log the download activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='view',
+            model_name='BorrowRequestBatch',
+            object_repr=f"Borrower's Slip #{batch_id}",
+            description=f"Downloaded borrower's slip for borrow batch request #{batch_id}"
+        )
+        
+        return download_borrowers_slip(batch_request)
+        
+    except Exception as e:
+        messages.error(request, f'Error generating borrower\'s slip: {str(e)}')
+        return redirect('borrow_batch_request_detail' if request.user.userprofile.role == 'ADMIN' else 'user_all_requests', batch_id=batch_id)
+
+
+@login_required
+@cache_policy(REVALIDATE, etag_func=_borrowers_slip_etag)
+def view_borrowers_slip(request, batch_id):
+    """
+    View the borrower's slip PDF in browser for a borrow request batch.
+    Available for both admin users and the borrower.
+    """
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    
+    # Check permissions: admin users can view any slip, regular users can only view their own
+    if not (request.user.userprofile.role == 'ADMIN' or batch_request.user == request.user):
+        messages.error(request, 'You do not have permission to access this borrower\'s slip.')
+        return redirect('user_all_requests')
+    
+    # Only generate slip for approved, partially approved, for_claiming, active, or completed requests
+    if batch_request.status not in BORROWERS_SLIP_STATUSES:
+        messages.error(request, 'Borrower\'s slip is only available for approved requests.')
+        return redirect('borrow_batch_request_detail' if request.user.userprofile.role == 'ADMIN' else 'user_all_requests', batch_id=batch_id)
+    
+    try:
+        from ..pdf_utils import view_borrowers_slip
+
+        # The view was logged by _borrowers_slip_etag()
+        return view_borrowers_slip(batch_request)
+        
+    except Exception as e:
+        messages.error(request, f'Error generating borrower\'s slip: {str(e)}')
+        return redirect('borrow_batch_request_detail' if request.user.userprofile.role == 'ADMIN' else 'user_all_requests', batch_id=batch_id)
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+@using_reporting()
+def generate_completed_supply_requests_pdf(request):
+    """Generate PDF report for completed supply requests with filters"""
+    try:
+        from reportlab.lib.pagesizes import letter, A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+        from django.db.models import Q
+        from io import BytesIO
+        from datetime import datetime
+    except ImportError as e:
+        return HttpResponse(f"Error importing required libraries: {str(e)}", status=500)
+    
+    # Get filter parameters
+    user_filter = request.GET.get('user', '')
+    department_filter = request.GET.get('department', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    
+    # Build queryset for completed requests
+    completed_requests = SupplyRequestBatch.objects.filter(
+        status='completed'
+    ).select_related(
+        'user', 
+        'user__userprofile', 
+        'user__userprofile__department'
+    ).prefetch_related(
+        'items__supply'
+    ).order_by('-completed_date')
+    
+    # Apply filters
+    if user_filter:
+        completed_requests = completed_requests.filter(user__id=user_filter)
+    
+    if department_filter:
+        completed_requests = completed_requests.filter(user__userprofile__department__id=department_filter)
+    
+    if date_from:
+        try:
+            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d')
+            completed_requests = completed_requests.filter(completed_date__date__gte=date_from_obj.date())
+        except ValueError:
+            pass
+    
+    if date_to:
+        try:
+            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d')
+            completed_requests = completed_requests.filter(completed_date__date__lte=date_to_obj.date())
+        except ValueError:
+            pass
+    
+    # Create the HttpResponse object with PDF headers
+    response = HttpResponse(content_type='application/pdf')
+    filename = f'Completed_Supply_Requests_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    # Create the PDF object with LANDSCAPE orientation
+    from reportlab.lib.pagesizes import landscape
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, 
+        pagesize=landscape(A4),
+        rightMargin=0.5*inch, 
+        leftMargin=0.5*inch,
+        topMargin=0.5*inch, 
+        bottomMargin=0.5*inch
+    )
+    
+    # Container for the 'Flowable' objects
+    story = []
+    
+    # Define styles
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#152d64'),
+        spaceAfter=20,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=12,
+        textColor=colors.HexColor('#152d64'),
+        spaceAfter=10,
+        fontName='Helvetica-Bold'
+    )
+    
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=9,
+        alignment=TA_LEFT
+    )
+    
+    # Title
+    story.append(Paragraph("COMPLETED SUPPLY REQUESTS REPORT", title_style))
+    story.append(Paragraph(f"Generated on: {timezone.now().strftime('%B %d, %Y at %I:%M %p')}", normal_style))
+    story.append(Spacer(1, 20))
+    
+    # Filter information
+    filter_info = []
+    if user_filter:
+        try:
+            from django.contrib.auth.models import User
+            user = User.objects.get(id=user_filter)
+            user_name = f"{user.first_name} {user.last_name}".strip() or user.username
+            filter_info.append(f"User: {user_name}")
+        except:
+            pass
+    
+    if department_filter:
+        try:
+            from ..models import Department
+            dept = Department.objects.get(id=department_filter)
+            filter_info.append(f"Department: {dept.name}")
+        except:
+            pass
+    
+    if date_from:
+        filter_info.append(f"From: {date_from}")
+    
+    if date_to:
+        filter_info.append(f"To: {date_to}")
+    
+    if filter_info:
+        story.append(Paragraph("<b>Filters Applied:</b> " + " | ".join(filter_info), normal_style))
+        story.append(Spacer(1, 15))
+    
+    total_count = completed_requests.count()
+    story.append(Paragraph(f"<b>Total Requests:</b> {total_count}", normal_style))
+    story.append(Spacer(1, 15))
+    
+    # Define text wrapping style for table cells
+    wrap_style = ParagraphStyle(
+        'WrapText',
+        parent=styles['Normal'],
+        fontSize=7,
+        alignment=TA_LEFT,
+        spaceAfter=0
+    )
+    
+    # Check if there are no requests
+    if total_count == 0:
+        story.append(Paragraph("<b>No completed supply requests found with the selected filters.</b>", normal_style))
+        story.append(Spacer(1, 20))
+        story.append(Paragraph("Try adjusting your filter criteria or check back later.", normal_style))
+    else:
+        # Create a single consolidated table with all items from all completed requests
+        story.append(Paragraph("<b>All Completed Supply Requests</b>", heading_style))
+        story.append(Spacer(1, 10))
+        
+        # Prepare table data with all items
+        table_data = [
+            ["Req#", "Requester", "Dept", "Purpose", "Item Name", "Req\nQty", "App\nQty", "Request\nDate", "Completed\nDate", "Released By", "Remarks"]
+        ]
+        
+        for batch_request in completed_requests:
+            user_name = f"{batch_request.user.first_name} {batch_request.user.last_name}".strip() or batch_request.user.username
+            dept_name = batch_request.user.userprofile.department.name if batch_request.user.userprofile.department else "N/A"
+            
+            purpose_display = (batch_request.purpose[:25] + "...") if batch_request.purpose and len(batch_request.purpose) > 25 else (batch_request.purpose or "N/A")
+            
+            claimed_by_name = "N/A"
+            if batch_request.claimed_by:
+                claimed_by_name = f"{batch_request.claimed_by.first_name} {batch_request.claimed_by.last_name}".strip() or batch_request.claimed_by.username
+            
+            request_date_str = batch_request.request_date.strftime('%m/%d/%Y')
+            completed_date_str = batch_request.completed_date.strftime('%m/%d/%Y') if batch_request.completed_date else "N/A"
+            
+            # Add a row for each item in the request
+            items = batch_request.items.all().order_by('supply__supply_name')
+            if items.count() == 0:
+                # If no items, still show the request
+                table_data.append([
+                    f"#{batch_request.id:03d}",
+                    Paragraph(user_name, wrap_style),  # Wrap in Paragraph for text wrapping
+                    dept_name,
+                    purpose_display,
+                    "No items",
+                    "-",
+                    "-",
+                    request_date_str,
+                    completed_date_str,
+                    Paragraph(claimed_by_name, wrap_style),  # Wrap in Paragraph for text wrapping
+                    "-"
+                ])
+            else:
+                for idx, item in enumerate(items):
+                    remarks_display = "-"
+                    if item.remarks:
+                        remarks_display = item.remarks[:30] + "..." if len(item.remarks) > 30 else item.remarks
+                    
+                    # For first item, show all request details
+                    if idx == 0:
+                        table_data.append([
+                            f"#{batch_request.id:03d}",
+                            Paragraph(user_name, wrap_style),  # Wrap in Paragraph for text wrapping
+                            dept_name,
+                            purpose_display,
+                            item.supply.supply_name,
+                            str(item.quantity),
+                            str(item.approved_quantity) if item.approved_quantity else "-",
+                            request_date_str,
+                            completed_date_str,
+                            Paragraph(claimed_by_name, wrap_style),  # Wrap in Paragraph for text wrapping
+                            remarks_display
+                        ])
+                    else:
+                        # For subsequent items, only show item details
+                        table_data.append([
+                            "",  # Empty Req#
+                            "",  # Empty Requester
+                            "",  # Empty Department
+                            "",  # Empty Purpose
+                            item.supply.supply_name,
+                            str(item.quantity),
+                            str(item.approved_quantity) if item.approved_quantity else "-",
+                            "",  # Empty Request Date
+                            "",  # Empty Completed Date
+                            "",  # Empty Released By
+                            remarks_display
+                        ])
+        
+        # Create table with appropriate column widths for landscape
+        main_table = Table(table_data, colWidths=[
+            0.45*inch,  # Req#
+            1.5*inch,   # Requester (increased width for long names)
+            0.85*inch,  # Department
+            1.1*inch,   # Purpose
+            1.9*inch,   # Item Name
+            0.55*inch,  # Requested Qty
+            0.55*inch,  # Approved Qty
+            0.7*inch,   # Request Date
+            0.75*inch,  # Completed Date
+            1.0*inch,   # Released By
+            1.2*inch    # Remarks (slightly reduced to compensate)
+        ])
+        
+        main_table.setStyle(TableStyle([
+            # Header styling
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#152d64')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 7.5),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+            
+            # Data rows styling
+            ('FONTSIZE', (0, 1), (-1, -1), 7),
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # Req# center
+            ('ALIGN', (1, 1), (1, -1), 'LEFT'),    # Requester left
+            ('ALIGN', (2, 1), (2, -1), 'LEFT'),    # Department left
+            ('ALIGN', (3, 1), (3, -1), 'LEFT'),    # Purpose left
+            ('ALIGN', (4, 1), (4, -1), 'LEFT'),    # Item name left
+            ('ALIGN', (5, 1), (6, -1), 'CENTER'),  # Quantities center
+            ('ALIGN', (7, 1), (8, -1), 'CENTER'),  # Dates center
+            ('ALIGN', (9, 1), (9, -1), 'LEFT'),    # Released By left
+            ('ALIGN', (10, 1), (10, -1), 'LEFT'),  # Remarks left
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            
+            # Padding
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+            ('TOPPADDING', (0, 0), (-1, -1), 5),
+            ('LEFTPADDING', (0, 0), (-1, -1), 3),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+            
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#152d64')),
+            
+            # Alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+        ]))
+        
+        story.append(main_table)
+    
+    # Build PDF
+    try:
+        doc.build(story)
+        
+        # Get the value of the BytesIO buffer and write it to the response
+        pdf = buffer.getvalue()
+        buffer.close()
+        response.write(pdf)
+        
+        return response
+    except Exception as e:
+        import traceback
+        error_details = traceback.format_exc()
+        return HttpResponse(f"Error generating PDF: {str(e)}\n\nDetails:\n{error_details}", status=500, content_type='text/plain')
+
+
+@using_reporting()
+def generate_items_tally_report_pdf(request):
+    """Generate PDF report for items tallied by supply name (aggregated across all requests)"""
+    try:
+        from reportlab.lib.pagesizes import letter, A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+        from django.db.models import Q, Sum, Count
+        from io import BytesIO
+        from datetime import datetime
+    except ImportError as e:
+        return HttpResponse(f"Error importing required libraries: {str(e)}", status=500)
+    
+    # Get filter parameters
+    user_filter = request.GET.get('user', '')
+    department_filter = request.GET.get('department', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    status_filter = request.GET.get('status', '')
+    
+    # Build queryset for completed requests to aggregate items
+    completed_requests = SupplyRequestBatch.objects.filter(
+        status='completed'
+    ).select_related(
+        'user', 
+        'user__userprofile', 
+        'user__userprofile__department'
+    ).prefetch_related(
+        'items__supply'
+    )
+    
+    # Apply filters
+    if user_filter:
+        completed_requests = completed_requests.filter(user__id=user_filter)
+    
+    if department_filter:
+        completed_requests = completed_requests.filter(user__userprofile__department__id=department_filter)
+    
+    if date_from:
+        try:
+            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d')
+            completed_requests = completed_requests.filter(completed_date__date__gte=date_from_obj.date())
+        except ValueError:
+            pass
+    
+    if date_to:
+        try:
+            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d')
+            completed_requests = completed_requests.filter(completed_date__date__lte=date_to_obj.date())
+        except ValueError:
+            pass
+    
+    if status_filter:
+        completed_requests = completed_requests.filter(items__status=status_filter)
+    
+    # Create the HttpResponse object with PDF headers
+    response = HttpResponse(content_type='application/pdf')
+    filename = f'Items_Tally_Report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    # Create the PDF object with LANDSCAPE orientation
+    from reportlab.lib.pagesizes import landscape
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, 
+        pagesize=landscape(A4),
+        rightMargin=0.5*inch, 
+        leftMargin=0.5*inch,
+        topMargin=0.5*inch, 
+        bottomMargin=0.5*inch
+    )
+    
+    # Container for the 'Flowable' objects
+    story = []
+    
+    # Define styles
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#152d64'),
+        spaceAfter=20,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=12,
+        textColor=colors.HexColor('#152d64'),
+        spaceAfter=10,
+        fontName='Helvetica-Bold'
+    )
+    
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=9,
+        alignment=TA_LEFT
+    )
+    
+    wrap_style = ParagraphStyle(
+        'WrapText',
+        parent=styles['Normal'],
+        fontSize=8,
+        alignment=TA_LEFT,
+        spaceAfter=0
+    )
+    
+    # Title
+    story.append(Paragraph("ITEMS TALLY REPORT", title_style))
+    story.append(Paragraph(f"Generated on: {timezone.now().strftime('%B %d, %Y at %I:%M %p')}", normal_style))
+    story.append(Spacer(1, 20))
+    
+    # Filter information
+    filter_info = []
+    if user_filter:
+        try:
+            from django.contrib.auth.models import User
+            user = User.objects.get(id=user_filter)
+            user_name = f"{user.first_name} {user.last_name}".strip() or user.username
+            filter_info.append(f"User: {user_name}")
+        except:
+            pass
+    
+    if department_filter:
+        try:
+            from ..models import Department
+            dept = Department.objects.get(id=department_filter)
+            filter_info.append(f"Department: {dept.name}")
+        except:
+            pass
+    
+    if date_from:
+        filter_info.append(f"From: {date_from}")
+    
+    if date_to:
+        filter_info.append(f"To: {date_to}")
+    
+    if status_filter:
+        status_display = dict(SupplyRequestItem.STATUS_CHOICES).get(status_filter, status_filter)
+        filter_info.append(f"Status: {status_display}")
+    
+    if filter_info:
+        story.append(Paragraph("<b>Filters Applied:</b> " + " | ".join(filter_info), normal_style))
+        story.append(Spacer(1, 15))
+    
+    # Aggregate items by supply name
+    items_tally = {}
+    total_items_requested = 0
+    total_items_approved = 0
+    
+    for batch_request in completed_requests:
+        for item in batch_request.items.all():
+            supply_name = item.supply.supply_name
+            
+            if supply_name not in items_tally:
+                items_tally[supply_name] = {
+                    'total_requested': 0,
+                    'total_approved': 0,
+                    'request_count': 0,
+                    'unit': item.supply.unit if hasattr(item.supply, 'unit') and item.supply.unit else 'pcs'
+                }
+            
+            items_tally[supply_name]['total_requested'] += item.quantity
+            items_tally[supply_name]['total_approved'] += (item.approved_quantity or 0)
+            items_tally[supply_name]['request_count'] += 1
+            
+            total_items_requested += item.quantity
+            total_items_approved += (item.approved_quantity or 0)
+    
+    total_item_types = len(items_tally)
+    story.append(Paragraph(f"<b>Total Item Types:</b> {total_item_types} | <b>Total Quantity Requested:</b> {total_items_requested} | <b>Total Quantity Approved:</b> {total_items_approved}", normal_style))
+    story.append(Spacer(1, 15))
+    
+    if total_item_types == 0:
+        story.append(Paragraph("<b>No items found with the selected filters.</b>", normal_style))
+        story.append(Spacer(1, 20))
+        story.append(Paragraph("Try adjusting your filter criteria or check back later.", normal_style))
+    else:
+        # Create a table with items tally
+        story.append(Paragraph("<b>Items Summary</b>", heading_style))
+        story.append(Spacer(1, 10))
+        
+        # Prepare table data
+        table_data = [
+            ["Item Name", "Unit", "Total\nRequested", "Total\nApproved", "Times\nRequested"]
+        ]
+        
+        # Sort items by name
+        for supply_name in sorted(items_tally.keys()):
+            item_data = items_tally[supply_name]
+            table_data.append([
+                Paragraph(supply_name, wrap_style),
+                item_data['unit'],
+                str(item_data['total_requested']),
+                str(item_data['total_approved']),
+                str(item_data['request_count'])
+            ])
+        
+        # Create table with appropriate column widths for landscape
+        main_table = Table(table_data, colWidths=[
+            3.0*inch,   # Item Name (slightly reduced for new unit column)
+            0.8*inch,   # Unit
+            1.1*inch,   # Total Requested
+            1.1*inch,   # Total Approved
+            1.1*inch    # Times Requested
+        ])
+        
+        main_table.setStyle(TableStyle([
+            # Header styling
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#152d64')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+            
+            # Data rows styling
+            ('FONTSIZE', (0, 1), (-1, -1), 7.5),
+            ('ALIGN', (0, 1), (0, -1), 'LEFT'),     # Item name left
+            ('ALIGN', (1, 1), (1, -1), 'CENTER'),   # Unit center
+            ('ALIGN', (2, 1), (-1, -1), 'CENTER'),  # Quantities and count center
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            
+            # Padding
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+            
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#152d64')),
+            
+            # Alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+        ]))
+        
+        story.append(main_table)
+    
+    # Build PDF
+    try:
+        doc.build(story)
+        
+        # Get the value of the BytesIO buffer and write it to the response
+        pdf = buffer.getvalue()
+        buffer.close()
+        response.write(pdf)
+        
+        return response
+    except Exception as e:
+        import traceback
+        error_details = traceback.format_exc()
+        return HttpResponse(f"Error generating PDF: {str(e)}\n\nDetails:\n{error_details}", status=500, content_type='text/plain')
+
+
+def _supply_tally_filters(request):
+    """The claimed_items() filters selected on the supply approved tally page."""
+    def parse_date(value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        except ValueError:
+            return None
+
+    return {
+        'department': request.GET.get('department', ''),
+        'user': request.GET.get('user', ''),
+        'category': request.GET.get('category', ''),
+        'date_from': parse_date(request.GET.get('date_from', '')),
+        'date_to': parse_date(request.GET.get('date_to', '')),
+    }
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+@using_reporting()
+def supply_approved_tally(request):
+    """
+    Admin page to view the approved supplies tally.
+    Shows all given supplies per item with their approved quantities.
+    Includes search, department, user, category, and date filters with pagination.
+    Includes analytics dashboard for supply allocation by department and category.
+
+    Grouping, search and pagination run in SQL (see app/supply_tally.py); the
+    charts are rolled up from one (supply x department x category x month)
+    cube per filter set, and the batches behind a row load on demand from
+    supply_approved_tally_batches.
+    """
+    from ..supply_tally import (
+        CLAIMED_BATCH_STATUSES, claimed_items, rollup, search_items, supply_tally,
+        tally_cube, tally_totals,
+    )
+
+    # Get filter parameters
+    search_query = request.GET.get('search', '').strip()
+    department_filter = request.GET.get('department', '')
+    user_filter = request.GET.get('user', '')
+    category_filter = request.GET.get('category', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    date_range_filter = request.GET.get('date_range', '')  # For analytics filters: 30days, 90days, 1year
+
+    # Only completed/distributed items of approved batches are counted
+    filters = _supply_tally_filters(request)
+    approved_items = claimed_items(**filters)
+    searched_items = search_items(approved_items, search_query)
+
+    # Pagination over the per-supply GROUP BY
+    paginator = Paginator(supply_tally(searched_items), 10)  # 10 items per page
+    page = request.GET.get('page', 1)
+
+    try:
+        tally_page = paginator.page(page)
+    except PageNotAnInteger:
+        tally_page = paginator.page(1)
+    except EmptyPage:
+        tally_page = paginator.page(paginator.num_pages)
+
+    # Build URL parameters for pagination
+    url_params = []
+    if search_query:
+        url_params.append(f'search={search_query}')
+    if department_filter:
+        url_params.append(f'department={department_filter}')
+    if user_filter:
+        url_params.append(f'user={user_filter}')
+    if category_filter:
+        url_params.append(f'category={category_filter}')
+    if date_from:
+        url_params.append(f'date_from={date_from}')
+    if date_to:
+        url_params.append(f'date_to={date_to}')
+
+    base_url_params = '&'.join(url_params)
+
+    # Calculate summary
+    totals = tally_totals(searched_items)
+
+    # Get departments for filter dropdown
+    departments = Department.objects.all().order_by('name')
+
+    # Get categories for filter dropdown
+    categories = SupplyCategory.objects.all().order_by('name')
+
+    # Get users who have made approved requests for filter dropdown, in one query
+    users_with_approved = list(User.objects.filter(
+        supplyrequestbatch__status__in=CLAIMED_BATCH_STATUSES
+    ).select_related('userprofile').distinct().order_by('first_name', 'last_name'))
+
+    # Build a dictionary of users by department for JS filtering
+    users_by_department = {dept.id: [] for dept in departments}
+    for u in users_with_approved:
+        profile = getattr(u, 'userprofile', None)
+        if profile and profile.department_id in users_by_department:
+            users_by_department[profile.department_id].append(
+                {'id': u.id, 'name': u.get_full_name() or u.username}
+            )
+
+    # If department filter is selected, offer only users from that department
+    if department_filter:
+        users_with_approved = [
+            u for u in users_with_approved
+            if getattr(u, 'userprofile', None) and str(u.userprofile.department_id) == department_filter
+        ]
+
+    # ===== ANALYTICS DATA AGGREGATION =====
+    cube = tally_cube(approved_items)
+
+    dept_totals = rollup(cube, 'department_name')
+    dept_labels = [row['department_name'] for row in dept_totals]
+    dept_data = [row['approved'] for row in dept_totals]
+
+    # Uncategorized supplies are left out of the category chart
+    cat_totals = rollup([cell for cell in cube if cell['category_id'] is not None], 'category_name')
+    cat_labels = [row['category_name'] for row in cat_totals]
+    cat_data = [row['approved'] for row in cat_totals]
+
+    def item_department_breakdown(cells):
+        breakdown = {}
+        for row in rollup(cells, 'supply_name', 'department_name'):
+            breakdown.setdefault(row['supply_name'], {})[row['department_name']] = row['approved']
+        return breakdown
+
+    # Item-department data for the dynamic chart (FILTERED - uses department filter)
+    item_dept_data = item_department_breakdown(cube)
+
+    # Item-department data for the item selector (UNFILTERED - ignores department filter)
+    if department_filter:
+        unfiltered_cube = tally_cube(claimed_items(**dict(filters, department=None)))
+    else:
+        unfiltered_cube = cube
+    item_dept_data_unfiltered = item_department_breakdown(unfiltered_cube)
+
+    # Category-department data for the category filter
+    category_dept_data = {}
+    for row in rollup(cube, 'category_name', 'department_name'):
+        chart = category_dept_data.setdefault(row['category_name'], {'labels': [], 'data': []})
+        chart['labels'].append(row['department_name'])
+        chart['data'].append(row['approved'])
+
+    users_by_department_json = json.dumps(users_by_department)
+    dept_chart_data = json.dumps({'labels': dept_labels, 'data': dept_data})
+    cat_chart_data = json.dumps({'labels': cat_labels, 'data': cat_data})
+    item_dept_analytics_json = json.dumps(item_dept_data)
+    item_dept_analytics_unfiltered_json = json.dumps(item_dept_data_unfiltered)
+    category_dept_analytics_json = json.dumps(category_dept_data)
+
+    context = {
+        'page_obj': tally_page,
+        'paginator': paginator,
+        'total_items': totals['total_items'],
+        'total_quantity': totals['total_quantity'],
+        'total_requests': totals['total_requests'],
+        'search_query': search_query,
+        'department_filter': department_filter,
+        'user_filter': user_filter,
+        'category_filter': category_filter,
+        'date_from': date_from,
+        'date_to': date_to,
+        'date_range_filter': date_range_filter,
+        'departments': departments,
+        'categories': categories,
+        'users_with_approved': users_with_approved,
+        'users_by_department_json': users_by_department_json,
+        'url_params': '&' + base_url_params if base_url_params else '',
+        'dept_chart_data': dept_chart_data,
+        'cat_chart_data': cat_chart_data,
+        'item_dept_analytics_json': item_dept_analytics_json,
+        'item_dept_analytics_unfiltered_json': item_dept_analytics_unfiltered_json,
+        'category_dept_analytics_json': category_dept_analytics_json,
+    }
+
+    return render(request, 'app/supply_approved_tally.html', context)
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+@using_reporting()
+def supply_approved_tally_batches(request, supply_id):
+    """
+    Batch requests behind one row of the supply approved tally, loaded when
+    the row is expanded. Honours the same department/user/category/date
+    filters as the page.
+    """
+    from ..supply_tally import claimed_items, supply_batches
+
+    batches = supply_batches(claimed_items(**_supply_tally_filters(request)), supply_id)
+    return JsonResponse({
+        'supply_id': supply_id,
+        'batches': [
+            {
+                'batch_id': batch['batch_request_id'],
+                'batch_status': batch['batch_status'],
+                'requestor': f"{batch['first_name']} {batch['last_name']}".strip() or batch['username'],
+                'department': batch['department_name'] or 'Others',
+                'approved_quantity': batch['approved'],
+                'request_date': timezone.localtime(batch['request_date']).strftime('%b %d, %Y'),
+            }
+            for batch in batches
+        ],
+    })
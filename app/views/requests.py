@@ -0,0 +1,3379 @@
+"""
+Supply, borrow and reservation requests: admin request lists and details,
+approval, claiming and returns, and the supply request list (cart).
+"""
+import json
+from datetime import datetime
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, permission_required
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from django.views.generic import ListView
+
+from ..batch_decisions import REQUEST_TYPES as DECISION_REQUEST_TYPES, apply_decisions
+from ..carts import (
+    SUPPLY, add_to_cart, cart_lines, clear_cart, get_cart, get_line, line_count,
+    remove_from_cart, submit_cart, update_line, validate_cart,
+)
+from ..forms import SupplyRequestBatchForm, SupplyRequestItemForm
+from ..models import (
+    ActivityLog, BorrowRequest, BorrowRequestBatch, BorrowRequestItem, DamageReport, Department,
+    LostItem, Notification, Property, PropertyHistory, Reservation, ReservationBatch,
+    ReservationItem, Supply, SupplyHistory, SupplyRequest, SupplyRequestBatch,
+    SupplyRequestItem,
+)
+from ..permissions import admin_permission_required, has_admin_permission
+from ..stock_monitor import IN_STOCK
+from .inventory import redirect_with_tab
+
+
+def reservation_detail(request, pk):
+    """Detail view for individual reservation (redirects to batch view if part of batch)"""
+    reservation = get_object_or_404(Reservation, pk=pk)
+    
+    # If this reservation is part of a batch, redirect to batch detail
+    if reservation.batch_id:
+        return redirect('reservation_batch_detail', batch_id=reservation.batch_id)
+    
+    # Legacy single reservation view
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        remarks = request.POST.get('remarks')
+        reservation.remarks = remarks
+        
+        if action == 'approve':
+            # Check for overlapping reservations
+            overlapping_reservations = Reservation.objects.filter(
+                item=reservation.item,
+                status__in=['approved', 'active'],
+                needed_date__lte=reservation.return_date,
+                return_date__gte=reservation.needed_date
+            ).exclude(pk=reservation.pk)
+            
+            # Calculate total quantity reserved for the overlapping period
+            total_reserved = sum(r.quantity for r in overlapping_reservations)
+            available_quantity = reservation.item.quantity - total_reserved
+            
+            if available_quantity >= reservation.quantity:
+                reservation.status = 'approved'
+                reservation.approved_date = timezone.now()
+                Notification.objects.create(
+                    user=reservation.user,
+                    message=f"Your reservation for {reservation.item.property_name} has been approved.",
+                    remarks=remarks
+                )
+                reservation.save()
+                messages.success(request, 'Reservation approved successfully.')
+            else:
+                messages.error(request, f'Cannot approve reservation. Only {available_quantity} items available for the requested period.')
+                return render(request, 'app/reservation_detail.html', {'reservation': reservation})
+                
+        elif action == 'reject':
+            reservation.status = 'rejected'
+            reservation.approved_date = timezone.now()
+            Notification.objects.create(
+                user=reservation.user,
+                message=f"Your reservation for {reservation.item.property_name} has been rejected.",
+                remarks=remarks
+            )
+            reservation.save()
+            messages.success(request, 'Reservation rejected successfully.')
+            
+        return redirect('user_reservations')
+    return render(request, 'app/reservation_detail.html', {'reservation': reservation})
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+def reservation_batch_detail(request, batch_id):
+    """View and manage a batch reservation request"""
+    # Check and update reservation batch statuses (triggers active reservations)
+    ReservationBatch.check_and_update_batches()
+    
+    # Get the reservation batch
+    batch = get_object_or_404(ReservationBatch.objects.select_related('user').prefetch_related('items__property'), id=batch_id)
+    
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        remarks = request.POST.get('remarks', '').strip()
+        
+        # Handle void action for approved reservations
+        if action == 'void_request' and batch.status == 'approved':
+            # Check permission
+            from ..permissions import has_admin_permission
+            if not has_admin_permission(request.user, 'void_request'):
+                messages.error(request, 'You do not have permission to void requests.')
+                return redirect('reservation_batch_detail', batch_id=batch_id)
+            
+            # Validate that remarks is provided
+            if not remarks:
+                messages.error(request, 'Please provide a reason for voiding this reservation.')
+                return redirect('reservation_batch_detail', batch_id=batch_id)
+            
+            # Release reserved quantities from approved items
+            approved_items = batch.items.filter(status='approved')
+            for item in approved_items:
+                # Release the reserved quantity
+                item.property.reserved_quantity = max(0, item.property.reserved_quantity - item.quantity)
+                item.property.save()
+            
+            # Update ALL items to voided status (not just approved ones)
+            batch.items.all().update(status='voided')
+            
+            # Change batch status to voided
+            from django.utils import timezone
+            batch.status = 'voided'
+            batch.remarks = remarks
+            batch.voided_by = request.user
+            batch.voided_date = timezone.now()
+            batch.save()
+            
+            # Create notification for user
+            Notification.objects.create(
+                user=batch.user,
+                message=f"Your reservation batch #{batch.id} has been voided by admin.",
+                remarks=remarks
+            )
+            
+            # Send email notification to the requester
+            if batch.user.email:
+                from django.core.mail import send_mail
+                from django.conf import settings
+                
+                subject = f'Reservation Request #{batch.id} - Voided'
+                message = f"""Dear {batch.user.get_full_name() or batch.user.username},
+
+Your reservation request (Batch #{batch.id}) has been voided by the administrator.
+
+Reason for voiding:
+{remarks}
+
+All reserved quantities have been released back to the inventory.
+
+If you have any questions, please contact the administrator.
+
+Best regards,
+Resource Hive Management System
+"""
+                try:
+                    send_mail(
+                        subject,
+                        message,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [batch.user.email],
+                        fail_silently=False,
+                    )
+                except Exception as e:
+                    # Log the error but don't fail the request
+                    import logging
+                    logger = logging.getLogger(__name__)
+                    logger.error(f"Failed to send void notification email: {str(e)}")
+            
+            # Log activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='update',
+                model_name='ReservationBatch',
+                object_repr=f"Reservation Batch #{batch.id}",
+                description=f"Voided approved reservation, released reserved quantities. Reason: {remarks[:100]}"
+            )
+            
+            messages.success(request, 'Reservation voided successfully. Reserved quantities have been released and the requester has been notified.')
+            return redirect('reservation_batch_detail', batch_id=batch_id)
+    
+    # Refresh the batch object to get updated item statuses
+    batch = ReservationBatch.objects.select_related('user').prefetch_related('items__property').get(id=batch_id)
+    
+    # Get all items in this batch
+    items = batch.items.all().order_by('id')
+    
+    # Calculate status counts
+    status_counts = {}
+    for item in items:
+        status_counts[item.status] = status_counts.get(item.status, 0) + 1
+    
+    from ..permissions import has_admin_permission
+    context = {
+        'batch': batch,
+        'items': items,
+        'batch_id': batch.id,
+        'batch_number': batch.id,
+        'batch_status': batch.status,
+        'total_items': batch.total_items,
+        'total_quantity': batch.total_quantity,
+        'status_counts': status_counts,
+        'can_void_request': has_admin_permission(request.user, 'void_request'),
+    }
+    
+    return render(request, 'app/reservation_batch_detail.html', context)
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+@admin_permission_required('approve_reservation')
+def approve_reservation_item(request, batch_id, item_id):
+    """Approve a single item in a reservation batch"""
+    if request.method == 'POST':
+        batch = get_object_or_404(ReservationBatch, id=batch_id)
+        item = get_object_or_404(ReservationItem, id=item_id, batch_request=batch)
+        remarks = request.POST.get('remarks', '')
+        scroll_position = request.POST.get('scroll_position', '0')
+        
+        # Get approved quantity from POST (default to original quantity if not provided)
+        approved_quantity = request.POST.get('approved_quantity', item.quantity)
+        try:
+            approved_quantity = int(approved_quantity)
+        except (ValueError, TypeError):
+            approved_quantity = item.quantity
+        
+        # Validate approved quantity
+        if approved_quantity < 1:
+            messages.error(request, 'Approved quantity must be at least 1.')
+            response = redirect('reservation_batch_detail', batch_id=batch_id)
+            response['Location'] += f'#scroll-{scroll_position}'
+            return response
+        
+        if approved_quantity > item.quantity:
+            messages.error(request, f'Approved quantity cannot exceed requested quantity of {item.quantity}.')
+            response = redirect('reservation_batch_detail', batch_id=batch_id)
+            response['Location'] += f'#scroll-{scroll_position}'
+            return response
+        
+        # Check available quantity (uses reserved_quantity from Property model)
+        if item.property.available_quantity >= approved_quantity:
+            # Update quantity to approved quantity
+            original_quantity = item.quantity
+            item.quantity = approved_quantity
+            item.status = 'approved'
+            
+            # Add remarks about quantity adjustment if different
+            if approved_quantity < original_quantity:
+                adjustment_note = f"Approved quantity: {approved_quantity} (Originally requested: {original_quantity})"
+                item.remarks = f"{adjustment_note}\n{remarks}" if remarks else adjustment_note
+            else:
+                item.remarks = remarks
+            
+            item.save()
+            
+            # Update batch approved_date if first approval
+            if not batch.approved_date:
+                batch.approved_date = timezone.now()
+            
+            # Check if all items are now approved/rejected
+            all_items = batch.items.all()
+            if all(i.status in ['approved', 'rejected'] for i in all_items):
+                # If some approved and some rejected
+                if any(i.status == 'approved' for i in all_items) and any(i.status == 'rejected' for i in all_items):
+                    batch.status = 'partially_approved'
+                # If all approved
+                elif all(i.status == 'approved' for i in all_items):
+                    batch.status = 'approved'
+                # If all rejected
+                elif all(i.status == 'rejected' for i in all_items):
+                    batch.status = 'rejected'
+                batch.save()
+            
+            # Notify user about approval (handled by ReservationItem save method if needed)
+            # For individual item approval, send a notification
+            approval_msg = f"Item {item.property.property_name} in reservation batch #{batch_id} has been approved."
+            if approved_quantity < original_quantity:
+                approval_msg += f" Approved quantity: {approved_quantity} (Requested: {original_quantity})"
+            
+            Notification.objects.create(
+                user=batch.user,
+                message=approval_msg,
+                remarks=remarks if remarks else None
+            )
+            
+            # Log activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='approve',
+                model_name='ReservationItem',
+                object_repr=f"{item.property.property_name} (Batch #{batch_id})",
+                description=f"Approved reservation item #{item_id} in batch #{batch_id} - Quantity: {approved_quantity}"
+            )
+            
+            success_msg = f'Reservation for {item.property.property_name} approved successfully.'
+            if approved_quantity < original_quantity:
+                success_msg += f' (Approved: {approved_quantity} out of {original_quantity} requested)'
+            messages.success(request, success_msg)
+        else:
+            messages.error(request, f'Cannot approve reservation. Only {item.property.available_quantity} units of {item.property.property_name} available (trying to approve {approved_quantity}).')
+        
+        response = redirect('reservation_batch_detail', batch_id=batch_id)
+        response['Location'] += f'#scroll-{scroll_position}'
+        return response
+    
+    return redirect('user_reservations')
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+@admin_permission_required('approve_reservation')
+def reject_reservation_item(request, batch_id, item_id):
+    """Reject a single item in a reservation batch"""
+    if request.method == 'POST':
+        batch = get_object_or_404(ReservationBatch, id=batch_id)
+        item = get_object_or_404(ReservationItem, id=item_id, batch_request=batch)
+        remarks = request.POST.get('remarks', '')
+        scroll_position = request.POST.get('scroll_position', '0')
+        
+        item.status = 'rejected'
+        item.remarks = remarks
+        item.save()
+        
+        # Update batch status if needed
+        all_items = batch.items.all()
+        if all(i.status in ['approved', 'rejected'] for i in all_items):
+            # If some approved and some rejected
+            if any(i.status == 'approved' for i in all_items) and any(i.status == 'rejected' for i in all_items):
+                batch.status = 'partially_approved'
+            # If all rejected
+            elif all(i.status == 'rejected' for i in all_items):
+                batch.status = 'rejected'
+                batch.approved_date = timezone.now()
+            batch.save()
+        
+        # Notify user about rejection
+        Notification.objects.create(
+            user=batch.user,
+            message=f"Item {item.property.property_name} in reservation batch #{batch_id} has been rejected.",
+            remarks=remarks if remarks else None
+        )
+        
+        # Log activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='reject',
+            model_name='ReservationItem',
+            object_repr=f"{item.property.property_name} (Batch #{batch_id})",
+            description=f"Rejected reservation item #{item_id} in batch #{batch_id}"
+        )
+        
+        messages.success(request, f'Reservation for {item.property.property_name} rejected.')
+        response = redirect('reservation_batch_detail', batch_id=batch_id)
+        response['Location'] += f'#scroll-{scroll_position}'
+        return response
+    
+    return redirect('user_reservations')
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+@admin_permission_required('approve_reservation')
+def approve_reservation_batch(request, batch_id):
+    """Approve all pending items in a reservation batch"""
+    if request.method == 'POST':
+        batch = get_object_or_404(ReservationBatch, id=batch_id)
+        items = batch.items.filter(status='pending')
+        remarks = request.POST.get('remarks', '')
+        
+        if not items.exists():
+            messages.warning(request, 'No pending items to approve in this batch.')
+            return redirect('reservation_batch_detail', batch_id=batch_id)
+        
+        approved_count = 0
+        failed_items = []
+        
+        for item in items:
+            # Check available quantity (uses reserved_quantity from Property model)
+            if item.property.available_quantity >= item.quantity:
+                item.status = 'approved'
+                item.remarks = remarks
+                item.save()
+                approved_count += 1
+            else:
+                failed_items.append(f"{item.property.property_name} (only {item.property.available_quantity} available)")
+        
+        # Update batch status
+        if approved_count > 0:
+            if not batch.approved_date:
+                batch.approved_date = timezone.now()
+            
+            # Check final status
+            all_items = batch.items.all()
+            if all(i.status == 'approved' for i in all_items):
+                batch.status = 'approved'
+            elif any(i.status == 'approved' for i in all_items):
+                batch.status = 'partially_approved'
+            batch.save()
+            
+            # Notify user once for the batch
+            Notification.objects.create(
+                user=batch.user,
+                message=f"Your batch reservation request #{batch_id} has been approved ({approved_count} items).",
+                remarks=remarks if remarks else None
+            )
+            
+            # Log activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='approve',
+                model_name='ReservationBatch',
+                object_repr=f"Batch #{batch_id}",
+                description=f"Approved {approved_count} items in reservation batch"
+            )
+            
+            messages.success(request, f'{approved_count} item(s) approved successfully.')
+        
+        if failed_items:
+            messages.warning(request, f'Could not approve: {", ".join(failed_items)}')
+        
+        return redirect('reservation_batch_detail', batch_id=batch_id)
+    
+    return redirect('user_reservations')
+
+
+@login_required
+@permission_required('app.view_admin_module', raise_exception=True)
+@admin_permission_required('approve_reservation')
+def reject_reservation_batch(request, batch_id):
+    """Reject all pending items in a reservation batch"""
+    if request.method == 'POST':
+        batch = get_object_or_404(ReservationBatch, id=batch_id)
+        items = batch.items.filter(status='pending')
+        remarks = request.POST.get('remarks', '')
+        
+        if not items.exists():
+            messages.warning(request, 'No pending items to reject in this batch.')
+            return redirect('reservation_batch_detail', batch_id=batch_id)
+        
+        count = items.count()
+        
+        # Update all pending items
+        for item in items:
+            item.status = 'rejected'
+            item.remarks = remarks
+            item.save()
+        
+        # Update batch status
+        batch.status = 'rejected'
+        batch.approved_date = timezone.now()
+        batch.remarks = remarks
+        batch.save()
+        
+        # Notify user once for the batch
+        Notification.objects.create(
+            user=batch.user,
+            message=f"Your batch reservation request #{batch_id} has been rejected ({count} items).",
+            remarks=remarks if remarks else None
+        )
+        
+        # Log activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='reject',
+            model_name='ReservationBatch',
+            object_repr=f"Batch #{batch_id}",
+            description=f"Rejected {count} items in reservation batch"
+        )
+        
+        messages.success(request, f'{count} item(s) rejected.')
+        return redirect('reservation_batch_detail', batch_id=batch_id)
+    
+    return redirect('user_reservations')
+
+
+def damage_report_detail(request, pk):
+    report_obj = get_object_or_404(DamageReport, pk=pk)
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        remarks = request.POST.get('remarks')
+        
+        if action == 'resolve':
+            classification = request.POST.get('classification')
+            
+            if classification == 'unserviceable':
+                report_obj.status = 'resolved'
+                report_obj.remarks = f"Classified as Unserviceable. {remarks}"
+                # Update property condition
+                report_obj.item.condition = 'Unserviceable'
+                report_obj.item.availability = 'not_available'
+                report_obj.item.save()
+                report_obj.save()
+                Notification.objects.create(
+                    user=report_obj.user,
+                    message=f"Your damage report for {report_obj.item.property_name} has been resolved - Classified as Unserviceable.",
+                    remarks=remarks
+                )
+            elif classification == 'needs_repair':
+                report_obj.status = 'resolved'
+                report_obj.remarks = f"Classified as Needs Repair. {remarks}"
+                # Update property condition
+                report_obj.item.condition = 'Needing repair'
+                report_obj.item.availability = 'not_available'
+                report_obj.item.save()
+                report_obj.save()
+                Notification.objects.create(
+                    user=report_obj.user,
+                    message=f"Your damage report for {report_obj.item.property_name} has been resolved - Classified as Needs Repair.",
+                    remarks=remarks
+                )
+            elif classification == 'good_condition':
+                report_obj.status = 'resolved'
+                report_obj.remarks = f"Classified as Good Condition. {remarks}"
+                # Update property condition
+                report_obj.item.condition = 'In good condition'
+                report_obj.item.availability = 'available'
+                report_obj.item.save()
+                report_obj.save()
+                Notification.objects.create(
+                    user=report_obj.user,
+                    message=f"Your damage report for {report_obj.item.property_name} has been resolved - Item is in Good Condition.",
+                    remarks=remarks
+                )
+            
+            messages.success(request, f'Damage report #{report_obj.id} has been classified and resolved successfully.')
+            return redirect('user_damage_reports')
+    
+    return render(request, 'app/report_details.html', {'report_obj': report_obj})
+
+
+def borrow_request_details(request, pk):
+    request_obj = get_object_or_404(BorrowRequest, pk=pk)
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        remarks = request.POST.get('remarks')
+        request_obj.remarks = remarks
+
+        try:
+            if action == 'approve':
+                request_obj.status = 'approved'
+                request_obj.approved_date = timezone.now()
+                request_obj.save()  # This will trigger validation
+                messages.success(request, 'Borrow request approved successfully.')
+                Notification.objects.create(
+                    user=request_obj.user,
+                    message=f"Your borrow request for {request_obj.property.property_name} has been approved.",
+                    remarks=remarks
+                )
+            elif action == 'decline':
+                request_obj.status = 'declined'
+                request_obj.approved_date = timezone.now()
+                request_obj.save()
+                messages.success(request, 'Borrow request declined successfully.')
+                Notification.objects.create(
+                    user=request_obj.user,
+                    message=f"Your borrow request for {request_obj.property.property_name} has been declined.",
+                    remarks=remarks
+                )
+            elif action == 'return':
+                request_obj.status = 'returned'
+                request_obj.actual_return_date = timezone.now().date()
+                request_obj.save()
+                messages.success(request, 'Borrow request marked as returned successfully.')
+                Notification.objects.create(
+                    user=request_obj.user,
+                    message=f"Your borrow request for {request_obj.property.property_name} has been marked as returned.",
+                    remarks=remarks
+                )
+            elif action == 'overdue':
+                request_obj.status = 'overdue'
+                request_obj.save()
+                messages.warning(request, 'Borrow request marked as overdue.')
+                Notification.objects.create(
+                    user=request_obj.user,
+                    message=f"Your borrow request for {request_obj.property.property_name} is overdue.",
+                    remarks=remarks
+                )
+        except ValidationError as e:
+            if 'quantity' in e.message_dict:
+                messages.error(request, e.message_dict['quantity'][0])
+            else:
+                messages.error(request, "An error occurred while processing the request.")
+            return render(request, 'app/borrow_request_details.html', {'borrow_obj': request_obj})
+            
+        return redirect('user_borrow_requests')
+    return render(request, 'app/borrow_request_details.html', {'borrow_obj': request_obj})
+
+
+def borrow_request_status_update(request, pk):
+    request_obj = get_object_or_404(BorrowRequest, pk=pk)
+    status = request.POST.get('status')
+    remarks = request.POST.get('remarks')  # optional if you want to use it here
+
+    if status == 'returned':
+        request_obj.status = 'returned'
+        request_obj.actual_return_date = timezone.now().date()
+        Notification.objects.create(
+            user=request_obj.user,
+            message=f"Your borrow request for {request_obj.property.property_name} has been marked as returned.",
+            remarks=remarks
+        )
+    elif status == 'overdue':
+        request_obj.status = 'overdue'
+        Notification.objects.create(
+            user=request_obj.user,
+            message=f"Your borrow request for {request_obj.property.property_name} is overdue.",
+            remarks=remarks
+        )
+    request_obj.save()
+    return redirect('user_borrow_requests')
+
+
+def request_detail(request, pk):
+    request_obj = get_object_or_404(SupplyRequest, pk=pk)
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        remarks = request.POST.get('remarks')
+        request_obj.remarks = remarks
+        if action == 'approve':
+            request_obj.status = 'approved'
+            Notification.objects.create(
+                user=request_obj.user,
+                message=f"Your supply request for {request_obj.supply.supply_name} has been approved.",
+                remarks=remarks
+            )
+            
+        elif action == 'rejected':
+            request_obj.status = 'rejected'
+            Notification.objects.create(
+                user=request_obj.user,
+                message=f"Your supply request for {request_obj.supply.supply_name} has been rejected.",
+                remarks=remarks
+            )
+        request_obj.approved_date = timezone.now()
+        request_obj.save()
+        return redirect('user_supply_requests')
+    return render(request, 'app/request_details.html', {'request_obj': request_obj})
+
+
+class UserSupplyRequestListView(PermissionRequiredMixin, ListView):
+    model = SupplyRequestBatch
+    template_name = 'app/requests.html'
+    permission_required = 'app.view_admin_module'
+    context_object_name = 'batch_requests'
+    paginate_by = 8  # Optimized for table layout - shows 8 requests per page for better UX
+    
+    def get_queryset(self):
+        # Show batch requests ordered by oldest first
+        return SupplyRequestBatch.objects.with_aggregates().select_related('user', 'user__userprofile', 'user__userprofile__department').prefetch_related('items__supply').order_by('request_date')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        
+        # Get the current tab from request
+        current_tab = self.request.GET.get('tab', 'pending')
+        
+        # Get search and filter parameters
+        search_query = self.request.GET.get('search', '').strip()
+        department_filter = self.request.GET.get('department', '')
+        date_from = self.request.GET.get('date_from', '')
+        date_to = self.request.GET.get('date_to', '')
+        
+        # Base queryset with related data
+        base_queryset = SupplyRequestBatch.objects.with_aggregates().select_related('user', 'user__userprofile', 'user__userprofile__department').prefetch_related('items__supply').order_by('request_date')
+        
+        # Apply search filter
+        if search_query:
+            # Search only by supply request ID/number
+            try:
+                # Try to extract just the number from the search query
+                search_number = ''.join(filter(str.isdigit, search_query))
+                if search_number:
+                    base_queryset = base_queryset.filter(id=int(search_number))
+                else:
+                    # If no number found, return empty queryset
+                    base_queryset = base_queryset.none()
+            except (ValueError, TypeError):
+                # If conversion fails, return empty queryset
+                base_queryset = base_queryset.none()
+        
+        # Apply department filter
+        if department_filter:
+            base_queryset = base_queryset.filter(user__userprofile__department__id=department_filter)
+        
+        # Apply date range filters
+        if date_from:
+            try:
+                from django.utils import timezone
+                from datetime import datetime
+                # Convert string to datetime and make it timezone aware
+                date_from_obj = datetime.strptime(date_from, '%Y-%m-%d')
+                date_from_aware = timezone.make_aware(date_from_obj)
+                base_queryset = base_queryset.filter(request_date__date__gte=date_from_aware.date())
+            except ValueError:
+                # Invalid date format, ignore filter
+                pass
+        if date_to:
+            try:
+                from django.utils import timezone
+                from datetime import datetime
+                # Convert string to datetime and make it timezone aware
+                date_to_obj = datetime.strptime(date_to, '%Y-%m-%d')
+                date_to_aware = timezone.make_aware(date_to_obj)
+                base_queryset = base_queryset.filter(request_date__date__lte=date_to_aware.date())
+            except ValueError:
+                # Invalid date format, ignore filter
+                pass
+        
+        # Apply pagination to each status filter
+        from django.core.paginator import Paginator
+        from django.db.models import Q
+        
+        # Merge pending and partially_approved into pending
+        pending_requests = base_queryset.filter(Q(status='pending') | Q(status='partially_approved'))
+        approved_requests = base_queryset.filter(status='approved')
+        rejected_requests = base_queryset.filter(status='rejected')
+        for_claiming_requests = base_queryset.filter(status='for_claiming')
+        # Completed requests ordered by completion date (most recent first)
+        completed_requests = base_queryset.filter(status='completed').order_by('-completed_date')
+        from django.db.models import F
+        voided_requests = base_queryset.filter(status='voided').order_by(F('voided_date').desc(nulls_last=True), '-request_date')
+        
+        # Paginate each category
+        pending_paginator = Paginator(pending_requests, self.paginate_by)
+        approved_paginator = Paginator(approved_requests, self.paginate_by)
+        rejected_paginator = Paginator(rejected_requests, self.paginate_by)
+        for_claiming_paginator = Paginator(for_claiming_requests, self.paginate_by)
+        completed_paginator = Paginator(completed_requests, self.paginate_by)
+        voided_paginator = Paginator(voided_requests, self.paginate_by)
+        
+        # Get current page number for each tab
+        pending_page = self.request.GET.get('pending_page', 1)
+        approved_page = self.request.GET.get('approved_page', 1)
+        rejected_page = self.request.GET.get('rejected_page', 1)
+        for_claiming_page = self.request.GET.get('for_claiming_page', 1)
+        completed_page = self.request.GET.get('completed_page', 1)
+        voided_page = self.request.GET.get('voided_page', 1)
+        
+        # Get the page objects
+        context['pending_batch_requests'] = pending_paginator.get_page(pending_page)
+        context['approved_batch_requests'] = approved_paginator.get_page(approved_page)
+        context['rejected_batch_requests'] = rejected_paginator.get_page(rejected_page)
+        context['for_claiming_batch_requests'] = for_claiming_paginator.get_page(for_claiming_page)
+        context['completed_batch_requests'] = completed_paginator.get_page(completed_page)
+        context['voided_batch_requests'] = voided_paginator.get_page(voided_page)
+        
+        # Add current tab to context
+        context['current_tab'] = current_tab
+        
+        # Add search and filter parameters to context
+        context['search_query'] = search_query
+        context['department_filter'] = department_filter
+        context['date_from'] = date_from
+        context['date_to'] = date_to
+        
+        # Build URL parameters string for pagination links
+        url_params = []
+        if search_query:
+            url_params.append(f'search={search_query}')
+        if department_filter:
+            url_params.append(f'department={department_filter}')
+        if date_from:
+            url_params.append(f'date_from={date_from}')
+        if date_to:
+            url_params.append(f'date_to={date_to}')
+        
+        base_url_params = '&'.join(url_params)
+        context['url_params'] = '&' + base_url_params if base_url_params else ''
+        
+        # Get all departments for the filter dropdown
+        from ..models import Department
+        context['departments'] = Department.objects.all().order_by('name')
+        
+        # Get all users who have made supply requests for the filter dropdown
+        from django.contrib.auth.models import User
+        try:
+            users_with_requests = User.objects.filter(
+                supplyrequestbatch__isnull=False
+            ).distinct().order_by('first_name', 'last_name')
+            context['users_with_requests'] = users_with_requests
+        except Exception as e:
+            # Fallback to all active users if there's an issue
+            context['users_with_requests'] = User.objects.filter(is_active=True).order_by('first_name', 'last_name')
+        
+        # Create a mapping of users to their departments for frontend filtering
+        users_departments = {}
+        for user in context['users_with_requests']:
+            try:
+                dept = user.userprofile.department
+                users_departments[str(user.id)] = str(dept.id) if dept else ''
+            except:
+                users_departments[str(user.id)] = ''
+        context['users_departments'] = users_departments
+        
+        return context
+
+
+class UserDamageReportListView(PermissionRequiredMixin, ListView):
+    model = DamageReport
+    template_name = 'app/reports.html'
+    permission_required = 'app.view_admin_module'
+    context_object_name = 'damage_reports'
+    paginate_by = 15  # Changed from 10 to 15
+    
+    def get_queryset(self):
+        queryset = DamageReport.objects.select_related('user', 'user__userprofile', 'item').order_by('-report_date')
+        
+        # Search functionality
+        search = self.request.GET.get('search')
+        if search:
+            queryset = queryset.filter(
+                Q(user__first_name__icontains=search) |
+                Q(user__last_name__icontains=search) |
+                Q(user__username__icontains=search) |
+                Q(item__property_name__icontains=search) |
+                Q(description__icontains=search)
+            )
+        
+        # Department filter
+        department = self.request.GET.get('department')
+        if department:
+            queryset = queryset.filter(user__userprofile__department_id=department)
+        
+        # Date range filters
+        date_from = self.request.GET.get('date_from')
+        date_to = self.request.GET.get('date_to')
+        if date_from:
+            try:
+                from datetime import datetime
+                # Parse the date string and make it timezone-aware
+                date_from_obj = datetime.strptime(date_from, '%Y-%m-%d')
+                date_from_aware = timezone.make_aware(date_from_obj.replace(hour=0, minute=0, second=0))
+                queryset = queryset.filter(report_date__gte=date_from_aware)
+            except (ValueError, TypeError):
+                pass  # Invalid date format, skip filter
+        if date_to:
+            try:
+                from datetime import datetime
+                # Parse the date string and make it timezone-aware (end of day)
+                date_to_obj = datetime.strptime(date_to, '%Y-%m-%d')
+                date_to_aware = timezone.make_aware(date_to_obj.replace(hour=23, minute=59, second=59))
+                queryset = queryset.filter(report_date__lte=date_to_aware)
+            except (ValueError, TypeError):
+                pass  # Invalid date format, skip filter
+        
+        return queryset
+    
+    def get_context_data(self, **kwargs):
+        from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+        context = super().get_context_data(**kwargs)
+        all_reports = self.get_queryset()
+
+        # Get URL parameters for building pagination links
+        url_params = ""
+        search = self.request.GET.get('search', '')
+        department = self.request.GET.get('department', '')
+        date_from = self.request.GET.get('date_from', '')
+        date_to = self.request.GET.get('date_to', '')
+        
+        params = []
+        if search:
+            params.append(f'search={search}')
+        if department:
+            params.append(f'department={department}')
+        if date_from:
+            params.append(f'date_from={date_from}')
+        if date_to:
+            params.append(f'date_to={date_to}')
+        
+        if params:
+            url_params = "&" + "&".join(params)
+
+        # Paginate each tab separately with 15 items per page
+        paginate_by = 15
+        
+        # Get page numbers for each tab
+        all_page = self.request.GET.get('all_page', 1)
+        pending_page = self.request.GET.get('pending_page', 1)
+        resolved_page = self.request.GET.get('resolved_page', 1)
+        
+        # Create paginators for each tab
+        # Pending reports: oldest first (ascending order)
+        pending_reports = all_reports.filter(status='pending').order_by('report_date')
+        # Resolved reports: newest first (descending order)
+        resolved_reports = all_reports.filter(status='resolved')
+        
+        # Paginate pending reports
+        pending_paginator = Paginator(pending_reports, paginate_by)
+        try:
+            pending_page_obj = pending_paginator.page(pending_page)
+        except PageNotAnInteger:
+            pending_page_obj = pending_paginator.page(1)
+        except EmptyPage:
+            pending_page_obj = pending_paginator.page(pending_paginator.num_pages)
+        
+        # Paginate resolved reports
+        resolved_paginator = Paginator(resolved_reports, paginate_by)
+        try:
+            resolved_page_obj = resolved_paginator.page(resolved_page)
+        except PageNotAnInteger:
+            resolved_page_obj = resolved_paginator.page(1)
+        except EmptyPage:
+            resolved_page_obj = resolved_paginator.page(resolved_paginator.num_pages)
+        
+        # Create combined all reports (mix of all statuses) and paginate
+        all_reports_combined = all_reports
+        all_paginator = Paginator(all_reports_combined, paginate_by)
+        try:
+            all_page_obj = all_paginator.page(all_page)
+        except PageNotAnInteger:
+            all_page_obj = all_paginator.page(1)
+        except EmptyPage:
+            all_page_obj = all_paginator.page(all_paginator.num_pages)
+
+        # Add paginated objects to context
+        context['pending_reports'] = pending_page_obj
+        context['resolved_reports'] = resolved_page_obj
+        context['all_reports'] = all_page_obj
+        
+        # Add total counts for badges
+        context['pending_count'] = pending_reports.count()
+        context['resolved_count'] = resolved_reports.count()
+        context['all_count'] = all_reports_combined.count()
+        
+        # Add departments for filter dropdown
+        from ..models import Department
+        context['departments'] = Department.objects.all().order_by('name')
+        
+        # Add search parameters for form persistence and URL building
+        context['search'] = search
+        context['department_filter'] = department
+        context['date_from'] = date_from
+        context['date_to'] = date_to
+        context['url_params'] = url_params
+
+        return context
+
+
+class UserReservationListView(PermissionRequiredMixin, ListView):
+    model = ReservationBatch
+    template_name = 'app/reservation.html'
+    permission_required = 'app.view_admin_module'
+    context_object_name = 'reservation_batches'
+    paginate_by = 10
+
+    def get_queryset(self):
+        # Get all reservation batches
+        queryset = ReservationBatch.objects.with_aggregates().select_related(
+            'user'
+        ).prefetch_related(
+            'user__userprofile',
+            'items__property'
+        ).order_by('-request_date')
+        
+        # Apply search filter
+        search_query = self.request.GET.get('search')
+        if search_query:
+            queryset = queryset.filter(
+                Q(user__first_name__icontains=search_query) |
+                Q(user__last_name__icontains=search_query) |
+                Q(user__username__icontains=search_query) |
+                Q(items__property__property_name__icontains=search_query) |
+                Q(purpose__icontains=search_query) |
+                Q(id__icontains=search_query)
+            ).distinct()
+        
+        # Apply department filter
+        department = self.request.GET.get('department')
+        if department:
+            queryset = queryset.filter(user__userprofile__department_id=department)
+        
+        # Apply date filters
+        date_from = self.request.GET.get('date_from')
+        if date_from:
+            try:
+                date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+                queryset = queryset.filter(request_date__date__gte=date_from_obj)
+            except ValueError:
+                pass
+                
+        date_to = self.request.GET.get('date_to')
+        if date_to:
+            try:
+                date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+                queryset = queryset.filter(request_date__date__lte=date_to_obj)
+            except ValueError:
+                pass
+        
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+        
+        # Update reservation batch statuses before displaying
+        ReservationBatch.check_and_update_batches()
+        
+        context = super().get_context_data(**kwargs)
+        all_batches = self.get_queryset()
+        
+        # Group batches by status
+        # Pending batches should show oldest first
+        pending_batches = all_batches.filter(status='pending').order_by('request_date')
+        approved_batches = all_batches.filter(status='approved')
+        active_batches = all_batches.filter(status='active')
+        completed_batches = all_batches.filter(status='completed')
+        rejected_batches = all_batches.filter(status='rejected')
+        expired_batches = all_batches.filter(status='expired')
+        from django.db.models import F
+        voided_batches = all_batches.filter(status='voided').order_by(F('voided_date').desc(nulls_last=True), '-request_date')
+        
+        # Paginate each status group with 10 items per page
+        paginate_by = 10
+        
+        # Get page numbers for each status tab
+        all_page = self.request.GET.get('all_page', 1)
+        pending_page = self.request.GET.get('pending_page', 1)
+        approved_page = self.request.GET.get('approved_page', 1)
+        active_page = self.request.GET.get('active_page', 1)
+        completed_page = self.request.GET.get('completed_page', 1)
+        rejected_page = self.request.GET.get('rejected_page', 1)
+        expired_page = self.request.GET.get('expired_page', 1)
+        voided_page = self.request.GET.get('voided_page', 1)
+        
+        # Paginate all batches
+        all_paginator = Paginator(all_batches, paginate_by)
+        try:
+            context['all_reservations'] = all_paginator.page(all_page)
+        except PageNotAnInteger:
+            context['all_reservations'] = all_paginator.page(1)
+        except EmptyPage:
+            context['all_reservations'] = all_paginator.page(all_paginator.num_pages)
+        
+        # Paginate pending batches
+        pending_paginator = Paginator(pending_batches, paginate_by)
+        try:
+            context['pending_reservations'] = pending_paginator.page(pending_page)
+        except PageNotAnInteger:
+            context['pending_reservations'] = pending_paginator.page(1)
+        except EmptyPage:
+            context['pending_reservations'] = pending_paginator.page(pending_paginator.num_pages)
+        
+        # Paginate approved batches
+        approved_paginator = Paginator(approved_batches, paginate_by)
+        try:
+            context['approved_reservations'] = approved_paginator.page(approved_page)
+        except PageNotAnInteger:
+            context['approved_reservations'] = approved_paginator.page(1)
+        except EmptyPage:
+            context['approved_reservations'] = approved_paginator.page(approved_paginator.num_pages)
+        
+        # Paginate active batches
+        active_paginator = Paginator(active_batches, paginate_by)
+        try:
+            context['active_reservations'] = active_paginator.page(active_page)
+        except PageNotAnInteger:
+            context['active_reservations'] = active_paginator.page(1)
+        except EmptyPage:
+            context['active_reservations'] = active_paginator.page(active_paginator.num_pages)
+        
+        # Paginate completed batches
+        completed_paginator = Paginator(completed_batches, paginate_by)
+        try:
+            context['completed_reservations'] = completed_paginator.page(completed_page)
+        except PageNotAnInteger:
+            context['completed_reservations'] = completed_paginator.page(1)
+        except EmptyPage:
+            context['completed_reservations'] = completed_paginator.page(completed_paginator.num_pages)
+        
+        # Paginate rejected batches
+        rejected_paginator = Paginator(rejected_batches, paginate_by)
+        try:
+            context['rejected_reservations'] = rejected_paginator.page(rejected_page)
+        except PageNotAnInteger:
+            context['rejected_reservations'] = rejected_paginator.page(1)
+        except EmptyPage:
+            context['rejected_reservations'] = rejected_paginator.page(rejected_paginator.num_pages)
+        
+        # Paginate expired batches
+        expired_paginator = Paginator(expired_batches, paginate_by)
+        try:
+            context['expired_reservations'] = expired_paginator.page(expired_page)
+        except PageNotAnInteger:
+            context['expired_reservations'] = expired_paginator.page(1)
+        except EmptyPage:
+            context['expired_reservations'] = expired_paginator.page(expired_paginator.num_pages)
+        
+        # Paginate voided batches
+        voided_paginator = Paginator(voided_batches, paginate_by)
+        try:
+            context['voided_reservations'] = voided_paginator.page(voided_page)
+        except PageNotAnInteger:
+            context['voided_reservations'] = voided_paginator.page(1)
+        except EmptyPage:
+            context['voided_reservations'] = voided_paginator.page(voided_paginator.num_pages)
+        
+        # Add total counts for badges
+        context['all_count'] = all_paginator.count
+        context['pending_count'] = pending_paginator.count
+        context['approved_count'] = approved_paginator.count
+        context['active_count'] = active_paginator.count
+        context['completed_count'] = completed_paginator.count
+        context['rejected_count'] = rejected_paginator.count
+        context['expired_count'] = expired_paginator.count
+        context['voided_count'] = voided_paginator.count
+        
+        # Add departments for the filter dropdown
+        context['departments'] = Department.objects.all()
+        
+        # Prepare reservation data for JavaScript calendar (if needed)
+        reservation_data = []
+        for batch in all_batches:
+            # Get user display name
+            if batch.user.first_name or batch.user.last_name:
+                user_name = f"{batch.user.first_name} {batch.user.last_name}".strip()
+            else:
+                user_name = batch.user.username
+            
+            # Get first item name for display
+            first_item = batch.items.first()
+            item_name = first_item.property.property_name if first_item else "No items"
+            if batch.total_items > 1:
+                item_name += f" (+{batch.total_items - 1} more)"
+            
+            # Prepare batch object
+            batch_obj = {
+                'id': batch.id,
+                'status': batch.status,
+                'statusDisplay': batch.get_status_display(),
+                'itemName': item_name,
+                'userName': user_name,
+                'department': str(batch.user.userprofile.department) if batch.user.userprofile.department else '',
+                'quantity': batch.total_quantity,
+                'purpose': batch.purpose[:50] + ('...' if len(batch.purpose) > 50 else ''),
+                'neededDate': batch.earliest_needed_date.strftime('%Y-%m-%d') if batch.earliest_needed_date else '',
+                'returnDate': batch.latest_return_date.strftime('%Y-%m-%d') if batch.latest_return_date else '',
+                'requestDate': batch.request_date.strftime('%Y-%m-%d %H:%M'),
+                'approvedDate': batch.approved_date.strftime('%Y-%m-%d %H:%M') if batch.approved_date else None,
+                'remarks': batch.remarks if batch.remarks else '',
+            }
+                
+            reservation_data.append(batch_obj)
+        
+        context['reservation_data'] = json.dumps(reservation_data)
+        
+        return context
+
+
+@login_required
+def create_supply_request(request):
+    """
+    New cart-based supply request system.
+    Users can add multiple items to a cart before submitting.
+    """
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        
+        if action == 'add_to_cart':
+            # Handle adding item to list
+            return add_to_list(request)
+        elif action == 'remove_from_cart':
+            # Handle removing item from list
+            return remove_from_list(request)
+        elif action == 'update_cart':
+            # Handle updating item quantity in list
+            return update_list_item(request)
+        elif action == 'submit_request':
+            # Handle final request submission
+            return submit_list_request(request)
+    
+    # GET request - show the cart page
+    cart_items = [
+        {
+            'supply_id': line.supply_id,
+            'supply_name': line.supply.supply_name,
+            'quantity': line.quantity,
+            'available_quantity': line.supply.quantity_info.current_quantity,
+        }
+        for line in cart_lines(get_cart(request.user, SUPPLY, create=False))
+    ]
+    
+    # Get recent batch requests (new system)
+    recent_batch_requests = SupplyRequestBatch.objects.with_aggregates().filter(user=request.user).order_by('-request_date')[:5]
+    
+    # Get recent single requests (legacy system) 
+    recent_single_requests = SupplyRequest.objects.filter(user=request.user).order_by('-request_date')[:5]
+    
+    # Combine and format recent requests
+    recent_requests_data = []
+    
+    # Add batch requests
+    for req in recent_batch_requests:
+        items_text = f"{req.total_items} items"
+        if req.total_items <= 3:
+            items_list = ", ".join([f"{item.supply.supply_name} (x{item.quantity})" for item in req.items.all()])
+            items_text = items_list
+        
+        recent_requests_data.append({
+            'id': req.id,
+            'item': items_text,
+            'quantity': req.total_quantity,
+            'status': req.status,
+            'date': req.request_date,
+            'purpose': req.purpose,
+            'type': 'batch'
+        })
+    
+    # Add single requests (for backward compatibility)
+    for req in recent_single_requests:
+        recent_requests_data.append({
+            'id': req.id,
+            'item': req.supply.supply_name,
+            'quantity': req.quantity,
+            'status': req.status,
+            'date': req.request_date,
+            'purpose': req.purpose,
+            'type': 'single'
+        })
+    
+    # Sort by date
+    recent_requests_data.sort(key=lambda x: x['date'], reverse=True)
+    recent_requests_data = recent_requests_data[:5]  # Keep only 5 most recent
+    
+    context = {
+        'cart_items': cart_items,
+        'item_form': SupplyRequestItemForm(),
+        'batch_form': SupplyRequestBatchForm(),
+        'available_supplies': Supply.objects.filter(
+            available_for_request=True,
+            quantity_info__stock_status__in=IN_STOCK
+        ).select_related('quantity_info'),
+        'recent_requests': recent_requests_data,
+    }
+    
+    return render(request, 'userpanel/user_request.html', context)
+
+
+@login_required
+def add_to_list(request):
+    """Add an item to the supply request list"""
+    if request.method == 'POST':
+        supply_id = request.POST.get('supply_id')
+        quantity = int(request.POST.get('quantity', 0))
+        
+        try:
+            supply = Supply.objects.get(id=supply_id)
+            
+            # Validate quantity
+            available_quantity = supply.quantity_info.current_quantity
+            if quantity > available_quantity:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Only {available_quantity} units of {supply.supply_name} are available.'
+                })
+            
+            cart = get_cart(request.user, SUPPLY)
+            
+            # Adding an item already in the list adds to its quantity
+            line = get_line(cart, supply.id)
+            if line is not None and line.quantity + quantity > available_quantity:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Cannot add {quantity} more. Total would exceed available quantity ({available_quantity}).'
+                })
+            add_to_cart(cart, supply.id, quantity)
+            
+            return JsonResponse({
+                'success': True,
+                'message': f'Added {supply.supply_name} to list.',
+                'list_count': line_count(cart)
+            })
+            
+        except Supply.DoesNotExist:
+            return JsonResponse({
+                'success': False,
+                'message': 'Supply item not found.'
+            })
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': f'Error adding item to cart: {str(e)}'
+            })
+
+
+@login_required
+def remove_from_list(request):
+    """Remove an item from the supply request list"""
+    if request.method == 'POST':
+        supply_id = request.POST.get('supply_id')
+        
+        cart = get_cart(request.user, SUPPLY)
+        try:
+            remove_from_cart(cart, supply_id)
+        except (ValueError, TypeError):
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid supply ID.'
+            })
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Item removed from cart.',
+            'cart_count': line_count(cart)
+        })
+
+
+@login_required
+def clear_supply_list(request):
+    """Clear all items from the supply request list"""
+    if request.method == 'POST':
+        clear_cart(get_cart(request.user, SUPPLY))
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'List cleared successfully.',
+            'cart_count': 0
+        })
+    
+    return JsonResponse({
+        'success': False,
+        'message': 'Invalid request method.'
+    })
+
+
+@login_required
+def update_list_item(request):
+    """Update quantity of an item in the list"""
+    if request.method == 'POST':
+        supply_id = request.POST.get('supply_id')
+        new_quantity = int(request.POST.get('quantity', 0))
+        
+        try:
+            supply = Supply.objects.get(id=supply_id)
+            available_quantity = supply.quantity_info.current_quantity
+            
+            if new_quantity > available_quantity:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Only {available_quantity} units available.'
+                })
+            
+            cart = get_cart(request.user, SUPPLY)
+            update_line(cart, supply.id, quantity=new_quantity)
+            
+            return JsonResponse({
+                'success': True,
+                'message': 'Cart updated.',
+                'cart_count': line_count(cart)
+            })
+            
+        except Supply.DoesNotExist:
+            return JsonResponse({
+                'success': False,
+                'message': 'Supply item not found.'
+            })
+
+
+@login_required
+def submit_list_request(request):
+    """Submit the list as a batch supply request"""
+    if request.method == 'POST':
+        purpose = request.POST.get('purpose', '').strip()
+        cart = get_cart(request.user, SUPPLY)
+        lines = cart_lines(cart)
+        
+        if not lines:
+            messages.error(request, 'Your request list is empty. Please add items before submitting.')
+            return redirect('create_supply_request')
+        
+        if not purpose:
+            messages.error(request, 'Please provide a purpose for your request.')
+            return redirect('create_supply_request')
+        
+        # Validate quantities against available stock (accounting for reserved items)
+        errors = validate_cart(cart, lines)
+        if errors:
+            messages.error(request, errors[0])
+            return redirect('create_supply_request')
+        
+        try:
+            # Create the batch request and its items, and empty the list
+            batch_request = submit_cart(cart, lines, purpose)
+            
+            # Log activity
+            item_list = ", ".join(f"{line.supply.supply_name} (x{line.quantity})" for line in lines[:3])
+            if len(lines) > 3:
+                item_list += f" and {len(lines) - 3} more items"
+            
+            ActivityLog.log_activity(
+                user=request.user,
+                action='request',
+                model_name='SupplyRequestBatch',
+                object_repr=f"Batch #{batch_request.id}",
+                description=f"Submitted batch supply request with {len(lines)} items: {item_list}"
+            )
+            
+            messages.success(request, f'Supply request submitted successfully! Your request ID is #{batch_request.id}.')
+            return redirect('user_unified_request')
+            
+        except Exception as e:
+            messages.error(request, f'Error submitting request: {str(e)}')
+            return redirect('user_unified_request')
+
+
+@login_required
+def create_borrow_request(request):
+    if request.method == 'POST':
+        property_id = request.POST.get('property_id')
+        quantity = request.POST.get('quantity')
+        borrow_date = request.POST.get('borrow_date')
+        return_date = request.POST.get('return_date')
+        purpose = request.POST.get('purpose')
+        
+        property_item = get_object_or_404(Property, id=property_id)
+        borrow_request = BorrowRequest.objects.create(
+            user=request.user,
+            property=property_item,
+            quantity=quantity,
+            borrow_date=borrow_date,
+            return_date=return_date,
+            purpose=purpose,
+            status='pending'
+        )
+
+        ActivityLog.log_activity(
+            user=request.user,
+            action='request',
+            model_name='Property',
+            object_repr=property_item.property_name,
+            description=f"Requested to borrow {quantity} units of {property_item.property_name} from {borrow_date} to {return_date} for {purpose}"
+        )
+
+        messages.success(request, 'Borrow request created successfully.')
+        return redirect('create_borrow_request')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def approve_borrow_request(request, request_id):
+    borrow_request = get_object_or_404(BorrowRequest, id=request_id)
+    borrow_request.status = 'approved'
+    borrow_request.save()
+
+    ActivityLog.log_activity(
+        user=request.user,
+        action='approve',
+        model_name='BorrowRequest',
+        object_repr=f"Request #{request_id}",
+        description=f"Approved borrow request for {borrow_request.quantity} units of {borrow_request.property.property_name}"
+    )
+
+    messages.success(request, 'Borrow request approved successfully.')
+    return redirect('borrow_requests')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def reject_borrow_request(request, request_id):
+    borrow_request = get_object_or_404(BorrowRequest, id=request_id)
+    borrow_request.status = 'rejected'
+    borrow_request.save()
+
+    ActivityLog.log_activity(
+        user=request.user,
+        action='reject',
+        model_name='BorrowRequest',
+        object_repr=f"Request #{request_id}",
+        description=f"Rejected borrow request for {borrow_request.quantity} units of {borrow_request.property.property_name}"
+    )
+
+    messages.success(request, 'Borrow request rejected successfully.')
+    return redirect('borrow_requests')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+@admin_permission_required('approve_supply_request')
+def approve_batch_item(request, batch_id, item_id):
+    """Approve an individual item in a batch request"""
+    from django.core.exceptions import ObjectDoesNotExist
+    from ..models import PPMP, PPMPItem
+    from django.db.models import F
+    
+    batch_request = get_object_or_404(SupplyRequestBatch, id=batch_id)
+    item = get_object_or_404(SupplyRequestItem, id=item_id, batch_request=batch_request)
+    scroll_position = request.POST.get('scroll_position', '0')
+    
+    # Get approved quantity from form
+    approved_quantity = request.POST.get('approved_quantity', item.quantity)
+    try:
+        approved_quantity = int(approved_quantity)
+        if approved_quantity <= 0 or approved_quantity > item.quantity:
+            messages.error(request, f'Invalid approved quantity. Must be between 1 and {item.quantity}.')
+            response = redirect('batch_request_detail', batch_id=batch_id)
+            response['Location'] += f'#scroll-{scroll_position}'
+            return response
+    except (ValueError, TypeError):
+        approved_quantity = item.quantity
+    
+    # Get PPMP year and item from form (if provided)
+    # First check for multi-year allocations (new format)
+    ppmp_allocations_json = request.POST.get('ppmp_allocations')
+    ppmp_allocations = None
+    
+    if ppmp_allocations_json:
+        import json
+        import logging
+        logger = logging.getLogger(__name__)
+        try:
+            ppmp_allocations = json.loads(ppmp_allocations_json)
+            logger.debug(f"PPMP Allocations received: {ppmp_allocations}")
+        except (ValueError, json.JSONDecodeError):
+            ppmp_allocations = None
+            logger.error(f"Failed to parse PPMP allocations JSON: {ppmp_allocations_json}")
+    
+    # Fallback to single year selection (legacy format)
+    ppmp_year = request.POST.get('ppmp_year')
+    ppmp_item_id = request.POST.get('ppmp_item_id')
+    
+    if ppmp_year:
+        try:
+            ppmp_year = int(ppmp_year)
+        except (ValueError, TypeError):
+            ppmp_year = None
+    
+    if ppmp_item_id:
+        try:
+            ppmp_item_id = int(ppmp_item_id)
+        except (ValueError, TypeError):
+            ppmp_item_id = None
+    
+    # CHECK AVAILABLE STOCK BEFORE APPROVING
+    quantity_info = item.supply.quantity_info
+    available_qty = quantity_info.available_quantity
+    
+    if approved_quantity > available_qty:
+        error_msg = f'Cannot approve {approved_quantity} units of {item.supply.supply_name}. Only {available_qty} units available (Current: {quantity_info.current_quantity}, Reserved: {quantity_info.reserved_quantity}).'
+        
+        # Check if this is an AJAX request
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': False,
+                'error': error_msg
+            })
+        else:
+            messages.error(request, error_msg)
+            response = redirect('batch_request_detail', batch_id=batch_id)
+            response['Location'] += f'#scroll-{scroll_position}'
+            return response
+    
+    # Mark item as approved
+    item.approved = True
+    item.status = 'approved'  # Also update the status field
+    item.approved_quantity = approved_quantity
+    remarks = request.POST.get('remarks', '')
+    if remarks:
+        item.remarks = remarks
+    
+    # Save PPMP allocations or single year selection (but don't update released quantity yet)
+    # PPMP released quantities will be updated during the claiming phase, not during approval
+    if ppmp_allocations:
+        # Multi-year allocation - store allocation data for later use during claiming
+        item.ppmp_allocations = ppmp_allocations
+        
+        logger.debug(f"========== STORING ALLOCATION DATA (NO RELEASE YET) ==========")
+        logger.debug(f"Total allocations to store: {len(ppmp_allocations)}")
+        logger.debug(f"Full allocations data: {ppmp_allocations}")
+        
+        # Validate allocations and store backward compatibility fields
+        for allocation in ppmp_allocations:
+            alloc_ppmp_item_id = allocation.get('ppmp_item_id')
+            alloc_quantity = allocation.get('quantity', 0)
+            alloc_year = allocation.get('year')
+            
+            logger.debug(f"Allocation {ppmp_allocations.index(allocation) + 1}: year={alloc_year}, ppmp_item_id={alloc_ppmp_item_id}, quantity={alloc_quantity}")
+            
+            # Verify PPMP item exists and year matches
+            if alloc_ppmp_item_id and alloc_quantity > 0:
+                try:
+                    ppmp_item = PPMPItem.objects.get(id=alloc_ppmp_item_id)
+                    if ppmp_item.ppmp.year != alloc_year:
+                        logger.error(f"❌ YEAR MISMATCH! PPMP item {alloc_ppmp_item_id} is from year {ppmp_item.ppmp.year} but allocation specifies year {alloc_year}")
+                except PPMPItem.DoesNotExist:
+                    logger.warning(f"Could not find PPMP item with ID {alloc_ppmp_item_id}")
+        
+        # Store the primary PPMP year (first allocation year) for backwards compatibility
+        if ppmp_allocations and len(ppmp_allocations) > 0:
+            item.ppmp_year = ppmp_allocations[0].get('year')
+            # Also store the first ppmp_item for reference
+            if ppmp_allocations[0].get('ppmp_item_id'):
+                try:
+                    item.ppmp_item = PPMPItem.objects.get(id=ppmp_allocations[0]['ppmp_item_id'])
+                    logger.debug(f"Set backward compatibility: ppmp_year={item.ppmp_year}, ppmp_item={item.ppmp_item.id}")
+                except PPMPItem.DoesNotExist:
+                    pass
+        
+        logger.debug(f"Allocations stored. PPMP released quantities will be updated during claiming.")
+        logger.debug(f"========== END ALLOCATION STORAGE ==========")
+    
+    # Only process legacy single-year selection if multi-year allocations were NOT used
+    # Store the reference but don't update released quantity yet (that happens during claiming)
+    if not ppmp_allocations and ppmp_year and ppmp_item_id:
+        logger.debug(f"Storing legacy single-year selection: year={ppmp_year}, ppmp_item_id={ppmp_item_id}")
+        # Single year selection (legacy support)
+        item.ppmp_year = ppmp_year
+        
+        # Link the supply request item to this PPMP item (but don't update released yet)
+        try:
+            ppmp_item = PPMPItem.objects.get(id=ppmp_item_id)
+            item.ppmp_item = ppmp_item
+            logger.debug(f"Linked item to PPMP item {ppmp_item_id}. Released quantity will be updated during claiming.")
+        except PPMPItem.DoesNotExist:
+            logger.warning(f"Could not find PPMP item with ID {ppmp_item_id}")
+        except Exception as e:
+            logger.warning(f"Could not link PPMP item: {str(e)}")
+    
+    item.save()
+    
+    # Reserve the approved quantity to prevent overbooking
+    quantity_info.reserved_quantity += approved_quantity
+    quantity_info.save(user=request.user)
+    
+    # Check if all items in the batch are processed
+    total_items = batch_request.items.count()
+    approved_items = batch_request.items.filter(approved=True).count()
+    rejected_items = batch_request.items.filter(approved=False, status='rejected').count()
+    processed_items = approved_items + rejected_items
+    
+    # Update batch status
+    if processed_items == total_items:
+        # All items have been processed (approved or rejected)
+        if approved_items > 0:
+            batch_request.status = 'for_claiming'
+            # Set approved_date if not already set
+            if not batch_request.approved_date:
+                batch_request.approved_date = timezone.now()
+                batch_request.approved_by = request.user
+        else:
+            batch_request.status = 'rejected'
+    elif approved_items > 0:
+        batch_request.status = 'partially_approved'
+        # Set approved_date when first item is approved
+        if not batch_request.approved_date:
+            batch_request.approved_date = timezone.now()
+            batch_request.approved_by = request.user
+    
+    batch_request.save()
+    
+    # Create notification for user (individual item notification)
+    Notification.objects.create(
+        user=batch_request.user,
+        message=f"Item '{item.supply.supply_name}' in your batch request #{batch_request.id} has been approved for {item.approved_quantity} units.",
+        remarks=remarks
+    )
+    
+    # Send batch completion email ONLY if all items are now processed
+    # Do this asynchronously to avoid blocking the response
+    if processed_items == total_items:
+        from threading import Thread
+        from ..utils import send_batch_request_completion_email
+        
+        def send_email_async():
+            approved_items_list = batch_request.items.filter(status='approved')
+            rejected_items_list = batch_request.items.filter(status='rejected')
+            send_batch_request_completion_email(batch_request, approved_items_list, rejected_items_list)
+        
+        # Start email sending in background thread
+        email_thread = Thread(target=send_email_async)
+        email_thread.daemon = True
+        email_thread.start()
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='approve',
+        model_name='SupplyRequestItem',
+        object_repr=f"Batch #{batch_id} - {item.supply.supply_name}",
+        description=f"Approved {item.approved_quantity} out of {item.quantity} units of {item.supply.supply_name} in batch request #{batch_id}"
+    )
+    
+    # Remove success message since user can see status change immediately on the page
+    # messages.success(request, f'Item "{item.supply.supply_name}" approved successfully.')
+    response = redirect('batch_request_detail', batch_id=batch_id)
+    response['Location'] += f'#scroll-{scroll_position}'
+    return response
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+@admin_permission_required('approve_supply_request')
+def reject_batch_item(request, batch_id, item_id):
+    """Reject an individual item in a batch request"""
+    batch_request = get_object_or_404(SupplyRequestBatch, id=batch_id)
+    item = get_object_or_404(SupplyRequestItem, id=item_id, batch_request=batch_request)
+    scroll_position = request.POST.get('scroll_position', '0')
+    
+    # If the item was previously approved, release the reserved quantity
+    if item.status == 'approved' and item.approved_quantity:
+        quantity_info = item.supply.quantity_info
+        quantity_info.reserved_quantity = max(0, quantity_info.reserved_quantity - item.approved_quantity)
+        quantity_info.save(user=request.user)
+    
+    # Mark item as not approved and add remarks
+    item.approved = False
+    item.status = 'rejected'  # Also update the status field
+    remarks = request.POST.get('remarks', '')
+    if remarks:
+        item.remarks = remarks
+    item.save()
+    
+    # Check if all items in the batch are processed
+    total_items = batch_request.items.count()
+    approved_items = batch_request.items.filter(approved=True).count()
+    rejected_items = batch_request.items.filter(approved=False, status='rejected').count()
+    processed_items = approved_items + rejected_items
+    
+    # Update batch status
+    if processed_items == total_items:
+        # All items have been processed (approved or rejected)
+        if approved_items > 0:
+            batch_request.status = 'for_claiming'
+            # Set approved_date if not already set
+            if not batch_request.approved_date:
+                batch_request.approved_date = timezone.now()
+        else:
+            batch_request.status = 'rejected'
+    elif approved_items > 0:
+        batch_request.status = 'partially_approved'
+        # Set approved_date when first item is approved
+        if not batch_request.approved_date:
+            batch_request.approved_date = timezone.now()
+    
+    batch_request.save()
+    
+    # Create notification for user (individual item notification)
+    Notification.objects.create(
+        user=batch_request.user,
+        message=f"Item '{item.supply.supply_name}' in your batch request #{batch_request.id} has been rejected.",
+        remarks=remarks
+    )
+    
+    # Send batch completion email ONLY if all items are now processed
+    if processed_items == total_items:
+        from ..utils import send_batch_request_completion_email
+        approved_items = batch_request.items.filter(status='approved')
+        rejected_items = batch_request.items.filter(status='rejected')
+        send_batch_request_completion_email(batch_request, approved_items, rejected_items)
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='reject',
+        model_name='SupplyRequestItem',
+        object_repr=f"Batch #{batch_id} - {item.supply.supply_name}",
+        description=f"Rejected {item.quantity} units of {item.supply.supply_name} in batch request #{batch_id}"
+    )
+    
+    # Remove success message since user can see status change immediately on the page
+    # messages.success(request, f'Item "{item.supply.supply_name}" rejected successfully.')
+    response = redirect('batch_request_detail', batch_id=batch_id)
+    response['Location'] += f'#scroll-{scroll_position}'
+    return response
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+def batch_item_decisions(request, request_type):
+    """
+    Approve or reject many batch items in one request (see app/batch_decisions.py).
+
+    Expects a JSON body {"decisions": [{"item", "decision", "approved_quantity",
+    "ppmp_allocations", "remarks"}, ...]} for items of one request type ('supply',
+    'borrow' or 'reservation'). Answers {"success": true, "batches": {id: status}},
+    or {"success": false, "errors": [...]} with status 400 and nothing applied.
+    """
+    if request_type not in DECISION_REQUEST_TYPES:
+        raise Http404('Unknown request type')
+    if not has_admin_permission(request.user, DECISION_REQUEST_TYPES[request_type][3]):
+        return JsonResponse({
+            'success': False,
+            'errors': ["You don't have permission to perform this action."]
+        }, status=403)
+    
+    try:
+        decisions = json.loads(request.body)['decisions']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'success': False, 'errors': ['Invalid request body.']}, status=400)
+    if not isinstance(decisions, list):
+        return JsonResponse({'success': False, 'errors': ['decisions must be a list.']}, status=400)
+    
+    try:
+        statuses = apply_decisions(request_type, decisions, request.user)
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'errors': e.messages}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'batches': {str(batch_id): status for batch_id, status in statuses.items()}
+    })
+
+
+@permission_required('app.view_admin_module')
+@login_required
+def batch_request_detail(request, batch_id):
+    """View detailed information about a batch request with individual item actions"""
+    batch_request = get_object_or_404(SupplyRequestBatch, id=batch_id)
+    
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        item_id = request.POST.get('item_id')
+        remarks = request.POST.get('remarks', '').strip()
+        
+        # Handle void action for for_claiming requests
+        if action == 'void_request' and batch_request.status == 'for_claiming':
+            # Check permission
+            from ..permissions import has_admin_permission
+            if not has_admin_permission(request.user, 'void_request'):
+                messages.error(request, 'You do not have permission to void requests.')
+                return redirect('batch_request_detail', batch_id=batch_id)
+            
+            # Validate that remarks is provided
+            if not remarks:
+                messages.error(request, 'Please provide a reason for voiding this request.')
+                return redirect('batch_request_detail', batch_id=batch_id)
+            
+            # Release all reserved quantities from approved items
+            approved_items = batch_request.items.filter(status='approved')
+            for item in approved_items:
+                if item.approved_quantity:
+                    quantity_info = item.supply.quantity_info
+                    quantity_info.reserved_quantity = max(0, quantity_info.reserved_quantity - item.approved_quantity)
+                    quantity_info.save(user=request.user)
+            
+            # Update ALL items to voided status (not just approved ones)
+            batch_request.items.all().update(status='voided')
+            
+            # Change batch status to voided
+            from django.utils import timezone
+            batch_request.status = 'voided'
+            batch_request.remarks = remarks
+            batch_request.voided_by = request.user
+            batch_request.voided_date = timezone.now()
+            batch_request.save()
+            
+            # Create notification for user
+            Notification.objects.create(
+                user=batch_request.user,
+                message=f"Your batch supply request #{batch_request.id} has been voided by admin.",
+                remarks=remarks
+            )
+            
+            # Send email notification to the requester
+            if batch_request.user.email:
+                from django.core.mail import send_mail
+                from django.conf import settings
+                
+                subject = f'Supply Request #{batch_request.id} - Voided'
+                message = f"""Dear {batch_request.user.get_full_name() or batch_request.user.username},
+
+Your supply request (Batch #{batch_request.id}) has been voided by the administrator.
+
+Reason for voiding:
+{remarks}
+
+All reserved quantities have been released back to the inventory.
+
+If you have any questions, please contact the administrator.
+
+Best regards,
+Resource Hive Management System
+"""
+                try:
+                    send_mail(
+                        subject,
+                        message,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [batch_request.user.email],
+                        fail_silently=False,
+                    )
+                except Exception as e:
+                    # Log the error but don't fail the request
+                    import logging
+                    logger = logging.getLogger(__name__)
+                    logger.error(f"Failed to send void notification email: {str(e)}")
+            
+            # Log activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='update',
+                model_name='SupplyRequestBatch',
+                object_repr=f"Batch Request #{batch_request.id}",
+                description=f"Voided for_claiming request, released reserved quantities. Reason: {remarks[:100]}"
+            )
+            
+            messages.success(request, 'Request voided successfully. Reserved quantities have been released and the requester has been notified.')
+            return redirect('batch_request_detail', batch_id=batch_id)
+        
+        if item_id:
+            item = get_object_or_404(SupplyRequestItem, id=item_id, batch_request=batch_request)
+            
+            if action == 'approve':
+                # Get approved quantity from form (defaults to requested quantity)
+                approved_quantity = request.POST.get('approved_quantity', item.quantity)
+                try:
+                    approved_quantity = int(approved_quantity)
+                    if approved_quantity <= 0 or approved_quantity > item.quantity:
+                        approved_quantity = item.quantity
+                except (ValueError, TypeError):
+                    approved_quantity = item.quantity
+                
+                # CHECK AVAILABLE STOCK BEFORE APPROVING
+                quantity_info = item.supply.quantity_info
+                available_qty = quantity_info.available_quantity
+                
+                if approved_quantity > available_qty:
+                    messages.error(request, f'Cannot approve {approved_quantity} units of {item.supply.supply_name}. Only {available_qty} units available (Current: {quantity_info.current_quantity}, Reserved: {quantity_info.reserved_quantity}).')
+                    return redirect('batch_request_detail', batch_id=batch_id)
+                
+                item.status = 'approved'
+                item.approved_quantity = approved_quantity
+                if remarks:
+                    item.remarks = remarks
+                item.save()
+                
+                # Reserve the approved quantity to prevent overbooking
+                quantity_info.reserved_quantity += approved_quantity
+                quantity_info.save(user=request.user)
+                
+                # Create notification
+                Notification.objects.create(
+                    user=batch_request.user,
+                    message=f"Item '{item.supply.supply_name}' in your batch request #{batch_request.id} has been approved for {approved_quantity} units.",
+                    remarks=remarks
+                )
+                
+                messages.success(request, f'Item "{item.supply.supply_name}" approved successfully.')
+                
+            elif action == 'reject':
+                # If the item was previously approved, release the reserved quantity
+                if item.status == 'approved' and item.approved_quantity:
+                    quantity_info = item.supply.quantity_info
+                    quantity_info.reserved_quantity = max(0, quantity_info.reserved_quantity - item.approved_quantity)
+                    quantity_info.save(user=request.user)
+                
+                item.status = 'rejected'
+                if remarks:
+                    item.remarks = remarks
+                item.save()
+                
+                # Create notification
+                Notification.objects.create(
+                    user=batch_request.user,
+                    message=f"Item '{item.supply.supply_name}' in your batch request #{batch_request.id} has been rejected.",
+                    remarks=remarks
+                )
+                
+                messages.success(request, f'Item "{item.supply.supply_name}" rejected successfully.')
+            
+            # Update batch status based on individual item statuses
+            total_items = batch_request.items.count()
+            approved_items = batch_request.items.filter(status='approved').count()
+            rejected_items = batch_request.items.filter(status='rejected').count()
+            pending_items = batch_request.items.filter(status='pending').count()
+            processed_items = approved_items + rejected_items
+            
+            if processed_items == total_items:
+                # All items have been processed (approved or rejected)
+                if approved_items > 0:
+                    # At least some items were approved
+                    batch_request.status = 'for_claiming'
+                    if approved_items == total_items:
+                        batch_request.approved_date = timezone.now()
+                else:
+                    # All items were rejected
+                    batch_request.status = 'rejected'
+            elif approved_items > 0:
+                # Some approved, some still pending
+                batch_request.status = 'partially_approved'
+            else:
+                # No items approved yet (either all pending or all rejected)
+                if rejected_items > 0 and pending_items > 0:
+                    # Some rejected, some pending
+                    batch_request.status = 'pending'
+                else:
+                    # All pending or all rejected
+                    batch_request.status = 'pending' if pending_items > 0 else 'rejected'
+            
+            batch_request.save()
+            
+            # Send batch completion email ONLY if all items are now processed
+            if processed_items == total_items:
+                from ..utils import send_batch_request_completion_email
+                approved_items_qs = batch_request.items.filter(status='approved')
+                rejected_items_qs = batch_request.items.filter(status='rejected')
+                send_batch_request_completion_email(batch_request, approved_items_qs, rejected_items_qs)
+        
+        return redirect('batch_request_detail', batch_id=batch_id)
+    
+    from ..permissions import has_admin_permission
+    import json
+    
+    # Add PPMP matching check for each item (only for supply requests)
+    # Use multi-year matching to show all available years with unfulfilled items
+    ppmp_matches = {}
+    user_department = batch_request.user.userprofile.department if hasattr(batch_request.user, 'userprofile') and batch_request.user.userprofile.department else None
+    
+    if user_department:
+        from ..utils import check_ppmp_match_multi_year
+        for item in batch_request.items.all():
+            match_result = check_ppmp_match_multi_year(
+                supply_name=item.supply.supply_name,
+                department=user_department,
+                current_year=batch_request.request_date.year
+            )
+            ppmp_matches[item.id] = match_result
+    
+    # Convert ppmp_matches to JSON for JavaScript
+    # Need to serialize the data properly (remove non-serializable objects)
+    ppmp_matches_json = {}
+    for item_id, match_data in ppmp_matches.items():
+        ppmp_matches_json[str(item_id)] = {
+            'match_found': match_data.get('match_found', False),
+            'message': match_data.get('message', ''),
+            'total_matches': match_data.get('total_matches', 0),
+            'years_with_matches': [
+                {
+                    'year': year_data['year'],
+                    'total_remaining': year_data['total_remaining'],
+                }
+                for year_data in match_data.get('years_with_matches', [])
+            ] if match_data.get('years_with_matches') else []
+        }
+    
+    context = {
+        'batch_request': batch_request,
+        'items': batch_request.items.all().order_by('supply__supply_name'),
+        'can_void_request': has_admin_permission(request.user, 'void_request'),
+        'ppmp_matches': ppmp_matches,
+        'ppmp_matches_json': json.dumps(ppmp_matches_json),
+        'user_department': user_department,
+    }
+    
+    return render(request, 'app/batch_request_detail.html', context)
+
+
+# Claiming Workflow Views
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+def claim_batch_items(request, batch_id):
+    """
+    Handle claiming of all approved items in a batch request.
+    This will deduct stock and mark items as completed.
+    """
+    batch_request = get_object_or_404(SupplyRequestBatch, id=batch_id)
+    
+    # Only allow claiming if batch is in for_claiming status
+    if batch_request.status != 'for_claiming':
+        messages.error(request, 'This request is not available for claiming.')
+        return redirect_with_tab(request, 'user_supply_requests')
+    
+    # Get all approved items that haven't been claimed yet
+    approved_items = batch_request.items.filter(status='approved', claimed_date__isnull=True)
+    
+    if not approved_items.exists():
+        messages.error(request, 'No approved items available for claiming.')
+        return redirect_with_tab(request, 'user_supply_requests')
+    
+    # Check stock availability for all items before processing
+    insufficient_stock_items = []
+    for item in approved_items:
+        available_quantity = 0
+        if hasattr(item.supply, 'quantity_info') and item.supply.quantity_info:
+            available_quantity = item.supply.quantity_info.current_quantity or 0
+        
+        # Handle case where approved_quantity might be None (fallback to requested quantity)
+        approved_qty = item.approved_quantity or item.quantity or 0
+        
+        if available_quantity < approved_qty:
+            insufficient_stock_items.append(f"{item.supply.supply_name} (available: {available_quantity}, needed: {approved_qty})")
+    
+    if insufficient_stock_items:
+        messages.error(request, f"Insufficient stock for items: {', '.join(insufficient_stock_items)}")
+        return redirect_with_tab(request, 'user_supply_requests')
+    
+    # Process each approved item
+    claimed_items = []
+    for item in approved_items:
+        # Handle case where approved_quantity might be None (fallback to requested quantity)
+        approved_qty = item.approved_quantity or item.quantity or 0
+        
+        # Deduct from stock
+        if hasattr(item.supply, 'quantity_info') and item.supply.quantity_info:
+            old_qty = item.supply.quantity_info.current_quantity or 0
+            new_qty = max(0, old_qty - approved_qty)
+            item.supply.quantity_info.current_quantity = new_qty
+            
+            # Also release the reserved quantity
+            item.supply.quantity_info.reserved_quantity = max(0, item.supply.quantity_info.reserved_quantity - approved_qty)
+            
+            # Create SupplyHistory entry for quantity deduction
+            requester_name = batch_request.user.get_full_name() if batch_request.user.get_full_name() else batch_request.user.username
+            SupplyHistory.objects.create(
+                supply=item.supply,
+                user=request.user,  # The admin/staff who processed the claim
+                action='quantity_update',
+                field_name='current_quantity',
+                old_value=str(old_qty),
+                new_value=str(new_qty),
+                remarks=f"Supply request by {requester_name} (Batch #{batch_id})"
+            )
+            
+            # Save with skip_history to avoid duplicate entry
+            item.supply.quantity_info.save(skip_history=True)
+        
+        # Update PPMP released quantity NOW (during claiming, not approval)
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        # Handle multi-year allocations
+        if item.ppmp_allocations:
+            logger.info(f"Updating PPMP released quantities for multi-year allocations: {item.ppmp_allocations}")
+            for allocation in item.ppmp_allocations:
+                alloc_ppmp_item_id = allocation.get('ppmp_item_id')
+                alloc_quantity = allocation.get('quantity', 0)
+                alloc_year = allocation.get('year')
+                
+                if alloc_ppmp_item_id and alloc_quantity > 0:
+                    try:
+                        from ..models import PPMPItem
+                        ppmp_item = PPMPItem.objects.get(id=alloc_ppmp_item_id)
+                        old_released = ppmp_item.released
+                        ppmp_item.released += alloc_quantity
+                        ppmp_item.save()
+                        logger.info(f"PPMP item {alloc_ppmp_item_id} (year {alloc_year}) released: {old_released} → {ppmp_item.released}")
+                        
+                        # Log activity
+                        ActivityLog.log_activity(
+                            user=request.user,
+                            action='release',
+                            model_name='PPMPItem',
+                            object_repr=f"PPMP {alloc_year} - {ppmp_item.unit_measure}",
+                            description=f"Released {alloc_quantity} units of {item.supply.supply_name} from PPMP {alloc_year}. New released count: {ppmp_item.released}/{ppmp_item.quantity}"
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to update PPMP item {alloc_ppmp_item_id}: {str(e)}")
+        
+        # Handle single-year selection
+        elif item.ppmp_item:
+            logger.info(f"Updating PPMP released quantity for single-year selection: PPMP item {item.ppmp_item.id}")
+            try:
+                old_released = item.ppmp_item.released
+                item.ppmp_item.released += approved_qty
+                item.ppmp_item.save()
+                logger.info(f"PPMP item {item.ppmp_item.id} (year {item.ppmp_item.ppmp.year}) released: {old_released} → {item.ppmp_item.released}")
+                
+                # Log activity
+                ActivityLog.log_activity(
+                    user=request.user,
+                    action='release',
+                    model_name='PPMPItem',
+                    object_repr=f"PPMP {item.ppmp_item.ppmp.year} - {item.ppmp_item.unit_measure}",
+                    description=f"Released {approved_qty} units of {item.supply.supply_name} from PPMP {item.ppmp_item.ppmp.year}. New released count: {item.ppmp_item.released}/{item.ppmp_item.quantity}"
+                )
+            except Exception as e:
+                logger.error(f"Failed to update PPMP item {item.ppmp_item.id}: {str(e)}")
+        
+        # Legacy path: No PPMP allocation was selected during approval
+        else:
+            if hasattr(batch_request.user, 'userprofile') and batch_request.user.userprofile.department:
+                from ..utils import check_ppmp_match
+                from ..models import PPMPItem
+                match_result = check_ppmp_match(
+                    supply_name=item.supply.supply_name,
+                    department=batch_request.user.userprofile.department,
+                    year=batch_request.request_date.year
+                )
+                if match_result['match_found'] and match_result['matched_items']:
+                    # Update the first matching PPMP item's released quantity
+                    ppmp_item = match_result['matched_items'][0]
+                    ppmp_item.released += approved_qty
+                    ppmp_item.save()
+                    logger.info(f"Legacy PPMP update: PPMP item {ppmp_item.id} released quantity updated")
+        
+        # Update the approved_quantity if it was None
+        if item.approved_quantity is None:
+            item.approved_quantity = item.quantity
+        
+        # Mark item as completed and claimed
+        item.status = 'completed'
+        item.claimed_date = timezone.now()
+        item.save()
+        
+        claimed_items.append(item)
+        
+        # Log activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='claim',
+            model_name='SupplyRequestItem',
+            object_repr=f"Batch #{batch_id} - {item.supply.supply_name}",
+            description=f"Claimed {item.approved_quantity or item.quantity} units of {item.supply.supply_name} from batch request #{batch_id}"
+        )
+    
+    # Update batch status and dates
+    batch_request.status = 'completed'
+    batch_request.claimed_date = timezone.now()
+    batch_request.completed_date = timezone.now()
+    batch_request.claimed_by = request.user
+    batch_request.save()
+    
+    # Create notification for the requester
+    Notification.objects.create(
+        user=batch_request.user,
+        message=f"Your supply request #{batch_request.id} has been completed and items have been claimed.",
+        remarks=f"Total items claimed: {len(claimed_items)}"
+    )
+    
+    # Log batch completion
+    ActivityLog.log_activity(
+        user=request.user,
+        action='complete',
+        model_name='SupplyRequestBatch',
+        object_repr=f"Batch #{batch_id}",
+        description=f"Completed batch request #{batch_id} with {len(claimed_items)} items claimed"
+    )
+    
+    return redirect_with_tab(request, 'user_supply_requests')
+
+
+@permission_required('app.view_admin_module') 
+@login_required
+@require_POST
+def claim_individual_item(request, batch_id, item_id):
+    """
+    Handle claiming of an individual approved item.
+    This will deduct stock and mark the specific item as completed.
+    """
+    batch_request = get_object_or_404(SupplyRequestBatch, id=batch_id)
+    item = get_object_or_404(SupplyRequestItem, id=item_id, batch_request=batch_request)
+    
+    # Only allow claiming if item is approved and not yet claimed
+    if item.status != 'approved' or item.claimed_date is not None:
+        messages.error(request, 'This item is not available for claiming.')
+        return redirect('batch_request_detail', batch_id=batch_id)
+    
+    # Check stock availability
+    available_quantity = 0
+    if hasattr(item.supply, 'quantity_info') and item.supply.quantity_info:
+        available_quantity = item.supply.quantity_info.current_quantity or 0
+    
+    # Handle case where approved_quantity might be None (fallback to requested quantity)
+    approved_qty = item.approved_quantity or item.quantity or 0
+    
+    if available_quantity < approved_qty:
+        messages.error(request, f"Insufficient stock for {item.supply.supply_name}. Available: {available_quantity}, needed: {approved_qty}")
+        return redirect('batch_request_detail', batch_id=batch_id)
+    
+    # Deduct from stock
+    if hasattr(item.supply, 'quantity_info') and item.supply.quantity_info:
+        old_qty = item.supply.quantity_info.current_quantity or 0
+        new_qty = max(0, old_qty - approved_qty)
+        item.supply.quantity_info.current_quantity = new_qty
+        
+        # Also release the reserved quantity
+        item.supply.quantity_info.reserved_quantity = max(0, item.supply.quantity_info.reserved_quantity - approved_qty)
+        
+        # Create SupplyHistory entry for quantity deduction
+        requester_name = batch_request.user.get_full_name() if batch_request.user.get_full_name() else batch_request.user.username
+        SupplyHistory.objects.create(
+            supply=item.supply,
+            user=request.user,  # The admin/staff who processed the claim
+            action='quantity_update',
+            field_name='current_quantity',
+            old_value=str(old_qty),
+            new_value=str(new_qty),
+            remarks=f"Supply request by {requester_name} (Batch #{batch_id})"
+        )
+        
+        # Save with skip_history to avoid duplicate entry
+        item.supply.quantity_info.save(skip_history=True)
+    
+    # Update PPMP released quantity NOW (during claiming, not approval)
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    # Handle multi-year allocations
+    if item.ppmp_allocations:
+        logger.info(f"Updating PPMP released quantities for multi-year allocations: {item.ppmp_allocations}")
+        for allocation in item.ppmp_allocations:
+            alloc_ppmp_item_id = allocation.get('ppmp_item_id')
+            alloc_quantity = allocation.get('quantity', 0)
+            alloc_year = allocation.get('year')
+            
+            if alloc_ppmp_item_id and alloc_quantity > 0:
+                try:
+                    from ..models import PPMPItem
+                    ppmp_item = PPMPItem.objects.get(id=alloc_ppmp_item_id)
+                    old_released = ppmp_item.released
+                    ppmp_item.released += alloc_quantity
+                    ppmp_item.save()
+                    logger.info(f"PPMP item {alloc_ppmp_item_id} (year {alloc_year}) released: {old_released} → {ppmp_item.released}")
+                    
+                    # Log activity
+                    ActivityLog.log_activity(
+                        user=request.user,
+                        action='release',
+                        model_name='PPMPItem',
+                        object_repr=f"PPMP {alloc_year} - {ppmp_item.unit_measure}",
+                        description=f"Released {alloc_quantity} units of {item.supply.supply_name} from PPMP {alloc_year}. New released count: {ppmp_item.released}/{ppmp_item.quantity}"
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to update PPMP item {alloc_ppmp_item_id}: {str(e)}")
+    
+    # Handle single-year selection
+    elif item.ppmp_item:
+        logger.info(f"Updating PPMP released quantity for single-year selection: PPMP item {item.ppmp_item.id}")
+        try:
+            old_released = item.ppmp_item.released
+            item.ppmp_item.released += approved_qty
+            item.ppmp_item.save()
+            logger.info(f"PPMP item {item.ppmp_item.id} (year {item.ppmp_item.ppmp.year}) released: {old_released} → {item.ppmp_item.released}")
+            
+            # Log activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='release',
+                model_name='PPMPItem',
+                object_repr=f"PPMP {item.ppmp_item.ppmp.year} - {item.ppmp_item.unit_measure}",
+                description=f"Released {approved_qty} units of {item.supply.supply_name} from PPMP {item.ppmp_item.ppmp.year}. New released count: {item.ppmp_item.released}/{item.ppmp_item.quantity}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to update PPMP item {item.ppmp_item.id}: {str(e)}")
+    
+    # Legacy path: No PPMP allocation was selected during approval
+    else:
+        if hasattr(batch_request.user, 'userprofile') and batch_request.user.userprofile.department:
+            from ..utils import check_ppmp_match
+            from ..models import PPMPItem
+            match_result = check_ppmp_match(
+                supply_name=item.supply.supply_name,
+                department=batch_request.user.userprofile.department,
+                year=batch_request.request_date.year
+            )
+            if match_result['match_found'] and match_result['matched_items']:
+                # Update the first matching PPMP item's released quantity
+                ppmp_item = match_result['matched_items'][0]
+                ppmp_item.released += approved_qty
+                ppmp_item.save()
+                logger.info(f"Legacy PPMP update: PPMP item {ppmp_item.id} released quantity updated")
+    
+    # Update the approved_quantity if it was None
+    if item.approved_quantity is None:
+        item.approved_quantity = item.quantity
+    
+    # Mark item as completed and claimed
+    item.status = 'completed'
+    item.claimed_date = timezone.now()
+    item.save()
+    
+    # Check if all approved items in the batch are now completed
+    remaining_approved_items = batch_request.items.filter(status='approved', claimed_date__isnull=True)
+    if not remaining_approved_items.exists():
+        # All approved items have been claimed, mark batch as completed
+        batch_request.status = 'completed'
+        batch_request.completed_date = timezone.now()
+        if not batch_request.claimed_date:
+            batch_request.claimed_date = timezone.now()
+        if not batch_request.claimed_by:
+            batch_request.claimed_by = request.user
+        batch_request.save()
+        
+        # Notify user
+        Notification.objects.create(
+            user=batch_request.user,
+            message=f"Your supply request #{batch_request.id} has been completed.",
+            remarks="All approved items have been claimed."
+        )
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='claim',
+        model_name='SupplyRequestItem',
+        object_repr=f"Batch #{batch_id} - {item.supply.supply_name}",
+        description=f"Claimed {item.approved_quantity or item.quantity} units of {item.supply.supply_name} from batch request #{batch_id}"
+    )
+    
+    return redirect('batch_request_detail', batch_id=batch_id)
+
+
+# Batch Borrow Request Management Views
+@permission_required('app.view_admin_module')
+@login_required
+def borrow_batch_request_detail(request, batch_id):
+    """View detailed information about a batch borrow request with individual item actions"""
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        item_id = request.POST.get('item_id')
+        remarks = request.POST.get('remarks', '').strip()
+        
+        # Handle void action for for_claiming requests
+        if action == 'void_request' and batch_request.status == 'for_claiming':
+            # Check permission
+            from ..permissions import has_admin_permission
+            if not has_admin_permission(request.user, 'void_request'):
+                messages.error(request, 'You do not have permission to void requests.')
+                return redirect('borrow_batch_request_detail', batch_id=batch_id)
+            
+            # Validate that remarks is provided
+            if not remarks:
+                messages.error(request, 'Please provide a reason for voiding this borrow request.')
+                return redirect('borrow_batch_request_detail', batch_id=batch_id)
+            
+            # Release reserved quantities from approved items
+            approved_items = batch_request.items.filter(status='approved')
+            for item in approved_items:
+                if item.approved_quantity:
+                    # Release the reserved quantity
+                    item.property.reserved_quantity = max(0, item.property.reserved_quantity - item.approved_quantity)
+                    item.property.save()
+            
+            # Update ALL items to voided status (not just approved ones)
+            batch_request.items.all().update(status='voided')
+            
+            # Change batch status to voided
+            batch_request.status = 'voided'
+            batch_request.remarks = remarks
+            batch_request.save()
+            
+            # Create notification for user
+            Notification.objects.create(
+                user=batch_request.user,
+                message=f"Your batch borrow request #{batch_request.id} has been voided by admin.",
+                remarks=remarks
+            )
+            
+            # Send email notification to the requester
+            if batch_request.user.email:
+                from django.core.mail import send_mail
+                from django.conf import settings
+                
+                subject = f'Borrow Request #{batch_request.id} - Voided'
+                message = f"""Dear {batch_request.user.get_full_name() or batch_request.user.username},
+
+Your borrow request (Batch #{batch_request.id}) has been voided by the administrator.
+
+Reason for voiding:
+{remarks}
+
+All reserved quantities have been released back to the inventory.
+
+If you have any questions, please contact the administrator.
+
+Best regards,
+Resource Hive Management System
+"""
+                try:
+                    send_mail(
+                        subject,
+                        message,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [batch_request.user.email],
+                        fail_silently=False,
+                    )
+                except Exception as e:
+                    # Log the error but don't fail the request
+                    import logging
+                    logger = logging.getLogger(__name__)
+                    logger.error(f"Failed to send void notification email: {str(e)}")
+            
+            # Log activity
+            ActivityLog.log_activity(
+                user=request.user,
+                action='update',
+                model_name='BorrowRequestBatch',
+                object_repr=f"Batch Borrow Request #{batch_request.id}",
+                description=f"Voided for_claiming request, released reserved quantities. Reason: {remarks[:100]}"
+            )
+            
+            messages.success(request, 'Borrow request voided successfully. Reserved quantities have been released and the requester has been notified.')
+            return redirect('borrow_batch_request_detail', batch_id=batch_id)
+        
+        if item_id:
+            item = get_object_or_404(BorrowRequestItem, id=item_id, batch_request=batch_request)
+            
+            if action == 'approve':
+                # Check availability before approving
+                available_quantity = item.property.quantity or 0
+                approved_quantity = int(request.POST.get('approved_quantity', item.quantity))
+                
+                if approved_quantity > available_quantity:
+                    messages.error(request, f'Only {available_quantity} units of {item.property.property_name} are available.')
+                    return redirect('borrow_batch_request_detail', batch_id=batch_id)
+                
+                item.status = 'approved'
+                item.approved_quantity = approved_quantity
+                if remarks:
+                    item.remarks = remarks
+                item.save()
+                
+                # Reserve the approved quantity
+                item.property.reserved_quantity += approved_quantity
+                item.property.save()
+                
+                # Create notification
+                Notification.objects.create(
+                    user=batch_request.user,
+                    message=f"Item '{item.property.property_name}' in your batch borrow request #{batch_request.id} has been approved for {approved_quantity} units.",
+                    remarks=remarks
+                )
+                
+                messages.success(request, f'Item "{item.property.property_name}" approved successfully.')
+                
+            elif action == 'reject':
+                # If item was previously approved, release the reserved quantity
+                if item.status == 'approved' and item.approved_quantity:
+                    item.property.reserved_quantity = max(0, item.property.reserved_quantity - item.approved_quantity)
+                    item.property.save()
+                
+                item.status = 'rejected'
+                if remarks:
+                    item.remarks = remarks
+                item.save()
+                
+                # Create notification
+                Notification.objects.create(
+                    user=batch_request.user,
+                    message=f"Item '{item.property.property_name}' in your batch borrow request #{batch_request.id} has been rejected.",
+                    remarks=remarks
+                )
+                
+                messages.success(request, f'Item "{item.property.property_name}" rejected successfully.')
+            
+            # Update batch status based on individual item statuses
+            total_items = batch_request.items.count()
+            approved_items = batch_request.items.filter(status='approved').count()
+            rejected_items = batch_request.items.filter(status='rejected').count()
+            pending_items = batch_request.items.filter(status='pending').count()
+            processed_items = approved_items + rejected_items
+            
+            if processed_items == total_items:
+                # All items have been processed (approved or rejected)
+                if approved_items > 0:
+                    # At least some items were approved
+                    batch_request.status = 'for_claiming'
+                    if approved_items == total_items:
+                        batch_request.approved_date = timezone.now()
+                else:
+                    # All items were rejected
+                    batch_request.status = 'rejected'
+            elif approved_items > 0:
+                # Some approved, some still pending
+                batch_request.status = 'partially_approved'
+            else:
+                # No items approved yet (either all pending or all rejected)
+                if rejected_items > 0 and pending_items > 0:
+                    # Some rejected, some pending
+                    batch_request.status = 'pending'
+                else:
+                    # All pending or all rejected
+                    batch_request.status = 'pending' if pending_items > 0 else 'rejected'
+            
+            batch_request.save()
+            
+            # Send borrow batch completion email ONLY if all items are now processed
+            if processed_items == total_items:
+                # All items have been processed, send completion email
+                from ..utils import send_borrow_batch_request_completion_email
+                approved_items_qs = batch_request.items.filter(status='approved')
+                rejected_items_qs = batch_request.items.filter(status='rejected')
+                send_borrow_batch_request_completion_email(batch_request, approved_items_qs, rejected_items_qs)
+        
+        return redirect('borrow_batch_request_detail', batch_id=batch_id)
+    
+    from ..permissions import has_admin_permission
+    context = {
+        'batch': batch_request,
+        'items': batch_request.items.all().order_by('property__property_name'),
+        'can_void_request': has_admin_permission(request.user, 'void_request'),
+    }
+    
+    return render(request, 'app/borrow_batch_request_detail.html', context)
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+def claim_borrow_batch_items(request, batch_id):
+    """
+    Handle claiming of all approved items in a batch borrow request.
+    This will deduct stock and mark items as active.
+    Returns JSON response for AJAX calls from list view.
+    """
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    
+    # Check if this is an AJAX request
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
+    # Only allow claiming if batch is in for_claiming status
+    if batch_request.status != 'for_claiming':
+        error_msg = 'This request is not available for claiming.'
+        if is_ajax:
+            return JsonResponse({'success': False, 'message': error_msg})
+        messages.error(request, error_msg)
+        return redirect_with_tab(request, 'user_borrow_requests')
+    
+    # Get all approved items that haven't been claimed yet
+    approved_items = batch_request.items.filter(status='approved', claimed_date__isnull=True)
+    
+    if not approved_items.exists():
+        error_msg = 'No approved items available for claiming.'
+        if is_ajax:
+            return JsonResponse({'success': False, 'message': error_msg})
+        messages.error(request, error_msg)
+        return redirect_with_tab(request, 'user_borrow_requests')
+    
+    # Check stock availability for all items before processing
+    insufficient_stock_items = []
+    for item in approved_items:
+        available_quantity = item.property.quantity or 0
+        approved_qty = item.approved_quantity or item.quantity or 0
+        
+        if available_quantity < approved_qty:
+            insufficient_stock_items.append(f"{item.property.property_name} (need: {approved_qty}, available: {available_quantity})")
+    
+    if insufficient_stock_items:
+        error_msg = f"Insufficient stock for: {', '.join(insufficient_stock_items)}"
+        if is_ajax:
+            return JsonResponse({'success': False, 'message': error_msg})
+        messages.error(request, error_msg)
+        return redirect_with_tab(request, 'user_borrow_requests')
+    
+    # Process all approved items
+    claimed_items = []
+    
+    for item in approved_items:
+        approved_qty = item.approved_quantity or item.quantity or 0
+        old_quantity = item.property.quantity
+        
+        # Deduct from property quantity
+        item.property.quantity -= approved_qty
+        item.property.save()
+        
+        # Create PropertyHistory entry for deduction with responsible person and reason
+        PropertyHistory.objects.create(
+            property=item.property,
+            user=request.user,
+            action='quantity_update',
+            field_name='quantity',
+            old_value=str(old_quantity),
+            new_value=str(item.property.quantity),
+            remarks=f"Deducted {approved_qty} units for borrow request. Borrower: {batch_request.user.get_full_name() or batch_request.user.username}. Return date: {batch_request.latest_return_date}. Purpose: {batch_request.purpose[:100]}"
+        )
+        
+        # Update the approved_quantity if it was None
+        if item.approved_quantity is None:
+            item.approved_quantity = item.quantity
+        
+        # Mark item as active and claimed
+        item.status = 'active'
+        item.claimed_date = timezone.now()
+        item.save()
+        
+        claimed_items.append(item)
+        
+        # Log activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='claim',
+            model_name='BorrowRequestItem',
+            object_repr=f"Batch #{batch_id} - {item.property.property_name}",
+            description=f"Claimed {approved_qty} units of {item.property.property_name} from batch borrow request #{batch_id}"
+        )
+    
+    # Update batch status and dates
+    batch_request.status = 'active'
+    batch_request.claimed_date = timezone.now()
+    batch_request.claimed_by = request.user
+    batch_request.save()
+    
+    # Create notification for the requester
+    Notification.objects.create(
+        user=batch_request.user,
+        message=f"Your borrow request #{batch_request.id} is now active and items have been claimed.",
+        remarks=f"Total items claimed: {len(claimed_items)}. Please return by: {batch_request.latest_return_date}"
+    )
+    
+    # Log batch activation
+    ActivityLog.log_activity(
+        user=request.user,
+        action='activate',
+        model_name='BorrowRequestBatch',
+        object_repr=f"Batch #{batch_id}",
+        description=f"Activated batch borrow request #{batch_id} with {len(claimed_items)} items claimed"
+    )
+    
+    success_msg = f'Successfully claimed {len(claimed_items)} items.'
+    
+    # Return JSON response for AJAX, or redirect for normal form submission
+    if is_ajax:
+        return JsonResponse({'success': True, 'message': success_msg})
+    
+    messages.success(request, success_msg)
+    return redirect_with_tab(request, 'user_borrow_requests')
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+def return_borrow_batch_items(request, batch_id):
+    """
+    Handle returning of all active items in a batch borrow request.
+    This will increase stock and mark items as returned.
+    Returns JSON response for AJAX calls from list view.
+    """
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    
+    # Check if this is an AJAX request
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
+    # Only allow returning if batch is in active or overdue status
+    if batch_request.status not in ['active', 'overdue']:
+        error_msg = 'This request is not available for returning.'
+        if is_ajax:
+            return JsonResponse({'success': False, 'message': error_msg})
+        messages.error(request, error_msg)
+        return redirect_with_tab(request, 'user_borrow_requests')
+    
+    # Get all active items
+    active_items = batch_request.items.filter(status__in=['active', 'overdue'])
+    
+    if not active_items.exists():
+        error_msg = 'No active items available for returning.'
+        if is_ajax:
+            return JsonResponse({'success': False, 'message': error_msg})
+        messages.error(request, error_msg)
+        return redirect_with_tab(request, 'user_borrow_requests')
+    
+    # Process all active items
+    returned_items = []
+    
+    for item in active_items:
+        approved_qty = item.approved_quantity or item.quantity or 0
+        old_quantity = item.property.quantity
+        
+        # Add back to property quantity
+        item.property.quantity += approved_qty
+        item.property.save()
+        
+        # Create PropertyHistory entry for return with responsible person
+        PropertyHistory.objects.create(
+            property=item.property,
+            user=request.user,
+            action='quantity_update',
+            field_name='quantity',
+            old_value=str(old_quantity),
+            new_value=str(item.property.quantity),
+            remarks=f"Returned {approved_qty} units from borrow. Borrower: {batch_request.user.get_full_name() or batch_request.user.username}. Processed by: {request.user.get_full_name() or request.user.username}"
+        )
+        
+        # Mark item as returned
+        item.status = 'returned'
+        item.actual_return_date = timezone.now().date()
+        item.save()
+        
+        returned_items.append(item)
+        
+        # Log activity
+        ActivityLog.log_activity(
+            user=request.user,
+            action='return',
+            model_name='BorrowRequestItem',
+            object_repr=f"Batch #{batch_id} - {item.property.property_name}",
+            description=f"Returned {approved_qty} units of {item.property.property_name} from batch borrow request #{batch_id}"
+        )
+    
+    # Update batch status and dates
+    batch_request.status = 'returned'
+    batch_request.returned_date = timezone.now()
+    batch_request.completed_date = timezone.now()
+    batch_request.save()
+    
+    # If this borrow batch was created from a reservation, update the reservation status
+    source_reservations = batch_request.source_reservation_batch.all()
+    if source_reservations.exists():
+        for source_reservation in source_reservations:
+            # Mark the reservation items as completed
+            source_reservation.items.filter(status='active').update(status='completed')
+            # Update the reservation batch status to completed if all items are done
+            if not source_reservation.items.filter(status__in=['pending', 'approved']).exists():
+                source_reservation.status = 'completed'
+                source_reservation.save()
+    
+    # Create notification for the requester
+    Notification.objects.create(
+        user=batch_request.user,
+        message=f"Your borrow request #{batch_request.id} has been marked as returned.",
+        remarks="Thank you for returning all items."
+    )
+    
+    # Log batch completion
+    ActivityLog.log_activity(
+        user=request.user,
+        action='return',
+        model_name='BorrowRequestBatch',
+        object_repr=f"Batch #{batch_id}",
+        description=f"Completed batch borrow request #{batch_id} with {len(returned_items)} items returned"
+    )
+    
+    success_msg = f'Successfully returned {len(returned_items)} items.'
+    
+    # Return JSON response for AJAX, or redirect for normal form submission
+    if is_ajax:
+        return JsonResponse({'success': True, 'message': success_msg})
+    
+    messages.success(request, success_msg)
+    return redirect_with_tab(request, 'user_borrow_requests')
+
+
+class UserBorrowRequestBatchListView(LoginRequiredMixin, ListView):
+    """View for displaying batch borrow requests - shows all for admin, user's own for regular users"""
+    model = BorrowRequestBatch
+    template_name = 'app/borrow_batch.html'
+    context_object_name = 'batch_requests'
+    paginate_by = 10
+
+    def get_queryset(self):
+        # Check for overdue batches, near-overdue items, and expired items before getting the queryset
+        BorrowRequestBatch.check_overdue_batches()
+        BorrowRequestBatch.check_near_overdue_items()
+        BorrowRequestBatch.check_expired_batches()
+        
+        queryset = BorrowRequestBatch.objects.with_aggregates() \
+            .select_related('user', 'user__userprofile', 'claimed_by') \
+            .prefetch_related('items__property') \
+            .order_by('request_date')
+        
+        # If user has admin permissions, show all requests
+        # If user is regular user, show only their requests
+        if self.request.user.has_perm('app.view_admin_module'):
+            # Admin users see all requests
+            return queryset
+        else:
+            # Regular users see only their own requests
+            return queryset.filter(user=self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        
+        # Get the current tab from request
+        current_tab = self.request.GET.get('tab', 'pending')
+        
+        # Get search and filter parameters
+        search_query = self.request.GET.get('search', '').strip()
+        department_filter = self.request.GET.get('department', '')
+        date_from = self.request.GET.get('date_from', '')
+        date_to = self.request.GET.get('date_to', '')
+        
+        # Base queryset with related data
+        base_queryset = BorrowRequestBatch.objects.with_aggregates().select_related('user', 'user__userprofile', 'user__userprofile__department').prefetch_related('items__property').order_by('request_date')
+        
+        # Apply user filtering based on permissions
+        if self.request.user.has_perm('app.view_admin_module'):
+            # Admin users see all requests
+            pass  # No additional filtering needed
+        else:
+            # Regular users see only their own requests
+            base_queryset = base_queryset.filter(user=self.request.user)
+        
+        # Apply search filter
+        if search_query:
+            base_queryset = base_queryset.filter(
+                Q(user__first_name__icontains=search_query) |
+                Q(user__last_name__icontains=search_query) |
+                Q(user__username__icontains=search_query) |
+                Q(purpose__icontains=search_query) |
+                Q(items__property__property_name__icontains=search_query)
+            ).distinct()
+        
+        # Apply department filter
+        if department_filter:
+            base_queryset = base_queryset.filter(user__userprofile__department__name=department_filter)
+        
+        # Apply date filters
+        if date_from:
+            try:
+                date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+                base_queryset = base_queryset.filter(request_date__date__gte=date_from_obj)
+            except ValueError:
+                pass
+        
+        if date_to:
+            try:
+                date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+                base_queryset = base_queryset.filter(request_date__date__lte=date_to_obj)
+            except ValueError:
+                pass
+        
+        # Get filtered requests by status
+        # Pending and partially_approved statuses
+        pending_requests = base_queryset.filter(Q(status='pending') | Q(status='partially_approved'))
+        for_claiming_requests = base_queryset.filter(status='for_claiming')
+        active_requests = base_queryset.filter(status='active')
+        returned_requests = base_queryset.filter(status='returned')
+        overdue_requests = base_queryset.filter(status='overdue')
+        rejected_requests = base_queryset.filter(status='rejected')
+        expired_requests = base_queryset.filter(status='expired')
+        from django.db.models import F
+        voided_requests = base_queryset.filter(status='voided').order_by(F('voided_date').desc(nulls_last=True), '-request_date')
+        
+        # Pagination for each tab
+        paginator_pending = Paginator(pending_requests, self.paginate_by)
+        paginator_for_claiming = Paginator(for_claiming_requests, self.paginate_by)
+        paginator_active = Paginator(active_requests, self.paginate_by)
+        paginator_returned = Paginator(returned_requests, self.paginate_by)
+        paginator_overdue = Paginator(overdue_requests, self.paginate_by)
+        paginator_rejected = Paginator(rejected_requests, self.paginate_by)
+        paginator_expired = Paginator(expired_requests, self.paginate_by)
+        paginator_voided = Paginator(voided_requests, self.paginate_by)
+        
+        # Get page numbers for each tab
+        page_pending = self.request.GET.get('pending_page', 1)
+        page_for_claiming = self.request.GET.get('for_claiming_page', 1)
+        page_active = self.request.GET.get('active_page', 1)
+        page_returned = self.request.GET.get('returned_page', 1)
+        page_overdue = self.request.GET.get('overdue_page', 1)
+        page_rejected = self.request.GET.get('rejected_page', 1)
+        page_expired = self.request.GET.get('expired_page', 1)
+        page_voided = self.request.GET.get('voided_page', 1)
+        
+        # Build URL parameters string for pagination
+        url_params = ''
+        if search_query:
+            url_params += f'&search={search_query}'
+        if department_filter:
+            url_params += f'&department={department_filter}'
+        if date_from:
+            url_params += f'&date_from={date_from}'
+        if date_to:
+            url_params += f'&date_to={date_to}'
+        
+        context.update({
+            'current_tab': current_tab,
+            'pending_requests': paginator_pending.get_page(page_pending),
+            'for_claiming_requests': paginator_for_claiming.get_page(page_for_claiming),
+            'active_requests': paginator_active.get_page(page_active),
+            'returned_requests': paginator_returned.get_page(page_returned),
+            'overdue_requests': paginator_overdue.get_page(page_overdue),
+            'rejected_requests': paginator_rejected.get_page(page_rejected),
+            'expired_requests': paginator_expired.get_page(page_expired),
+            'voided_requests': paginator_voided.get_page(page_voided),
+            'search_query': search_query,
+            'department_filter': department_filter,
+            'date_from': date_from,
+            'date_to': date_to,
+            'departments': Department.objects.all(),
+            'url_params': url_params,
+        })
+        
+        return context
+
+
+# Individual Borrow Item Management Views for Batch Requests
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+@admin_permission_required('approve_borrow_request')
+def approve_borrow_item(request, batch_id, item_id):
+    """Approve an individual item in a batch borrow request"""
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    item = get_object_or_404(BorrowRequestItem, id=item_id, batch_request=batch_request)
+    
+    # Get approved quantity from form
+    approved_quantity = request.POST.get('approved_quantity', item.quantity)
+    try:
+        approved_quantity = int(approved_quantity)
+        if approved_quantity <= 0 or approved_quantity > item.quantity:
+            messages.error(request, f'Invalid approved quantity. Must be between 1 and {item.quantity}.')
+            return redirect('borrow_batch_request_detail', batch_id=batch_id)
+    except (ValueError, TypeError):
+        approved_quantity = item.quantity
+    
+    # Check if enough property units are available
+    # Use available_quantity which accounts for already reserved/approved items
+    available_quantity = item.property.available_quantity
+    if approved_quantity > available_quantity:
+        messages.error(request, f'Only {available_quantity} units of {item.property.property_name} are available (including approved reservations and borrows).')
+        return redirect('borrow_batch_request_detail', batch_id=batch_id)
+    
+    # Mark item as approved
+    item.approved = True
+    item.status = 'approved'
+    item.approved_quantity = approved_quantity
+    remarks = request.POST.get('remarks', '')
+    if remarks:
+        item.remarks = remarks
+    item.save()
+    
+    # Check if all items in the batch are processed
+    total_items = batch_request.items.count()
+    approved_items = batch_request.items.filter(approved=True).count()
+    rejected_items = batch_request.items.filter(approved=False, status='rejected').count()
+    processed_items = approved_items + rejected_items
+    
+    # Update batch status
+    if processed_items == total_items:
+        # All items have been processed (approved or rejected)
+        if approved_items > 0:
+            batch_request.status = 'for_claiming'
+            batch_request.approved_date = timezone.now()
+            if not batch_request.approved_by:
+                batch_request.approved_by = request.user
+        else:
+            batch_request.status = 'rejected'
+    elif approved_items > 0:
+        batch_request.status = 'partially_approved'
+        if not batch_request.approved_by:
+            batch_request.approved_by = request.user
+    
+    batch_request.save()
+    
+    # Send borrow batch completion email ONLY if all items are now processed
+    if processed_items == total_items:
+        # All items have been processed, send completion email
+        from ..utils import send_borrow_batch_request_completion_email
+        approved_items_qs = batch_request.items.filter(status='approved')
+        rejected_items_qs = batch_request.items.filter(status='rejected')
+        send_borrow_batch_request_completion_email(batch_request, approved_items_qs, rejected_items_qs)
+    
+    # Create notification for user
+    Notification.objects.create(
+        user=batch_request.user,
+        message=f"Item '{item.property.property_name}' in your batch borrow request #{batch_request.id} has been approved for {item.approved_quantity} units.",
+        remarks=remarks
+    )
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='approve',
+        model_name='BorrowRequestItem',
+        object_repr=f"Batch #{batch_id} - {item.property.property_name}",
+        description=f"Approved {item.approved_quantity} out of {item.quantity} units of {item.property.property_name} in batch borrow request #{batch_id}"
+    )
+    
+    return redirect('borrow_batch_request_detail', batch_id=batch_id)
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+@admin_permission_required('approve_borrow_request')
+def reject_borrow_item(request, batch_id, item_id):
+    """Reject an individual item in a batch borrow request"""
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    item = get_object_or_404(BorrowRequestItem, id=item_id, batch_request=batch_request)
+    
+    # Mark item as not approved and add remarks
+    item.approved = False
+    item.status = 'rejected'
+    remarks = request.POST.get('remarks', '')
+    if remarks:
+        item.remarks = remarks
+    item.save()
+    
+    # Check if all items in the batch are processed
+    total_items = batch_request.items.count()
+    approved_items = batch_request.items.filter(approved=True).count()
+    rejected_items = batch_request.items.filter(approved=False, status='rejected').count()
+    processed_items = approved_items + rejected_items
+    
+    # Update batch status
+    if processed_items == total_items:
+        # All items have been processed (approved or rejected)
+        if approved_items > 0:
+            batch_request.status = 'for_claiming'
+            batch_request.approved_date = timezone.now()
+            if not batch_request.approved_by:
+                batch_request.approved_by = request.user
+        else:
+            batch_request.status = 'rejected'
+    elif approved_items > 0:
+        batch_request.status = 'partially_approved'
+        if not batch_request.approved_by:
+            batch_request.approved_by = request.user
+    
+    batch_request.save()
+    
+    # Send borrow batch completion email ONLY if all items are now processed
+    if processed_items == total_items:
+        # All items have been processed, send completion email
+        from ..utils import send_borrow_batch_request_completion_email
+        approved_items_qs = batch_request.items.filter(status='approved')
+        rejected_items_qs = batch_request.items.filter(status='rejected')
+        send_borrow_batch_request_completion_email(batch_request, approved_items_qs, rejected_items_qs)
+    
+    # Create notification for user
+    Notification.objects.create(
+        user=batch_request.user,
+        message=f"Item '{item.property.property_name}' in your batch borrow request #{batch_request.id} has been rejected.",
+        remarks=remarks
+    )
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='reject',
+        model_name='BorrowRequestItem',
+        object_repr=f"Batch #{batch_id} - {item.property.property_name}",
+        description=f"Rejected {item.quantity} units of {item.property.property_name} in batch borrow request #{batch_id}"
+    )
+    
+    return redirect('borrow_batch_request_detail', batch_id=batch_id)
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+def claim_individual_borrow_item(request, batch_id, item_id):
+    """
+    Handle claiming of an individual approved borrow item.
+    This will deduct stock and mark the specific item as active.
+    """
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    item = get_object_or_404(BorrowRequestItem, id=item_id, batch_request=batch_request)
+    
+    # Only allow claiming if item is approved and not yet claimed
+    if item.status != 'approved' or item.claimed_date is not None:
+        messages.error(request, 'This item is not available for claiming.')
+        return redirect('borrow_batch_request_detail', batch_id=batch_id)
+    
+    # Check stock availability
+    available_quantity = item.property.quantity or 0
+    approved_qty = item.approved_quantity or item.quantity or 0
+    
+    if available_quantity < approved_qty:
+        messages.error(request, f"Insufficient stock for {item.property.property_name}. Available: {available_quantity}, needed: {approved_qty}")
+        return redirect('borrow_batch_request_detail', batch_id=batch_id)
+    
+    # Store old quantity for history
+    old_quantity = item.property.quantity
+    
+    # Deduct from property stock
+    item.property.quantity -= approved_qty
+    item.property.save()
+    
+    # Create PropertyHistory entry for deduction with responsible person and reason
+    PropertyHistory.objects.create(
+        property=item.property,
+        user=request.user,
+        action='quantity_update',
+        field_name='quantity',
+        old_value=str(old_quantity),
+        new_value=str(item.property.quantity),
+        remarks=f"Deducted {approved_qty} units for borrow request. Borrower: {batch_request.user.get_full_name() or batch_request.user.username}. Return date: {item.return_date}. Claimed by: {request.user.get_full_name() or request.user.username}"
+    )
+    
+    # Update the approved_quantity if it was None
+    if item.approved_quantity is None:
+        item.approved_quantity = item.quantity
+    
+    # Mark item as active and claimed
+    item.status = 'active'
+    item.claimed_date = timezone.now()
+    item.save()
+    
+    # Check if all approved items in the batch are now active
+    remaining_approved_items = batch_request.items.filter(status='approved', claimed_date__isnull=True)
+    if not remaining_approved_items.exists():
+        # All approved items have been claimed, mark batch as active
+        batch_request.status = 'active'
+        if not batch_request.claimed_date:
+            batch_request.claimed_date = timezone.now()
+        if not batch_request.claimed_by:
+            batch_request.claimed_by = request.user
+        batch_request.save()
+        
+        # Notify user
+        Notification.objects.create(
+            user=batch_request.user,
+            message=f"Your borrow request #{batch_request.id} is now active.",
+            remarks="All approved items have been claimed. Please return by the specified dates."
+        )
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='claim',
+        model_name='BorrowRequestItem',
+        object_repr=f"Batch #{batch_id} - {item.property.property_name}",
+        description=f"Claimed {item.approved_quantity or item.quantity} units of {item.property.property_name} from batch borrow request #{batch_id}"
+    )
+    
+    return redirect('borrow_batch_request_detail', batch_id=batch_id)
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+def return_individual_borrow_item(request, batch_id, item_id):
+    """
+    Handle returning of an individual active borrow item.
+    This will increase stock and mark the specific item as returned.
+    """
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    item = get_object_or_404(BorrowRequestItem, id=item_id, batch_request=batch_request)
+    
+    # Only allow returning if item is active or overdue
+    if item.status not in ['active', 'overdue']:
+        messages.error(request, 'This item is not available for returning.')
+        return redirect('borrow_batch_request_detail', batch_id=batch_id)
+    
+    # Add back to property stock
+    approved_qty = item.approved_quantity or item.quantity or 0
+    old_quantity = item.property.quantity
+    item.property.quantity += approved_qty
+    item.property.save()
+    
+    # Create PropertyHistory entry for return with responsible person
+    PropertyHistory.objects.create(
+        property=item.property,
+        user=request.user,
+        action='quantity_update',
+        field_name='quantity',
+        old_value=str(old_quantity),
+        new_value=str(item.property.quantity),
+        remarks=f"Returned {approved_qty} units from borrow. Borrower: {batch_request.user.get_full_name() or batch_request.user.username}. Processed by: {request.user.get_full_name() or request.user.username}"
+    )
+    
+    # Mark item as returned
+    item.status = 'returned'
+    item.actual_return_date = timezone.now().date()
+    item.save()
+    
+    # Check if all active items in the batch are now returned
+    remaining_active_items = batch_request.items.filter(status__in=['active', 'overdue'])
+    if not remaining_active_items.exists():
+        # All items have been returned, mark batch as returned
+        batch_request.status = 'returned'
+        batch_request.returned_date = timezone.now()
+        batch_request.completed_date = timezone.now()
+        batch_request.save()
+        
+        # If this borrow batch was created from a reservation, update the reservation status
+        source_reservations = batch_request.source_reservation_batch.all()
+        if source_reservations.exists():
+            for source_reservation in source_reservations:
+                # Mark the reservation items as completed
+                source_reservation.items.filter(status='active').update(status='completed')
+                # Update the reservation batch status to completed if all items are done
+                if not source_reservation.items.filter(status__in=['pending', 'approved']).exists():
+                    source_reservation.status = 'completed'
+                    source_reservation.save()
+        
+        # Notify user
+        Notification.objects.create(
+            user=batch_request.user,
+            message=f"Your borrow request #{batch_request.id} has been completed.",
+            remarks="All items have been successfully returned."
+        )
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='return',
+        model_name='BorrowRequestItem',
+        object_repr=f"Batch #{batch_id} - {item.property.property_name}",
+        description=f"Returned {approved_qty} units of {item.property.property_name} from batch borrow request #{batch_id}"
+    )
+    
+    return redirect('borrow_batch_request_detail', batch_id=batch_id)
+
+
+@permission_required('app.view_admin_module')
+@login_required
+@require_POST
+def mark_individual_borrow_item_lost(request, batch_id, item_id):
+    """
+    Handle marking an individual active borrow item as lost.
+    This will NOT increase stock (item is lost) and mark the specific item as lost.
+    Also creates a LostItem entry for tracking in the lost items list.
+    """
+    batch_request = get_object_or_404(BorrowRequestBatch, id=batch_id)
+    item = get_object_or_404(BorrowRequestItem, id=item_id, batch_request=batch_request)
+    
+    # Only allow marking as lost if item is active or overdue
+    if item.status not in ['active', 'overdue']:
+        messages.error(request, 'This item is not available for marking as lost.')
+        return redirect('borrow_batch_request_detail', batch_id=batch_id)
+    
+    # Get remarks from the request
+    remarks = request.POST.get('remarks', '').strip()
+    
+    # Return quantity to inventory (even though item is marked as lost)
+    approved_qty = item.approved_quantity or item.quantity or 0
+    old_quantity = item.property.quantity
+    item.property.quantity += approved_qty
+    item.property.save()
+    
+    # Build description for lost item
+    lost_description = f"Item lost by {batch_request.user.get_full_name() or batch_request.user.username}. {remarks}" if remarks else f"Item lost by {batch_request.user.get_full_name() or batch_request.user.username}."
+    
+    # Create LostItem entry for tracking in the lost items management page
+    lost_item = LostItem(
+        user=batch_request.user,  # The person who lost the item
+        item=item.property,
+        description=f"Lost during borrow request #{batch_request.id}. {lost_description}",
+        last_seen_location=remarks if remarks else "Unknown",
+        last_seen_date=timezone.now().date(),
+        status='lost',
+        remarks=f"Auto-reported by admin {request.user.get_full_name() or request.user.username} when marking borrow item as lost. Quantity: {approved_qty}"
+    )
+    lost_item.save(skip_auto_status=True)  # Skip the automatic status change since we handle it here
+    
+    # Update property condition to Lost
+    item.property.condition = 'Lost'
+    item.property.availability = 'not_available'
+    item.property.save(update_fields=['condition', 'availability'])
+    
+    # Create PropertyHistory entry for lost item with quantity return
+    PropertyHistory.objects.create(
+        property=item.property,
+        user=request.user,
+        action='quantity_update',
+        field_name='quantity',
+        old_value=str(old_quantity),
+        new_value=str(item.property.quantity),
+        remarks=f"Returned {approved_qty} units from borrow (marked as LOST). Borrower: {batch_request.user.get_full_name() or batch_request.user.username}. Processed by: {request.user.get_full_name() or request.user.username}. {remarks}"
+    )
+    
+    # Mark item as lost
+    item.status = 'lost'
+    item.actual_return_date = timezone.now().date()  # Record when it was marked as lost
+    item.remarks = lost_description
+    item.save()
+    
+    # Check if all active items in the batch are now returned or lost
+    remaining_active_items = batch_request.items.filter(status__in=['active', 'overdue'])
+    if not remaining_active_items.exists():
+        # All items have been resolved (returned or lost)
+        # Mark batch as 'returned' regardless of whether items were returned or lost
+        # This ensures the batch appears in the 'returned' tab for tracking
+        batch_request.status = 'returned'
+        batch_request.returned_date = timezone.now()
+        batch_request.completed_date = timezone.now()
+        batch_request.save()
+        
+        # Notify user
+        Notification.objects.create(
+            user=batch_request.user,
+            message=f"Your borrow request #{batch_request.id} has been marked as lost.",
+            remarks=f"{item.property.property_name} was marked as lost. Please contact the admin for further action."
+        )
+    
+    # Log activity
+    ActivityLog.log_activity(
+        user=request.user,
+        action='update',
+        model_name='BorrowRequestItem',
+        object_repr=f"Batch #{batch_id} - {item.property.property_name}",
+        description=f"Marked {approved_qty} units of {item.property.property_name} as LOST from batch borrow request #{batch_id}. Lost by: {batch_request.user.get_full_name() or batch_request.user.username}"
+    )
+    
+    messages.warning(request, f'{item.property.property_name} has been marked as lost and added to the Lost Items list.')
+    return redirect('borrow_batch_request_detail', batch_id=batch_id)
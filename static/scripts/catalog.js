@@ -0,0 +1,83 @@
+// Supply and property catalog for pickers, fetched once per page from the cached snapshot
+// endpoint (see app/catalog.py) instead of being rendered into every page.
+//
+// Include with the versioned URL:   <script src=".../catalog.js" data-catalog-url="{{ catalog_url }}"></script>
+// Then either call ResourceHiveCatalog.load().then(catalog => ...), or fill a <select> declaratively:
+//
+//   <select data-catalog="supplies"                      -- "supplies" or "properties"
+//           data-catalog-label="{name} ({number})"        -- option text, {field} placeholders
+//           data-catalog-data="name quantity number"      -- copied to data-<field> attributes
+//           data-catalog-group="category"                 -- optional <optgroup> per field value
+//           data-catalog-filter="availability=available"> -- optional field=value filter
+//
+// Options are appended to whatever the select already holds (e.g. a placeholder option).
+(() => {
+    const script = document.currentScript;
+    const url = script && script.dataset.catalogUrl;
+    let pending = null;
+
+    function load() {
+        if (!pending) {
+            pending = fetch(url, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } })
+                .then(response => {
+                    if (!response.ok) throw new Error(`Catalog request failed (${response.status})`);
+                    return response.json();
+                })
+                .catch(error => {
+                    pending = null;  // Let a later call retry
+                    throw error;
+                });
+        }
+        return pending;
+    }
+
+    function format(template, entry) {
+        return template.replace(/\{(\w+)\}/g, (_, field) => entry[field] == null ? '' : entry[field]);
+    }
+
+    function fillSelect(select, catalog) {
+        const [filterField, filterValue] = (select.dataset.catalogFilter || '').split('=');
+        const dataFields = (select.dataset.catalogData || '').split(/\s+/).filter(Boolean);
+        const groupField = select.dataset.catalogGroup;
+        const groups = new Map();
+
+        catalog[select.dataset.catalog].forEach(entry => {
+            if (filterField && String(entry[filterField]) !== filterValue) return;
+            const option = new Option(format(select.dataset.catalogLabel || '{name}', entry), entry.id);
+            dataFields.forEach(field => {
+                option.dataset[field] = entry[field] == null ? '' : entry[field];
+            });
+            if (!groupField) {
+                select.appendChild(option);
+                return;
+            }
+            const label = entry[groupField] || 'Uncategorized';
+            if (!groups.has(label)) {
+                const group = document.createElement('optgroup');
+                group.label = label;
+                groups.set(label, group);
+            }
+            groups.get(label).appendChild(option);
+        });
+        [...groups.keys()].sort().forEach(label => select.appendChild(groups.get(label)));
+        select.dispatchEvent(new CustomEvent('catalog:loaded', { bubbles: true }));
+    }
+
+    function fillSelects(root = document) {
+        const selects = root.querySelectorAll('select[data-catalog]:not([data-catalog-filled])');
+        if (!selects.length) return Promise.resolve();
+        return load().then(catalog => {
+            selects.forEach(select => {
+                select.dataset.catalogFilled = '';
+                fillSelect(select, catalog);
+            });
+        });
+    }
+
+    window.ResourceHiveCatalog = { load, fillSelects };
+
+    // Fetched after the page itself has loaded, so it never delays rendering the page's own rows
+    window.addEventListener('load', () => {
+        fillSelects().catch(error => console.error('[catalog]', error));
+    });
+})();
@@ -0,0 +1,43 @@
+// Live notification and dashboard counters over server-sent events (see app/live_updates.py).
+// The first "counters" event carries every counter, later ones only those that changed.
+// Pages react to the "live:counters" document event; the notification badges are updated here.
+(() => {
+    if (!window.EventSource) return;
+
+    const BADGES = [
+        ['notificationBell', 'notificationCount'],
+        ['notificationBellDesktop', 'notificationCountDesktop'],
+    ];
+
+    function updateNotificationBadges(count) {
+        BADGES.forEach(([bellId, badgeId]) => {
+            const bell = document.getElementById(bellId);
+            if (!bell) return;
+            let badge = document.getElementById(badgeId);
+            if (count > 0) {
+                if (!badge) {
+                    badge = document.createElement('span');
+                    badge.id = badgeId;
+                    badge.className = 'notification-count';
+                    bell.appendChild(badge);
+                }
+                badge.textContent = count;
+            } else if (badge) {
+                badge.remove();
+            }
+        });
+    }
+
+    const source = new EventSource('/events/');
+
+    source.addEventListener('counters', event => {
+        const counters = JSON.parse(event.data);
+        if ('notifications' in counters) {
+            updateNotificationBadges(counters.notifications);
+        }
+        document.dispatchEvent(new CustomEvent('live:counters', { detail: counters }));
+    });
+
+    // Close cleanly when leaving so the server releases the stream at once
+    window.addEventListener('pagehide', () => source.close());
+})();
@@ -18,5 +18,8 @@ docker compose up --build -d
 echo "=== Running migrations ==="
 docker compose exec web python manage.py migrate --noinput
 
+echo "=== Rebuilding request index ==="
+docker compose exec web python manage.py rebuild_request_index
+
 echo "=== Done! ==="
 docker compose ps
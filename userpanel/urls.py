@@ -39,6 +39,7 @@ urlpatterns = [
     path('api/pending-count/', views.get_pending_count, name='get_pending_count'),
     path('api/approved-count/', views.get_approved_count, name='get_approved_count'),
     path('api/active-count/', views.get_active_count, name='get_active_count'),
+    path('api/request-counters/', views.get_request_counters_api, name='request_counters'),
     
     # Password change URLs with custom views
     path('password/change/', 
@@ -7,13 +7,24 @@ from django.contrib.auth.models import User
 from .forms import SupplyRequestForm, ReservationForm, DamageReportForm, BorrowForm, UserProfileUpdateForm
 from app.forms import LostItemForm
 from django.contrib.auth.views import LoginView, PasswordChangeView, PasswordChangeDoneView
-from app.models import UserProfile, Notification, Property, ActivityLog, Supply, SupplyRequestBatch, SupplyRequestItem, SupplyRequest, BorrowRequest, BorrowRequestBatch, BorrowRequestItem, Reservation, ReservationBatch, ReservationItem, DamageReport, PropertyCategory, SupplyQuantity, LostItem
+from app.models import UserProfile, Notification, Property, ActivityLog, Supply, SupplyRequestBatch, SupplyRequestItem, SupplyRequest, BorrowRequest, BorrowRequestBatch, BorrowRequestItem, Reservation, ReservationBatch, ReservationItem, DamageReport, PropertyCategory, SupplyQuantity, LostItem, RequestIndex
+from app.carts import (
+    BORROW, RESERVATION, SUPPLY, add_to_cart, cart_lines, clear_cart, fill_cart, get_cart, line_count,
+    remove_from_cart, submit_cart, update_line, validate_cart,
+)
+from app.catalog import catalog_url
+from app.request_index import REQUEST_ID_PREFIXES, request_number
+from app.request_counters import get_request_counters
+from app.cache_policy import cache_policy, SHORT_LIVED
+from app.stock_monitor import IN_STOCK
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.http import JsonResponse
 from django.utils import timezone
 from datetime import timedelta, datetime
+import hashlib
 import json
 from django.core.paginator import Paginator
+from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
@@ -75,66 +86,34 @@ class UserReserveView(PermissionRequiredMixin, TemplateView):
         from app.models import ReservationBatch
         ReservationBatch.check_and_update_batches()
         
-        # Get cart items from session
-        cart_items = request.session.get('reservation_cart', [])
+        # The cart's lines and their properties, in one query
+        cart = get_cart(request.user, RESERVATION, create=False)
         
-        # Get batch-level dates from session (set by request_again)
-        batch_needed_date = request.session.get('reservation_needed_date')
-        batch_return_date = request.session.get('reservation_return_date')
+        # Batch-level dates (set by request_again) fill in for lines without their own
+        batch_needed_date = cart.needed_date if cart else None
+        batch_return_date = cart.return_date if cart else None
         
-        # Convert cart items to objects with property details
-        cart_items_data = []
-        for item in cart_items:
-            try:
-                if 'property_id' not in item:
-                    continue
-                    
-                property_obj = Property.objects.get(id=item['property_id'])
-                
-                # Try to get dates from item, fallback to batch-level dates
-                needed_date_str = item.get('needed_date', batch_needed_date)
-                return_date_str = item.get('return_date', batch_return_date)
-                
-                needed_date = None
-                return_date = None
-                
-                if needed_date_str:
-                    try:
-                        needed_date = datetime.strptime(needed_date_str, '%Y-%m-%d').date()
-                    except (ValueError, TypeError):
-                        pass
-                
-                if return_date_str:
-                    try:
-                        return_date = datetime.strptime(return_date_str, '%Y-%m-%d').date()
-                    except (ValueError, TypeError):
-                        pass
-                
-                enriched_item = {
-                    'supply': property_obj,  # Using 'supply' for template consistency
-                    'quantity': item['quantity'],
-                    'needed_date': needed_date,
-                    'return_date': return_date,
-                    'purpose': item.get('purpose', '')
-                }
-                cart_items_data.append(enriched_item)
-            except (Property.DoesNotExist, KeyError, ValueError) as e:
-                continue
+        cart_items_data = [
+            {
+                'supply': line.property,  # Using 'supply' for template consistency
+                'quantity': line.quantity,
+                'needed_date': line.needed_date or batch_needed_date,
+                'return_date': line.return_date or batch_return_date,
+                'purpose': line.purpose
+            }
+            for line in cart_lines(cart)
+        ]
         
-        # Get available properties for the dropdown
-        # Show all non-archived properties - users can request any quantity
-        # Admin will validate availability during approval
-        available_supplies = Property.objects.filter(
-            is_archived=False,
-            availability='available'
-        )
+        # The item dropdown and picker list every available property; they load the cached
+        # catalog snapshot instead of rendering it into the page.
+        # Users can request any quantity - admin will validate availability during approval
         
         # Get property categories
         supply_categories = PropertyCategory.objects.all()
         
         # Get recent reservation batches
         from app.models import ReservationBatch
-        recent_batches = ReservationBatch.objects.filter(user=request.user).order_by('-request_date')[:5]
+        recent_batches = ReservationBatch.objects.with_aggregates().filter(user=request.user).order_by('-request_date')[:5]
         
         # Convert batches to dict format for template
         recent_requests_data = []
@@ -157,11 +136,11 @@ class UserReserveView(PermissionRequiredMixin, TemplateView):
         
         return render(request, self.template_name, {
             'cart_items': cart_items_data,
-            'available_supplies': available_supplies,
+            'catalog_url': catalog_url(),
             'supply_categories': supply_categories,
             'recent_requests': recent_requests_data,
-            'batch_needed_date': batch_needed_date,
-            'batch_return_date': batch_return_date,
+            'batch_needed_date': batch_needed_date.isoformat() if batch_needed_date else None,
+            'batch_return_date': batch_return_date.isoformat() if batch_return_date else None,
             'today': today
         })
 
@@ -282,43 +261,27 @@ class UserUnifiedRequestView(PermissionRequiredMixin, TemplateView):
         from app.models import SupplyCategory, PropertyCategory, PPMP, PPMPItem
         from datetime import datetime as dt
         
-        # Get supply cart items from session
-        supply_cart_items = request.session.get('supply_cart', [])
-        supply_cart_items_data = []
-        for item in supply_cart_items:
-            try:
-                if 'supply_id' not in item:
-                    continue
-                    
-                supply_obj = Supply.objects.select_related('quantity_info').get(id=item['supply_id'])
-                enriched_item = {
-                    'supply_id': supply_obj.id,
-                    'supply_name': supply_obj.supply_name,
-                    'quantity': item['quantity'],
-                    'available_quantity': supply_obj.quantity_info.current_quantity if supply_obj.quantity_info else 0,
-                    'supply': supply_obj
-                }
-                supply_cart_items_data.append(enriched_item)
-            except (Supply.DoesNotExist, KeyError, ValueError) as e:
-                continue
-        
-        # Get borrow cart items from session
-        borrow_cart_items = request.session.get('borrow_cart', [])
-        borrow_cart_items_data = []
-        for item in borrow_cart_items:
-            try:
-                property_obj = Property.objects.get(id=item['property_id'])
-                enriched_item = {
-                    'supply': property_obj,
-                    'quantity': item['quantity'],
-                    'return_date': datetime.strptime(item['return_date'], '%Y-%m-%d').date() if item['return_date'] else None,
-                    'purpose': item['purpose']
-                }
-                borrow_cart_items_data.append(enriched_item)
-            except Property.DoesNotExist:
-                continue
-            except Exception as e:
-                continue
+        # Cart lines with their supplies or properties, one query per cart
+        supply_cart_items_data = [
+            {
+                'supply_id': line.supply_id,
+                'supply_name': line.supply.supply_name,
+                'quantity': line.quantity,
+                'available_quantity': line.supply.quantity_info.current_quantity if hasattr(line.supply, 'quantity_info') else 0,
+                'supply': line.supply
+            }
+            for line in cart_lines(get_cart(request.user, SUPPLY, create=False))
+        ]
+        
+        borrow_cart_items_data = [
+            {
+                'supply': line.property,
+                'quantity': line.quantity,
+                'return_date': line.return_date,
+                'purpose': line.purpose
+            }
+            for line in cart_lines(get_cart(request.user, BORROW, create=False))
+        ]
         
         # Get user's department for PPMP filtering
         user_department = None
@@ -334,7 +297,7 @@ class UserUnifiedRequestView(PermissionRequiredMixin, TemplateView):
         # Get available supplies - includes both current_quantity and available_quantity (after reserved items)
         available_supplies = Supply.objects.filter(
             available_for_request=True,
-            quantity_info__current_quantity__gt=0
+            quantity_info__stock_status__in=IN_STOCK
         ).select_related('quantity_info', 'category')
         
         # Annotate supplies with PPMP information using the same algorithm as admin side
@@ -393,7 +356,7 @@ class UserUnifiedRequestView(PermissionRequiredMixin, TemplateView):
         borrow_categories = PropertyCategory.objects.all()
         
         # Get recent supply requests
-        recent_supply_batch_requests = SupplyRequestBatch.objects.filter(user=request.user).order_by('-request_date')[:5]
+        recent_supply_batch_requests = SupplyRequestBatch.objects.with_aggregates().filter(user=request.user).order_by('-request_date')[:5]
         recent_supply_single_requests = SupplyRequest.objects.filter(user=request.user).order_by('-request_date')[:5]
         
         supply_recent_requests_data = []
@@ -428,7 +391,7 @@ class UserUnifiedRequestView(PermissionRequiredMixin, TemplateView):
         supply_recent_requests_data = supply_recent_requests_data[:5]
         
         # Get recent borrow requests
-        recent_borrow_batch_requests = BorrowRequestBatch.objects.filter(user=request.user).order_by('-request_date')[:5]
+        recent_borrow_batch_requests = BorrowRequestBatch.objects.with_aggregates().filter(user=request.user).order_by('-request_date')[:5]
         recent_borrow_single_requests = BorrowRequest.objects.filter(user=request.user).order_by('-borrow_date')[:5]
         
         borrow_recent_requests_data = []
@@ -548,7 +511,7 @@ class UserDashboardView(LoginRequiredMixin, PermissionRequiredMixin, TemplateVie
         # Querysets ordered by date descending
         # Combine old SupplyRequest and new SupplyRequestBatch systems
         legacy_supply_requests = SupplyRequest.objects.filter(user=user).select_related('supply')
-        batch_supply_requests = SupplyRequestBatch.objects.filter(user=user)
+        batch_supply_requests = SupplyRequestBatch.objects.with_aggregates().filter(user=user)
         
         # Create a combined list for supply requests with unified structure
         combined_supply_requests = []
@@ -637,7 +600,7 @@ class UserDashboardView(LoginRequiredMixin, PermissionRequiredMixin, TemplateVie
         
         # Combine old Reservation and new ReservationBatch systems
         legacy_reservations = Reservation.objects.filter(user=user).select_related('item')
-        batch_reservations = ReservationBatch.objects.filter(user=user)
+        batch_reservations = ReservationBatch.objects.with_aggregates().filter(user=user)
         
         # Create a combined list for reservations with unified structure
         combined_reservations = []
@@ -1690,7 +1653,7 @@ def report_lost_item_user(request):
 # Borrow Cart Functionality
 @login_required
 def add_to_borrow_list(request):
-    """Add item to borrow cart session - uses batch return date"""
+    """Add item to borrow cart - uses batch return date"""
     if request.method == 'POST':
         property_id = request.POST.get('property_id')  # Changed from 'supply' to 'property_id'
         quantity = int(request.POST.get('quantity', 1))
@@ -1732,35 +1695,15 @@ def add_to_borrow_list(request):
                         'message': 'Return date cannot be in the past'
                     })
             
-            # Get or create cart in session
-            cart = request.session.get('borrow_cart', [])
-            
-            # Check if item already exists in cart
-            item_exists = False
-            for item in cart:
-                if item['property_id'] == property_id:
-                    item['quantity'] += quantity
-                    # Return date is now the same for all items (batch date)
-                    item['return_date'] = return_date
-                    item['purpose'] = purpose
-                    item_exists = True
-                    break
-            
-            if not item_exists:
-                cart.append({
-                    'property_id': property_id,
-                    'quantity': quantity,
-                    'return_date': return_date,  # All items use batch return date
-                    'purpose': purpose
-                })
-            
-            request.session['borrow_cart'] = cart
-            request.session.modified = True
+            # Adding an item already in the list adds to its quantity;
+            # return date is the same for all items (batch date)
+            cart = get_cart(request.user, BORROW)
+            add_to_cart(cart, property_obj.id, quantity, return_date=return_date or None, purpose=purpose)
             
             return JsonResponse({
                 'status': 'success',
                 'message': f'{property_obj.property_name} added to borrow list',
-                'list_count': len(cart)
+                'list_count': line_count(cart)
             })
             
         except Property.DoesNotExist:
@@ -1779,29 +1722,23 @@ def add_to_borrow_list(request):
 
 @login_required
 def remove_from_borrow_list(request):
-    """Remove item from borrow cart session"""
+    """Remove item from borrow cart"""
     if request.method == 'POST':
         property_id = request.POST.get('supply_id')
         
-        # Convert property_id to integer to handle type mismatch (session stores as int, POST sends as string)
+        cart = get_cart(request.user, BORROW)
         try:
-            property_id = int(property_id)
+            remove_from_cart(cart, property_id)
         except (ValueError, TypeError):
             return JsonResponse({
                 'status': 'error',
                 'message': 'Invalid property ID'
             })
         
-        cart = request.session.get('borrow_cart', [])
-        cart = [item for item in cart if item['property_id'] != property_id]
-        
-        request.session['borrow_cart'] = cart
-        request.session.modified = True
-        
         return JsonResponse({
             'status': 'success',
             'message': 'Item removed from borrow list',
-            'list_count': len(cart)
+            'list_count': line_count(cart)
         })
     
     return JsonResponse({'status': 'error', 'message': 'Invalid request'})
@@ -1809,7 +1746,7 @@ def remove_from_borrow_list(request):
 
 @login_required
 def update_borrow_list_item(request):
-    """Update item quantity in borrow cart session - return date is batch-wide and cannot be changed per-item"""
+    """Update item quantity in borrow cart - return date is batch-wide and cannot be changed per-item"""
     import logging
     logger = logging.getLogger(__name__)
     
@@ -1822,41 +1759,9 @@ def update_borrow_list_item(request):
         try:
             property_obj = Property.objects.get(id=property_id)
             
-            cart = request.session.get('borrow_cart', [])
-            logger.info(f"Current borrow cart before update: {cart}")
-            logger.info(f"Cart length: {len(cart)}")
-            
-            # Log all items in cart for debugging
-            for idx, item in enumerate(cart):
-                logger.info(f"  Cart item {idx}: property_id={item.get('property_id')} (type: {type(item.get('property_id'))}), quantity={item.get('quantity')}")
-            
-            # Find and update the item - only quantity, return date is batch-wide
-            updated = False
-            for item in cart:
-                # Compare as strings since cart items are stored as strings
-                if str(item['property_id']) == str(property_id):
-                    old_qty = item['quantity']
-                    item['quantity'] = quantity
-                    logger.info(f"Updated borrow item in cart: property_id={property_id}, old_qty={old_qty}, new_qty={quantity}, item={item}")
-                    updated = True
-                    break
-            
-            if not updated:
-                logger.warning(f"Item {property_id} not found in borrow cart for update. Cart items: {[item.get('property_id') for item in cart]}")
-            
-            request.session['borrow_cart'] = cart
-            request.session.modified = True
-            request.session.save()  # Explicitly save the session
-            
-            # Verify the save
-            saved_cart = request.session.get('borrow_cart', [])
-            logger.info(f"Borrow cart after update and save: {saved_cart}")
-            
-            # Double check the item was saved
-            for item in saved_cart:
-                if str(item['property_id']) == str(property_id):
-                    logger.info(f"Verified saved borrow item: property_id={property_id}, quantity={item['quantity']}")
-                    break
+            # Only the quantity changes; the return date is batch-wide
+            if not update_line(get_cart(request.user, BORROW), property_obj.id, quantity=quantity):
+                logger.warning(f"Item {property_id} not found in borrow cart for update")
             
             return JsonResponse({
                 'status': 'success',
@@ -1881,10 +1786,9 @@ def update_borrow_list_item(request):
 
 @login_required
 def clear_borrow_list(request):
-    """Clear all items from borrow cart session"""
+    """Clear all items from borrow cart"""
     if request.method == 'POST':
-        request.session['borrow_cart'] = []
-        request.session.modified = True
+        clear_cart(get_cart(request.user, BORROW))
         
         return JsonResponse({
             'status': 'success',
@@ -1898,9 +1802,10 @@ def clear_borrow_list(request):
 def submit_borrow_list_request(request):
     """Submit all items in borrow cart as a batch borrow request with single return date"""
     if request.method == 'POST':
-        cart = request.session.get('borrow_cart', [])
+        cart = get_cart(request.user, BORROW)
+        lines = cart_lines(cart)
         
-        if not cart:
+        if not lines:
             return JsonResponse({
                 'status': 'error',
                 'message': 'No items in borrow list'
@@ -1928,91 +1833,30 @@ def submit_borrow_list_request(request):
                     'message': 'Return date cannot be in the past'
                 })
             
-            # Create the batch borrow request
-            batch_request = BorrowRequestBatch.objects.create(
-                user=request.user,
-                purpose=general_purpose,
-                status='pending'
-            )
+            # Validate all items before creating the batch
+            errors = validate_cart(cart, lines)
+            if errors:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': errors[0]
+                })
             
-            # Create individual borrow request items - all with same return date
-            for item in cart:
-                try:
-                    property_obj = Property.objects.get(id=item['property_id'])
-                except Property.DoesNotExist:
-                    # Delete the batch request if a property doesn't exist
-                    batch_request.delete()
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'Property with ID {item["property_id"]} not found'
-                    })
-                
-                # Check if property is available for request
-                if property_obj.availability != 'available':
-                    batch_request.delete()
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'{property_obj.property_name} is not available for request'
-                    })
-                
-                # Check if property is archived
-                if property_obj.is_archived:
-                    batch_request.delete()
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'{property_obj.property_name} is archived and cannot be requested'
-                    })
-                
-                # Create the borrow request item using get_or_create to handle duplicates gracefully
-                try:
-                    item_obj, created = BorrowRequestItem.objects.get_or_create(
-                        batch_request=batch_request,
-                        property=property_obj,
-                        defaults={
-                            'quantity': item['quantity'],
-                            'return_date': batch_return_date_obj,  # Use batch return date for all items
-                            'status': 'pending'
-                        }
-                    )
-                    # If item already existed, update it
-                    if not created:
-                        item_obj.quantity = item['quantity']
-                        item_obj.return_date = batch_return_date_obj  # Use batch return date
-                        item_obj.save()
-                except Exception as create_error:
-                    # Delete the batch request if creating an item fails
-                    batch_request.delete()
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'Error creating borrow request item: {str(create_error)}'
-                    })
+            # Create the batch borrow request and its items - all with same return date
+            batch_request = submit_cart(cart, lines, general_purpose, return_date=batch_return_date_obj)
             
             # Log activity for the batch request
-            # Build item list for logging by fetching property names
-            logged_items = []
-            for item in cart[:3]:
-                try:
-                    property_obj = Property.objects.get(id=item['property_id'])
-                    logged_items.append(f"{property_obj.property_name} (x{item['quantity']})")
-                except Property.DoesNotExist:
-                    logged_items.append(f"Unknown Item (x{item['quantity']})")
-            
-            item_list = ", ".join(logged_items)
-            if len(cart) > 3:
-                item_list += f" and {len(cart) - 3} more items"
+            item_list = ", ".join(f"{line.property.property_name} (x{line.quantity})" for line in lines[:3])
+            if len(lines) > 3:
+                item_list += f" and {len(lines) - 3} more items"
             
             ActivityLog.log_activity(
                 user=request.user,
                 action='request',
                 model_name='BorrowRequestBatch',
                 object_repr=f"Batch #{batch_request.id}",
-                description=f"Submitted batch borrow request with {len(cart)} items (Return: {batch_return_date_obj}): {item_list}"
+                description=f"Submitted batch borrow request with {len(lines)} items (Return: {batch_return_date_obj}): {item_list}"
             )
             
-            # Clear the cart
-            request.session['borrow_cart'] = []
-            request.session.modified = True
-            
             # Return success response
             return JsonResponse({
                 'status': 'success',
@@ -2035,7 +1879,7 @@ def submit_borrow_list_request(request):
 # Reservation Cart Functionality
 @login_required
 def add_to_reservation_list(request):
-    """Add item to reservation cart session"""
+    """Add item to reservation cart"""
     if request.method == 'POST':
         property_id = request.POST.get('supply')
         quantity = int(request.POST.get('quantity', 1))
@@ -2069,41 +1913,15 @@ def add_to_reservation_list(request):
         # No quantity validation here - let users request any amount
         # Validation will happen during admin approval
         
-        # Check if item already exists in cart
-        cart = request.session.get('reservation_cart', [])
-        
-        existing_item = None
-        for i, item in enumerate(cart):
-            # Compare as strings since property_id from POST is a string
-            if str(item['property_id']) == str(property_id):
-                existing_item = i
-                break
-        
-        if existing_item is not None:
-            # Update existing item
-            cart[existing_item]['quantity'] += quantity
-            cart[existing_item]['needed_date'] = needed_date
-            cart[existing_item]['return_date'] = return_date
-            cart[existing_item]['purpose'] = purpose
-        else:
-            # Add new item
-            cart.append({
-                'property_id': property_id,
-                'property_name': property_obj.property_name,
-                'quantity': quantity,
-                'needed_date': needed_date,
-                'return_date': return_date,
-                'purpose': purpose
-            })
-        
-        # Save cart to session
-        request.session['reservation_cart'] = cart
-        request.session.modified = True
+        # Adding an item already in the list adds to its quantity and replaces its dates
+        cart = get_cart(request.user, RESERVATION)
+        add_to_cart(cart, property_obj.id, quantity,
+                    needed_date=needed_date or None, return_date=return_date or None, purpose=purpose)
         
         return JsonResponse({
             'status': 'success',
             'message': f'{property_obj.property_name} added to reservation list',
-            'cart_count': len(cart),
+            'cart_count': line_count(cart),
             'item': {
                 'property_id': property_id,
                 'property_name': property_obj.property_name,
@@ -2132,61 +1950,37 @@ def update_reservation_list_item(request):
         
         logger.info(f"Updating reservation item: property_id={property_id} (type: {type(property_id)}), new_quantity={new_quantity}")
         
-        cart = request.session.get('reservation_cart', [])
-        logger.info(f"Current reservation cart: {cart}")
+        try:
+            property_obj = Property.objects.get(id=property_id)
+        except Property.DoesNotExist:
+            logger.error(f"Property not found: {property_id}")
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Property not found'
+            })
         
-        # Convert property_id to string for comparison (since session data stores strings)
-        property_id_str = str(property_id)
+        # Check if new quantity is available
+        if new_quantity > property_obj.quantity:
+            logger.warning(f"Quantity {new_quantity} exceeds available {property_obj.quantity}")
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Only {property_obj.quantity} units available'
+            })
         
-        # Find and update the item
-        updated = False
-        for i, item in enumerate(cart):
-            # Compare as strings since session data is stored as strings
-            cart_property_id = str(item.get('property_id'))
-            logger.info(f"Comparing: {property_id_str} vs {cart_property_id}")
-            
-            if cart_property_id == property_id_str:
-                try:
-                    property_obj = Property.objects.get(id=property_id)
-                    
-                    # Check if new quantity is available
-                    if new_quantity > property_obj.quantity:
-                        logger.warning(f"Quantity {new_quantity} exceeds available {property_obj.quantity}")
-                        return JsonResponse({
-                            'status': 'error',
-                            'message': f'Only {property_obj.quantity} units available'
-                        })
-                    
-                    old_qty = cart[i]['quantity']
-                    cart[i]['quantity'] = new_quantity
-                    if needed_date:
-                        cart[i]['needed_date'] = needed_date
-                    if return_date:
-                        cart[i]['return_date'] = return_date
-                    
-                    logger.info(f"Updated reservation item: property_id={property_id}, old_qty={old_qty}, new_qty={new_quantity}")
-                    
-                    request.session['reservation_cart'] = cart
-                    request.session.modified = True
-                    request.session.save()
-                    
-                    logger.info(f"Reservation cart after update: {request.session.get('reservation_cart', [])}")
-                    
-                    updated = True
-                    return JsonResponse({
-                        'status': 'success',
-                        'message': 'Item updated successfully'
-                    })
-                    
-                except Property.DoesNotExist:
-                    logger.error(f"Property not found: {property_id}")
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': 'Property not found'
-                    })
+        fields = {'quantity': new_quantity}
+        if needed_date:
+            fields['needed_date'] = needed_date
+        if return_date:
+            fields['return_date'] = return_date
+        
+        if update_line(get_cart(request.user, RESERVATION), property_obj.id, **fields):
+            logger.info(f"Updated reservation item: property_id={property_id}, new_qty={new_quantity}")
+            return JsonResponse({
+                'status': 'success',
+                'message': 'Item updated successfully'
+            })
         
-        if not updated:
-            logger.warning(f"Item {property_id} not found in reservation cart. Cart items: {[item.get('property_id') for item in cart]}")
+        logger.warning(f"Item {property_id} not found in reservation cart")
         
         return JsonResponse({
             'status': 'error',
@@ -2202,18 +1996,19 @@ def remove_from_reservation_list(request):
     if request.method == 'POST':
         property_id = request.POST.get('property_id')
         
-        cart = request.session.get('reservation_cart', [])
-        
-        # Remove the item - compare as strings
-        cart = [item for item in cart if str(item['property_id']) != str(property_id)]
-        
-        request.session['reservation_cart'] = cart
-        request.session.modified = True
+        cart = get_cart(request.user, RESERVATION)
+        try:
+            remove_from_cart(cart, property_id)
+        except (ValueError, TypeError):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid property ID'
+            })
         
         return JsonResponse({
             'status': 'success',
             'message': 'Item removed from reservation list successfully',
-            'cart_count': len(cart)
+            'cart_count': line_count(cart)
         })
     
     return JsonResponse({'status': 'error', 'message': 'Invalid request'})
@@ -2223,8 +2018,7 @@ def remove_from_reservation_list(request):
 def clear_reservation_list(request):
     """Clear all items from reservation cart"""
     if request.method == 'POST':
-        request.session['reservation_cart'] = []
-        request.session.modified = True
+        clear_cart(get_cart(request.user, RESERVATION))
         
         return JsonResponse({
             'status': 'success',
@@ -2238,9 +2032,10 @@ def clear_reservation_list(request):
 def submit_reservation_list_request(request):
     """Submit all items in reservation cart as a batch reservation request"""
     if request.method == 'POST':
-        cart = request.session.get('reservation_cart', [])
+        cart = get_cart(request.user, RESERVATION)
+        lines = cart_lines(cart)
         
-        if not cart:
+        if not lines:
             messages.error(request, 'No items in reservation list')
             return redirect('user_reserve')
         
@@ -2276,69 +2071,33 @@ def submit_reservation_list_request(request):
                 return redirect('user_reserve')
             
             # Validate all items before creating batch
-            for item in cart:
-                property_obj = Property.objects.get(id=item['property_id'])
-                
-                # Check if property is available for request
-                if property_obj.availability != 'available':
-                    messages.error(request, f'{property_obj.property_name} is not available for request')
-                    return redirect('user_reserve')
-                
-                # Check if property is archived
-                if property_obj.is_archived:
-                    messages.error(request, f'{property_obj.property_name} is archived and cannot be requested')
-                    return redirect('user_reserve')
+            errors = validate_cart(cart, lines)
+            if errors:
+                messages.error(request, errors[0])
+                return redirect('user_reserve')
             
-            # Create the ReservationBatch
-            reservation_batch = ReservationBatch.objects.create(
-                user=request.user,
-                purpose=general_purpose if general_purpose else "Batch reservation request",
-                status='pending'
+            # Create the ReservationBatch and its items using the batch-level dates, and empty the list.
+            # The admins are notified once it commits (see notify_admins_of_new_batch()).
+            reservation_batch = submit_cart(
+                cart, lines, general_purpose if general_purpose else "Batch reservation request",
+                needed_date=batch_needed_date, return_date=batch_return_date,
             )
             
-            # Create ReservationItem for each cart item using the batch-level dates
-            created_items = []
-            for item in cart:
-                property_obj = Property.objects.get(id=item['property_id'])
-                
-                reservation_item = ReservationItem.objects.create(
-                    batch_request=reservation_batch,
-                    property=property_obj,
-                    quantity=item['quantity'],
-                    needed_date=batch_needed_date,
-                    return_date=batch_return_date,
-                    status='pending',
-                    remarks=item.get('purpose', '')
-                )
-                
-                created_items.append(reservation_item)
-            
-            # Notification is handled automatically in ReservationBatch.save()
-            # when the batch is created, so we don't need to send it manually here
-            
             # Log activity for the batch request
-            item_list = ", ".join([f"{Property.objects.get(id=item['property_id']).property_name} (x{item['quantity']})" 
-                                 for item in cart[:3]])
-            if len(cart) > 3:
-                item_list += f" and {len(cart) - 3} more items"
+            item_list = ", ".join(f"{line.property.property_name} (x{line.quantity})" for line in lines[:3])
+            if len(lines) > 3:
+                item_list += f" and {len(lines) - 3} more items"
             
             ActivityLog.log_activity(
                 user=request.user,
                 action='request',
                 model_name='ReservationBatch',
                 object_repr=f"Batch #{reservation_batch.id}",
-                description=f"Submitted batch reservation request with {len(cart)} items: {item_list}"
+                description=f"Submitted batch reservation request with {len(lines)} items: {item_list}"
             )
             
-            # Clear the cart and batch dates
-            request.session['reservation_cart'] = []
-            request.session['reservation_needed_date'] = None
-            request.session['reservation_return_date'] = None
-            request.session['reservation_purpose'] = None
-            request.session.modified = True
-            
             # Show success message and redirect
-            messages.success(request, f'Reservation request #{reservation_batch.id} submitted successfully! Your batch includes {len(created_items)} item(s).')
+            messages.success(request, f'Reservation request #{reservation_batch.id} submitted successfully! Your batch includes {len(lines)} item(s).')
             return redirect('user_reserve')
             
         except Exception as e:
@@ -2428,188 +2187,63 @@ class UserAllRequestsView(LoginRequiredMixin, PermissionRequiredMixin, TemplateV
         status_filter = self.request.GET.get('status', 'all')
         search_query = self.request.GET.get('search', '')
         
-        # Initialize combined requests list
-        all_requests = []
-        
-        # Get Supply Requests (batch and single)
-        if request_type in ['all', 'supply']:
-            # Batch supply requests
-            batch_supply_requests = SupplyRequestBatch.objects.filter(
-                user=self.request.user
-            ).select_related('user').prefetch_related('items__supply')
-            
-            for req in batch_supply_requests:
-                # Create items summary
-                items_summary = []
-                for item in req.items.all()[:3]:  # Show first 3 items
-                    items_summary.append(f"{item.supply.supply_name} (x{item.quantity})")
-                
-                if req.items.count() > 3:
-                    items_summary.append(f"and {req.items.count() - 3} more items")
-                
-                request_data = {
-                    'id': f"SB-{req.id}",
-                    'type': 'Supply Request',
-                    'item_name': ", ".join(items_summary),
-                    'quantity': req.total_quantity,
-                    'status': req.get_status_display(),
-                    'status_raw': req.status,
-                    'date': req.request_date,
-                    'purpose': req.purpose,
-                    'can_cancel': req.status == 'pending',
-                    'model_type': 'batch_supply',
-                    'real_id': req.id
-                }
-                all_requests.append(request_data)
-            
-            # Single supply requests (legacy)
-            single_supply_requests = SupplyRequest.objects.filter(
-                user=self.request.user
-            ).select_related('user', 'supply')
-            
-            for req in single_supply_requests:
-                request_data = {
-                    'id': f"S-{req.id}",
-                    'type': 'Supply Request',
-                    'item_name': req.supply.supply_name,
-                    'quantity': req.quantity,
-                    'status': req.get_status_display(),
-                    'status_raw': req.status,
-                    'date': req.request_date,
-                    'purpose': req.purpose,
-                    'can_cancel': req.status == 'pending',
-                    'model_type': 'supply',
-                    'real_id': req.id
-                }
-                all_requests.append(request_data)
-        
-        # Get Borrow Requests (batch and single)
-        if request_type in ['all', 'borrow']:
-            # Batch borrow requests
-            batch_borrow_requests = BorrowRequestBatch.objects.filter(
-                user=self.request.user
-            ).select_related('user').prefetch_related('items__property')
-            
-            for req in batch_borrow_requests:
-                # Create items summary
-                items_summary = []
-                for item in req.items.all()[:3]:  # Show first 3 items
-                    items_summary.append(f"{item.property.property_name} (x{item.quantity})")
-                
-                if req.items.count() > 3:
-                    items_summary.append(f"and {req.items.count() - 3} more items")
-                
-                request_data = {
-                    'id': f"BB-{req.id}",
-                    'type': 'Borrow Request',
-                    'item_name': ", ".join(items_summary),
-                    'quantity': req.total_quantity,
-                    'status': req.get_status_display(),
-                    'status_raw': req.status,
-                    'date': req.request_date,
-                    'purpose': req.purpose,
-                    'return_date': req.latest_return_date,
-                    'can_cancel': req.status == 'pending',
-                    'model_type': 'batch_borrow',
-                    'real_id': req.id
-                }
-                all_requests.append(request_data)
-            
-            # Single borrow requests (legacy)
-            single_borrow_requests = BorrowRequest.objects.filter(
-                user=self.request.user
-            ).select_related('user', 'property')
-            
-            for req in single_borrow_requests:
-                request_data = {
-                    'id': f"B-{req.id}",
-                    'type': 'Borrow Request',
-                    'item_name': req.property.property_name,
-                    'quantity': req.quantity,
-                    'status': req.get_status_display(),
-                    'status_raw': req.status,
-                    'date': req.borrow_date,
-                    'purpose': req.purpose,
-                    'return_date': req.return_date,
-                    'can_cancel': req.status == 'pending',
-                    'model_type': 'borrow',
-                    'real_id': req.id
-                }
-                all_requests.append(request_data)
-        
-        # Get Reservations (batch)
-        if request_type in ['all', 'reservation']:
-            reservation_batches = ReservationBatch.objects.filter(
-                user=self.request.user
-            ).select_related('user').prefetch_related('items__property')
-            
-            for req in reservation_batches:
-                # Create items summary
-                items_summary = []
-                for item in req.items.all()[:3]:  # Show first 3 items
-                    items_summary.append(f"{item.property.property_name} (x{item.quantity})")
-                
-                if req.items.count() > 3:
-                    items_summary.append(f"and {req.items.count() - 3} more items")
-                
-                request_data = {
-                    'id': f"RB-{req.id}",
-                    'type': 'Reservation',
-                    'item_name': ", ".join(items_summary) if items_summary else "No items",
-                    'quantity': req.total_quantity,
-                    'status': req.get_status_display(),
-                    'status_raw': req.status,
-                    'date': req.request_date,
-                    'purpose': req.purpose,
-                    'needed_date': req.earliest_needed_date,
-                    'return_date': req.latest_return_date,
-                    'can_cancel': req.status == 'pending',
-                    'model_type': 'reservation',
-                    'real_id': req.id
-                }
-                all_requests.append(request_data)
-        
+        # One indexed query over the RequestIndex projection instead of loading every
+        # request and batch of the user and merging them in Python
+        kinds_by_type = {
+            'supply': ['batch_supply', 'supply'],
+            'borrow': ['batch_borrow', 'borrow'],
+            'reservation': ['reservation'],
+        }
+        kinds = kinds_by_type.get(request_type, sum(kinds_by_type.values(), []))
+        requests_qs = RequestIndex.objects.filter(user=self.request.user, kind__in=kinds)
+
+        # Get unique statuses for filter dropdown
+        unique_statuses = sorted(set(requests_qs.values_list('status', 'status_display').distinct()))
+
         # Apply status filter
         if status_filter != 'all':
-            all_requests = [req for req in all_requests if req['status_raw'] == status_filter]
-        
+            requests_qs = requests_qs.filter(status=status_filter)
+
         # Apply search filter
         if search_query:
             search_query = search_query.lower()
-            all_requests = [
-                req for req in all_requests
-                if (search_query in req['item_name'].lower() or 
-                    search_query in req['purpose'].lower() or
-                    search_query in req['type'].lower() or
-                    search_query in req['id'].lower() or
-                    search_query in req['status'].lower() or
-                    search_query in str(req['quantity']).lower())
-            ]
-        
+            search_q = (
+                Q(item_summary__icontains=search_query) |
+                Q(purpose__icontains=search_query) |
+                Q(status_display__icontains=search_query) |
+                Q(kind__in=[kind for kind, label in RequestIndex.KIND_CHOICES if search_query in label.lower()])
+            )
+            if search_query.isdigit():
+                search_q |= Q(total_quantity=int(search_query))
+            # Request numbers such as "SB-12" or "12"
+            prefix, _, number = search_query.rpartition('-')
+            if number.isdigit():
+                number_kinds = [kind for kind, kind_prefix in REQUEST_ID_PREFIXES.items()
+                                if not prefix or kind_prefix.lower() == prefix]
+                search_q |= Q(source_id=int(number), kind__in=number_kinds)
+            requests_qs = requests_qs.filter(search_q)
+
         # Sort by date (most recent first)
-        all_requests.sort(key=lambda x: x['date'], reverse=True)
-        
-        # Get unique statuses for filter dropdown
-        unique_statuses = set()
-        for req in all_requests:
-            unique_statuses.add((req['status_raw'], req['status']))
-        unique_statuses = sorted(list(unique_statuses))
+        requests_qs = requests_qs.order_by('-request_date', '-id')
         
         # Pagination - use 6 items per page on mobile, 10 on desktop
         user_agent = self.request.META.get('HTTP_USER_AGENT', '').lower()
         is_mobile = any(device in user_agent for device in ['mobile', 'android', 'iphone', 'ipad', 'windows phone'])
         
         items_per_page = 6 if is_mobile else 10
-        paginator = Paginator(all_requests, items_per_page)
+        paginator = Paginator(requests_qs, items_per_page)
         page_number = self.request.GET.get('page', 1)
         
         try:
             page_obj = paginator.get_page(page_number)
         except:
             page_obj = paginator.get_page(1)
+
+        # Only the rows on this page are turned into template dicts
+        all_requests = [self._request_row(entry) for entry in page_obj.object_list]
         
         context.update({
-            'all_requests': page_obj.object_list,
+            'all_requests': all_requests,
             'page_obj': page_obj,
             'paginator': paginator,
             'is_paginated': paginator.num_pages > 1,
@@ -2617,12 +2251,31 @@ class UserAllRequestsView(LoginRequiredMixin, PermissionRequiredMixin, TemplateV
             'status_filter': status_filter,
             'search_query': search_query,
             'unique_statuses': unique_statuses,
-            'total_requests': len(all_requests),
+            'total_requests': paginator.count,
             'is_mobile': is_mobile
         })
         
         return context
 
+    @staticmethod
+    def _request_row(entry):
+        """Shape a RequestIndex row like the dicts user_all_requests.html expects."""
+        return {
+            'id': request_number(entry.kind, entry.source_id),
+            'type': entry.get_kind_display(),
+            'item_name': entry.item_summary,
+            'quantity': entry.total_quantity,
+            'status': entry.status_display,
+            'status_raw': entry.status,
+            'date': entry.request_date,
+            'purpose': entry.purpose,
+            'needed_date': entry.needed_date,
+            'return_date': entry.return_date,
+            'can_cancel': entry.status == 'pending',
+            'model_type': entry.kind,
+            'real_id': entry.source_id,
+        }
+
 
 @login_required
 def request_detail(request, type, request_id):
@@ -2708,92 +2361,65 @@ def request_again(request):
         if request_type == 'supply':
             original_request = get_object_or_404(SupplyRequest, id=request_id, user=request.user)
             # Clear existing cart and add this item
-            cart_item = {
-                'supply_id': original_request.supply.id,
-                'quantity': original_request.quantity
-            }
-            request.session['supply_cart'] = [cart_item]
+            fill_cart(get_cart(request.user, SUPPLY), [
+                {'item_id': original_request.supply_id, 'quantity': original_request.quantity}
+            ])
             request.session['active_request_tab'] = 'supply'
-            request.session.modified = True
-            request.session.save()  # Explicitly save the session
             messages.success(request, f'Added {original_request.supply.supply_name} to your cart.')
             return redirect('user_unified_request')
             
         elif request_type == 'batch_supply':
             original_request = get_object_or_404(SupplyRequestBatch, id=request_id, user=request.user)
             # Clear existing cart and add all items from the batch
-            cart_items = []
-            for item in original_request.items.all():
-                cart_items.append({
-                    'supply_id': item.supply.id,
-                    'quantity': item.quantity
-                })
-            request.session['supply_cart'] = cart_items
+            cart_items = [
+                {'item_id': item.supply_id, 'quantity': item.quantity}
+                for item in original_request.items.all()
+            ]
+            fill_cart(get_cart(request.user, SUPPLY), cart_items)
             request.session['active_request_tab'] = 'supply'
-            request.session.modified = True
-            request.session.save()  # Explicitly save the session
-            messages.success(request, f'Added {original_request.items.count()} items to your cart.')
+            messages.success(request, f'Added {len(cart_items)} items to your cart.')
             return redirect('user_unified_request')
             
         elif request_type == 'borrow':
             original_request = get_object_or_404(BorrowRequest, id=request_id, user=request.user)
             # Clear existing borrow cart and add this item
-            cart_item = {
-                'property_id': original_request.property.id,
+            fill_cart(get_cart(request.user, BORROW), [{
+                'item_id': original_request.property_id,
                 'quantity': original_request.quantity,
-                'return_date': original_request.return_date.strftime('%Y-%m-%d') if original_request.return_date else None,
-                'purpose': original_request.purpose if hasattr(original_request, 'purpose') else ''
-            }
-            request.session['borrow_cart'] = [cart_item]
+                'return_date': original_request.return_date,
+                'purpose': original_request.purpose or ''
+            }])
             request.session['active_request_tab'] = 'borrow'
-            request.session.modified = True
-            request.session.save()  # Explicitly save the session
             messages.success(request, f'Added {original_request.property.property_name} to your borrow list.')
             return redirect('user_unified_request')
             
         elif request_type == 'batch_borrow':
             original_request = get_object_or_404(BorrowRequestBatch, id=request_id, user=request.user)
             # Clear existing borrow cart and add all items from the batch
-            borrow_items = []
-            for item in original_request.items.all():
-                borrow_items.append({
-                    'property_id': item.property.id,
+            borrow_items = [
+                {
+                    'item_id': item.property_id,
                     'quantity': item.quantity,
-                    'return_date': item.return_date.strftime('%Y-%m-%d') if item.return_date else None,
-                    'purpose': original_request.purpose if hasattr(original_request, 'purpose') else ''
-                })
-            request.session['borrow_cart'] = borrow_items
+                    'return_date': item.return_date,
+                    'purpose': original_request.purpose or ''
+                }
+                for item in original_request.items.all()
+            ]
+            fill_cart(get_cart(request.user, BORROW), borrow_items)
             request.session['active_request_tab'] = 'borrow'
-            request.session.modified = True
-            request.session.save()  # Explicitly save the session
-            messages.success(request, f'Added {original_request.items.count()} items to your borrow list.')
+            messages.success(request, f'Added {len(borrow_items)} items to your borrow list.')
             return redirect('user_unified_request')
             
         elif request_type == 'reservation':
             original_request = get_object_or_404(ReservationBatch, id=request_id, user=request.user)
-            # Clear existing reservation cart and add all items from the batch
-            reservation_items = []
-            for item in original_request.items.all():
-                reservation_items.append({
-                    'property_id': item.property.id,
-                    'property_name': item.property.property_name,
-                    'quantity': item.quantity,
-                    # Do NOT include old dates - user must set new dates
-                    'needed_date': None,
-                    'return_date': None,
-                    'purpose': item.remarks if item.remarks else ''
-                })
-            request.session['reservation_cart'] = reservation_items
-            # Do NOT store old batch-level dates - user must enter new dates
-            # Clear any existing reservation dates from session
-            if 'reservation_needed_date' in request.session:
-                del request.session['reservation_needed_date']
-            if 'reservation_return_date' in request.session:
-                del request.session['reservation_return_date']
-            request.session['reservation_purpose'] = original_request.purpose if hasattr(original_request, 'purpose') else ''
-            request.session.modified = True
-            request.session.save()  # Explicitly save the session
-            messages.success(request, f'Added {original_request.items.count()} items to your reservation list. Please set new reservation dates.')
+            # Clear existing reservation cart and add all items from the batch.
+            # Old item and batch-level dates are NOT carried over - user must set new dates
+            reservation_items = [
+                {'item_id': item.property_id, 'quantity': item.quantity, 'purpose': item.remarks or ''}
+                for item in original_request.items.all()
+            ]
+            fill_cart(get_cart(request.user, RESERVATION), reservation_items, purpose=original_request.purpose or '')
+            messages.success(request, f'Added {len(reservation_items)} items to your reservation list. Please set new reservation dates.')
             return redirect('user_reserve')
             
         else:
@@ -2817,35 +2443,15 @@ def add_to_list(request):
         
         # No quantity validation here - let users request any amount
         # Validation will happen during admin approval
-        available_quantity = supply.quantity_info.current_quantity
-        
-        # Get or create cart in session
-        cart = request.session.get('supply_cart', [])
-        
-        # Check if item already exists in cart
-        item_exists = False
-        for item in cart:
-            if item['supply_id'] == supply_id:
-                # Update quantity
-                item['quantity'] += quantity
-                item_exists = True
-                break
-        
-        if not item_exists:
-            cart.append({
-                'supply_id': supply_id,
-                'supply_name': supply.supply_name,
-                'quantity': quantity,
-                'available_quantity': available_quantity
-            })
         
-        request.session['supply_cart'] = cart
-        request.session.modified = True
+        # Adding an item already in the list adds to its quantity
+        cart = get_cart(request.user, SUPPLY)
+        add_to_cart(cart, supply.id, quantity)
         
         return JsonResponse({
             'success': True,
             'message': f'Added {supply.supply_name} to list.',
-            'list_count': len(cart),
+            'list_count': line_count(cart),
             'unit': supply.unit if supply.unit else ''
         })
         
@@ -2867,25 +2473,19 @@ def remove_from_list(request):
     """Remove an item from the supply request list"""
     supply_id = request.POST.get('supply_id')
     
-    # Convert supply_id to integer to handle type mismatch (session stores as int, POST sends as string)
+    cart = get_cart(request.user, SUPPLY)
     try:
-        supply_id = int(supply_id)
+        remove_from_cart(cart, supply_id)
     except (ValueError, TypeError):
         return JsonResponse({
             'success': False,
             'message': 'Invalid supply ID'
         })
     
-    cart = request.session.get('supply_cart', [])
-    cart = [item for item in cart if item['supply_id'] != supply_id]
-    
-    request.session['supply_cart'] = cart
-    request.session.modified = True
-    
     return JsonResponse({
         'success': True,
         'message': 'Item removed from cart.',
-        'cart_count': len(cart)
+        'cart_count': line_count(cart)
     })
 
 
@@ -2893,8 +2493,7 @@ def remove_from_list(request):
 @require_POST
 def clear_supply_list(request):
     """Clear all items from the supply request list"""
-    request.session['supply_cart'] = []
-    request.session.modified = True
+    clear_cart(get_cart(request.user, SUPPLY))
     
     return JsonResponse({
         'success': True,
@@ -2918,49 +2517,14 @@ def update_list_item(request):
     try:
         supply = Supply.objects.get(id=supply_id)
         
-        # Get the cart and create a new list with updated quantity
-        cart = request.session.get('supply_cart', [])
-        logger.info(f"Current cart before update: {cart}")
-        logger.info(f"Cart length: {len(cart)}")
-        
-        # Log all items in cart for debugging
-        for idx, item in enumerate(cart):
-            logger.info(f"  Cart item {idx}: supply_id={item.get('supply_id')} (type: {type(item.get('supply_id'))}), quantity={item.get('quantity')}")
-        
-        # Find and update the item
-        updated = False
-        for item in cart:
-            cart_supply_id = item['supply_id']
-            # Compare as strings since cart items are stored as strings
-            if str(item['supply_id']) == str(supply_id):
-                old_qty = item['quantity']
-                item['quantity'] = new_quantity
-                logger.info(f"Updated item in cart: supply_id={supply_id}, old_qty={old_qty}, new_qty={new_quantity}, item={item}")
-                updated = True
-                break
-        
-        if not updated:
-            logger.warning(f"Item {supply_id} not found in cart for update. Cart items: {[item.get('supply_id') for item in cart]}")
-        
-        # Set the session with the updated cart
-        request.session['supply_cart'] = cart
-        request.session.modified = True
-        request.session.save()  # Explicitly save the session
-        
-        # Verify the save
-        saved_cart = request.session.get('supply_cart', [])
-        logger.info(f"Cart after update and save: {saved_cart}")
-        
-        # Double check the item was saved
-        for item in saved_cart:
-            if str(item['supply_id']) == str(supply_id):
-                logger.info(f"Verified saved item: supply_id={supply_id}, quantity={item['quantity']}")
-                break
+        cart = get_cart(request.user, SUPPLY)
+        if not update_line(cart, supply.id, quantity=new_quantity):
+            logger.warning(f"Item {supply_id} not found in cart for update")
         
         return JsonResponse({
             'success': True,
             'message': 'Cart updated.',
-            'cart_count': len(cart)
+            'cart_count': line_count(cart)
         })
         
     except Supply.DoesNotExist:
@@ -2976,9 +2540,10 @@ def submit_list_request(request):
     """Submit the list as a batch supply request"""
     if request.method == 'POST':
         purpose = request.POST.get('purpose', '').strip()
-        cart = request.session.get('supply_cart', [])
+        cart = get_cart(request.user, SUPPLY)
+        lines = cart_lines(cart)
         
-        if not cart:
+        if not lines:
             return JsonResponse({
                 'success': False,
                 'message': 'Your request list is empty. Please add items before submitting.'
@@ -2992,22 +2557,7 @@ def submit_list_request(request):
         
         try:
             # Validate quantities against available_quantity (accounting for reserved items)
-            validation_errors = []
-            for cart_item in cart:
-                try:
-                    supply = Supply.objects.get(id=cart_item['supply_id'])
-                    requested_qty = cart_item['quantity']
-                    available_qty = supply.quantity_info.available_quantity
-                    
-                    if requested_qty > available_qty:
-                        validation_errors.append(
-                            f"{supply.supply_name}: Only {available_qty} unit(s) available "
-                            f"(accounting for reserved items). Please reduce your request to {available_qty} or less."
-                        )
-                except Supply.DoesNotExist:
-                    validation_errors.append(f"Supply item #{cart_item['supply_id']} not found.")
-                except SupplyQuantity.DoesNotExist:
-                    validation_errors.append(f"{supply.supply_name} has no quantity information.")
+            validation_errors = validate_cart(cart, lines)
             
             # If there are validation errors, return them all
             if validation_errors:
@@ -3016,52 +2566,22 @@ def submit_list_request(request):
                     'message': 'Cannot submit request due to insufficient available stock:\n' + '\n'.join(validation_errors)
                 })
             
-            # Create the batch request
-            batch_request = SupplyRequestBatch.objects.create(
-                user=request.user,
-                purpose=purpose,
-                status='pending'
-            )
-            
-            # Create individual items - use get_or_create to handle duplicates gracefully
-            for cart_item in cart:
-                supply = Supply.objects.get(id=cart_item['supply_id'])
-                # Use get_or_create in case item already exists (though it shouldn't in a new batch)
-                item, created = SupplyRequestItem.objects.get_or_create(
-                    batch_request=batch_request,
-                    supply=supply,
-                    defaults={'quantity': cart_item['quantity']}
-                )
-                # If item already existed, update quantity
-                if not created:
-                    item.quantity = cart_item['quantity']
-                    item.save()
+            # Create the batch request and its items, and empty the list
+            batch_request = submit_cart(cart, lines, purpose)
             
             # Log activity
-            supplies_for_logging = []
-            for cart_item in cart[:3]:
-                try:
-                    supply = Supply.objects.get(id=cart_item['supply_id'])
-                    supplies_for_logging.append(f"{supply.supply_name} (x{cart_item['quantity']})")
-                except Supply.DoesNotExist:
-                    supplies_for_logging.append(f"Unknown Item (x{cart_item['quantity']})")
-            
-            item_list = ", ".join(supplies_for_logging)
-            if len(cart) > 3:
-                item_list += f" and {len(cart) - 3} more items"
+            item_list = ", ".join(f"{line.supply.supply_name} (x{line.quantity})" for line in lines[:3])
+            if len(lines) > 3:
+                item_list += f" and {len(lines) - 3} more items"
             
             ActivityLog.log_activity(
                 user=request.user,
                 action='request',
                 model_name='SupplyRequestBatch',
                 object_repr=f"Batch #{batch_request.id}",
-                description=f"Submitted batch supply request with {len(cart)} items: {item_list}"
+                description=f"Submitted batch supply request with {len(lines)} items: {item_list}"
             )
             
-            # Clear the cart
-            request.session['supply_cart'] = []
-            request.session.modified = True
-            
             return JsonResponse({
                 'success': True,
                 'message': f'Supply request submitted successfully! Your request ID is #{batch_request.id}.'
@@ -3241,204 +2761,41 @@ def user_view_borrowers_slip(request, batch_id):
         return redirect('request_detail', type='batch_borrow', request_id=batch_id)
 
 
+def _request_counters_etag(request):
+    """ETag for the request counters: changes whenever any of the counts change."""
+    counters = get_request_counters(request.user)
+    return hashlib.md5(json.dumps(counters, sort_keys=True).encode()).hexdigest()
+
+
 @login_required
-def get_pending_count(request):
-    """API endpoint to get pending count filtered by type - counts items grouped by batch ID"""
-    from django.utils import timezone
-    from datetime import timedelta
-    user = request.user
+@cache_policy(SHORT_LIVED, etag_func=_request_counters_etag)
+def get_request_counters_api(request):
+    """
+    API endpoint returning every dashboard counter in one response:
+    {"pending": {"all": n, "supply": n, "borrow": n, "reservation": n}, "approved": {...}, "active": {...}}
+    """
+    return JsonResponse(get_request_counters(request.user))
+
+
+def _request_counter(request, bucket):
     request_type = request.GET.get('type', 'all')
-    today = timezone.now().astimezone().date()
-    tomorrow = today + timedelta(days=1)
-    
-    # Get all requests for the user
-    legacy_supply_requests = SupplyRequest.objects.filter(user=user)
-    batch_supply_requests = SupplyRequestBatch.objects.filter(user=user)
-    old_borrow_requests = BorrowRequest.objects.filter(user=user)
-    batch_borrow_items = BorrowRequestItem.objects.filter(batch_request__user=user)
-    legacy_reservations = Reservation.objects.filter(user=user)
-    batch_reservations = ReservationBatch.objects.filter(user=user)
-    
-    count = 0
-    seen_supply_batches = set()
-    seen_borrow_batches = set()
-    seen_reservation_batches = set()
-    
-    if request_type == 'all':
-        # Count all pending items (legacy items counted directly, batch items grouped by batch ID)
-        # For supply - count all pending (no return date filtering for supplies)
-        count += legacy_supply_requests.filter(status__in=['pending', 'pending_approval']).count()
-        
-        # Batch supply requests - count unique batches
-        for item in batch_supply_requests.filter(status__in=['pending', 'pending_approval']):
-            if item.id not in seen_supply_batches:
-                seen_supply_batches.add(item.id)
-                count += 1
-        
-        # For borrow - exclude if return_date < tomorrow
-        for item in old_borrow_requests.filter(status__in=['pending', 'pending_approval']):
-            if not item.return_date or item.return_date >= tomorrow:
-                count += 1
-        
-        # Batch borrow items - count unique batches (group by batch_request.id) and exclude if return_date < tomorrow
-        for item in batch_borrow_items.filter(status__in=['pending', 'pending_approval']):
-            if (not item.return_date or item.return_date >= tomorrow):
-                batch_id = item.batch_request.id
-                if batch_id not in seen_borrow_batches:
-                    seen_borrow_batches.add(batch_id)
-                    count += 1
-        
-        # For reservation - no return_date filter for pending reservations
-        count += legacy_reservations.filter(status__in=['pending', 'pending_approval']).count()
-        
-        # Batch reservations - count unique batches
-        for item in batch_reservations.filter(status__in=['pending', 'pending_approval']):
-            if item.id not in seen_reservation_batches:
-                seen_reservation_batches.add(item.id)
-                count += 1
-                
-    elif request_type == 'supply':
-        # Count only supply requests (no return date filtering)
-        count += legacy_supply_requests.filter(status__in=['pending', 'pending_approval']).count()
-        
-        # Batch supply requests - count unique batches
-        for item in batch_supply_requests.filter(status__in=['pending', 'pending_approval']):
-            if item.id not in seen_supply_batches:
-                seen_supply_batches.add(item.id)
-                count += 1
-                
-    elif request_type == 'borrow':
-        # Count only borrow requests - exclude if return_date < tomorrow
-        for item in old_borrow_requests.filter(status__in=['pending', 'pending_approval']):
-            if not item.return_date or item.return_date >= tomorrow:
-                count += 1
-        
-        # Batch borrow items - count unique batches (group by batch_request.id) and exclude if return_date < tomorrow
-        for item in batch_borrow_items.filter(status__in=['pending', 'pending_approval']):
-            if (not item.return_date or item.return_date >= tomorrow):
-                batch_id = item.batch_request.id
-                if batch_id not in seen_borrow_batches:
-                    seen_borrow_batches.add(batch_id)
-                    count += 1
-                    
-    elif request_type == 'reservation':
-        # Count only reservations
-        count += legacy_reservations.filter(status__in=['pending', 'pending_approval']).count()
-        
-        # Batch reservations - count unique batches
-        for item in batch_reservations.filter(status__in=['pending', 'pending_approval']):
-            if item.id not in seen_reservation_batches:
-                seen_reservation_batches.add(item.id)
-                count += 1
-    
-    return JsonResponse({'count': count})
+    counters = get_request_counters(request.user)[bucket]
+    return JsonResponse({'count': counters.get(request_type, 0)})
+
+
+@login_required
+def get_pending_count(request):
+    """API endpoint to get pending count filtered by type (batches count once)"""
+    return _request_counter(request, 'pending')
 
 
 @login_required
 def get_active_count(request):
-    """API endpoint to get active count filtered by type - counts items currently active by date"""
-    user = request.user
-    request_type = request.GET.get('type', 'all')
-    today = timezone.now().astimezone().date()  # Use local timezone, not UTC
-    
-    count = 0
-    seen_batch_requests = set()  # Track batch requests to avoid counting duplicates (group by batch ID)
-    
-    # Get batch borrow items that are active and within date range
-    if request_type in ['all', 'borrow']:
-        batch_borrow_items = BorrowRequestItem.objects.filter(batch_request__user=user, status='active')
-        for item in batch_borrow_items:
-            # Use borrow_date from claimed_date or request_date
-            borrow_date = item.claimed_date if item.claimed_date else item.batch_request.request_date
-            return_date = item.return_date
-            
-            if borrow_date and return_date:
-                borrow_date_only = borrow_date.date() if hasattr(borrow_date, 'date') else borrow_date
-                return_date_only = return_date.date() if hasattr(return_date, 'date') else return_date
-                
-                if borrow_date_only <= today <= return_date_only:
-                    # Group by batch request ID to avoid counting duplicates (multiple items in same batch)
-                    batch_id = item.batch_request.id
-                    if batch_id not in seen_batch_requests:
-                        seen_batch_requests.add(batch_id)
-                        count += 1
-    
-    # Get batch reservations that are active and within date range
-    if request_type in ['all', 'reservation']:
-        batch_reservations = ReservationBatch.objects.filter(user=user, status='active')
-        for batch in batch_reservations:
-            needed_date = batch.earliest_needed_date
-            return_date = batch.latest_return_date
-            
-            if needed_date and return_date:
-                if needed_date <= today <= return_date:
-                    count += 1
-    
-    return JsonResponse({'count': count})
+    """API endpoint to get active count filtered by type - requests currently active by date"""
+    return _request_counter(request, 'active')
 
 
 @login_required
 def get_approved_count(request):
-    """API endpoint to get approved count filtered by type - counts items grouped by batch ID"""
-    user = request.user
-    request_type = request.GET.get('type', 'all')
-    
-    # Get all requests for the user
-    legacy_supply_requests = SupplyRequest.objects.filter(user=user)
-    batch_supply_requests = SupplyRequestBatch.objects.filter(user=user)
-    old_borrow_requests = BorrowRequest.objects.filter(user=user)
-    batch_borrow_items = BorrowRequestItem.objects.filter(batch_request__user=user)
-    legacy_reservations = Reservation.objects.filter(user=user)
-    batch_reservations = ReservationBatch.objects.filter(user=user)
-    
-    count = 0
-    seen_batch_requests = set()  # Track batch requests to avoid counting duplicates (group by batch ID)
-    
-    if request_type == 'all':
-        # Count all approved items (legacy items counted directly, batch items grouped by batch ID)
-        count += legacy_supply_requests.filter(status__in=['approved', 'for_claiming']).count()
-        # Batch supply requests - count unique batches
-        for item in batch_supply_requests.filter(status__in=['approved', 'for_claiming', 'partially_approved']):
-            if item.id not in seen_batch_requests:
-                seen_batch_requests.add(item.id)
-                count += 1
-        count += old_borrow_requests.filter(status__in=['approved', 'for_claiming']).count()
-        # Batch borrow items - count unique batches (group by batch_request.id)
-        for item in batch_borrow_items.filter(status__in=['approved', 'for_claiming']):
-            batch_id = item.batch_request.id
-            if batch_id not in seen_batch_requests:
-                seen_batch_requests.add(batch_id)
-                count += 1
-        count += legacy_reservations.filter(status__in=['approved', 'for_claiming']).count()
-        # Batch reservations - count unique batches
-        for item in batch_reservations.filter(status__in=['approved', 'for_claiming', 'partially_approved']):
-            if item.id not in seen_batch_requests:
-                seen_batch_requests.add(item.id)
-                count += 1
-    elif request_type == 'supply':
-        # Count only supply requests
-        count += legacy_supply_requests.filter(status__in=['approved', 'for_claiming']).count()
-        # Batch supply requests - count unique batches
-        for item in batch_supply_requests.filter(status__in=['approved', 'for_claiming', 'partially_approved']):
-            if item.id not in seen_batch_requests:
-                seen_batch_requests.add(item.id)
-                count += 1
-    elif request_type == 'borrow':
-        # Count only borrow requests
-        count += old_borrow_requests.filter(status__in=['approved', 'for_claiming']).count()
-        # Batch borrow items - count unique batches (group by batch_request.id)
-        for item in batch_borrow_items.filter(status__in=['approved', 'for_claiming']):
-            batch_id = item.batch_request.id
-            if batch_id not in seen_batch_requests:
-                seen_batch_requests.add(batch_id)
-                count += 1
-    elif request_type == 'reservation':
-        # Count only reservations
-        count += legacy_reservations.filter(status__in=['approved', 'for_claiming']).count()
-        # Batch reservations - count unique batches
-        for item in batch_reservations.filter(status__in=['approved', 'for_claiming', 'partially_approved']):
-            if item.id not in seen_batch_requests:
-                seen_batch_requests.add(item.id)
-                count += 1
-    
-    return JsonResponse({'count': count})
\ No newline at end of file
+    """API endpoint to get approved count filtered by type (batches count once)"""
+    return _request_counter(request, 'approved')
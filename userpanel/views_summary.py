@@ -4,10 +4,12 @@ from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMix
 from django.views.generic import TemplateView
 from django.http import HttpResponse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from app.db_routing import ReportingViewMixin, using_reporting
 from app.models import SupplyRequestBatch, BorrowRequestBatch, ReservationBatch, SupplyCategory, PPMP, PPMPItem
+from app.supply_tally import claimed_items, rollup, tally_cube
 
 
-class UserRequestsSummaryView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+class UserRequestsSummaryView(LoginRequiredMixin, PermissionRequiredMixin, ReportingViewMixin, TemplateView):
     """View for users to see a summary of all their requested items, filterable by year with PDF export"""
     template_name = 'userpanel/user_requests_summary.html'
     permission_required = 'app.view_user_module'
@@ -265,6 +267,7 @@ class UserRequestsSummaryView(LoginRequiredMixin, PermissionRequiredMixin, Templ
 
 @login_required
 @permission_required('app.view_user_module')
+@using_reporting()
 def export_requests_summary_pdf(request):
     """Export user's requests summary as PDF"""
     from reportlab.lib.pagesizes import letter, landscape
@@ -470,6 +473,7 @@ def export_requests_summary_pdf(request):
 
 @login_required
 @permission_required('app.view_user_module')
+@using_reporting()
 def export_claimed_supplies_tally_excel(request):
     """Export claimed supplies tally as Excel with filters"""
     from openpyxl import Workbook
@@ -573,61 +577,38 @@ def export_claimed_supplies_tally_excel(request):
             cell.alignment = center_aligned
             cell.border = border
         
-        # Get tally data
-        tally_items = []
-        tally_supply_batches = SupplyRequestBatch.objects.filter(user=request.user)
-        
+        # Get tally data: the user's completed items, rolled up per supply from the tally cube
+        def parse_date(value):
+            try:
+                return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+            except ValueError:
+                return None
+
         # Apply date filters - prioritize date range over year/month
         if start_date_filter or end_date_filter:
-            if start_date_filter:
-                try:
-                    start_date = datetime.strptime(start_date_filter, '%Y-%m-%d').date()
-                    tally_supply_batches = tally_supply_batches.filter(request_date__gte=start_date)
-                except:
-                    pass
-            if end_date_filter:
-                try:
-                    end_date = datetime.strptime(end_date_filter, '%Y-%m-%d').date()
-                    tally_supply_batches = tally_supply_batches.filter(request_date__lte=end_date)
-                except:
-                    pass
+            date_filters = {'date_from': parse_date(start_date_filter), 'date_to': parse_date(end_date_filter)}
         else:
-            # Use year/month filters if no date range specified
-            if year_filter:
-                tally_supply_batches = tally_supply_batches.filter(request_date__year=year_filter)
-            if month_filter:
-                tally_supply_batches = tally_supply_batches.filter(request_date__month=month_filter)
-        
-        for batch in tally_supply_batches:
-            for item in batch.items.filter(status='completed'):
-                category_name = item.supply.category.name if item.supply.category else 'Uncategorized'
-                if category_filter and category_name != category_filter:
-                    continue
-                    
-                tally_items.append({
-                    'supply_id': item.supply.barcode or f"SUP-{item.supply.id}",
-                    'item_name': item.supply.supply_name,
-                    'category': category_name,
-                    'quantity': item.quantity,
-                    'approved_quantity': item.approved_quantity or 0,
-                })
-        
-        # Build item tally (group by item name)
-        tally_dict = {}
-        for item in tally_items:
-            key = item['item_name']
-            if key not in tally_dict:
-                tally_dict[key] = {
-                    'supply_id': item['supply_id'],
-                    'item_name': item['item_name'],
-                    'category': item['category'],
-                    'total_quantity': 0,
-                    'total_approved': 0,
-                }
-            tally_dict[key]['total_quantity'] += item['quantity']
-            tally_dict[key]['total_approved'] += item['approved_quantity']
-        
-        tally_data = sorted(tally_dict.values(), key=lambda x: x['total_quantity'], reverse=True)
+            date_filters = {'year': year_filter, 'month': month_filter}
+
+        cube = tally_cube(claimed_items(
+            batch_statuses=None,
+            user=request.user.id,
+            category_name=category_filter,
+            **date_filters,
+        ))
+        tally_data = [
+            {
+                'supply_id': row['supply_barcode'] or f"SUP-{row['supply_id']}",
+                'item_name': row['supply_name'],
+                'category': row['category_name'],
+                'total_quantity': row['requested'],
+                'total_approved': row['recorded_approved'],
+            }
+            # Approved as the summary page counts it: items without an approved quantity add nothing
+            for row in rollup(cube, 'supply_id', 'supply_name', 'supply_barcode', 'category_name',
+                              measures=('requested', 'recorded_approved'))
+        ]
+        tally_data.sort(key=lambda x: x['total_quantity'], reverse=True)
         
         # Add data rows
         row_num = header_row + 1